@@ -0,0 +1,97 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the adaptive radix tree (ART) of the C solvers. It generates
+# the solvers of graphClausure.dl and pointerAnalysis.dl with the ART and with
+# the other data structures of the paths and the sets, creates random facts of
+# several sizes and reports the time and the peak memory (maximum resident set
+# size) of every solver. The answers are compared with the ones of the first
+# data structure. The solvers that use Judy are only measured when it is
+# installed (otherwise they can't be built and they are reported as skipped).
+#
+# Usage (from the experiments directory):
+#    python BenchmarkCART.py
+
+import os, sys
+import random, time
+import hashlib
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, EXAMPLES_DIR, REPETITIONS, DEVNULL, \
+                                  generateGraphClausureFacts, generatePointerAnalysisFacts
+
+C_OPTIONS = ['Paths=ART,Sets=ART',
+             'Paths=ART,Sets=BitMap',
+             'Paths=Hash,Sets=BitMap',
+             'Paths=Hash,Sets=ART',
+             'Paths=BTree,Sets=BTree',
+             'Paths=Judy,Sets=Judy']
+
+# Programs: (name, program, queried predicate, facts generator, sizes)
+PROGRAMS = [('graphClausure', os.path.join(EXAMPLES_DIR, 'graphClausure.dl'), 'path',
+             generateGraphClausureFacts, [500, 1000, 2000]),
+            ('pointerAnalysis', os.path.join(EXAMPLES_DIR, 'pointerAnalysis.dl'), 'vP',
+             generatePointerAnalysisFacts, [250, 500, 1000])]
+
+# This function returns the directory of the solver or None if it can't be
+# built (Judy is not installed)
+def generateSolver(program, query, directory, options):
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-p', query, '-d', directory, '-o', options,
+                           program], cwd=COMPILER_DIR, stdout=DEVNULL, stderr=DEVNULL)
+    solver_dir = os.path.join(directory, 'Solver_C_code')
+    if subprocess.call(['make'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL):
+        return None
+    return solver_dir
+
+# This function returns the best time and the peak memory (in kilobytes) of
+# the solver
+def measureSolver(solver_dir, facts_dir):
+    best = float("inf")
+    memory = 0
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        process = subprocess.Popen(['./solver'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+        _, _, usage = os.wait4(process.pid, 0)
+        best = min(best, time.time() - start)
+        memory = max(memory, usage.ru_maxrss)
+    return best, memory
+
+# This function returns the number of answers and a digest that doesn't depend
+# on their order. The answers are not kept: the solvers are forked from this
+# process and its memory would be added to their peak memory.
+def readAnswers(solver_dir, query):
+    number, digest = 0, 0
+    with open(os.path.join(solver_dir, query + '.tuples')) as f:
+        for line in f:
+            number += 1
+            digest = (digest + int(hashlib.md5(line).hexdigest(), 16)) % (1 << 128)
+    return number, digest
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        print 'PROGRAM\tSIZE\tOPTIONS\tANSWERS\tTIME (s)\tMEMORY (KB)\tSAME ANSWERS'
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            for size in sizes:
+                facts_dir = os.path.join(directory, 'facts')
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+                answers = None
+                for options in C_OPTIONS:
+                    solver_dir = generateSolver(program, query, os.path.join(directory, 'solver'), options)
+                    if solver_dir is None:
+                        print '{}\t{}\t{}\tskipped (it can\'t be built)'.format(name, size, options)
+                    else:
+                        best, memory = measureSolver(solver_dir, facts_dir)
+                        solver_answers = readAnswers(solver_dir, query)
+                        if answers is None:
+                            answers = solver_answers
+                        print '{}\t{}\t{}\t{}\t{:.3f}\t{}\t{}'.format(name, size, options, solver_answers[0],
+                                                                      best, memory, answers == solver_answers)
+                    shutil.rmtree(os.path.join(directory, 'solver'))
+                shutil.rmtree(facts_dir)
+    finally:
+        shutil.rmtree(directory)
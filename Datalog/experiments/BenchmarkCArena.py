@@ -0,0 +1,105 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the allocation of the nodes of the data structure of the C
+# solvers. It generates the solvers of graphClausure.dl and pointerAnalysis.dl
+# with several data structures, creates random facts and reports the time of
+# the solver, the time it spends freeing the data structure and its peak memory
+# (maximum resident set size). The time of the teardown is the difference with
+# a copy of the solver that doesn't call solver_free.
+#
+# The directory of an older version of the compiler (for example one extracted
+# with git archive) can be given as argument. In that case the solvers it
+# generates are also measured and the answers of both solvers are compared.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkCArena.py [reference compiler directory]
+
+import os, sys
+import random, time
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, EXAMPLES_DIR, REPETITIONS, DEVNULL, \
+                                  generateGraphClausureFacts, generatePointerAnalysisFacts
+
+REFERENCE_DIR = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+
+# Data structures of the C solvers that don't require Judy
+C_OPTIONS = ['Paths=Hash,Sets=BitMap',
+             'Paths=Hash,Sets=AVLTree',
+             'Paths=BTree,Sets=AVLTree']
+
+# Programs: (name, program, queried predicate, facts generator, size)
+PROGRAMS = [('graphClausure', os.path.join(EXAMPLES_DIR, 'graphClausure.dl'), 'path',
+             generateGraphClausureFacts, 2000),
+            ('pointerAnalysis', os.path.join(EXAMPLES_DIR, 'pointerAnalysis.dl'), 'vP',
+             generatePointerAnalysisFacts, 1000)]
+
+# This function returns the directories of the solver and of its copy that
+# doesn't free the data structure
+def generateSolvers(compiler_dir, program, query, directory, options):
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-p', query, '-d', directory, '-o', options,
+                           program], cwd=compiler_dir, stdout=DEVNULL, stderr=DEVNULL)
+    solver_dir = os.path.join(directory, 'Solver_C_code')
+    no_free_dir = os.path.join(directory, 'Solver_C_code_no_free')
+    shutil.copytree(solver_dir, no_free_dir)
+    with open(os.path.join(no_free_dir, 'main.c')) as f:
+        main = f.read()
+    with open(os.path.join(no_free_dir, 'main.c'), 'w') as f:
+        f.write(main.replace('solver_free();', ''))
+    for d in [solver_dir, no_free_dir]:
+        subprocess.check_call(['make'], cwd=d, stdout=DEVNULL, stderr=DEVNULL)
+    return solver_dir, no_free_dir
+
+# This function returns the best time and the peak memory (in kilobytes) of
+# the solver. The exit status is not checked, the reference solvers can fail
+# freeing their data structures.
+def measureSolver(solver_dir, facts_dir):
+    best = float("inf")
+    memory = 0
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        process = subprocess.Popen(['./solver'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+        _, _, usage = os.wait4(process.pid, 0)
+        best = min(best, time.time() - start)
+        memory = max(memory, usage.ru_maxrss)
+    return best, memory
+
+def readAnswers(solver_dir, query):
+    with open(os.path.join(solver_dir, query + '.tuples')) as f:
+        return sorted(f.readlines())
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        header = 'PROGRAM\tOPTIONS\tANSWERS\tTIME (s)\tTEARDOWN (s)\tMEMORY (KB)'
+        if REFERENCE_DIR:
+            header += '\tREFERENCE TIME (s)\tREFERENCE TEARDOWN (s)\tREFERENCE MEMORY (KB)\tSAME ANSWERS'
+        print header
+        for name, program, query, generateFacts, size in PROGRAMS:
+            facts_dir = os.path.join(directory, 'facts')
+            os.mkdir(facts_dir)
+            generateFacts(facts_dir, size, random.Random(size))
+            for options in C_OPTIONS:
+                compilers = [COMPILER_DIR] + ([REFERENCE_DIR] if REFERENCE_DIR else [])
+                line = '{}\t{}'.format(name, options)
+                answers = None
+                for number, compiler_dir in enumerate(compilers):
+                    solver_dir, no_free_dir = generateSolvers(compiler_dir, program, query,
+                                                              os.path.join(directory, str(number)), options)
+                    best, memory = measureSolver(solver_dir, facts_dir)
+                    best_no_free, _ = measureSolver(no_free_dir, facts_dir)
+                    if answers is None:
+                        answers = readAnswers(solver_dir, query)
+                        line += '\t{}'.format(len(answers))
+                    line += '\t{:.3f}\t{:.3f}\t{}'.format(best, max(0.0, best - best_no_free), memory)
+                    if number:
+                        line += '\t{}'.format(answers == readAnswers(solver_dir, query))
+                    shutil.rmtree(os.path.join(directory, str(number)))
+                print line
+            shutil.rmtree(facts_dir)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,97 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the reading of the facts of the C solvers. It generates a file
+# of facts of the given size (in GB, 1 by default) for a program whose only rule
+# selects the facts with a constant, so most of the time of the solver is spent
+# reading the facts. The solver is generated reading the facts with the mapped
+# files (Facts=Mmap) and with the producer thread (Facts=Thread), the facts per
+# second and the peak memory (maximum resident set size) are reported for both.
+#
+# The directory of an older version of the compiler (for example one extracted
+# with git archive) can be given as second argument. In that case the solver it
+# generates is also measured and the answers of the solvers are compared.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkCFactsReader.py [size in GB] [reference compiler directory]
+
+import os, sys
+import random, time
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, REPETITIONS, DEVNULL
+
+SIZE = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+REFERENCE_DIR = os.path.abspath(sys.argv[2]) if len(sys.argv) > 2 else None
+
+PROGRAM = 'q(X, Y) :- e(X, Y, 7).\n'
+# Data structures of the C solvers that don't require Judy
+C_OPTIONS = 'Paths=Hash,Sets=BitMap'
+# The file is written repeating a block of random facts
+BLOCK_FACTS = 1 << 20
+
+# This function writes the facts of e and returns their number
+def generateFacts(filename, size, rnd):
+    block = ''.join('e({}, {}, {}).\n'.format(rnd.randint(0, 999), rnd.randint(0, 999), rnd.randint(0, 9))
+                    for _ in xrange(BLOCK_FACTS))
+    blocks = max(1, int(size * (1 << 30) / len(block)))
+    with open(filename, 'wb') as f:
+        for _ in xrange(blocks):
+            f.write(block)
+    return blocks * BLOCK_FACTS
+
+def generateSolver(compiler_dir, program, directory, options):
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-d', directory, '-o', options, program],
+                          cwd=compiler_dir, stdout=DEVNULL, stderr=DEVNULL)
+    solver_dir = os.path.join(directory, 'Solver_C_code')
+    subprocess.check_call(['make'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+    return solver_dir
+
+# This function returns the best time and the peak memory (in kilobytes) of the
+# solver. Its exit status is not checked, the reference solver can fail freeing
+# its queues after the answers are written.
+def measureSolver(solver_dir, facts_file):
+    best = float("inf")
+    memory = 0
+    os.symlink(facts_file, os.path.join(solver_dir, 'e.tuples'))
+    for _ in xrange(REPETITIONS):
+        start = time.time()
+        process = subprocess.Popen(['./solver'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+        _, _, usage = os.wait4(process.pid, 0)
+        best = min(best, time.time() - start)
+        memory = max(memory, usage.ru_maxrss)
+    return best, memory
+
+def readAnswers(solver_dir):
+    with open(os.path.join(solver_dir, 'q.tuples')) as f:
+        return sorted(f.readlines())
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        program = os.path.join(directory, 'select.dl')
+        with open(program, 'w') as f:
+            f.write(PROGRAM)
+        facts_file = os.path.join(directory, 'e.tuples')
+        number_of_facts = generateFacts(facts_file, SIZE, random.Random(0))
+        size = os.path.getsize(facts_file)
+
+        solvers = [(facts, generateSolver(COMPILER_DIR, program, os.path.join(directory, facts),
+                                          C_OPTIONS + ',Facts=' + facts)) for facts in ['Mmap', 'Thread']]
+        if REFERENCE_DIR:
+            solvers.append(('Reference', generateSolver(REFERENCE_DIR, program,
+                                                        os.path.join(directory, 'Reference'), C_OPTIONS)))
+
+        print 'READER\tFILE (MB)\tFACTS\tTIME (s)\tFACTS/S\tMB/S\tMEMORY (KB)\tSAME ANSWERS'
+        answers = None
+        for name, solver_dir in solvers:
+            best, memory = measureSolver(solver_dir, facts_file)
+            if answers is None:
+                answers = readAnswers(solver_dir)
+            print '{}\t{}\t{}\t{:.3f}\t{:.0f}\t{:.1f}\t{}\t{}'.format(name, size >> 20, number_of_facts, best,
+                                                                   number_of_facts / best,
+                                                                   size / best / (1 << 20), memory,
+                                                                   answers == readAnswers(solver_dir))
+    finally:
+        shutil.rmtree(directory)
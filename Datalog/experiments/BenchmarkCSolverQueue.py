@@ -0,0 +1,107 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the queue of the rewriting variables of the C solvers. It
+# generates the solvers of graphClausure.dl and of the program with a chain of
+# copies of a relation (every rewriting variable is cheap to evaluate, so the
+# time is dominated by the queue), creates random facts of increasing sizes and
+# reports the time, the peak memory (maximum resident set size) and the
+# statistics of the queue of every solver.
+#
+# The directory of an older version of the compiler (for example one extracted
+# with git archive) can be given as argument. In that case the solvers it
+# generates are also measured, the speedup is reported and the answers of both
+# solvers are compared. The reference solvers can fail freeing their data
+# structures after the answers are written, then their times don't include it.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkCSolverQueue.py [reference compiler directory]
+
+import os, sys, re
+import random, time
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, EXAMPLES_DIR, REPETITIONS, DEVNULL, CHAIN_LENGTH, \
+                                  generateGraphClausureFacts, generateChainFacts, generateChainProgram
+
+REFERENCE_DIR = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+
+# Data structures of the C solvers that don't require Judy
+C_OPTIONS = 'Paths=Hash,Sets=BitMap'
+STATISTICS_RE = re.compile(r'Queue \d+: (\d+) variables at most, (\d+) blocks \((\d+) bytes\), '
+                           r'(\d+) variables appended')
+
+# Programs: (name, program, queried predicate, facts generator, sizes)
+PROGRAMS = [('graphClausure', os.path.join(EXAMPLES_DIR, 'graphClausure.dl'), 'path',
+             generateGraphClausureFacts, [500, 1000, 2000]),
+            ('chain', None, 'p{}'.format(CHAIN_LENGTH),
+             generateChainFacts, [1000, 2000, 4000])]
+
+def generateSolver(compiler_dir, program, query, directory):
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-p', query, '-d', directory, '-o', C_OPTIONS,
+                           program], cwd=compiler_dir, stdout=DEVNULL, stderr=DEVNULL)
+    solver_dir = os.path.join(directory, 'Solver_C_code')
+    subprocess.check_call(['make'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+    return solver_dir
+
+# This function returns the best time, the peak memory (in kilobytes) and the
+# statistics printed by the solver. The exit status is not checked, the
+# reference solvers can fail freeing their queues after the answers are written.
+def measureSolver(solver_dir, facts_dir):
+    best = float("inf")
+    memory = 0
+    environment = dict(os.environ, SOLVER_QUEUE_STATISTICS='1')
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        process = subprocess.Popen(['./solver'], cwd=solver_dir, stdout=DEVNULL, stderr=subprocess.PIPE,
+                                   env=environment)
+        errors = process.stderr.read()
+        _, _, usage = os.wait4(process.pid, 0)
+        best = min(best, time.time() - start)
+        memory = max(memory, usage.ru_maxrss)
+    return best, memory, errors
+
+def readAnswers(solver_dir, query):
+    with open(os.path.join(solver_dir, query + '.tuples')) as f:
+        return sorted(f.readlines())
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        header = 'PROGRAM\tSIZE\tANSWERS\tTIME (s)\tMEMORY (KB)\tQUEUE MAXIMUM\tQUEUE BLOCKS\tAPPENDED'
+        if REFERENCE_DIR:
+            header += '\tREFERENCE TIME (s)\tREFERENCE MEMORY (KB)\tSPEEDUP\tSAME ANSWERS'
+        print header
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            solvers = [generateSolver(COMPILER_DIR, program, query, os.path.join(directory, name))]
+            if REFERENCE_DIR:
+                solvers.append(generateSolver(REFERENCE_DIR, program, query,
+                                              os.path.join(directory, name + '-reference')))
+            for size in sizes:
+                facts_dir = os.path.join(directory, 'facts')
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                best, memory, errors = measureSolver(solvers[0], facts_dir)
+                answers = readAnswers(solvers[0], query)
+                # The statistics of the queues of all the stratums are added
+                statistics = [0, 0, 0, 0]
+                for m in STATISTICS_RE.finditer(errors):
+                    statistics = [x + int(y) for x, y in zip(statistics, m.groups())]
+                line = '{}\t{}\t{}\t{:.3f}\t{}\t{}\t{}\t{}'.format(name, size, len(answers), best, memory,
+                                                                   statistics[0], statistics[1], statistics[3])
+                if REFERENCE_DIR:
+                    reference_best, reference_memory, _ = measureSolver(solvers[1], facts_dir)
+                    line += '\t{:.3f}\t{}\t{:.2f}\t{}'.format(reference_best, reference_memory,
+                                                              reference_best / best,
+                                                              answers == readAnswers(solvers[1], query))
+                print line
+                shutil.rmtree(facts_dir)
+    finally:
+        shutil.rmtree(directory)
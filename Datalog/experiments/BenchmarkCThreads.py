@@ -0,0 +1,92 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the evaluation of the C solvers with several threads. It
+# generates the solvers of graphClausure.dl and pointerAnalysis.dl without the
+# option Threads and with it, creates random facts and reports the time of the
+# sequential solver and the time and the speedup of the threaded solver with
+# every number of threads (given by the environment variable SOLVER_THREADS).
+# The answers of the threaded solvers are compared with the sequential ones.
+#
+# The directory of an older version of the compiler (for example one extracted
+# with git archive) can be given as argument. In that case the sequential
+# solvers are generated by it.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkCThreads.py [reference compiler directory]
+
+import os, sys
+import random, time
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, EXAMPLES_DIR, REPETITIONS, DEVNULL, \
+                                  generateGraphClausureFacts, generatePointerAnalysisFacts
+
+REFERENCE_DIR = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+
+# Data structures of the C solvers that can be used with several threads
+C_OPTIONS = ['Paths=Hash,Sets=BitMap',
+             'Paths=BTree,Sets=AVLTree']
+THREADS = [1, 2, 4]
+
+# Programs: (name, program, queried predicate, facts generator, size)
+PROGRAMS = [('graphClausure', os.path.join(EXAMPLES_DIR, 'graphClausure.dl'), 'path',
+             generateGraphClausureFacts, 1000),
+            ('pointerAnalysis', os.path.join(EXAMPLES_DIR, 'pointerAnalysis.dl'), 'vP',
+             generatePointerAnalysisFacts, 1000)]
+
+def generateSolver(compiler_dir, program, query, directory, options):
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-p', query, '-d', directory, '-o', options,
+                           program], cwd=compiler_dir, stdout=DEVNULL, stderr=DEVNULL)
+    solver_dir = os.path.join(directory, 'Solver_C_code')
+    subprocess.check_call(['make'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+    return solver_dir
+
+def measureSolver(solver_dir, facts_dir, threads=None):
+    best = float("inf")
+    environment = dict(os.environ)
+    if threads:
+        environment['SOLVER_THREADS'] = str(threads)
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        subprocess.call(['./solver'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL, env=environment)
+        best = min(best, time.time() - start)
+    return best
+
+def readAnswers(solver_dir, query):
+    with open(os.path.join(solver_dir, query + '.tuples')) as f:
+        return sorted(f.readlines())
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        header = 'PROGRAM\tOPTIONS\tANSWERS\tSEQUENTIAL (s)'
+        for threads in THREADS:
+            header += '\t{0} THREADS (s)\t{0} THREADS SPEEDUP'.format(threads)
+        print header + '\tSAME ANSWERS'
+        for name, program, query, generateFacts, size in PROGRAMS:
+            facts_dir = os.path.join(directory, 'facts')
+            os.mkdir(facts_dir)
+            generateFacts(facts_dir, size, random.Random(size))
+            for options in C_OPTIONS:
+                sequential_dir = generateSolver(REFERENCE_DIR or COMPILER_DIR, program, query,
+                                                os.path.join(directory, 'sequential'), options)
+                threads_dir = generateSolver(COMPILER_DIR, program, query, os.path.join(directory, 'threads'),
+                                             '{},Threads={}'.format(options, max(THREADS)))
+                sequential = measureSolver(sequential_dir, facts_dir)
+                answers = readAnswers(sequential_dir, query)
+                line = '{}\t{}\t{}\t{:.3f}'.format(name, options, len(answers), sequential)
+                same_answers = True
+                for threads in THREADS:
+                    best = measureSolver(threads_dir, facts_dir, threads)
+                    same_answers = same_answers and answers == readAnswers(threads_dir, query)
+                    line += '\t{:.3f}\t{:.2f}'.format(best, sequential / best)
+                print line + '\t{}'.format(same_answers)
+                shutil.rmtree(os.path.join(directory, 'sequential'))
+                shutil.rmtree(os.path.join(directory, 'threads'))
+            shutil.rmtree(facts_dir)
+    finally:
+        shutil.rmtree(directory)
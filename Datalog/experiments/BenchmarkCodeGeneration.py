@@ -0,0 +1,133 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the code generators (the frontends). It generates synthetic
+# programs between 250 and 4000 rules, analyzes them once and measures the
+# time every frontend requires to generate the code of the solver. The time
+# required to build the generation index shared by the frontends is also
+# reported. For the biggest program the time required by every frontend is
+# also measured with different numbers of processes filling the templates.
+#
+# The directory of the compiler can be given as argument, that way the same
+# programs can be measured with an older version of the compiler (for example
+# one extracted with git archive) and both tables compared.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkCodeGeneration.py [compiler directory]
+
+import os, sys
+import random, time
+import shutil, tempfile
+import logging, inspect
+
+COMPILER_DIR = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, COMPILER_DIR)
+# The frontends look for the templates in the current directory
+os.chdir(COMPILER_DIR)
+
+from dcompiler import analyzeProgram
+import c_Frontend, py_Frontend, java_Frontend, cPP_Frontend
+
+SIZES = [250, 500, 1000, 2000, 4000]
+# Number of extensional predicates of the programs
+NUMBER_OF_RELATIONS = 20
+# Number of rules defining every intensional predicate
+RULES_PER_PREDICATE = 4
+REPETITIONS = 1
+
+C_COMPOSITION_STRUCTURES = {"Paths": "Hash", "Successors": "Queue", "Sets": "BitMap"}
+
+# Number of processes used to fill the templates of the biggest program (only
+# for the versions of the compiler that accept the jobs option)
+JOBS = [1, 2, 4]
+
+FRONTENDS = [('C', lambda d, s, p, i, **k: c_Frontend.generate_code_from_template(d, s, C_COMPOSITION_STRUCTURES,
+                                                                                  p, p.intensional, [], i, **k)),
+             ('Python', lambda d, s, p, i, **k: py_Frontend.generate_code_from_template(d, s, p, p.intensional,
+                                                                                        [], i, 'Native', 'Deque',
+                                                                                        **k)),
+             ('Java', lambda d, s, p, i, **k: java_Frontend.generate_code_from_template(d, s, p, p.intensional,
+                                                                                        [], i, **k)),
+             ('CPP', lambda d, s, p, i, **k: cPP_Frontend.generate_code_from_template(d, s, p, p.intensional,
+                                                                                      [], i, **k))]
+
+# This function generates a program with the given number of rules. Every
+# intensional predicate is defined by a copy rule from a relation and by
+# joins of two predicates defined before it, some of them with a constant or
+# negating a relation (the negated relations are never used as positive ones).
+def generateProgram(number_of_rules, seed=0):
+    rnd = random.Random(seed)
+    relations = ['relation{}'.format(x) for x in xrange(NUMBER_OF_RELATIONS)]
+    negated_relations = ['excluded{}'.format(x) for x in xrange(NUMBER_OF_RELATIONS)]
+    predicates = []
+
+    lines = []
+    for line_no in xrange(number_of_rules):
+        if line_no % RULES_PER_PREDICATE == 0:
+            predicates.append('predicate{}'.format(len(predicates)))
+            lines.append('{}(X, Y) :- {}(X, Y).\n'.format(predicates[-1], rnd.choice(relations)))
+            continue
+        head = predicates[-1]
+        first = rnd.choice(predicates[-50:] + relations)
+        second = rnd.choice(predicates[-50:] + relations)
+        kind = rnd.randint(0, 3)
+        if kind == 1:
+            lines.append('{}(X, Y) :- {}(X, Z), {}(Z, Y).\n'.format(head, first, second))
+        elif kind == 2:
+            lines.append('{}(X, Y) :- {}(X, {}), {}(X, Y).\n'.format(head, first, rnd.randint(0, 100),
+                                                                     second))
+        elif kind == 3:
+            lines.append('{}(X, Y) :- {}(X, Y), ~{}(X, Y).\n'.format(head, first, rnd.choice(negated_relations)))
+        else:
+            lines.append('{}(X, Y) :- {}(Y, X).\n'.format(head, first))
+    return ''.join(lines)
+
+def measure(generator, stratums, predicateTypes, idToStratumLevels, **options):
+    times = []
+    for _ in xrange(REPETITIONS):
+        directory = tempfile.mkdtemp()
+        try:
+            start = time.time()
+            generator(directory, stratums, predicateTypes, idToStratumLevels, **options)
+            times.append(time.time() - start)
+        finally:
+            shutil.rmtree(directory)
+    return min(times)
+
+if __name__ == '__main__':
+    logging.disable(logging.CRITICAL)
+
+    index_header = ''
+    try:
+        from GenerationIndex import buildGenerationIndex
+        index_header = '\tINDEX (s)'
+    except ImportError:
+        buildGenerationIndex = None
+
+    print 'RULES\tEQUATIONS\t' + '\t'.join('{} (s)'.format(name) for name, _ in FRONTENDS) + index_header
+    for size in SIZES:
+        f, filename = tempfile.mkstemp(suffix='.dl')
+        with os.fdopen(f, 'w') as f:
+            f.write(generateProgram(size))
+        try:
+            _, _, predicateTypes, stratums, idToStratumLevels = analyzeProgram(filename, [])
+        finally:
+            os.remove(filename)
+
+        row = [str(size), str(sum(len(stratum.equations) for stratum in stratums))]
+        for _, generator in FRONTENDS:
+            row.append('{:.3f}'.format(measure(generator, stratums, predicateTypes, idToStratumLevels)))
+        if buildGenerationIndex:
+            start = time.time()
+            buildGenerationIndex(stratums, predicateTypes.intensional)
+            row.append('{:.3f}'.format(time.time() - start))
+        print '\t'.join(row)
+
+    if 'jobs' in inspect.getargspec(c_Frontend.generate_code_from_template).args:
+        print
+        print 'JOBS\t' + '\t'.join('{} (s)'.format(name) for name, _ in FRONTENDS)
+        for jobs in JOBS:
+            print '{}\t'.format(jobs) + '\t'.join('{:.3f}'.format(measure(generator, stratums, predicateTypes,
+                                                                          idToStratumLevels, jobs=jobs))
+                                                   for _, generator in FRONTENDS)
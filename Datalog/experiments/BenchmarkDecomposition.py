@@ -0,0 +1,129 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the decomposition methods that minimize the length of the
+# generated heads. For small rules the exhaustive method (common) and the
+# dynamic programming one (dynamic) are compared: both have to obtain the
+# same punctuation and, when the best decomposition is unique, the same
+# decomposition (when there are ties each method keeps a different one).
+# Longer rules are only decomposed with the dynamic method.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkDecomposition.py
+
+import os, sys
+import random, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DecomposingMethods import commonVariablesDecomposingMethod, dynamicProgrammingDecomposingMethod,\
+    get_head_arguments, get_variables
+from Types import LogicRule, Predicate, Identifier, Argument
+
+# Number of atoms of the rules decomposed with both methods
+COMPARED_SIZES = [3, 4, 5, 6, 7]
+# Number of atoms of the rules decomposed only with the dynamic method
+DYNAMIC_SIZES = [10, 15, 20]
+# Number of rules generated for every size and shape
+RULES_PER_SIZE = 20
+SHAPES = ['chain', 'cycle', 'random']
+
+def makeAtom(name, variables):
+    return Predicate(Identifier(name, name), False,
+                     [Argument('variable', v) for v in variables])
+
+# This function generates a rule with the given number of atoms. In a chain
+# every atom shares a variable with the next one, a cycle also closes the
+# chain and the random rules add some extra shared variables.
+def generateRule(atoms, shape, rnd):
+    body = []
+    for position in xrange(atoms):
+        variables = ['V{}'.format(position), 'V{}'.format(position + 1)]
+        if shape == 'cycle' and position == atoms - 1:
+            variables[1] = 'V0'
+        elif shape == 'random' and rnd.random() < 0.5:
+            variables.append('V{}'.format(rnd.randint(0, atoms)))
+        body.append(makeAtom('p{}'.format(position), variables))
+    head = makeAtom('head', ['V0', 'V{}'.format(atoms)])
+    return LogicRule(head, body, 0, False, 0, '')
+
+# The punctuation of a decomposition is the sum of the lengths of all the
+# heads
+def getPunctuation(rules):
+    return sum(len(rule.head.arguments) for rule in rules)
+
+# The decomposition is described by the atoms joined by every generated rule
+def getDecomposition(rules):
+    leafs = {}
+    def getLeafs(atom):
+        return leafs.get(atom.id.name, frozenset([atom.id.name]))
+    for rule in rules:
+        leafs[rule.head.id.name] = getLeafs(rule.body[0]) | getLeafs(rule.body[1])
+    return frozenset(frozenset([getLeafs(rule.body[0]), getLeafs(rule.body[1])]) for rule in rules)
+
+# This function counts how many decompositions of the rule obtain the best
+# punctuation
+def countBestDecompositions(rule):
+    best = {}
+    for position in xrange(len(rule.body)):
+        best[1 << position] = (0, 1)
+    get_atoms = lambda subset: [atom for position, atom in enumerate(rule.body) if subset >> position & 1]
+    for subset in xrange(1, 1 << len(rule.body)):
+        lowest = subset & -subset
+        if subset == lowest:
+            continue
+        head = get_head_arguments(get_atoms(subset), get_variables(get_atoms(~subset) + [rule.head]))
+        best_punctuation, count = float("inf"), 0
+        rest = subset & ~lowest
+        chosen = rest
+        while chosen:
+            chosen = (chosen - 1) & rest
+            first, second = lowest | chosen, rest & ~chosen
+            punctuation = best[first][0] + best[second][0]
+            if punctuation < best_punctuation:
+                best_punctuation, count = punctuation, 0
+            if punctuation == best_punctuation:
+                count += best[first][1] * best[second][1]
+        best[subset] = (best_punctuation + len(head), count)
+    return best[(1 << len(rule.body)) - 1][1]
+
+def decompose(method, rule):
+    start = time.time()
+    rules = method(rule._replace(body=rule.body[:]))
+    return rules, time.time() - start
+
+if __name__ == '__main__':
+    rnd = random.Random(0)
+
+    print 'ATOMS\tSHAPE\tSAME PUNCTUATION\tSAME DECOMPOSITION (UNIQUE BEST)\tCOMMON (s)\tDYNAMIC (s)'
+    for atoms in COMPARED_SIZES:
+        for shape in SHAPES:
+            same_punctuation, same_decomposition, unique = 0, 0, 0
+            common_time, dynamic_time = 0.0, 0.0
+            for _ in xrange(RULES_PER_SIZE):
+                rule = generateRule(atoms, shape, rnd)
+                common_rules, elapsed = decompose(commonVariablesDecomposingMethod, rule)
+                common_time += elapsed
+                dynamic_rules, elapsed = decompose(dynamicProgrammingDecomposingMethod, rule)
+                dynamic_time += elapsed
+                if getPunctuation(common_rules) == getPunctuation(dynamic_rules):
+                    same_punctuation += 1
+                if countBestDecompositions(rule) == 1:
+                    unique += 1
+                    if getDecomposition(common_rules) == getDecomposition(dynamic_rules):
+                        same_decomposition += 1
+            print '{}\t{}\t{}/{}\t{}/{}\t{:.4f}\t{:.4f}'.format(atoms, shape,
+                                                                same_punctuation, RULES_PER_SIZE,
+                                                                same_decomposition, unique,
+                                                                common_time / RULES_PER_SIZE,
+                                                                dynamic_time / RULES_PER_SIZE)
+
+    print
+    print 'ATOMS\tSHAPE\tDYNAMIC (s)'
+    for atoms in DYNAMIC_SIZES:
+        for shape in SHAPES:
+            dynamic_time = 0.0
+            for _ in xrange(RULES_PER_SIZE):
+                _, elapsed = decompose(dynamicProgrammingDecomposingMethod, generateRule(atoms, shape, rnd))
+                dynamic_time += elapsed
+            print '{}\t{}\t{:.4f}'.format(atoms, shape, dynamic_time / RULES_PER_SIZE)
@@ -0,0 +1,100 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the loading of the facts in the solvers generated by the
+# Python frontend. It generates files with 100k to 2M facts of arity 3 and
+# measures the facts loaded per second by read_facts (utils.py of the
+# generated code) and by the previous loop (readlines and a split of every
+# line). read_facts uses NumPy when it is available, the loader without NumPy
+# is also measured. Before measuring it checks that both loaders obtain the
+# same facts.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkFactLoading.py
+
+import os, sys
+import random, time
+import shutil, tempfile
+import subprocess
+
+from collections import deque
+
+COMPILER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+EXAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples', 'pointerAnalysis.dl')
+
+SIZES = [100000, 500000, 1000000, 2000000]
+ARITY = 3
+HYPOTHESIS = 0
+REPETITIONS = 3
+
+DEVNULL = open(os.devnull, 'wb')
+
+# Reference implementation. This is the code the Python frontend generated
+# before read_facts.
+def legacyLoadFacts(filename, queue):
+    fp = open(filename)
+    for l in fp.readlines():
+        values = map(int, l.strip()[:-2].split('(')[1].split(','))
+        queue.append(([HYPOTHESIS] + values))
+    fp.close()
+
+def loadFacts(filename, queue):
+    for facts in utils.read_facts(filename, ARITY, HYPOTHESIS):
+        queue.extend(facts)
+
+def generateFacts(filename, number_of_facts, seed=0):
+    rnd = random.Random(seed)
+    with open(filename, 'w') as f:
+        for _ in xrange(number_of_facts):
+            f.write('st({}, {}, {}).\n'.format(rnd.randint(0, 1 << 20), rnd.randint(0, 100),
+                                               rnd.randint(0, 1 << 20)))
+
+def measure(loader, filename):
+    best = float("inf")
+    for _ in xrange(REPETITIONS):
+        queue = deque()
+        start = time.time()
+        loader(filename, queue)
+        best = min(best, time.time() - start)
+    return best
+
+def withoutNumPy(loader):
+    def _(filename, queue):
+        numpy = utils.numpy
+        utils.numpy = None
+        try:
+            loader(filename, queue)
+        finally:
+            utils.numpy = numpy
+    return _
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        # read_facts is taken from the code generated for one of the examples
+        subprocess.check_call([sys.executable, 'dcompiler.py', '-f', 'Python', '-d', directory, EXAMPLE],
+                              cwd=COMPILER_DIR, stdout=DEVNULL, stderr=DEVNULL)
+        sys.path.insert(0, os.path.join(directory, 'Solver_Py_code'))
+        import utils
+
+        filename = os.path.join(directory, 'st.tuples')
+        header = 'FACTS\tSAME FACTS\tLEGACY (facts/s)\tCHUNKS (facts/s)\tSPEEDUP'
+        if utils.numpy is not None:
+            header += '\tCHUNKS WITHOUT NUMPY (facts/s)'
+        print header
+        for size in SIZES:
+            generateFacts(filename, size)
+            legacy_queue, queue = deque(), deque()
+            legacyLoadFacts(filename, legacy_queue)
+            loadFacts(filename, queue)
+            same = map(tuple, legacy_queue) == list(queue)
+
+            legacy_time = measure(legacyLoadFacts, filename)
+            new_time = measure(loadFacts, filename)
+            row = '{}\t{}\t{:.0f}\t{:.0f}\t{:.2f}'.format(size, same, size / legacy_time,
+                                                          size / new_time, legacy_time / new_time)
+            if utils.numpy is not None:
+                row += '\t{:.0f}'.format(size / measure(withoutNumPy(loadFacts), filename))
+            print row
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,112 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the Hash backend of the Python frontend. It generates the
+# solvers of the examples (the ones with a directory of facts) and of the
+# programs of BenchmarkPythonSolver.py with the Native and the Hash backends,
+# measures the time and the peak memory (maximum resident set size) every
+# solver requires and compares their answers. The programs of
+# BenchmarkPythonSolver.py are measured with facts of increasing sizes.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkHashBackend.py
+
+import os, sys
+import glob, random, time
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, EXAMPLES_DIR, PROGRAMS, REPETITIONS, DEVNULL,\
+                                  generateChainProgram, generateSolver, readAnswers
+
+BACKENDS = ['Native', 'Hash']
+
+# This function returns the best time and the peak memory (in kilobytes) of the
+# solver for the facts of the given directory
+def measureWithMemory(solver_dir, facts_dir):
+    best = float("inf")
+    memory = 0
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        process = subprocess.Popen([sys.executable, 'main.py'], cwd=solver_dir, stdout=DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        best = min(best, time.time() - start)
+        if status:
+            raise subprocess.CalledProcessError(status, 'main.py')
+        memory = max(memory, usage.ru_maxrss)
+    return best, memory
+
+def generateExampleSolver(program, directory, backend):
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-f', 'Python', '-d', directory,
+                           '-o', 'Backend=' + backend, program],
+                          cwd=COMPILER_DIR, stdout=DEVNULL, stderr=DEVNULL)
+    return os.path.join(directory, 'Solver_Py_code')
+
+# The answers of every predicate with an .output file
+def readExampleAnswers(solver_dir, example_dir):
+    answers = []
+    for filename in sorted(glob.glob(os.path.join(example_dir, '*.output'))):
+        predicate = os.path.basename(filename)[:-len('.output')]
+        with open(os.path.join(solver_dir, predicate + '.tuples')) as f:
+            answers.append(sorted(f.readlines()))
+    return answers
+
+def printRow(name, size, answers, measures):
+    (native_time, native_memory), (hash_time, hash_memory) = measures
+    print '{}\t{}\t{}\t{:.3f}\t{:.3f}\t{:.2f}\t{}\t{}\t{:.2f}\t{}'.format(name, size,
+                                                                      sum(map(len, answers[0])),
+                                                                      native_time, hash_time,
+                                                                      native_time / hash_time,
+                                                                      native_memory, hash_memory,
+                                                                      float(native_memory) / hash_memory,
+                                                                      answers[0] == answers[1])
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        print 'PROGRAM\tSIZE\tANSWERS\t' + '\t'.join('{} (s)'.format(backend) for backend in BACKENDS) +\
+              '\tSPEEDUP\t' + '\t'.join('{} (KB)'.format(backend) for backend in BACKENDS) +\
+              '\tMEMORY RATIO\tSAME ANSWERS'
+
+        # The examples, the facts are the .input files of their directories
+        for program in sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.dl'))):
+            name = os.path.basename(program)[:-len('.dl')]
+            example_dir = os.path.join(EXAMPLES_DIR, name)
+            if not os.path.isdir(example_dir):
+                continue
+            facts_dir = os.path.join(directory, name + '-facts')
+            os.mkdir(facts_dir)
+            for filename in glob.glob(os.path.join(example_dir, '*.input')):
+                shutil.copy(filename, os.path.join(facts_dir,
+                                                   os.path.basename(filename)[:-len('.input')] + '.tuples'))
+            try:
+                solver_dirs = [generateExampleSolver(program, os.path.join(directory, name + '-' + backend),
+                                                     backend) for backend in BACKENDS]
+                measures = [measureWithMemory(solver_dir, facts_dir) for solver_dir in solver_dirs]
+            except (OSError, subprocess.CalledProcessError):
+                # Some examples can't be compiled
+                continue
+            answers = [readExampleAnswers(solver_dir, example_dir) for solver_dir in solver_dirs]
+            printRow(name, '-', answers, measures)
+
+        # The scaled synthetic inputs
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            solver_dirs = [generateSolver(COMPILER_DIR, program, query,
+                                          os.path.join(directory, name + '-' + backend),
+                                          'Backend=' + backend) for backend in BACKENDS]
+            facts_dir = os.path.join(directory, name + '-facts')
+            for size in sizes:
+                shutil.rmtree(facts_dir, ignore_errors=True)
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                measures = [measureWithMemory(solver_dir, facts_dir) for solver_dir in solver_dirs]
+                answers = [[readAnswers(solver_dir, query)] for solver_dir in solver_dirs]
+                printRow(name, size, answers, measures)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,71 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the Multiprocess queue of the Python frontend. It generates the
+# solvers of the programs of BenchmarkPythonSolver.py with the Deque and the
+# Multiprocess queues, measures the time every solver requires for facts of
+# increasing sizes (the Multiprocess solver with different numbers of workers)
+# and compares their answers.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkMultiprocessQueue.py
+
+import os, sys
+import glob, random, time
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, DEVNULL, PROGRAMS, REPETITIONS,\
+                                  generateChainProgram, generateSolver, measure, readAnswers
+
+WORKERS = [1, 2, 4, 8]
+
+def measureWorkers(solver_dir, facts_dir, workers):
+    best = float("inf")
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        subprocess.check_call([sys.executable, 'main.py', str(workers)], cwd=solver_dir, stdout=DEVNULL)
+        best = min(best, time.time() - start)
+    return best
+
+# Every worker writes the answers it stores to its own file
+def readWorkersAnswers(solver_dir, query):
+    answers = []
+    for filename in glob.glob(os.path.join(solver_dir, query + '-*.tuples')):
+        with open(filename) as f:
+            answers.extend(f.readlines())
+        os.remove(filename)
+    return sorted(answers)
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        print 'PROGRAM\tSIZE\tANSWERS\tDeque (s)\t' +\
+              '\t'.join('{} WORKERS (s)\tSPEEDUP'.format(workers) for workers in WORKERS) + '\tSAME ANSWERS'
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            deque_dir = generateSolver(COMPILER_DIR, program, query, os.path.join(directory, name + '-Deque'))
+            multiprocess_dir = generateSolver(COMPILER_DIR, program, query,
+                                              os.path.join(directory, name + '-Multiprocess'),
+                                              'Queue=Multiprocess')
+            facts_dir = os.path.join(directory, name + '-facts')
+            for size in sizes:
+                shutil.rmtree(facts_dir, ignore_errors=True)
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                deque_time = measure(deque_dir, facts_dir)
+                answers = readAnswers(deque_dir, query)
+                row = '{}\t{}\t{}\t{:.3f}'.format(name, size, len(answers), deque_time)
+                same_answers = True
+                for workers in WORKERS:
+                    workers_time = measureWorkers(multiprocess_dir, facts_dir, workers)
+                    same_answers = same_answers and answers == readWorkersAnswers(multiprocess_dir, query)
+                    row += '\t{:.3f}\t{:.2f}'.format(workers_time, deque_time / workers_time)
+                print row + '\t{}'.format(same_answers)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,45 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the NumPy backend of the Python frontend. It generates the
+# solvers of the programs of BenchmarkPythonSolver.py with the Native and the
+# NumPy backends, measures the time every solver requires for facts of
+# increasing sizes and compares their answers. NumPy must be installed.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkNumPyBackend.py
+
+import os, random
+import shutil, tempfile
+
+from BenchmarkPythonSolver import COMPILER_DIR, PROGRAMS, generateChainProgram,\
+                                  generateSolver, measure, readAnswers
+
+BACKENDS = ['Native', 'NumPy']
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        print 'PROGRAM\tSIZE\tANSWERS\t' + '\t'.join('{} (s)'.format(backend) for backend in BACKENDS) +\
+              '\tSPEEDUP\tSAME ANSWERS'
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            solver_dirs = [generateSolver(COMPILER_DIR, program, query,
+                                          os.path.join(directory, name + '-' + backend),
+                                          'Backend=' + backend) for backend in BACKENDS]
+            facts_dir = os.path.join(directory, name + '-facts')
+            for size in sizes:
+                shutil.rmtree(facts_dir, ignore_errors=True)
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                times = [measure(solver_dir, facts_dir) for solver_dir in solver_dirs]
+                answers = [readAnswers(solver_dir, query) for solver_dir in solver_dirs]
+                print '{}\t{}\t{}\t{}\t{:.2f}\t{}'.format(name, size, len(answers[0]),
+                                                          '\t'.join('{:.3f}'.format(t) for t in times),
+                                                          times[0] / times[-1],
+                                                          all(a == answers[0] for a in answers))
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,144 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the writers of the answers of the generated solvers. For the
+# Python frontend it writes from 100k to 2M answers of arity 3 with the writers
+# of utils.py (generated code) in the text, binary and gzip formats and with
+# the previous code (print_answer, an if-chain over the predicates and a write
+# of every answer), it reports the answers written per second and checks that
+# the text writer obtains the same file.
+#
+# For the C frontend it generates the solvers of graphClausure with every
+# format and measures the time they require. The directory of an older version
+# of the compiler (for example one extracted with git archive) can be given as
+# argument, then its solver (fprintf of every answer) is also measured. The C
+# solvers use the data structures of C_OPTIONS (they don't require Judy).
+#
+# Usage (from the experiments directory):
+#    python BenchmarkOutputWriters.py [reference compiler directory]
+
+import os, sys
+import random, time
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, EXAMPLES_DIR, REPETITIONS, DEVNULL,\
+                                  generateGraphClausureFacts
+
+REFERENCE_DIR = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+
+SIZES = [100000, 500000, 1000000, 2000000]
+FORMATS = ['text', 'binary', 'gzip']
+HYPOTHESIS = 2
+
+C_OPTIONS = 'Paths=Hash,Sets=BitMap'
+C_SIZES = [800, 1600]
+
+# Reference implementation. This is the code the Python frontend generated
+# before the writers (the answer is the third predicate of the if-chain).
+def legacyPrintAnswer(f, var):
+    if (var[0] == 0):
+        f.write("hP(%i, %i, %i).\n" % (var[1], var[2], var[3]))
+    elif (var[0] == 1):
+        f.write("temp1(%i, %i, %i).\n" % (var[1], var[2], var[3]))
+    elif (var[0] == 2):
+        f.write("temp2(%i, %i, %i).\n" % (var[1], var[2], var[3]))
+    elif (var[0] == 3):
+        f.write("ld(%i, %i, %i).\n" % (var[1], var[2], var[3]))
+
+def legacyWrite(filename, answers):
+    f = open(filename, "w+")
+    for var in answers:
+        legacyPrintAnswer(f, var)
+    f.close()
+
+def writerWrite(format):
+    def _(filename, answers):
+        writer = utils.open_writer(filename, 'temp2', 3, format)
+        write = writer.write
+        for var in answers:
+            write(var)
+        writer.close()
+    return _
+
+def measure(writer, filename, answers):
+    best = float("inf")
+    for _ in xrange(REPETITIONS):
+        start = time.time()
+        writer(filename, answers)
+        best = min(best, time.time() - start)
+    return best
+
+def generateCSolver(compiler_dir, directory, options):
+    program = os.path.join(EXAMPLES_DIR, 'graphClausure.dl')
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-f', 'C', '-d', directory, '-o', options, program],
+                          cwd=compiler_dir, stdout=DEVNULL, stderr=DEVNULL)
+    solver_dir = os.path.join(directory, 'Solver_C_code')
+    subprocess.check_call(['make'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+    return solver_dir
+
+# The exit status is not checked, the reference solvers can fail freeing their queues
+# after the answers are written
+def measureCSolver(solver_dir, facts_dir):
+    best = float("inf")
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        subprocess.call(['./solver'], cwd=solver_dir, stdout=DEVNULL, stderr=DEVNULL)
+        best = min(best, time.time() - start)
+    return best
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        # The writers are taken from the code generated for one of the examples
+        subprocess.check_call([sys.executable, 'dcompiler.py', '-f', 'Python', '-d', directory,
+                               os.path.join(EXAMPLES_DIR, 'pointerAnalysis.dl')],
+                              cwd=COMPILER_DIR, stdout=DEVNULL, stderr=DEVNULL)
+        sys.path.insert(0, os.path.join(directory, 'Solver_Py_code'))
+        import utils
+
+        filename = os.path.join(directory, 'temp2.tuples')
+        print 'ANSWERS\tSAME FILE\tLEGACY (answers/s)\t' +\
+              '\t'.join('{} (answers/s)'.format(format.upper()) for format in FORMATS) + '\tSPEEDUP (TEXT)'
+        for size in SIZES:
+            rnd = random.Random(size)
+            answers = [(HYPOTHESIS, rnd.randint(0, 1 << 20), rnd.randint(0, 100), rnd.randint(0, 1 << 20))
+                       for _ in xrange(size)]
+            legacyWrite(filename, answers)
+            with open(filename) as f:
+                legacy_file = f.read()
+            writerWrite('text')(filename, answers)
+            with open(filename) as f:
+                same = f.read() == legacy_file
+
+            legacy_time = measure(legacyWrite, filename, answers)
+            times = [measure(writerWrite(format), filename, answers) for format in FORMATS]
+            print '{}\t{}\t{:.0f}\t'.format(size, same, size / legacy_time) +\
+                  '\t'.join('{:.0f}'.format(size / t) for t in times) +\
+                  '\t{:.2f}'.format(legacy_time / times[0])
+
+        print
+        header = 'C SOLVER\tSIZE\t' + '\t'.join('{} (s)'.format(format.upper()) for format in FORMATS)
+        if REFERENCE_DIR:
+            header += '\tREFERENCE (s)\tSPEEDUP (TEXT)'
+        print header
+        solver_dirs = [generateCSolver(COMPILER_DIR, os.path.join(directory, 'C-' + format),
+                                       C_OPTIONS + ',Output=' + format) for format in FORMATS]
+        if REFERENCE_DIR:
+            reference_dir = generateCSolver(REFERENCE_DIR, os.path.join(directory, 'C-reference'), C_OPTIONS)
+        facts_dir = os.path.join(directory, 'C-facts')
+        for size in C_SIZES:
+            shutil.rmtree(facts_dir, ignore_errors=True)
+            os.mkdir(facts_dir)
+            generateGraphClausureFacts(facts_dir, size, random.Random(size))
+
+            times = [measureCSolver(solver_dir, facts_dir) for solver_dir in solver_dirs]
+            row = 'graphClausure\t{}\t'.format(size) + '\t'.join('{:.3f}'.format(t) for t in times)
+            if REFERENCE_DIR:
+                reference_time = measureCSolver(reference_dir, facts_dir)
+                row += '\t{:.3f}\t{:.2f}'.format(reference_time, reference_time / times[0])
+            print row
+    finally:
+        shutil.rmtree(directory)
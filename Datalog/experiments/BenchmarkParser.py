@@ -0,0 +1,205 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the parser of the rules (Parser.parseRules). It generates
+# synthetic programs between 10k and 200k rules, similar to the machine
+# generated ones, and measures the number of rules parsed per second by the
+# token based parser and by the previous one (regular expressions applied to
+# slices of the rule). Before measuring it checks that both parsers obtain
+# the same heads and bodies for the generated programs and for the examples.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkParser.py
+
+import os, sys, glob
+import random, time, re
+
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from Parser import parseRules, hashed_generator
+from Types import Argument, Predicate, Identifier,\
+                  AssignationExpression, BooleanExpression,\
+                  ArithmeticExpression
+
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+SIZES = [10000, 50000, 100000, 200000]
+NUMBER_OF_PREDICATES = 500
+REPETITIONS = 3
+
+# Reference implementation. This is the parser as it was before the lexer, it
+# parses one rule per line.
+def legacyMakeArgument(arg):
+    try:
+        return Argument('constant', int(arg))
+    except ValueError:
+        return Argument('variable', arg)
+
+def legacyExpression(left, arg, expression, expression_with_parentheses=None):
+    if arg.match(left):
+        return legacyMakeArgument(left)
+    if expression.match(left):
+        arg1, op, arg2 = expression.match(left).groups()
+        return ArithmeticExpression((legacyMakeArgument(arg1), legacyMakeArgument(arg2)), op)
+    if expression_with_parentheses and expression_with_parentheses.match(left):
+        arg1, op, arg2 = expression_with_parentheses.match(left).groups()
+        return ArithmeticExpression((legacyMakeArgument(arg1), legacyMakeArgument(arg2)), op)
+    return None
+
+def legacyClousureGetAssignationExpression():
+    VAR_OR_NUMBER = "([A-Za-z]+|[0-9]+)"
+    arg = re.compile(VAR_OR_NUMBER + "$")
+    expression = re.compile(VAR_OR_NUMBER + r"([\+\-\*/\%])" + VAR_OR_NUMBER + "$")
+    assignation = re.compile("([A-Za-z]+)(=|IS)([A-Za-z0-9\+\*\-/\(\)\%]+)")
+    def _(rule, start_position):
+        match = assignation.match(rule[start_position:])
+        if match == None:
+            return None, start_position
+        left_side, operator, right = match.groups()
+        right_side = legacyExpression(right, arg, expression)
+        if right_side == None:
+            return None, start_position
+        return AssignationExpression('assignation', (legacyMakeArgument(left_side), right_side),
+                                     operator), start_position + match.end()
+    return _
+legacy_get_assignation_expression = legacyClousureGetAssignationExpression()
+
+def legacyClousureGetBooleanExpression():
+    VAR_OR_NUMBER = "([A-Z][A-Za-z0-9_]*|[0-9]+)"
+    EXPRESSION_SIDE = "([A-Za-z0-9\+\*\-/\(\)\%]+)"
+    arg = re.compile(VAR_OR_NUMBER + "$")
+    expression = re.compile(VAR_OR_NUMBER + r"([\+\-\*/\%])" + VAR_OR_NUMBER + "$")
+    expression_with_parentheses = re.compile("\(" + VAR_OR_NUMBER + r"([\+\-\*/\%])" + VAR_OR_NUMBER + "\)")
+    boolean = re.compile(EXPRESSION_SIDE + "(==|<|>|<=|>=|!=)" + EXPRESSION_SIDE)
+    def _(rule, start_position):
+        match = boolean.match(rule[start_position:])
+        if match == None:
+            return None, start_position
+        left, operator, right = match.groups()
+        left_side = legacyExpression(left, arg, expression, expression_with_parentheses)
+        right_side = legacyExpression(right, arg, expression, expression_with_parentheses)
+        if left_side == None or right_side == None:
+            return None, start_position
+        return BooleanExpression('boolean', (left_side, right_side), operator),\
+               start_position + match.end()
+    return _
+legacy_get_boolean_expression = legacyClousureGetBooleanExpression()
+
+def legacyClousureGetPredicate():
+    uniqueIds = {}
+    name_match = re.compile('~?[a-zA-Z][A-Za-z0-9_]*$')
+    def _(rule, start_position):
+        end_name_position = rule.find('(', start_position)
+        if (end_name_position == -1) or (end_name_position == start_position):
+            return None, start_position
+        name = rule[start_position:end_name_position]
+        if name_match.match(name) == None:
+            return None, start_position
+        is_negated = False
+        if name[0] == '~':
+            is_negated = True
+            name = name[1:]
+        if name not in uniqueIds:
+            uniqueIds[name] = name + '_' + hashed_generator(name, 5)
+        last_var_position = rule.find(')', end_name_position+1)
+        if rule.find('(', end_name_position+1, last_var_position) != -1:
+            return None, start_position
+        arguments = [legacyMakeArgument(arg) for arg in rule[end_name_position+1:last_var_position].split(",")]
+        return Predicate(Identifier(name, uniqueIds[name]), is_negated, arguments), last_var_position+1
+    return _
+legacy_get_predicate = legacyClousureGetPredicate()
+
+def legacyParseRule(rule):
+    rule = "".join([x for x in rule if x != " " and x != " \t" and x != "\n"])
+    head, position = legacy_get_predicate(rule, 0)
+    if head == None:
+        raise ValueError('Incorrect head')
+    if position+2 >= len(rule) or rule[position:position+2] != ':-':
+        raise ValueError('Head separator not found')
+    position += 2
+    parser_body_elements = [legacy_get_predicate, legacy_get_assignation_expression,
+                            legacy_get_boolean_expression]
+    body = []
+    while True:
+        for parser_element in parser_body_elements:
+            element, position = parser_element(rule, position)
+            if element != None:
+                body.append(element)
+                break
+        else:
+            raise ValueError('Incorrect body')
+        if position >= len(rule):
+            raise ValueError('Unfishined rule')
+        if rule[position] == '.':
+            break
+        if position+1 >= len(rule) or rule[position] != ',':
+            raise ValueError('Incorrect body')
+        position += 1
+    return (head, body)
+
+def legacyParseRules(stream):
+    for line in stream:
+        if line[0] == '\n' or line[0] == '#': continue
+        yield legacyParseRule(line)
+
+# This function generates a program with the given number of rules. Most of
+# the rules join two predicates, some of them also negate a predicate or
+# contain a boolean or an assignation expression.
+def generateProgram(number_of_rules, seed=0):
+    rnd = random.Random(seed)
+    names = ['predicate_{}'.format(x) for x in xrange(NUMBER_OF_PREDICATES)]
+    name = lambda: names[rnd.randint(0, NUMBER_OF_PREDICATES - 1)]
+
+    lines = []
+    for line_no in xrange(number_of_rules):
+        if line_no % 1000 == 0:
+            lines.append('# Block {}\n'.format(line_no // 1000))
+        body = ['{}(First, Second, {})'.format(name(), rnd.randint(0, 100)),
+                '{}(Second, Third, Fourth)'.format(name())]
+        kind = rnd.randint(0, 3)
+        if kind == 1:
+            body.append('~{}(First, Third)'.format(name()))
+        elif kind == 2:
+            body.append('First + 1 != Third')
+        elif kind == 3:
+            body.append('Result = First * Fourth')
+        head = '{}(First, Third, {})'.format(name(), 'Result' if kind == 3 else 'Fourth')
+        lines.append('{} :- {}.\n'.format(head, ', '.join(body)))
+    return ''.join(lines)
+
+def getRules(rules):
+    return [(rule[0], rule[1]) for rule in rules]
+
+# Every parser reads the program from memory so only the parsing is measured
+def measure(parser, program):
+    best = float("inf")
+    for _ in xrange(REPETITIONS):
+        start = time.time()
+        for _ in parser(StringIO(program)):
+            pass
+        best = min(best, time.time() - start)
+    return best
+
+if __name__ == '__main__':
+    for example in sorted(glob.glob(os.path.join(EXAMPLES_DIRECTORY, '*.dl'))):
+        with open(example) as f:
+            program = f.read()
+        try:
+            good_result = getRules(legacyParseRules(StringIO(program)))
+        except ValueError:
+            continue
+        if getRules(parseRules(StringIO(program))) != good_result:
+            print 'Different rules for', os.path.basename(example)
+
+    print 'RULES\tSAME RULES\tLEGACY (rules/s)\tTOKENS (rules/s)\tSPEEDUP'
+    for size in SIZES:
+        program = generateProgram(size)
+        same = getRules(legacyParseRules(StringIO(program))) == getRules(parseRules(StringIO(program)))
+        legacy_time = measure(legacyParseRules, program)
+        new_time = measure(parseRules, program)
+        print '{}\t{}\t{:.0f}\t{:.0f}\t{:.2f}'.format(size, same,
+                                                      size / legacy_time,
+                                                      size / new_time,
+                                                      legacy_time / new_time)
@@ -0,0 +1,122 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the solvers generated by the Python frontend. It generates the
+# solvers of graphClausure.dl, pointerAnalysis.dl and of a program with a
+# chain of 200 copies of a relation (the evaluation of every rewriting variable
+# is cheap, so the time is dominated by the dispatch of the variables), creates
+# random facts of increasing sizes and measures the time every solver requires.
+#
+# The directory of an older version of the compiler (for example one extracted
+# with git archive) can be given as argument. In that case the solvers it
+# generates are also measured, the speedup is reported and the answers of both
+# solvers are compared.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkPythonSolver.py [reference compiler directory]
+
+import os, sys
+import random, time
+import shutil, tempfile
+import subprocess
+
+COMPILER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+REFERENCE_DIR = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+
+REPETITIONS = 3
+CHAIN_LENGTH = 200
+
+DEVNULL = open(os.devnull, 'wb')
+
+def generateGraphClausureFacts(directory, nodes, rnd):
+    with open(os.path.join(directory, 'edge.tuples'), 'w') as f:
+        for _ in xrange(nodes * 2):
+            f.write('edge({}, {}).\n'.format(rnd.randint(0, nodes), rnd.randint(0, nodes)))
+
+def generatePointerAnalysisFacts(directory, variables, rnd):
+    objects = variables // 4
+    fields = 8
+    with open(os.path.join(directory, 'vP0.tuples'), 'w') as f:
+        for _ in xrange(variables):
+            f.write('vP0({}, {}).\n'.format(rnd.randint(0, variables), rnd.randint(0, objects)))
+    with open(os.path.join(directory, 'a.tuples'), 'w') as f:
+        for _ in xrange(variables):
+            f.write('a({}, {}).\n'.format(rnd.randint(0, variables), rnd.randint(0, variables)))
+    for relation in ['st', 'ld']:
+        with open(os.path.join(directory, relation + '.tuples'), 'w') as f:
+            for _ in xrange(variables // 2):
+                f.write('{}({}, {}, {}).\n'.format(relation, rnd.randint(0, variables),
+                                                   rnd.randint(0, fields), rnd.randint(0, variables)))
+
+def generateChainFacts(directory, facts, rnd):
+    with open(os.path.join(directory, 'edge.tuples'), 'w') as f:
+        for _ in xrange(facts):
+            f.write('edge({}, {}).\n'.format(rnd.randint(0, facts), rnd.randint(0, facts)))
+
+def generateChainProgram(filename):
+    with open(filename, 'w') as f:
+        f.write('p1(X, Y) :- edge(X, Y).\n')
+        for x in xrange(2, CHAIN_LENGTH + 1):
+            f.write('p{}(X, Y) :- p{}(X, Y).\n'.format(x, x - 1))
+
+# Programs: (name, program, queried predicate, facts generator, sizes)
+PROGRAMS = [('graphClausure', os.path.join(EXAMPLES_DIR, 'graphClausure.dl'), 'path',
+             generateGraphClausureFacts, [200, 400, 800]),
+            ('pointerAnalysis', os.path.join(EXAMPLES_DIR, 'pointerAnalysis.dl'), 'vP',
+             generatePointerAnalysisFacts, [250, 500, 1000]),
+            ('chain', None, 'p{}'.format(CHAIN_LENGTH),
+             generateChainFacts, [1000, 2000, 4000])]
+
+def generateSolver(compiler_dir, program, query, directory, options=None):
+    command = [sys.executable, 'dcompiler.py', '-f', 'Python', '-p', query, '-d', directory]
+    if options:
+        command += ['-o', options]
+    subprocess.check_call(command + [program], cwd=compiler_dir, stdout=DEVNULL, stderr=DEVNULL)
+    return os.path.join(directory, 'Solver_Py_code')
+
+def measure(solver_dir, facts_dir, arguments=()):
+    best = float("inf")
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        start = time.time()
+        subprocess.check_call([sys.executable, 'main.py'] + list(arguments), cwd=solver_dir, stdout=DEVNULL)
+        best = min(best, time.time() - start)
+    return best
+
+def readAnswers(solver_dir, query):
+    with open(os.path.join(solver_dir, query + '.tuples')) as f:
+        return sorted(f.readlines())
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        header = 'PROGRAM\tSIZE\tANSWERS\tTIME (s)'
+        if REFERENCE_DIR:
+            header += '\tREFERENCE TIME (s)\tSPEEDUP\tSAME ANSWERS'
+        print header
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            solver_dir = generateSolver(COMPILER_DIR, program, query, os.path.join(directory, name))
+            if REFERENCE_DIR:
+                reference_dir = generateSolver(REFERENCE_DIR, program, query,
+                                               os.path.join(directory, name + '-reference'))
+            facts_dir = os.path.join(directory, name + '-facts')
+            for size in sizes:
+                shutil.rmtree(facts_dir, ignore_errors=True)
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                new_time = measure(solver_dir, facts_dir)
+                answers = readAnswers(solver_dir, query)
+                row = '{}\t{}\t{}\t{:.3f}'.format(name, size, len(answers), new_time)
+                if REFERENCE_DIR:
+                    reference_time = measure(reference_dir, facts_dir)
+                    row += '\t{:.3f}\t{:.2f}\t{}'.format(reference_time, reference_time / new_time,
+                                                         answers == readAnswers(reference_dir, query))
+                print row
+    finally:
+        shutil.rmtree(directory)
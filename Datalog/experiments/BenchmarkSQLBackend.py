@@ -0,0 +1,49 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the SQL backend of the Python frontend. It generates the solvers
+# of the programs of BenchmarkPythonSolver.py with the Native, the SQLite and
+# the SQL backends, measures the time every solver requires for facts of
+# increasing sizes and compares the answers of the SQL solver with the answers
+# of the Native one. The speedup of the SQL backend is reported against both.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkSQLBackend.py
+
+import os
+import random
+import shutil, tempfile
+
+from BenchmarkPythonSolver import COMPILER_DIR, PROGRAMS, generateChainProgram,\
+                                  generateSolver, measure, readAnswers
+
+BACKENDS = ['Native', 'SQLite', 'SQL']
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        print 'PROGRAM\tSIZE\tANSWERS\t' + '\t'.join('{} (s)'.format(backend) for backend in BACKENDS) +\
+              '\tSPEEDUP (NATIVE)\tSPEEDUP (SQLITE)\tSAME ANSWERS'
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            solver_dirs = [generateSolver(COMPILER_DIR, program, query,
+                                          os.path.join(directory, name + '-' + backend),
+                                          'Backend=' + backend) for backend in BACKENDS]
+            facts_dir = os.path.join(directory, name + '-facts')
+            for size in sizes:
+                shutil.rmtree(facts_dir, ignore_errors=True)
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                native_time, sqlite_time, sql_time = [measure(solver_dir, facts_dir) for solver_dir in solver_dirs]
+                native_answers = readAnswers(solver_dirs[0], query)
+                sql_answers = readAnswers(solver_dirs[2], query)
+                print '{}\t{}\t{}\t{:.3f}\t{:.3f}\t{:.3f}\t{:.2f}\t{:.2f}\t{}'.format(name, size, len(native_answers),
+                                                                                  native_time, sqlite_time, sql_time,
+                                                                                  native_time / sql_time,
+                                                                                  sqlite_time / sql_time,
+                                                                                  native_answers == sql_answers)
+    finally:
+        shutil.rmtree(directory)
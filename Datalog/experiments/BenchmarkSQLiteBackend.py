@@ -0,0 +1,62 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the SQLite backend of the Python frontend. It generates the
+# solvers of the programs of BenchmarkPythonSolver.py with the SQLite backend
+# and measures the time every solver requires for facts of increasing sizes,
+# with the database in memory and in a file.
+#
+# The directory of an older version of the compiler (for example one extracted
+# with git archive) can be given as argument. In that case the solvers it
+# generates are also measured (with the database in memory), the speedup is
+# reported and the answers of both solvers are compared.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkSQLiteBackend.py [reference compiler directory]
+
+import os, sys
+import random
+import shutil, tempfile
+
+from BenchmarkPythonSolver import COMPILER_DIR, PROGRAMS, generateChainProgram,\
+                                  generateSolver, measure, readAnswers
+
+REFERENCE_DIR = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+
+# The SQLite solvers are slower, only the smallest sizes are measured
+NUMBER_OF_SIZES = 2
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        header = 'PROGRAM\tSIZE\tANSWERS\tMEMORY (s)\tFILE (s)'
+        if REFERENCE_DIR:
+            header += '\tREFERENCE TIME (s)\tSPEEDUP\tSAME ANSWERS'
+        print header
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            solver_dir = generateSolver(COMPILER_DIR, program, query, os.path.join(directory, name),
+                                        'Backend=SQLite')
+            if REFERENCE_DIR:
+                reference_dir = generateSolver(REFERENCE_DIR, program, query,
+                                               os.path.join(directory, name + '-reference'),
+                                               'Backend=SQLite')
+            facts_dir = os.path.join(directory, name + '-facts')
+            for size in sizes[:NUMBER_OF_SIZES]:
+                shutil.rmtree(facts_dir, ignore_errors=True)
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                memory_time = measure(solver_dir, facts_dir)
+                answers = readAnswers(solver_dir, query)
+                file_time = measure(solver_dir, facts_dir, [os.path.join(directory, 'solver.db')])
+                row = '{}\t{}\t{}\t{:.3f}\t{:.3f}'.format(name, size, len(answers), memory_time, file_time)
+                if REFERENCE_DIR:
+                    reference_time = measure(reference_dir, facts_dir)
+                    row += '\t{:.3f}\t{:.2f}\t{}'.format(reference_time, reference_time / memory_time,
+                                                         answers == readAnswers(reference_dir, query))
+                print row
+    finally:
+        shutil.rmtree(directory)
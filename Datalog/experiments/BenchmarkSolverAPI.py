@@ -0,0 +1,116 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the API of the solvers of the Python frontend (api.py). It
+# generates the solvers of the programs of BenchmarkPythonSolver.py and, for
+# facts of increasing sizes kept in memory, compares the time required to
+# obtain the answers of the query:
+#    FILES -> The facts are written to the .tuples files, the solver reads
+#             them and writes the answers that are read back.
+#    API   -> The facts are given to the solver with add_facts and the answers
+#             are consumed from the generator returned by answers.
+# The time until the first answer is obtained with the API is also reported.
+# Both ways are measured in the same process, so the start of the interpreter
+# is not included.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkSolverAPI.py
+
+import os, sys
+import random
+import shutil, tempfile
+import subprocess
+
+from BenchmarkPythonSolver import COMPILER_DIR, PROGRAMS, REPETITIONS, DEVNULL,\
+                                  generateChainProgram
+
+# The script is executed in the directory of the solver, its arguments are the
+# mode (files or api) and the query. It prints the time, the time until the
+# first answer and the number of answers.
+SCRIPT = r'''
+import os
+import sys
+import time
+
+from api import EXTENSIONAL_PREDICATES
+from utils import read_facts
+
+mode, query = sys.argv[1:]
+facts = {}
+for name, (arity, _) in EXTENSIONAL_PREDICATES.iteritems():
+    if os.path.exists(name + '.tuples'):
+        facts[name] = [fact[1:] for chunk in read_facts(name + '.tuples', arity, 0) for fact in chunk]
+
+start = time.time()
+if mode == 'files':
+    for name, rows in facts.iteritems():
+        line = '{}({}).\n'.format(name, ', '.join('%i' for _ in xrange(EXTENSIONAL_PREDICATES[name][0])))
+        with open(name + '.tuples', 'wb') as f:
+            f.write(''.join(line % row for row in rows))
+    from solver import solver_init, solver_compute, solver_end
+    solver_init()
+    solver_compute()
+    solver_end()
+    with open(query + '.tuples') as f:
+        arity = f.readline().count(',') + 1
+    answers = [answer for chunk in read_facts(query + '.tuples', arity, 0) for answer in chunk]
+    first = time.time() - start
+    number_of_answers = len(answers)
+else:
+    from api import Solver
+    solver = Solver([query])
+    for name, rows in facts.iteritems():
+        solver.add_facts(name, rows)
+    first = None
+    number_of_answers = 0
+    for answer in solver.answers(query):
+        if first is None:
+            first = time.time() - start
+        number_of_answers += 1
+print '{}\t{}\t{}'.format(time.time() - start, first, number_of_answers)
+'''
+
+def generateSolver(program, directory):
+    subprocess.check_call([sys.executable, 'dcompiler.py', '-f', 'Python', '-d', directory, program],
+                          cwd=COMPILER_DIR, stdout=DEVNULL, stderr=DEVNULL)
+    solver_dir = os.path.join(directory, 'Solver_Py_code')
+    with open(os.path.join(solver_dir, 'benchmark_api.py'), 'w') as f:
+        f.write(SCRIPT)
+    return solver_dir
+
+# This function returns the best time, the best time until the first answer and
+# the number of answers
+def measureMode(solver_dir, facts_dir, mode, query):
+    best = (float("inf"), float("inf"), 0)
+    for _ in xrange(REPETITIONS):
+        for filename in os.listdir(facts_dir):
+            shutil.copy(os.path.join(facts_dir, filename), solver_dir)
+        output = subprocess.check_output([sys.executable, 'benchmark_api.py', mode, query], cwd=solver_dir)
+        elapsed, first, answers = output.split()
+        best = min(best, (float(elapsed), float(first), int(answers)))
+    return best
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    try:
+        print 'PROGRAM\tSIZE\tANSWERS\tFILES (s)\tAPI (s)\tSPEEDUP\tFIRST ANSWER (s)\tSAME ANSWERS'
+        for name, program, query, generateFacts, sizes in PROGRAMS:
+            if program is None:
+                program = os.path.join(directory, name + '.dl')
+                generateChainProgram(program)
+            solver_dir = generateSolver(program, os.path.join(directory, name))
+            facts_dir = os.path.join(directory, name + '-facts')
+            for size in sizes:
+                shutil.rmtree(facts_dir, ignore_errors=True)
+                os.mkdir(facts_dir)
+                generateFacts(facts_dir, size, random.Random(size))
+
+                files_time, _, files_answers = measureMode(solver_dir, facts_dir, 'files', query)
+                api_time, first_time, api_answers = measureMode(solver_dir, facts_dir, 'api', query)
+                print '{}\t{}\t{}\t{:.3f}\t{:.3f}\t{:.2f}\t{:.3f}\t{}'.format(name, size, api_answers,
+                                                                           files_time, api_time,
+                                                                           files_time / api_time,
+                                                                           first_time,
+                                                                           files_answers == api_answers)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,105 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+
+# Benchmark for the stratification of the rules (RuleStratifier.stratifyRules).
+# It generates synthetic programs with negation between 2k and 100k rules and
+# measures the time required to stratify them. The previous algorithm (one
+# updateStratums call per negated literal) is also measured for the sizes
+# given by LEGACY_SIZES as it becomes unusable for bigger programs.
+#
+# Usage (from the experiments directory):
+#    python BenchmarkStratification.py
+
+import os, sys
+import random, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from RuleStratifier import stratifyRules
+from Parser import hashed_generator
+from Types import LogicRule, Predicate, Identifier, Argument
+
+SIZES = [2000, 10000, 25000, 50000, 100000]
+LEGACY_SIZES = [2000]
+# Number of rules defining every predicate
+RULES_PER_PREDICATE = 4
+# Number of layers of predicates, every layer negates predicates of the
+# previous ones so the program has up to as many stratums as layers
+LAYERS = 20
+REPETITIONS = 3
+
+def legacyUpdateStratums(predicate_id, rule, stratums):
+    stratum_of_rule = 0
+    for stratum_level, stratum in enumerate(stratums):
+        for stratum_rule in stratum:
+            if rule == stratum_rule:
+                stratum_of_rule = stratum_level
+
+    new_stratum = 0
+    found = False
+    for stratum_level, stratum in enumerate(stratums):
+        for stratum_rule in stratum:
+            if stratum_rule.head.id == predicate_id:
+                if stratum_level >= new_stratum:
+                    new_stratum = stratum_level + 1
+                found = True
+
+    if found:
+        stratums[stratum_of_rule].remove(rule)
+        if len(stratums) <= new_stratum:
+            stratums.append([rule])
+        else:
+            stratums[new_stratum].append(rule)
+
+def legacyStratifyRules(rulesTable):
+    stratums = [rulesTable[:]]
+    for rule in rulesTable:
+        for element in rule.body:
+            if isinstance(element, Predicate) and element.negated:
+                legacyUpdateStratums(element.id, rule, stratums)
+    return stratums
+
+def makePredicate(name, negated, variables):
+    return Predicate(Identifier(name, name + '_' + hashed_generator(name, 5)), negated,
+                     [Argument('variable', v) for v in variables])
+
+# This function generates a program with the given number of rules. The
+# predicates are split in layers, the rules of a predicate join two predicates
+# of its own or a lower layer and negate a predicate of a lower layer.
+def generateProgram(number_of_rules, seed=0):
+    rnd = random.Random(seed)
+    number_of_predicates = max(LAYERS, number_of_rules // RULES_PER_PREDICATE)
+    per_layer = number_of_predicates // LAYERS
+    names = ['p{}'.format(x) for x in xrange(number_of_predicates)]
+
+    rules = []
+    for line_no in xrange(number_of_rules):
+        position = line_no % number_of_predicates
+        layer = min(position // per_layer, LAYERS - 1)
+        head = makePredicate(names[position], False, ['X', 'Y'])
+        first = makePredicate(names[rnd.randint(0, (layer + 1) * per_layer - 1)], False, ['X', 'Z'])
+        second = makePredicate(names[rnd.randint(0, (layer + 1) * per_layer - 1)], False, ['Z', 'Y'])
+        body = [first, second]
+        if layer > 0:
+            body.append(makePredicate(names[rnd.randint(0, layer * per_layer - 1)], True, ['X', 'Y']))
+        rules.append(LogicRule(head, body, 2, layer > 0, line_no + 1, ''))
+    return rules
+
+def measure(function, rules):
+    times = []
+    for _ in xrange(REPETITIONS):
+        start = time.time()
+        stratums = function(rules)
+        times.append(time.time() - start)
+    return min(times), stratums
+
+if __name__ == '__main__':
+    print 'RULES\tSTRATUMS\tSCC (s)\tLEGACY (s)'
+    for size in SIZES:
+        rules = generateProgram(size)
+        scc_time, stratums = measure(stratifyRules, rules)
+        legacy = '-'
+        if size in LEGACY_SIZES:
+            legacy_time, _ = measure(legacyStratifyRules, rules)
+            legacy = '{:.3f}'.format(legacy_time)
+        print '{}\t{}\t{:.3f}\t{}'.format(size, len(stratums), scc_time, legacy)
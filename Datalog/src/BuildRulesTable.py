@@ -9,17 +9,18 @@ import logging
 
 from collections import defaultdict
 
-from Parser import parseRule
-from Types import LogicRule, PredicateTypes, Predicate, Argument
+from Parser import parseRules, ParsingError
+from PhaseProfiler import profileIterator
+from Types import LogicRule, PredicateTypes, Predicate
 from Types import AssignationExpression, BooleanExpression
 from Types import ArithmeticExpression
 
 
+# Every rule adds an edge from the predicates of its body to its head. The
+# successors of every predicate are kept in a set while the graph is built.
 def addRuleDependencyToGraph(graph, head, body):
     for pred in body:
-        #if not graph.has_key(pred):
-        #    graph[pred] = dict()
-        graph[pred][head] = 0
+        graph[pred].add(head)
 
 def logError(filename, line_no, error_type, error_message):
     logging.error('Analyzing:%s:Line:%i', filename, line_no)
@@ -28,73 +29,60 @@ def logError(filename, line_no, error_type, error_message):
     else:
         logging.error('%s', error_message)
 
+# This function returns the set with the names of the variables of the given
+# predicates. It is computed once per rule for the head and for the body and
+# the checks below use those sets.
+def getVariables(predicates):
+    return set(argument.value for predicate in predicates
+                              for argument in predicate.arguments
+                              if argument.type == 'variable')
+
+# This function returns the names of the variables of the side of an
+# expression, it can be an argument or an arithmetic expression.
+def getExpressionVariables(expression):
+    if isinstance(expression, ArithmeticExpression):
+        return [argument.value for argument in expression.arguments if argument.type == 'variable']
+    elif expression.type == 'variable':
+        return [expression.value]
+    return []
+
 # This function checks if a rule is unsafe. If a rule is unsafe can't be 
 # evaluated.
-def isAnUnsafeRule(head, body, assignations):
-    vars_head = set(x.value for x in head.arguments if x.type == 'variable' )
-    vars_body = set()
-    
-    if len(body) == 1:
-        # Check that all the variables of the body appear on the head
-        vars_body |= set(x.value for x in body[0].arguments if x.type == 'variable')
-        
-    elif len(body) == 2:
-        vars_body |= set(x.value for x in body[0].arguments if x.type == 'variable')
-        vars_body |= set(x.value for x in body[1].arguments if x.type == 'variable')
-        
-    if assignations:
-        vars_body |= set(a.arguments[0].value for a in assignations)
-            
-    if not vars_head.issubset(vars_body):
+def isAnUnsafeRule(head_variables, body_variables, assignations):
+    assigned_variables = set(a.arguments[0].value for a in assignations)
+    for variable in head_variables:
+        if variable not in body_variables and variable not in assigned_variables:
             return True
 
     return False
 
 
-def checkLeftSideVariableOnAssignationsAppearOnTheHead(head, assignation):
-    vars_head = set(x.value for x in head.arguments if x.type == 'variable')
-    
-    if assignation.arguments[0].value in vars_head:
-        return True
-    
-    return False
+def checkLeftSideVariableOnAssignationsAppearOnTheHead(head_variables, assignation):
+    return assignation.arguments[0].value in head_variables
 
 
-def checkRightSideVariablesOnAssignationsAppearOnTheBody(predicates_of_the_body, assignation):
-    assignation_vars = set()
-    if isinstance(assignation.arguments[1], ArithmeticExpression):
-        arithmetic_expression = assignation.arguments[1]
-        assignation_vars |= set(argument.value for argument in arithmetic_expression.arguments
-                                                    if argument.type == 'variable')
-    elif assignation.arguments[1].type == 'variable':
-        assignation_vars.add(assignation.arguments[1].value)
-                   
-    predicate_vars = set([y.value for x in predicates_of_the_body
-                                  for y in x.arguments if y.type == 'variable'])
-    
-    if assignation_vars.issubset(predicate_vars):
-        return True
-    
-    return False
+def checkRightSideVariablesOnAssignationsAppearOnTheBody(body_variables, assignation):
+    return body_variables.issuperset(getExpressionVariables(assignation.arguments[1]))
 
 
-def checkBooleanExpressionVariablesAppearOnTheBody(predicates_of_the_body, boolean):
-    boolean_vars = set()
-    for argument in boolean.arguments:
-        if isinstance(argument, Argument) and argument.type == 'variable':
-            boolean_vars.add(argument.value)
-        elif isinstance(argument, ArithmeticExpression):
-            boolean_vars.update(set([x.value for x in argument.arguments
-                                               if x.type == 'variable']))
+def checkBooleanExpressionVariablesAppearOnTheBody(body_variables, boolean):
+    return all(body_variables.issuperset(getExpressionVariables(argument))
+               for argument in boolean.arguments)
 
-    predicate_vars = set([y.value for x in predicates_of_the_body
-                                  for y in x.arguments if y.type == 'variable'])
-    
-    if boolean_vars.issubset(predicate_vars):
-        return True
-    
-    return False
 
+# This function reads the rules of the program, if one of them can't be parsed
+# the error is logged and the compilation stops.
+def readRules(f, filename, test):
+    try:
+        for rule in profileIterator('parsing', parseRules(f)):
+            yield rule
+    except ParsingError as e:
+        if not test:
+            logError(filename,
+                     e.line,
+                     'Parsing',
+                     'Column:{}:{}'.format(e.column, e.reason))
+        sys.exit(0)
 
 def buildRulesTable(filename, test=False):
     """This function is in charge to build the rules table, the rules table
@@ -102,7 +90,8 @@ def buildRulesTable(filename, test=False):
        rules of the program, a description for what a logical rule data type
        is can be found in the Utils.py file. This function also returns the
        dependency graph. A dependency graph is a dict containing the dependency
-       information in a bottom-up fashion. The predicateTypes is a tuple which
+       information in a bottom-up fashion, every predicate of a body is mapped
+       to a tuple with the heads of the rules in which it appears. The predicateTypes is a tuple which
        separates the set of intenstional and extensional."""
     # This line is to handle testing properly.
     # When we are testing we pass a stream otherwise we pass the file name.
@@ -111,7 +100,7 @@ def buildRulesTable(filename, test=False):
     if test: f = filename
     else : f = open(filename, 'r')
     
-    dependency_graph = defaultdict(lambda: defaultdict(int))
+    dependency_graph = defaultdict(set)
     
     # Dictionary to from predicate to its length to check we don't redefine its definition
     preds_to_length = dict()
@@ -120,21 +109,9 @@ def buildRulesTable(filename, test=False):
     body_preds_ids = set()
     negated_preds = set()
     rulesTable = []
-    for line_no, line in enumerate(f, start=1):
-        # Discard empty lines and comments
-        # Comments are lines that start with '#'
-        if line[0] == '\n' or line[0] == '#': continue
-        
-        try:
-            (head, body) = parseRule(line, check_restricted=True)
-        except ValueError as v:
-            if not test:
-                logError(filename,
-                         line_no,
-                         'Parsing',
-                         v.message)
-            sys.exit(0)
-        
+    # Rules can span several lines, empty lines and comments (they start with
+    # '#') are discarded by the parser.
+    for (head, body, line_no, line) in readRules(f, filename, test):
         # Obtain the different elements that compose the body of the rule.
         predicates = [x for x in body if isinstance(x, Predicate) and not x.negated]
         negated_predicates = [x for x in body if isinstance(x, Predicate) and x.negated]
@@ -146,6 +123,11 @@ def buildRulesTable(filename, test=False):
         
         has_negated_predicates = (len(negated_predicate_ids) != 0)
         
+        # The variables of the head and of the predicates of the body are
+        # collected only once and used by all the checks of the rule.
+        head_variables = getVariables([head])
+        body_variables = getVariables(predicates)
+        
         # Start for semantic error on the logical rules:
         # These errors can be found on the predicates or the expressions
         if len(predicates) == 0:
@@ -183,7 +165,7 @@ def buildRulesTable(filename, test=False):
         
         # Check that the assignation expressions are properly defined
         for assignation_expression in assignation_expressions:
-            if not checkLeftSideVariableOnAssignationsAppearOnTheHead(head, assignation_expression):
+            if not checkLeftSideVariableOnAssignationsAppearOnTheHead(head_variables, assignation_expression):
                 logError(filename,
                          line_no,
                          None,
@@ -191,7 +173,7 @@ def buildRulesTable(filename, test=False):
                          'appear on head of the rule')
                 sys.exit(0)
                 
-            if not checkRightSideVariablesOnAssignationsAppearOnTheBody(predicates, assignation_expression):
+            if not checkRightSideVariablesOnAssignationsAppearOnTheBody(body_variables, assignation_expression):
                 logError(filename,
                          line_no,
                          None,
@@ -201,7 +183,7 @@ def buildRulesTable(filename, test=False):
         
         # Check that the boolean expressions are properly defined        
         for boolean_expression in boolean_expressions:
-            if not checkBooleanExpressionVariablesAppearOnTheBody(predicates, boolean_expression):
+            if not checkBooleanExpressionVariablesAppearOnTheBody(body_variables, boolean_expression):
                 logError(filename,
                          line_no,
                          None,
@@ -212,7 +194,7 @@ def buildRulesTable(filename, test=False):
         # Is it an unsafe rule?
         # Conditions to be an unsafe rule:
         #    - A variable on the head doesn't appear on the body
-        if isAnUnsafeRule(head, predicates, assignation_expressions):
+        if isAnUnsafeRule(head_variables, body_variables, assignation_expressions):
             logError(filename,
                      line_no,
                      None,
@@ -222,9 +204,6 @@ def buildRulesTable(filename, test=False):
                 
 
         # Check for errors regarding negated predicates
-        body_variables = set([y.value for x in predicates
-                                      for y in x.arguments
-                                      if y.type == 'variable'])            
         for negated_predicate in negated_predicates:
             if negated_predicate.id in body_predicates_ids:
                 logError(filename,
@@ -252,10 +231,12 @@ def buildRulesTable(filename, test=False):
         body_preds_ids.update(body_predicates_ids)
         negated_preds.update(negated_predicate_ids)
         
-        addRuleDependencyToGraph(dependency_graph, head.id, body_preds_ids.union(negated_preds))
+        # Only the predicates of the body of this rule depend on its head.
+        addRuleDependencyToGraph(dependency_graph, head.id, body_predicates_ids + negated_predicate_ids)
         
         rulesTable.append(LogicRule(head, body, len(predicates), has_negated_predicates, line_no+1, line))
             
     f.close()
+    dependency_graph = dict((pred, tuple(heads)) for pred, heads in dependency_graph.iteritems())
     return (rulesTable, PredicateTypes(head_preds_ids, body_preds_ids.difference(head_preds_ids)), dependency_graph, negated_preds)
 
@@ -26,6 +26,7 @@ void Ds_init(){
 void Ds_free(){
 %% fill_DsFree
 }
+%% fill_DsRetireThread
 
 /* Functions to insert new values */
 %% fill_DsInsertFunctions
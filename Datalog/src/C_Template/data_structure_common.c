@@ -5,10 +5,18 @@
 #include <string.h>
 #include <stdint.h>
 #include <assert.h>
+#ifdef __SSE2__
+#include <emmintrin.h>
+#endif
 
 #include "data_structure_common.h"
 #include "utils.h"
 
+/* Arena constants */
+#define ARENA_INITIAL_OBJECTS 64
+#define ARENA_MAX_CHUNK_SIZE (1 << 22)
+#define ARENA_ALIGNMENT sizeof(void *)
+
 /* BitMap constants */
 #define INITIAL_BITARRAY_SIZE 1000
 #define BITMAP_BASE 32
@@ -38,6 +46,188 @@ struct BTreeSetNode{
     struct BTreeSetNode *kids[BTREE_SET_MAX_KEYS+1];  /* Kids[i] holds nodes < keys[i]         */
 };
 
+/* ART constants and definitions */
+#define ART_NODE4 0
+#define ART_NODE16 1
+#define ART_NODE48 2
+#define ART_NODE256 3
+#define ART_KEY_BYTES 4
+
+/* The byte of the key compared at the given depth, the most significant first */
+#define ART_KEY_BYTE(key, depth) ((uint8_t) ((key) >> (8 * (ART_KEY_BYTES - 1 - (depth)))))
+/* The leaves are tagged with the lowest bit of the pointer */
+#define ART_IS_LEAF(p) ((uintptr_t) (p) & 1)
+#define ART_LEAF_CELL(p) ((Cell *) ((uintptr_t) (p) & ~(uintptr_t) 1))
+#define ART_CELL_LEAF(c) ((void *) ((uintptr_t) (c) | 1))
+/* The leaves of the sets store the key when it fits with the tag */
+#define ART_SET_IMMEDIATE_KEYS (UINTPTR_MAX > 0xFFFFFFFFu)
+
+/* Header of the inner nodes, prefix holds the bytes shared by all its keys */
+struct ARTNode{
+    uint8_t type;
+    uint8_t prefix_length;
+    uint16_t num_children;
+    uint8_t prefix[ART_KEY_BYTES];
+};
+typedef struct ARTNode ARTNode;
+
+/* The keys of the nodes of 4 and 16 children are sorted */
+struct ARTNode4{
+    ARTNode n;
+    uint8_t keys[4];
+    void *children[4];
+};
+
+struct ARTNode16{
+    ARTNode n;
+    uint8_t keys[16];
+    void *children[16];
+};
+
+/* index[byte] is the position of the child plus one, 0 when it doesn't exist */
+struct ARTNode48{
+    ARTNode n;
+    uint8_t index[256];
+    void *children[48];
+};
+
+struct ARTNode256{
+    ARTNode n;
+    void *children[256];
+};
+
+
+
+static ARENA_THREAD_LOCAL Arena uIntListStack_nodes = ARENA_INITIALIZER(uIntListStackNode);
+static ARENA_THREAD_LOCAL Arena AVLTree_nodes = ARENA_INITIALIZER(AVLNode);
+static ARENA_THREAD_LOCAL Arena BTreeSet_nodes = ARENA_INITIALIZER(BTreeSetNode);
+static ARENA_THREAD_LOCAL Arena BTree_nodes = ARENA_INITIALIZER(BTreeNode);
+static ARENA_THREAD_LOCAL Arena BTree_cells = ARENA_INITIALIZER(Cell[BTREE_MAX_KEYS]);
+static ARENA_THREAD_LOCAL Arena BTree_children = ARENA_INITIALIZER(BTreeNode *[BTREE_MAX_KEYS + 1]);
+static ARENA_THREAD_LOCAL Arena ART_nodes[] = {ARENA_INITIALIZER(struct ARTNode4),
+                                               ARENA_INITIALIZER(struct ARTNode16),
+                                               ARENA_INITIALIZER(struct ARTNode48),
+                                               ARENA_INITIALIZER(struct ARTNode256)};
+static ARENA_THREAD_LOCAL Arena ART_leaves = ARENA_INITIALIZER(Cell);
+/* The nodes replaced by bigger ones are reused, linked by their first word */
+static ARENA_THREAD_LOCAL void *ART_free_nodes[ART_NODE256];
+
+#ifdef SOLVER_THREADS
+/* The chunks of the arenas of the threads that finished */
+static ArenaChunk *retired_chunks = NULL;
+static pthread_mutex_t retired_chunks_lock = PTHREAD_MUTEX_INITIALIZER;
+#endif
+
+
+/*
+  Next we have the implementation of the arenas that store the nodes of the
+  data structure. Every chunk of an arena stores twice the objects of the
+  previous one until its size reaches ARENA_MAX_CHUNK_SIZE, the nodes
+  allocated together are contiguous in memory and freeing the data structure
+  only requires freeing the chunks.
+*/
+static void Arena_new_chunk(ArenaPtr a){
+    ArenaChunk *chunk;
+    size_t size;
+
+    a->object_size = (a->object_size + ARENA_ALIGNMENT - 1) & ~(ARENA_ALIGNMENT - 1);
+    if (!a->chunk_objects){
+        a->chunk_objects = ARENA_INITIAL_OBJECTS;
+        while (a->chunk_objects > 1 && a->chunk_objects * a->object_size > ARENA_MAX_CHUNK_SIZE)
+            a->chunk_objects /= 2;
+    }
+    else if (a->chunk_objects * a->object_size * 2 <= ARENA_MAX_CHUNK_SIZE){
+        a->chunk_objects *= 2;
+    }
+
+    size = sizeof(ArenaChunk) + a->chunk_objects * a->object_size;
+    chunk = malloc(size);
+    if (!chunk){
+        fprintf(stderr, "Error: Not enough memory for the data structure\n");
+        exit(EXIT_FAILURE);
+    }
+    chunk->next = a->chunks;
+    a->chunks = chunk;
+    a->next = (char *) (chunk + 1);
+    a->available = a->chunk_objects;
+    a->num_bytes += size;
+}
+
+void Arena_init(ArenaPtr a, size_t object_size){
+    a->object_size = object_size;
+    a->next = NULL;
+    a->available = 0;
+    a->chunk_objects = 0;
+    a->chunks = NULL;
+    a->num_objects = 0;
+    a->num_bytes = 0;
+}
+
+void Arena_free(ArenaPtr a){
+    ArenaChunk *chunk;
+
+    while ((chunk = a->chunks)){
+        a->chunks = chunk->next;
+        free(chunk);
+    }
+    Arena_init(a, a->object_size);
+}
+
+void *Arena_alloc(ArenaPtr a){
+    void *object;
+
+    if (!a->available)
+        Arena_new_chunk(a);
+    object = a->next;
+    a->next += a->object_size;
+    a->available--;
+    a->num_objects++;
+
+    return object;
+}
+
+#ifdef SOLVER_THREADS
+void Arena_retire(ArenaPtr a){
+    ArenaChunk *last;
+
+    if (a->chunks){
+        for (last = a->chunks; last->next; last = last->next)
+            ;
+        pthread_mutex_lock(&retired_chunks_lock);
+        last->next = retired_chunks;
+        retired_chunks = a->chunks;
+        pthread_mutex_unlock(&retired_chunks_lock);
+        a->chunks = NULL;
+    }
+    Arena_init(a, a->object_size);
+}
+
+void Arena_retire_thread(){
+    unsigned int i;
+
+    Arena_retire(&uIntListStack_nodes);
+    Arena_retire(&AVLTree_nodes);
+    Arena_retire(&BTreeSet_nodes);
+    Arena_retire(&BTree_nodes);
+    Arena_retire(&BTree_cells);
+    Arena_retire(&BTree_children);
+    for (i = ART_NODE4; i <= ART_NODE256; i++)
+        Arena_retire(&ART_nodes[i]);
+    Arena_retire(&ART_leaves);
+    memset(ART_free_nodes, 0, sizeof(ART_free_nodes));
+}
+
+void Arena_free_retired(){
+    ArenaChunk *chunk;
+
+    pthread_mutex_lock(&retired_chunks_lock);
+    while ((chunk = retired_chunks)){
+        retired_chunks = chunk->next;
+        free(chunk);
+    }
+    pthread_mutex_unlock(&retired_chunks_lock);
+}
+#endif
 
 
 /*
@@ -80,16 +270,14 @@ void uIntListStack_init(uIntListStackPtr l){
     l->head = NULL;
 }
 
-void uIntListStack_free(uIntListStackPtr l){
-    uIntListStackNodePtr temp;
-    for (temp = l->head; temp; l->head = l->head->next, temp = l->head)
-        free(temp);
+void uIntListStack_free_all(){
+    Arena_free(&uIntListStack_nodes);
 }
 
 void uIntListStack_append(uIntListStackPtr l, int value){
     uIntListStackNodePtr new;
     
-    new = malloc(sizeof(uIntListStackNode));
+    new = Arena_alloc(&uIntListStack_nodes);
     new->value = value;
     new->next = l->head;
     l->head = new;
@@ -136,7 +324,7 @@ int max(int a, int b)
     NULL left and right pointers. */
 AVLNode *newNode(unsigned int key)
 {
-    AVLNode* node = (AVLNode*) malloc(sizeof(AVLNode));
+    AVLNode* node = (AVLNode*) Arena_alloc(&AVLTree_nodes);
     node->key   = key;
     node->left   = NULL;
     node->right  = NULL;
@@ -259,13 +447,9 @@ void AVLTree_init(AVLTree *root)
     *root = NULL;
 }
 
-void AVLTree_free(AVLTree node)
+void AVLTree_free_all()
 {
-    if (node != NULL){
-        AVLTree_free(node->left);
-        AVLTree_free(node->right);
-        free(node);
-    }
+    Arena_free(&AVLTree_nodes);
 }
 
 void AVLTree_size(AVLTree root, int * size)
@@ -578,7 +762,7 @@ static BTreeSet private_BTreeSet_Insert_Internal(BTreeSet b, unsigned int key, u
          *      3        7
          *      A B      C D
          */
-        b2 = malloc(sizeof(*b2));
+        b2 = Arena_alloc(&BTreeSet_nodes);
 
         b2->numKeys = b->numKeys - mid - 1;
         b2->isLeaf = b->isLeaf;
@@ -599,8 +783,7 @@ static BTreeSet private_BTreeSet_Insert_Internal(BTreeSet b, unsigned int key, u
 BTreeSet BTreeSet_Init(void){
     BTreeSet b;
 
-    b = malloc(sizeof(*b));
-    assert(b);
+    b = Arena_alloc(&BTreeSet_nodes);
 
     b->isLeaf = true;
     b->numKeys = 0;
@@ -608,16 +791,8 @@ BTreeSet BTreeSet_Init(void){
     return b;
 }
 
-void BTreeSet_Free(BTreeSet b){
-    unsigned int i;
-
-    if(!b->isLeaf) {
-        for(i = 0; i < b->numKeys + 1; i++) {
-            BTreeSet_Free(b->kids[i]);
-        }
-    }
-
-    free(b);
+void BTreeSet_FreeAll(){
+    Arena_free(&BTreeSet_nodes);
 }
 
 bool BTreeSet_Contains(BTreeSet b, unsigned int key){
@@ -649,8 +824,7 @@ void BTreeSet_Insert(BTreeSet b, unsigned int key){
         /* basic issue here is that we are at the root */
         /* so if we split, we have to make a new root */
 
-        b1 = malloc(sizeof(*b1));
-        assert(b1);
+        b1 = Arena_alloc(&BTreeSet_nodes);
 
         /* copy root to b1 */
         memmove(b1, b, sizeof(*b));
@@ -761,13 +935,12 @@ static Cell * private_BTree_Insert_NonFull(BTree b, unsigned int key){
 BTree BTree_Init(){
     BTree b;
 
-    b = malloc(sizeof(*b));
-    assert(b);
+    b = Arena_alloc(&BTree_nodes);
 
     b->m_numkeys = 0;
     b->m_leaf = true;
-    b->m_cells = malloc(sizeof(Cell) * BTREE_MAX_KEYS);
-    b->m_children = malloc(sizeof(BTreeNode *) * (BTREE_MAX_KEYS+1));
+    b->m_cells = Arena_alloc(&BTree_cells);
+    b->m_children = Arena_alloc(&BTree_children);
 
     return b;
 }
@@ -782,10 +955,12 @@ void BTree_Free(BTree b, void (*f)(size_t)){
     if(!b->m_leaf)
         for(i = 0; i < b->m_numkeys + 1; i++)
             BTree_Free(b->m_children[i], f);
+}
 
-    free(b->m_cells);
-    free(b->m_children);
-    free(b);
+void BTree_FreeAll(){
+    Arena_free(&BTree_nodes);
+    Arena_free(&BTree_cells);
+    Arena_free(&BTree_children);
 }
 
 Cell* BTree_Lookup(BTree b, unsigned int key){
@@ -839,3 +1014,379 @@ void BTree_Fill_KeysList(BTree b, BTreeKeyList **l){
 		*l = temp;
 	}
 }
+
+
+/*
+ * Adaptive radix tree implementation. It is based on the paper "The Adaptive
+ * Radix Tree: ARTful Indexing for Main-Memory Databases" (Leis, Kemper and
+ * Neumann, 2013). The keys have 4 bytes, so the whole prefix of a node always
+ * fits in it and there are no deletions.
+ */
+static inline void *private_ART_NewLeaf(unsigned int key, bool set){
+    Cell *c;
+
+#if ART_SET_IMMEDIATE_KEYS
+    if (set)
+        return (void *) (((uintptr_t) key << 1) | 1);
+#endif
+    c = Arena_alloc(&ART_leaves);
+    c->key = key;
+    c->value = 0;
+
+    return ART_CELL_LEAF(c);
+}
+
+static inline unsigned int private_ART_LeafKey(void *leaf, bool set){
+#if ART_SET_IMMEDIATE_KEYS
+    if (set)
+        return (unsigned int) ((uintptr_t) leaf >> 1);
+#endif
+    return ART_LEAF_CELL(leaf)->key;
+}
+
+static ARTNode *private_ART_NewNode(uint8_t type){
+    ARTNode *n;
+
+    if (type != ART_NODE256 && (n = ART_free_nodes[type]))
+        ART_free_nodes[type] = *(void **) n;
+    else
+        n = Arena_alloc(&ART_nodes[type]);
+    memset(n, 0, ART_nodes[type].object_size);
+    n->type = type;
+
+    return n;
+}
+
+/* Returns the slot of the child of the byte or NULL if there is none */
+static inline void **private_ART_FindChild(ARTNode *n, uint8_t byte){
+    unsigned int i;
+
+    switch (n->type){
+    case ART_NODE4:{
+        struct ARTNode4 *m = (struct ARTNode4 *) n;
+        for (i = 0; i < n->num_children; i++)
+            if (m->keys[i] == byte)
+                return &m->children[i];
+        return NULL;
+    }
+    case ART_NODE16:{
+        struct ARTNode16 *m = (struct ARTNode16 *) n;
+#ifdef __SSE2__
+        int mask;
+
+        /* Compares the byte with the 16 keys at once */
+        mask = _mm_movemask_epi8(_mm_cmpeq_epi8(_mm_set1_epi8((char) byte),
+                                                _mm_loadu_si128((__m128i *) m->keys)));
+        mask &= (1 << n->num_children) - 1;
+        return mask ? &m->children[__builtin_ctz(mask)] : NULL;
+#else
+        for (i = 0; i < n->num_children; i++)
+            if (m->keys[i] == byte)
+                return &m->children[i];
+        return NULL;
+#endif
+    }
+    case ART_NODE48:{
+        struct ARTNode48 *m = (struct ARTNode48 *) n;
+        return m->index[byte] ? &m->children[m->index[byte] - 1] : NULL;
+    }
+    default:{
+        struct ARTNode256 *m = (struct ARTNode256 *) n;
+        return m->children[byte] ? &m->children[byte] : NULL;
+    }
+    }
+}
+
+/* Replaces a full node by one of the next size, the old one is reused later */
+static ARTNode *private_ART_Grow(ARTNode *n){
+    ARTNode *new;
+    unsigned int i;
+    uint8_t type = n->type;
+
+    new = private_ART_NewNode(n->type + 1);
+    new->prefix_length = n->prefix_length;
+    new->num_children = n->num_children;
+    memcpy(new->prefix, n->prefix, ART_KEY_BYTES);
+
+    switch (n->type){
+    case ART_NODE4:{
+        struct ARTNode4 *m = (struct ARTNode4 *) n;
+        struct ARTNode16 *g = (struct ARTNode16 *) new;
+        memcpy(g->keys, m->keys, sizeof(m->keys));
+        memcpy(g->children, m->children, sizeof(m->children));
+        break;
+    }
+    case ART_NODE16:{
+        struct ARTNode16 *m = (struct ARTNode16 *) n;
+        struct ARTNode48 *g = (struct ARTNode48 *) new;
+        for (i = 0; i < n->num_children; i++){
+            g->index[m->keys[i]] = i + 1;
+            g->children[i] = m->children[i];
+        }
+        break;
+    }
+    default:{
+        struct ARTNode48 *m = (struct ARTNode48 *) n;
+        struct ARTNode256 *g = (struct ARTNode256 *) new;
+        for (i = 0; i < 256; i++)
+            if (m->index[i])
+                g->children[i] = m->children[m->index[i] - 1];
+        break;
+    }
+    }
+
+    *(void **) n = ART_free_nodes[type];
+    ART_free_nodes[type] = n;
+
+    return new;
+}
+
+/* Inserts the child in the sorted keys of a node of 4 or 16 children */
+static inline void **private_ART_InsertSorted(uint8_t *keys, void **children, unsigned int num_children,
+                                              uint8_t byte, void *child){
+    unsigned int i;
+
+    for (i = num_children; i > 0 && keys[i - 1] > byte; i--){
+        keys[i] = keys[i - 1];
+        children[i] = children[i - 1];
+    }
+    keys[i] = byte;
+    children[i] = child;
+
+    return &children[i];
+}
+
+/* Adds the child of the byte to the node stored at ref and returns its slot */
+static void **private_ART_AddChild(void **ref, ARTNode *n, uint8_t byte, void *child){
+    static const unsigned int capacity[] = {4, 16, 48, 256};
+    void **slot;
+
+    if (n->num_children == capacity[n->type]){
+        n = private_ART_Grow(n);
+        *ref = n;
+    }
+
+    switch (n->type){
+    case ART_NODE4:{
+        struct ARTNode4 *m = (struct ARTNode4 *) n;
+        slot = private_ART_InsertSorted(m->keys, m->children, n->num_children, byte, child);
+        break;
+    }
+    case ART_NODE16:{
+        struct ARTNode16 *m = (struct ARTNode16 *) n;
+        slot = private_ART_InsertSorted(m->keys, m->children, n->num_children, byte, child);
+        break;
+    }
+    case ART_NODE48:{
+        struct ARTNode48 *m = (struct ARTNode48 *) n;
+        m->children[n->num_children] = child;
+        m->index[byte] = n->num_children + 1;
+        slot = &m->children[n->num_children];
+        break;
+    }
+    default:{
+        struct ARTNode256 *m = (struct ARTNode256 *) n;
+        m->children[byte] = child;
+        slot = &m->children[byte];
+        break;
+    }
+    }
+    n->num_children++;
+
+    return slot;
+}
+
+/* Number of bytes of the prefix of the node equal to the bytes of the key */
+static inline unsigned int private_ART_PrefixMatch(ARTNode *n, unsigned int key, unsigned int depth){
+    unsigned int i;
+
+    for (i = 0; i < n->prefix_length; i++)
+        if (n->prefix[i] != ART_KEY_BYTE(key, depth + i))
+            break;
+
+    return i;
+}
+
+/* Returns the leaf of the key or NULL if it is not in the tree */
+static inline void *private_ART_Lookup(void *p, unsigned int key, bool set){
+    unsigned int depth = 0;
+    ARTNode *n;
+    void **child;
+
+    while (p){
+        if (ART_IS_LEAF(p))
+            return private_ART_LeafKey(p, set) == key ? p : NULL;
+        n = p;
+        if (n->prefix_length){
+            if (private_ART_PrefixMatch(n, key, depth) != n->prefix_length)
+                return NULL;
+            depth += n->prefix_length;
+        }
+        if (!(child = private_ART_FindChild(n, ART_KEY_BYTE(key, depth))))
+            return NULL;
+        p = *child;
+        depth++;
+    }
+
+    return NULL;
+}
+
+/* Returns the slot of the leaf of the key, the leaf is added if needed */
+static void **private_ART_Insert(void **ref, unsigned int key, bool set){
+    unsigned int depth = 0, i, other;
+    ARTNode *n, *new;
+    void **child;
+    uint8_t byte;
+
+    while (*ref){
+        if (ART_IS_LEAF(*ref)){
+            if ((other = private_ART_LeafKey(*ref, set)) == key)
+                return ref;
+            /* Lazy expansion: the leaf is replaced by a node with both keys,
+             * they differ at the last byte at the latest */
+            new = private_ART_NewNode(ART_NODE4);
+            for (i = depth; i < ART_KEY_BYTES - 1 && ART_KEY_BYTE(key, i) == ART_KEY_BYTE(other, i); i++)
+                new->prefix[i - depth] = ART_KEY_BYTE(key, i);
+            new->prefix_length = i - depth;
+            private_ART_AddChild(ref, new, ART_KEY_BYTE(other, i), *ref);
+            child = private_ART_AddChild(ref, new, ART_KEY_BYTE(key, i), private_ART_NewLeaf(key, set));
+            *ref = new;
+            return child;
+        }
+
+        n = *ref;
+        if (n->prefix_length){
+            i = private_ART_PrefixMatch(n, key, depth);
+            if (i != n->prefix_length){
+                /* The prefix is split by a new node with the shared bytes */
+                new = private_ART_NewNode(ART_NODE4);
+                new->prefix_length = i;
+                memcpy(new->prefix, n->prefix, i);
+                byte = n->prefix[i];
+                n->prefix_length -= i + 1;
+                memmove(n->prefix, n->prefix + i + 1, n->prefix_length);
+                private_ART_AddChild(ref, new, byte, n);
+                child = private_ART_AddChild(ref, new, ART_KEY_BYTE(key, depth + i),
+                                             private_ART_NewLeaf(key, set));
+                *ref = new;
+                return child;
+            }
+            depth += n->prefix_length;
+        }
+
+        byte = ART_KEY_BYTE(key, depth);
+        if (!(child = private_ART_FindChild(n, byte)))
+            return private_ART_AddChild(ref, n, byte, private_ART_NewLeaf(key, set));
+        ref = child;
+        depth++;
+    }
+
+    *ref = private_ART_NewLeaf(key, set);
+    return ref;
+}
+
+/* Calls the function with every leaf of the tree, in the order of the keys */
+static void private_ART_Traverse(void *p, void (*f)(void *, void *), void *data){
+    ARTNode *n;
+    unsigned int i;
+
+    if (!p)
+        return;
+    if (ART_IS_LEAF(p)){
+        f(p, data);
+        return;
+    }
+
+    n = p;
+    switch (n->type){
+    case ART_NODE4:
+        for (i = 0; i < n->num_children; i++)
+            private_ART_Traverse(((struct ARTNode4 *) n)->children[i], f, data);
+        break;
+    case ART_NODE16:
+        for (i = 0; i < n->num_children; i++)
+            private_ART_Traverse(((struct ARTNode16 *) n)->children[i], f, data);
+        break;
+    case ART_NODE48:{
+        struct ARTNode48 *m = (struct ARTNode48 *) n;
+        for (i = 0; i < 256; i++)
+            if (m->index[i])
+                private_ART_Traverse(m->children[m->index[i] - 1], f, data);
+        break;
+    }
+    default:
+        for (i = 0; i < 256; i++)
+            private_ART_Traverse(((struct ARTNode256 *) n)->children[i], f, data);
+        break;
+    }
+}
+
+/* The values are freed through a pointer to the function given to ART_Free */
+static void private_ART_FreeValue(void *leaf, void *data){
+    (*(void (**)(size_t)) data)(ART_LEAF_CELL(leaf)->value);
+}
+
+struct ARTKeys{
+    unsigned int **values;
+    unsigned int *size;
+    unsigned int *max_size;
+};
+
+static void private_ART_AppendKey(void *leaf, void *data){
+    struct ARTKeys *keys = data;
+
+    if (*keys->size == *keys->max_size){
+        *keys->max_size = *keys->max_size ? *keys->max_size * 2 : 1024;
+        *keys->values = realloc(*keys->values, *keys->max_size * sizeof(unsigned int));
+        if (!*keys->values){
+            fprintf(stderr, "Error: Not enough memory to store the keys of the ART\n");
+            exit(EXIT_FAILURE);
+        }
+    }
+    (*keys->values)[(*keys->size)++] = ART_LEAF_CELL(leaf)->key;
+}
+
+void ART_Init(ART *t){
+    *t = NULL;
+}
+
+void ART_Free(ART *t, void (*f)(size_t)){
+    private_ART_Traverse(*t, private_ART_FreeValue, &f);
+}
+
+void ART_FreeAll(){
+    unsigned int i;
+
+    for (i = ART_NODE4; i <= ART_NODE256; i++)
+        Arena_free(&ART_nodes[i]);
+    Arena_free(&ART_leaves);
+    memset(ART_free_nodes, 0, sizeof(ART_free_nodes));
+}
+
+Cell* ART_Lookup(ART *t, unsigned int key){
+    void *leaf = private_ART_Lookup(*t, key, false);
+
+    return leaf ? ART_LEAF_CELL(leaf) : NULL;
+}
+
+Cell* ART_Insert(ART *t, unsigned int key){
+    return ART_LEAF_CELL(*private_ART_Insert(t, key, false));
+}
+
+void ART_Fill_Keys(ART *t, unsigned int **values, unsigned int *size, unsigned int *max_size){
+    struct ARTKeys keys = {values, size, max_size};
+
+    private_ART_Traverse(*t, private_ART_AppendKey, &keys);
+}
+
+void ARTSet_Init(ARTSet *t){
+    *t = NULL;
+}
+
+void ARTSet_Insert(ARTSet *t, unsigned int key){
+    private_ART_Insert(t, key, true);
+}
+
+bool ARTSet_Contains(ARTSet t, unsigned int key){
+    return private_ART_Lookup(t, key, true) != NULL;
+}
@@ -8,6 +8,9 @@
 
 extern void Ds_init();
 extern void Ds_free();
+#ifdef SOLVER_THREADS
+extern void Ds_retire_thread();
+#endif
 
 extern void Ds_get_intValues_Level0_init();
 extern short Ds_get_intValues_Level0(unsigned int *);
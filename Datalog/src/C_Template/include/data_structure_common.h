@@ -2,10 +2,68 @@
  
 #include <stdlib.h>
 #include <stdbool.h>
+#ifdef SOLVER_THREADS
+#include <pthread.h>
+#endif
 
 #ifndef DATA_STRUCTURE_COMMON_H_
 #define DATA_STRUCTURE_COMMON_H_
 
+/* Arena header functions */
+/*
+ * The objects of an arena have the same size and are stored consecutively in
+ * big chunks of memory. They are not freed one by one, all of them are freed
+ * at once with Arena_free.
+ */
+struct ArenaChunk{
+    struct ArenaChunk *next;
+};
+typedef struct ArenaChunk ArenaChunk;
+
+struct Arena{
+    size_t object_size;
+    char *next;
+    size_t available;
+    size_t chunk_objects;
+    ArenaChunk *chunks;
+    /* Statistics */
+    size_t num_objects;
+    size_t num_bytes;
+};
+typedef struct Arena Arena;
+typedef struct Arena* ArenaPtr;
+
+#define ARENA_INITIALIZER(type) {sizeof(type), NULL, 0, 0, NULL, 0, 0}
+
+extern void Arena_init(ArenaPtr, size_t);
+extern void Arena_free(ArenaPtr);
+extern void *Arena_alloc(ArenaPtr);
+
+#ifdef SOLVER_THREADS
+/*
+ * Every thread of the solver allocates the nodes from its own arenas. Before
+ * a thread finishes the chunks of its arenas are retired: they are kept in a
+ * list shared by all the threads, freed with Arena_free_retired.
+ */
+#define ARENA_THREAD_LOCAL __thread
+
+extern void Arena_retire(ArenaPtr);
+/* Retires the arenas of the stacks, AVL trees, BTrees and ARTs of the thread */
+extern void Arena_retire_thread(void);
+extern void Arena_free_retired(void);
+
+/*
+ * The root level of the data structure is divided in DS_STRIPES stripes by
+ * the first value of the tuples. Every stripe has its own lock, which is held
+ * by the functions of the data structure while they use the stripe.
+ */
+#define DS_STRIPES 256
+#define DS_STRIPE(x) ((((unsigned int) (x)) * 2654435761u) >> 24)
+#else
+#define ARENA_THREAD_LOCAL
+#endif
+
+
 /* Queue header functions */
 struct uIntArrayQueue{
     long last, max_size;
@@ -33,8 +91,9 @@ struct uIntListStack{
 typedef struct uIntListStack uIntListStack;
 typedef struct uIntListStack* uIntListStackPtr;
 
+/* The nodes of all the stacks are freed at once */
 extern void uIntListStack_init(uIntListStackPtr);
-extern void uIntListStack_free(uIntListStackPtr);
+extern void uIntListStack_free_all(void);
 extern void uIntListStack_append(uIntListStackPtr, int);
 
 
@@ -49,8 +108,9 @@ struct AVLNode
 typedef struct AVLNode AVLNode;
 typedef struct AVLNode* AVLTree;
 
+/* The nodes of all the trees are freed at once */
 extern void AVLTree_init(AVLTree *);
-extern void AVLTree_free(AVLTree);
+extern void AVLTree_free_all(void);
 extern AVLTree AVLTree_insert(AVLTree, unsigned int);
 extern short AVLTree_contains(AVLTree, unsigned int);
 extern void AVLTree_preOrder(AVLTree root);
@@ -105,8 +165,8 @@ typedef struct BTreeSetNode* BTreeSet;
 /* Create a new empty tree */
 BTreeSet BTreeSet_Init(void);
 
-/* Free a tree */
-extern void BTreeSet_Free(BTreeSet);
+/* Free all the trees */
+extern void BTreeSet_FreeAll(void);
 
 /* Insert a new element into a tree */
 extern void BTreeSet_Insert(BTreeSet, unsigned int);
@@ -137,10 +197,43 @@ struct intList{
 };
 typedef struct intList BTreeKeyList;
 
+/*
+ * BTree_Free only calls the function with every value of the tree, the nodes
+ * of all the trees are freed at once with BTree_FreeAll
+ */
 extern BTree BTree_Init(void);
 extern void BTree_Free(BTree, void (*)(size_t));
+extern void BTree_FreeAll(void);
 extern Cell* BTree_Lookup(BTree, unsigned int);
 extern Cell* BTree_Insert(BTree *, unsigned int);
 extern void BTree_Fill_KeysList(BTree b, BTreeKeyList **l);
 
+/* Adaptive radix tree (ART) header functions */
+/*
+ * The keys are stored by their bytes, the most significant first. The inner
+ * nodes have 4, 16, 48 or 256 children and grow as the children are added,
+ * the bytes shared by all the keys of a node are stored in the node (path
+ * compression) and a subtree with only one key is a leaf. As a map (Paths=ART)
+ * every leaf is a Cell, as a set (Sets=ART) the key is stored in the pointer
+ * of the leaf. An empty tree is a NULL pointer.
+ */
+typedef void * ART;
+typedef void * ARTSet;
+
+/*
+ * ART_Free only calls the function with every value of the tree, the nodes
+ * of all the trees (maps and sets) are freed at once with ART_FreeAll
+ */
+extern void ART_Init(ART *);
+extern void ART_Free(ART *, void (*)(size_t));
+extern void ART_FreeAll(void);
+extern Cell* ART_Lookup(ART *, unsigned int);
+extern Cell* ART_Insert(ART *, unsigned int);
+/* Appends the keys of the tree in order to the array, growing it as needed */
+extern void ART_Fill_Keys(ART *, unsigned int **, unsigned int *, unsigned int *);
+
+extern void ARTSet_Init(ARTSet *);
+extern void ARTSet_Insert(ARTSet *, unsigned int);
+extern bool ARTSet_Contains(ARTSet, unsigned int);
+
 #endif
@@ -1,13 +0,0 @@
-%% fill_Header
-
-#ifndef FACT_H_
-#define FACT_H_
-
-struct Fact{
-    char id[10];
-    long values[15];
-    int num_values;
-};
-typedef struct Fact Fact;
-
-#endif /* FACT_H_ */
@@ -0,0 +1,54 @@
+%% fill_Header
+
+#ifndef OUTPUT_H_
+#define OUTPUT_H_
+
+#include <stdio.h>
+#include <stdbool.h>
+#ifdef OUTPUT_ZLIB
+#include <zlib.h>
+#endif
+#ifdef SOLVER_THREADS
+#include <pthread.h>
+#endif
+
+/*
+ * The answers of every predicate are written through an OutputFile that keeps
+ * them in a buffer of OUTPUT_BUFFER_SIZE bytes and writes it when it is full.
+ * The values of the text format are formatted by hand, the binary format
+ * writes every value as a signed 64 bit little-endian integer and the gzip
+ * format (only available when the solver is compiled with OUTPUT_ZLIB) is the
+ * text format compressed with zlib. With the option Threads the answers are
+ * written by several threads, every write holds the lock of the OutputFile.
+ */
+#define OUTPUT_BUFFER_SIZE (1 << 16)
+/* Characters of the longest value of the text format (-2147483648) */
+#define OUTPUT_MAX_VALUE_CHARS 11
+
+enum OutputFormat{
+    OUTPUT_TEXT,
+    OUTPUT_BINARY,
+    OUTPUT_GZIP
+};
+typedef enum OutputFormat OutputFormat;
+
+struct OutputFile{
+    OutputFormat format;
+    FILE *fp;
+#ifdef OUTPUT_ZLIB
+    gzFile gz;
+#endif
+#ifdef SOLVER_THREADS
+    pthread_mutex_t lock;
+#endif
+    size_t used;
+    char buffer[OUTPUT_BUFFER_SIZE];
+};
+typedef struct OutputFile OutputFile;
+typedef struct OutputFile * OutputFilePtr;
+
+extern bool OutputFile_open(OutputFilePtr, const char *, OutputFormat);
+extern void OutputFile_write(OutputFilePtr, const char *, size_t, const unsigned int *, int);
+extern void OutputFile_close(OutputFilePtr);
+
+#endif
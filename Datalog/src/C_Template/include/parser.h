@@ -4,20 +4,79 @@
 #define PARSER_H_
 
 /*
- * This module parses the datalog program
+ * This module reads the facts of the .tuples files. Every file is mapped in
+ * memory and its facts are parsed in place, the values are written directly
+ * in the given array. The number of values of every fact must be the arity of
+ * the predicate and every value must fit in an int (as they are written by
+ * the output files).
  */
 
-#include <stdio.h>
+#include <stddef.h>
+#include <stdbool.h>
+#ifdef FACTS_THREAD
+#include <pthread.h>
+#endif
 
-#include "fact.h"
+struct FactsFile{
+    const char *filename;
+    char *data;
+    size_t size;
+    const char *position, *end;
+    int line;
+};
+typedef struct FactsFile FactsFile;
+typedef struct FactsFile * FactsFilePtr;
 
+extern bool FactsFile_open(FactsFilePtr, const char *);
 /*
- * This function handles the facts and fill the Fact structure
+ * This function reads the next fact of the file
  * Returns:
  * 	-1 EOF
- * 	 0 FALSE
+ * 	 0 FALSE (the error is printed)
  * 	 1 TRUE
  */
-extern int parser_get_fact(FILE *, int *, Fact *);
+extern int FactsFile_next(FactsFilePtr, unsigned int *, int);
+extern void FactsFile_close(FactsFilePtr);
+
+#ifdef FACTS_THREAD
+/*
+ * The FactsProducer reads the files in a thread while the solver evaluates the
+ * facts it already read. The facts are handed in chunks of at most
+ * FACTS_CHUNK_SIZE facts, every chunk contains facts of only one file. The
+ * thread waits when FACTS_PENDING_CHUNKS chunks were not taken yet.
+ */
+#define FACTS_CHUNK_SIZE (1 << 14)
+#define FACTS_PENDING_CHUNKS 64
+
+struct FactsChunk{
+    int predicate, arity;
+    size_t num_facts;
+    unsigned int *values;
+    struct FactsChunk *next;
+};
+typedef struct FactsChunk FactsChunk;
+typedef struct FactsChunk * FactsChunkPtr;
+
+struct FactsProducer{
+    pthread_t thread;
+    pthread_mutex_t mutex;
+    pthread_cond_t available, taken;
+    char **filenames;
+    const int *files, *arities, *predicates;
+    int num_files, num_chunks;
+    FactsChunkPtr head, tail;
+    bool finished, failed;
+};
+typedef struct FactsProducer FactsProducer;
+typedef struct FactsProducer * FactsProducerPtr;
+
+/* The files to read are given by their positions in the array of file names */
+extern bool FactsProducer_start(FactsProducerPtr, char **, const int *, const int *, const int *, int);
+/* Returns the next chunk (NULL when all the facts were read) */
+extern FactsChunkPtr FactsProducer_take(FactsProducerPtr);
+/* Waits for the thread, returns false if a file couldn't be read */
+extern bool FactsProducer_finish(FactsProducerPtr);
+extern void FactsChunk_free(FactsChunkPtr);
+#endif
 
 #endif /* PARSER_H_ */
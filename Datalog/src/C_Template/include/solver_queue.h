@@ -1,28 +1,46 @@
 %% fill_Header
 
 #include <stdio.h>
+#include <stdbool.h>
+#ifdef SOLVER_THREADS
+#include <pthread.h>
+#endif
 
 #include "solver.h"
 
 #ifndef SOLVER_QUEUE_H_
 #define SOLVER_QUEUE_H_
 
-struct SolverNode{
-	TYPE_REWRITING_VARIABLE b;
-	struct SolverNode *next;
-};
-typedef struct SolverNode SolverNode;
-typedef struct SolverNode *SolverNodePtr;
+/*
+ * The rewriting variables of a SolverQueue are stored in blocks of
+ * SOLVER_QUEUE_BLOCK_SIZE variables linked in their order of arrival. The
+ * variables are appended after the last one of the tail block and popped from
+ * the head block. The blocks whose variables were all popped are kept in a
+ * list of free blocks and reused by the next appends, so the memory is only
+ * allocated when the queue grows beyond its largest size.
+ *
+ * The variable returned by SolverQueue_pop is valid until the next pop.
+ */
+#define SOLVER_QUEUE_BLOCK_SIZE 4096
 
-struct Queue{
-	SolverNodePtr head, tail;
+struct SolverQueueBlock{
+    TYPE_REWRITING_VARIABLE variables[SOLVER_QUEUE_BLOCK_SIZE];
+    struct SolverQueueBlock *next;
 };
-typedef struct Queue Queue;
-typedef struct Queue * QueuePtr;
+typedef struct SolverQueueBlock SolverQueueBlock;
+typedef struct SolverQueueBlock * SolverQueueBlockPtr;
 
 struct SolverQueue{
-    Queue q1, q2;
-    QueuePtr reading, writing;
+    SolverQueueBlockPtr head, tail, free_blocks;
+    size_t head_position, tail_position;
+    size_t size;
+    /* Statistics */
+    size_t high_water_mark;
+    size_t num_blocks;
+    unsigned long long appended;
+#ifdef SOLVER_THREADS
+    unsigned long long stolen;
+#endif
 };
 typedef struct SolverQueue SolverQueue;
 typedef struct SolverQueue * SolverQueuePtr;
@@ -30,6 +48,97 @@ typedef struct SolverQueue * SolverQueuePtr;
 extern void SolverQueue_init(SolverQueuePtr);
 extern void SolverQueue_free(SolverQueuePtr);
 extern void SolverQueue_append(SolverQueuePtr, TYPE_REWRITING_VARIABLE *);
-extern SolverNodePtr SolverQueue_pop(SolverQueuePtr);
+extern TYPE_REWRITING_VARIABLE *SolverQueue_pop(SolverQueuePtr);
+/*
+ * Prints the maximum number of variables the queue had at once, the memory of
+ * its blocks and the number of variables appended
+ */
+extern void SolverQueue_print_statistics(FILE *, int, SolverQueuePtr);
+
+#ifdef SOLVER_THREADS
+/*
+ * With the option Threads the variables of a stratum are evaluated by several
+ * threads. Every SolverWorker appends the variables it derives to a private
+ * chunk of SOLVER_CHUNK_SIZE variables. The full chunks (and the chunks with at
+ * least SOLVER_CHUNK_MIN_SHARED variables while some thread is idle) are shared:
+ * they are moved to the list of the worker, from which any thread can take
+ * them. A thread without variables takes the chunks of its own list first and
+ * steals the chunks of the other threads otherwise. The stratum finishes when
+ * all the threads are idle and no chunk is shared.
+ *
+ * The variables appended to the queues of other stratums are kept by the
+ * worker and appended to the queues in groups of SOLVER_WORKER_DEFERRED.
+ *
+ * The number of threads is the value of SOLVER_THREADS, the environment
+ * variable SOLVER_THREADS can change it when the solver is run.
+ */
+#define SOLVER_CHUNK_SIZE 256
+#define SOLVER_CHUNK_MIN_SHARED 16
+#define SOLVER_WORKER_DEFERRED 64
+
+struct SolverChunk{
+    TYPE_REWRITING_VARIABLE variables[SOLVER_CHUNK_SIZE];
+    size_t size;
+    struct SolverChunk *next;
+};
+typedef struct SolverChunk SolverChunk;
+typedef struct SolverChunk * SolverChunkPtr;
+
+struct SolverDeferredVariable{
+    SolverQueuePtr queue;
+    TYPE_REWRITING_VARIABLE variable;
+};
+typedef struct SolverDeferredVariable SolverDeferredVariable;
+
+struct SolverWorker{
+    struct SolverThreads *threads;
+    int id;
+    pthread_t thread;
+    /* Private chunks: the one being evaluated, the one being filled and the
+       chunks already evaluated */
+    SolverChunkPtr input, output, free_chunks;
+    size_t input_position;
+    /* Shared chunks, protected by the lock */
+    pthread_mutex_t lock;
+    SolverChunkPtr shared_head, shared_tail;
+    /* Variables evaluated by the worker alone before the others start */
+    SolverQueuePtr serial_queue;
+    size_t serial_variables;
+    SolverDeferredVariable deferred[SOLVER_WORKER_DEFERRED];
+    int num_deferred;
+    /* Statistics */
+    unsigned long long appended, stolen;
+};
+typedef struct SolverWorker SolverWorker;
+typedef struct SolverWorker * SolverWorkerPtr;
+
+struct SolverThreads{
+    SolverWorkerPtr workers;
+    int num_workers;
+    void (*compute)(SolverWorkerPtr);
+    /* Termination of the stratum, protected by the lock */
+    pthread_mutex_t lock;
+    pthread_cond_t wake;
+    size_t shared_chunks;
+    int idle;
+    bool finished;
+};
+typedef struct SolverThreads SolverThreads;
+typedef struct SolverThreads * SolverThreadsPtr;
+
+/*
+ * Evaluates the variables of the queue with the function of the stratum. The
+ * first variables (the facts of the negated predicates) are evaluated by the
+ * calling thread alone, the rest by all the threads. The variables appended to
+ * the queue of the stratum are counted in its statistics.
+ */
+extern bool SolverThreads_run(SolverQueuePtr, size_t, void (*)(SolverWorkerPtr));
+/* The variable returned is valid until the next pop, NULL when the stratum finished */
+extern TYPE_REWRITING_VARIABLE *SolverWorker_pop(SolverWorkerPtr);
+/* Appends a variable to the stratum being evaluated */
+extern void SolverWorker_append(SolverWorkerPtr, TYPE_REWRITING_VARIABLE *);
+/* Appends a variable to the queue of another stratum */
+extern void SolverWorker_append_to(SolverWorkerPtr, SolverQueuePtr, TYPE_REWRITING_VARIABLE *);
+#endif
 
 #endif
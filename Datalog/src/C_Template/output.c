@@ -0,0 +1,119 @@
+%% fill_Header
+
+#include <stdlib.h>
+#include <string.h>
+
+#include "output.h"
+
+void OutputFile_flush(OutputFilePtr);
+char *format_value(char *, int);
+
+bool OutputFile_open(OutputFilePtr o, const char *filename, OutputFormat format){
+    o->format = format;
+    o->used = 0;
+#ifdef SOLVER_THREADS
+    pthread_mutex_init(&o->lock, NULL);
+#endif
+#ifdef OUTPUT_ZLIB
+    if (format == OUTPUT_GZIP){
+        o->gz = gzopen(filename, "wb6");
+        return (o->gz != NULL);
+    }
+#endif
+    o->fp = fopen(filename, "wb");
+    return (o->fp != NULL);
+}
+
+void OutputFile_flush(OutputFilePtr o){
+#ifdef OUTPUT_ZLIB
+    if (o->format == OUTPUT_GZIP){
+        gzwrite(o->gz, o->buffer, o->used);
+        o->used = 0;
+        return;
+    }
+#endif
+    fwrite(o->buffer, 1, o->used, o->fp);
+    o->used = 0;
+}
+
+/*
+ * Writes the digits of the value at the given position, it returns the
+ * position after the last digit. As with printf("%i") the values are signed.
+ */
+char *format_value(char *position, int value){
+    char digits[10];
+    int n = 0;
+    unsigned int magnitude = (unsigned int) value;
+
+    if (value < 0){
+        *position++ = '-';
+        magnitude = -magnitude;
+    }
+    do{
+        digits[n++] = '0' + (magnitude % 10);
+        magnitude /= 10;
+    } while (magnitude);
+    while (n)
+        *position++ = digits[--n];
+
+    return position;
+}
+
+void OutputFile_write(OutputFilePtr o, const char *name, size_t name_length,
+                      const unsigned int *values, int num_values){
+    char *position;
+    unsigned long long value;
+    int i, j;
+
+#ifdef SOLVER_THREADS
+    pthread_mutex_lock(&o->lock);
+#endif
+    /*
+     * A value requires at most OUTPUT_MAX_VALUE_CHARS bytes and its separator
+     * (8 in the binary format), the name is followed by "(" and by ").\n"
+     */
+    if (OUTPUT_BUFFER_SIZE - o->used < name_length + (OUTPUT_MAX_VALUE_CHARS + 2) * num_values + 3)
+        OutputFile_flush(o);
+
+    position = o->buffer + o->used;
+    if (o->format == OUTPUT_BINARY){
+        for (i = 0; i < num_values; i++){
+            value = (unsigned long long) (long long) (int) values[i];
+            for (j = 0; j < 8; j++, value >>= 8)
+                *position++ = (char) (value & 0xff);
+        }
+    }
+    else{
+        memcpy(position, name, name_length);
+        position += name_length;
+        *position++ = '(';
+        for (i = 0; i < num_values; i++){
+            if (i){
+                *position++ = ',';
+                *position++ = ' ';
+            }
+            position = format_value(position, (int) values[i]);
+        }
+        *position++ = ')';
+        *position++ = '.';
+        *position++ = '\n';
+    }
+    o->used = position - o->buffer;
+#ifdef SOLVER_THREADS
+    pthread_mutex_unlock(&o->lock);
+#endif
+}
+
+void OutputFile_close(OutputFilePtr o){
+    OutputFile_flush(o);
+#ifdef SOLVER_THREADS
+    pthread_mutex_destroy(&o->lock);
+#endif
+#ifdef OUTPUT_ZLIB
+    if (o->format == OUTPUT_GZIP){
+        gzclose(o->gz);
+        return;
+    }
+#endif
+    fclose(o->fp);
+}
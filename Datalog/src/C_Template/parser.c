@@ -1,81 +1,264 @@
 %% fill_Header
 
-#include <string.h>
-#include <errno.h>
+#define _POSIX_C_SOURCE 200809L
+
+#include <stdio.h>
 #include <stdlib.h>
-#include <ctype.h>
+#include <string.h>
+#include <limits.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
 
 #include "parser.h"
 #include "utils.h"
 
-#define TAM_FACT 50
+int FactsFile_error(FactsFilePtr, const char *);
 
-int create_fact(const char *, Fact *);
+bool FactsFile_open(FactsFilePtr f, const char *filename){
+    struct stat info;
+    int fd;
 
-int create_fact(const char *temp_fact, Fact *f) {
-    int i=0;
-    char *pos, value[10];
+    f->filename = filename;
+    f->data = NULL;
+    f->size = 0;
+    f->line = 1;
 
-    f->num_values = 0;
-    pos = strstr(temp_fact, "(");
-
-    if (pos == NULL || temp_fact[strlen(temp_fact) -1] != ')')
+    fd = open(filename, O_RDONLY);
+    if (fd < 0){
+        fprintf(stderr, "Error: Can't open file %s\n", filename);
+        return false;
+    }
+    if (fstat(fd, &info) < 0){
+        fprintf(stderr, "Error: Can't read file %s\n", filename);
+        close(fd);
+        return false;
+    }
+    /* An empty file can't be mapped */
+    if (info.st_size > 0){
+        f->size = info.st_size;
+        f->data = mmap(NULL, f->size, PROT_READ, MAP_PRIVATE, fd, 0);
+        if (f->data == MAP_FAILED){
+            fprintf(stderr, "Error: Can't map file %s\n", filename);
+            close(fd);
             return false;
-    /*
-     * If (pos - temp_atom) > 10 -> Error
-     */
-
-    strncpy(f->id, temp_fact, (pos - temp_fact));
-    f->id[(pos - temp_fact)] = '\0';
-
-    /* Jump the separator "(" */
-    pos++;
-    for (; (*pos) != ')'; pos++) {
-        if ((*pos) == ',') {
-            value[i++] = '\0';
-            f->values[f->num_values++] = atol(value);
-            i = 0;
-            continue;
         }
+        posix_madvise(f->data, f->size, POSIX_MADV_SEQUENTIAL);
+    }
+    close(fd);
 
-        if (!isdigit(*pos))
-            return false;
+    f->position = f->data;
+    f->end = f->data + f->size;
+    return true;
+}
 
-        value[i++] = (*pos);
+int FactsFile_error(FactsFilePtr f, const char *message){
+    fprintf(stderr, "Error: %s:%i: %s\n", f->filename, f->line, message);
+    return false;
+}
+
+/*
+ * The facts are written as name(value, ..., value). and the blanks between
+ * the values are ignored. The digits are accumulated in an unsigned long long
+ * and its range is checked once the value finishes.
+ */
+int FactsFile_next(FactsFilePtr f, unsigned int *values, int arity){
+    const char *p = f->position, *end = f->end;
+    const char *start;
+    unsigned long long value;
+    bool negative;
+    int n = 0;
+
+    /* Jump the blanks and the empty lines */
+    for (; p < end && (*p == ' ' || *p == '\t' || *p == '\r' || *p == '\n'); p++)
+        f->line += (*p == '\n');
+    if (p == end){
+        f->position = p;
+        return -1;
+    }
+
+    /* Jump the name of the predicate */
+    while (p < end && *p != '(' && *p != '\n')
+        p++;
+    if (p == end || *p != '(')
+        return FactsFile_error(f, "Expected '('");
+    p++;
+
+    for (;;){
+        while (p < end && (*p == ' ' || *p == '\t'))
+            p++;
+        negative = (p < end && *p == '-');
+        p += negative;
+        start = p;
+        value = 0;
+        while (p < end && (unsigned char)(*p - '0') < 10 && p - start < 12)
+            value = value * 10 + (*p++ - '0');
+        if (p == start)
+            return FactsFile_error(f, "Expected a value");
+        if ((p < end && (unsigned char)(*p - '0') < 10) ||
+            value > (negative ? (unsigned long long) INT_MAX + 1 : (unsigned long long) INT_MAX))
+            return FactsFile_error(f, "The value doesn't fit in an int");
+        if (n < arity)
+            values[n] = (unsigned int) (negative ? -value : value);
+        n++;
+
+        while (p < end && (*p == ' ' || *p == '\t'))
+            p++;
+        if (p == end || *p != ',')
+            break;
+        p++;
     }
 
-    value[i++] = '\0';
-    f->values[f->num_values++] = atol(value);
+    if (p == end || *p != ')')
+        return FactsFile_error(f, "Expected ')'");
+    p++;
+    while (p < end && (*p == ' ' || *p == '\t'))
+        p++;
+    if (p == end || *p != '.')
+        return FactsFile_error(f, "Expected '.'");
+    if (n != arity){
+        fprintf(stderr, "Error: %s:%i: The fact has %i values instead of %i\n", f->filename,
+                                                                                f->line,
+                                                                                n,
+                                                                                arity);
+        return false;
+    }
 
+    f->position = p + 1;
     return true;
 }
 
-int parser_get_fact(FILE *fp, int *num_line, Fact *f){
-    int c, i=0;
-    char line[TAM_FACT];
-    while (i < (TAM_FACT - 1)) {
-        c = fgetc(fp);
+void FactsFile_close(FactsFilePtr f){
+    if (f->data)
+        munmap(f->data, f->size);
+    f->data = NULL;
+}
 
-        if (feof(fp))
-            return -1;
+#ifdef FACTS_THREAD
+void FactsProducer_hand(FactsProducerPtr, FactsChunkPtr);
+void *FactsProducer_run(void *);
 
-        /* Jump blanks */
-        if (c == ' ' || c == '\t')
-            continue;
+/* The chunk is appended to the list of the chunks to be taken by the solver */
+void FactsProducer_hand(FactsProducerPtr producer, FactsChunkPtr chunk){
+    pthread_mutex_lock(&producer->mutex);
+    while (producer->num_chunks >= FACTS_PENDING_CHUNKS)
+        pthread_cond_wait(&producer->taken, &producer->mutex);
+    producer->num_chunks++;
+    if (producer->tail)
+        producer->tail->next = chunk;
+    else
+        producer->head = chunk;
+    producer->tail = chunk;
+    pthread_cond_signal(&producer->available);
+    pthread_mutex_unlock(&producer->mutex);
+}
+
+void *FactsProducer_run(void *argument){
+    FactsProducerPtr producer = argument;
+    FactsChunkPtr chunk = NULL;
+    FactsFile file;
+    bool failed = false;
+    int i, result = -1;
 
-        if (c == '\n') {
-            if (num_line) (*num_line)++;
-            continue;
+    for (i = 0; i < producer->num_files && !failed; i++){
+        if (!FactsFile_open(&file, producer->filenames[producer->files[i]])){
+            failed = true;
+            break;
         }
+        do{
+            if (!chunk){
+                chunk = malloc(sizeof(FactsChunk));
+                chunk->predicate = producer->predicates[i];
+                chunk->arity = producer->arities[i];
+                chunk->num_facts = 0;
+                chunk->values = malloc(sizeof(unsigned int) * FACTS_CHUNK_SIZE * producer->arities[i]);
+                chunk->next = NULL;
+            }
+            result = FactsFile_next(&file, chunk->values + chunk->num_facts * producer->arities[i],
+                                    producer->arities[i]);
+            if (result == 1 && ++chunk->num_facts == FACTS_CHUNK_SIZE){
+                FactsProducer_hand(producer, chunk);
+                chunk = NULL;
+            }
+        } while (result == 1);
+        failed = (result == 0);
+        FactsFile_close(&file);
 
-        /* End of the sentence */
-        if (c == '.') {
-            line[i++] = '\0';
-            return create_fact(line, f);
+        /* Every chunk contains facts of only one file */
+        if (chunk && chunk->num_facts){
+            FactsProducer_hand(producer, chunk);
+            chunk = NULL;
         }
+    }
+    if (chunk)
+        FactsChunk_free(chunk);
+
+    pthread_mutex_lock(&producer->mutex);
+    producer->finished = true;
+    producer->failed = failed;
+    pthread_cond_signal(&producer->available);
+    pthread_mutex_unlock(&producer->mutex);
+
+    return NULL;
+}
+
+bool FactsProducer_start(FactsProducerPtr producer, char **filenames, const int *files,
+                         const int *arities, const int *predicates, int num_files){
+    producer->filenames = filenames;
+    producer->files = files;
+    producer->arities = arities;
+    producer->predicates = predicates;
+    producer->num_files = num_files;
+    producer->num_chunks = 0;
+    producer->head = producer->tail = NULL;
+    producer->finished = producer->failed = false;
+    pthread_mutex_init(&producer->mutex, NULL);
+    pthread_cond_init(&producer->available, NULL);
+    pthread_cond_init(&producer->taken, NULL);
 
-        line[i++] = c;
+    if (pthread_create(&producer->thread, NULL, FactsProducer_run, producer)){
+        fprintf(stderr, "Error: Can't start the thread that reads the facts\n");
+        return false;
     }
+    return true;
+}
 
-    return false;
+FactsChunkPtr FactsProducer_take(FactsProducerPtr producer){
+    FactsChunkPtr chunk;
+
+    pthread_mutex_lock(&producer->mutex);
+    while (!producer->head && !producer->finished)
+        pthread_cond_wait(&producer->available, &producer->mutex);
+    chunk = producer->head;
+    if (chunk){
+        producer->head = chunk->next;
+        if (!producer->head)
+            producer->tail = NULL;
+        producer->num_chunks--;
+        pthread_cond_signal(&producer->taken);
+    }
+    pthread_mutex_unlock(&producer->mutex);
+
+    return chunk;
+}
+
+bool FactsProducer_finish(FactsProducerPtr producer){
+    FactsChunkPtr chunk;
+
+    pthread_join(producer->thread, NULL);
+    /* The chunks that were not taken are freed */
+    while ((chunk = FactsProducer_take(producer)))
+        FactsChunk_free(chunk);
+    pthread_mutex_destroy(&producer->mutex);
+    pthread_cond_destroy(&producer->available);
+    pthread_cond_destroy(&producer->taken);
+
+    return !producer->failed;
+}
+
+void FactsChunk_free(FactsChunkPtr chunk){
+    free(chunk->values);
+    free(chunk);
 }
+#endif
@@ -6,10 +6,10 @@
 
 #include "solver.h"
 #include "parser.h"
-#include "fact.h"
 #include "utils.h"
 #include "data_structure.h"
 #include "solver_queue.h"
+#include "output.h"
 
 %% fill_InputTuplesFiles
 
@@ -30,6 +30,9 @@ void print_answer(FILE *file, TYPE_REWRITING_VARIABLE *b){
 %% fill_PrintAnswer
 }
 
+/* Functions to write the answers to their files */
+%% fill_WriteAnswers
+
 int solver_init(){
     Ds_init();
 
@@ -40,11 +43,9 @@ int solver_init(){
 
 %% fill_StratumQueueInitializers
 
+%% fill_SolverStratumFunctions
 int solver_compute(){
-%% fill_IntList
-    SolverNodePtr current;
-    TYPE_REWRITING_VARIABLE VAR;
-
+%% fill_SolverComputeVariables
 %% fill_SolverCompute
 
     return true;
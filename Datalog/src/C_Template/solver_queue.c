@@ -5,91 +5,377 @@
 #include <string.h>
 
 #include "solver_queue.h"
+#ifdef SOLVER_THREADS
+#include "data_structure.h"
+#endif
 
-void Queue_init(QueuePtr);
-void Queue_free(QueuePtr);
-bool Queue_empty(QueuePtr);
-void Queue_append(QueuePtr, TYPE_REWRITING_VARIABLE *);
-SolverNodePtr Queue_pop(QueuePtr);
+SolverQueueBlockPtr SolverQueue_new_block(SolverQueuePtr);
 
-void Queue_init(QueuePtr q){
-    q->head = q->tail = NULL;
+/* The blocks are taken from the free list before they are allocated */
+SolverQueueBlockPtr SolverQueue_new_block(SolverQueuePtr s){
+    SolverQueueBlockPtr block;
+
+    if (s->free_blocks){
+        block = s->free_blocks;
+        s->free_blocks = block->next;
+    }
+    else{
+        block = malloc(sizeof(SolverQueueBlock));
+        if (!block){
+            fprintf(stderr, "Error: Not enough memory for the queue of the solver\n");
+            exit(EXIT_FAILURE);
+        }
+        s->num_blocks++;
+    }
+    block->next = NULL;
+
+    return block;
+}
+
+void SolverQueue_init(SolverQueuePtr s){
+    s->free_blocks = NULL;
+    s->num_blocks = 0;
+    s->head = s->tail = SolverQueue_new_block(s);
+    s->head_position = s->tail_position = 0;
+    s->size = 0;
+    s->high_water_mark = 0;
+    s->appended = 0;
+#ifdef SOLVER_THREADS
+    s->stolen = 0;
+#endif
+}
+
+void SolverQueue_free(SolverQueuePtr s){
+    SolverQueueBlockPtr block, next;
+
+    for (block = s->head; block; block = next){
+        next = block->next;
+        free(block);
+    }
+    for (block = s->free_blocks; block; block = next){
+        next = block->next;
+        free(block);
+    }
+    s->head = s->tail = s->free_blocks = NULL;
+    s->size = 0;
+}
+
+void SolverQueue_append(SolverQueuePtr s, TYPE_REWRITING_VARIABLE *b){
+    if (s->tail_position == SOLVER_QUEUE_BLOCK_SIZE){
+        s->tail->next = SolverQueue_new_block(s);
+        s->tail = s->tail->next;
+        s->tail_position = 0;
+    }
+    s->tail->variables[s->tail_position++] = *b;
+
+    if (++s->size > s->high_water_mark)
+        s->high_water_mark = s->size;
+    s->appended++;
 }
 
-void Queue_free(QueuePtr q){
-    SolverNodePtr t1, t2;
-    
-    for (t1 = q->head, t2 = q->head; t1; t2 = t2->next, t1 = t2 )
-        free(t1);
+TYPE_REWRITING_VARIABLE *SolverQueue_pop(SolverQueuePtr s){
+    SolverQueueBlockPtr block;
+
+    if (!s->size)
+        return NULL;
+
+    /* The head block is freed once the variable returned by the previous pop,
+       its last one, has been handled */
+    if (s->head_position == SOLVER_QUEUE_BLOCK_SIZE){
+        block = s->head;
+        s->head = block->next;
+        s->head_position = 0;
+        block->next = s->free_blocks;
+        s->free_blocks = block;
+    }
+    s->size--;
+
+    return &s->head->variables[s->head_position++];
 }
 
-bool Queue_empty(QueuePtr q){
-    return (q->head == NULL);
+void SolverQueue_print_statistics(FILE *file, int level, SolverQueuePtr s){
+    fprintf(file, "Queue %i: %zu variables at most, %zu blocks (%zu bytes), %llu variables appended",
+            level,
+            s->high_water_mark,
+            s->num_blocks,
+            s->num_blocks * sizeof(SolverQueueBlock),
+            s->appended);
+#ifdef SOLVER_THREADS
+    fprintf(file, ", %llu chunks stolen", s->stolen);
+#endif
+    fprintf(file, "\n");
 }
 
-void Queue_append(QueuePtr q, TYPE_REWRITING_VARIABLE *b){
-    SolverNodePtr t;
+#ifdef SOLVER_THREADS
+SolverChunkPtr SolverWorker_new_chunk(SolverWorkerPtr);
+void SolverWorker_share(SolverWorkerPtr, SolverChunkPtr);
+SolverChunkPtr SolverWorker_unshare(SolverWorkerPtr);
+SolverChunkPtr SolverWorker_take(SolverWorkerPtr);
+void SolverWorker_flush(SolverWorkerPtr);
+void *SolverWorker_run(void *);
+
+/* The appends to the queues of the other stratums of all the threads */
+static pthread_mutex_t solver_queues_lock = PTHREAD_MUTEX_INITIALIZER;
 
-    t = malloc(sizeof(SolverNode));
-    /*memcpy((void *)&t->b, b, sizeof(TYPE_REWRITING_VARIABLE));*/
-    t->b = *b;
-    t->next = NULL;
+/* The chunks are taken from the free list before they are allocated */
+SolverChunkPtr SolverWorker_new_chunk(SolverWorkerPtr w){
+    SolverChunkPtr chunk;
 
-    if (q->tail){
-        q->tail->next = t;
-        q->tail = t;
+    if (w->free_chunks){
+        chunk = w->free_chunks;
+        w->free_chunks = chunk->next;
     }
     else{
-        q->head = q->tail = t;
+        chunk = malloc(sizeof(SolverChunk));
+        if (!chunk){
+            fprintf(stderr, "Error: Not enough memory for the queue of the solver\n");
+            exit(EXIT_FAILURE);
+        }
     }
+    chunk->size = 0;
+    chunk->next = NULL;
+
+    return chunk;
+}
+
+/* The chunk is appended to the list of the worker, an idle thread is woken */
+void SolverWorker_share(SolverWorkerPtr w, SolverChunkPtr chunk){
+    SolverThreadsPtr t = w->threads;
+
+    pthread_mutex_lock(&w->lock);
+    if (w->shared_tail)
+        w->shared_tail->next = chunk;
+    else
+        w->shared_head = chunk;
+    w->shared_tail = chunk;
+    pthread_mutex_unlock(&w->lock);
+
+    pthread_mutex_lock(&t->lock);
+    t->shared_chunks++;
+    if (t->idle)
+        pthread_cond_signal(&t->wake);
+    pthread_mutex_unlock(&t->lock);
 }
 
-SolverNodePtr Queue_pop(QueuePtr q){
-    SolverNodePtr t = NULL;
+/* Returns the first chunk of the list of the worker (NULL if it is empty) */
+SolverChunkPtr SolverWorker_unshare(SolverWorkerPtr w){
+    SolverThreadsPtr t = w->threads;
+    SolverChunkPtr chunk;
+
+    pthread_mutex_lock(&w->lock);
+    chunk = w->shared_head;
+    if (chunk){
+        w->shared_head = chunk->next;
+        if (!w->shared_head)
+            w->shared_tail = NULL;
+        chunk->next = NULL;
+    }
+    pthread_mutex_unlock(&w->lock);
 
-    if (q->head){
-        t = q->head;
-        q->head = q->head->next;
-        if (!q->head)
-        	q->tail = NULL;
+    if (chunk){
+        pthread_mutex_lock(&t->lock);
+        t->shared_chunks--;
+        pthread_mutex_unlock(&t->lock);
     }
-    
-    return t;
+
+    return chunk;
 }
 
-void SolverQueue_init(SolverQueuePtr s){
-    Queue_init(&s->q1);
-    Queue_init(&s->q2);
+/*
+ * Returns a shared chunk, its own ones first. When there are none the thread
+ * waits until a chunk is shared or all the threads are idle (then it returns
+ * NULL). A chunk can be counted while it is being taken by another thread, in
+ * that case the lists are looked again.
+ */
+SolverChunkPtr SolverWorker_take(SolverWorkerPtr w){
+    SolverThreadsPtr t = w->threads;
+    SolverChunkPtr chunk;
+    int i;
+
+    while (true){
+        for (i = 0; i < t->num_workers; i++){
+            if ((chunk = SolverWorker_unshare(&t->workers[(w->id + i) % t->num_workers]))){
+                if (i)
+                    w->stolen++;
+                return chunk;
+            }
+        }
 
-    s->reading = &s->q1;
-    s->writing = &s->q2;
+        /* The number of idle threads is changed atomically, SolverWorker_append
+           reads it without the lock */
+        pthread_mutex_lock(&t->lock);
+        if (!t->shared_chunks){
+            if (__atomic_add_fetch(&t->idle, 1, __ATOMIC_RELAXED) == t->num_workers){
+                t->finished = true;
+                pthread_cond_broadcast(&t->wake);
+            }
+            while (!t->shared_chunks && !t->finished)
+                pthread_cond_wait(&t->wake, &t->lock);
+            if (t->finished){
+                pthread_mutex_unlock(&t->lock);
+                return NULL;
+            }
+            __atomic_sub_fetch(&t->idle, 1, __ATOMIC_RELAXED);
+        }
+        pthread_mutex_unlock(&t->lock);
+    }
 }
 
-void SolverQueue_free(SolverQueuePtr s){
-    Queue_free(&s->q1);
-    Queue_free(&s->q2);
+TYPE_REWRITING_VARIABLE *SolverWorker_pop(SolverWorkerPtr w){
+    if (w->serial_queue){
+        if (!w->serial_variables)
+            return NULL;
+        w->serial_variables--;
+        return SolverQueue_pop(w->serial_queue);
+    }
+
+    if (w->input && w->input_position < w->input->size)
+        return &w->input->variables[w->input_position++];
+
+    /* The variable returned by the previous pop, the last one of the chunk,
+       has been handled */
+    if (w->input){
+        w->input->next = w->free_chunks;
+        w->free_chunks = w->input;
+    }
+    if (w->output && w->output->size){
+        w->input = w->output;
+        w->output = NULL;
+    }
+    else if (!(w->input = SolverWorker_take(w))){
+        return NULL;
+    }
+    w->input_position = 0;
 
-    s->reading = s->writing = NULL;
+    return &w->input->variables[w->input_position++];
 }
 
-void SolverQueue_append(SolverQueuePtr s, TYPE_REWRITING_VARIABLE *b){
-    Queue_append(s->writing, b);
+void SolverWorker_append(SolverWorkerPtr w, TYPE_REWRITING_VARIABLE *b){
+    if (!w->output)
+        w->output = SolverWorker_new_chunk(w);
+    w->output->variables[w->output->size++] = *b;
+    w->appended++;
+
+    /* The number of idle threads is only a hint, it is read without the lock */
+    if (w->output->size == SOLVER_CHUNK_SIZE ||
+        (w->output->size >= SOLVER_CHUNK_MIN_SHARED &&
+         __atomic_load_n(&w->threads->idle, __ATOMIC_RELAXED))){
+        SolverWorker_share(w, w->output);
+        w->output = NULL;
+    }
 }
 
-SolverNodePtr SolverQueue_pop(SolverQueuePtr s){
-    QueuePtr temp_queue;
-    SolverNodePtr t = NULL;
+void SolverWorker_flush(SolverWorkerPtr w){
+    int i;
+
+    pthread_mutex_lock(&solver_queues_lock);
+    for (i = 0; i < w->num_deferred; i++)
+        SolverQueue_append(w->deferred[i].queue, &w->deferred[i].variable);
+    pthread_mutex_unlock(&solver_queues_lock);
+    w->num_deferred = 0;
+}
 
-    /* Check if the reading queue is empty and
-       switch the queues */
-    if (Queue_empty(s->reading)){
-        temp_queue = s->reading;
-        s->reading = s->writing;
-        s->writing = temp_queue;
-        s->writing->tail = NULL;
+void SolverWorker_append_to(SolverWorkerPtr w, SolverQueuePtr queue, TYPE_REWRITING_VARIABLE *b){
+    w->deferred[w->num_deferred].queue = queue;
+    w->deferred[w->num_deferred].variable = *b;
+    if (++w->num_deferred == SOLVER_WORKER_DEFERRED)
+        SolverWorker_flush(w);
+}
+
+/* The threads give the memory of the data structure to the solver before finishing */
+void *SolverWorker_run(void *argument){
+    SolverWorkerPtr w = argument;
+
+    w->threads->compute(w);
+    SolverWorker_flush(w);
+    Ds_retire_thread();
+
+    return NULL;
+}
+
+bool SolverThreads_run(SolverQueuePtr queue, size_t serial, void (*compute)(SolverWorkerPtr)){
+    SolverThreads t;
+    SolverWorkerPtr w;
+    SolverChunkPtr chunk, next;
+    TYPE_REWRITING_VARIABLE *variable;
+    char *value;
+    bool failed = false;
+    int i, started;
+
+    t.num_workers = SOLVER_THREADS;
+    if ((value = getenv("SOLVER_THREADS")) && atoi(value) > 0)
+        t.num_workers = atoi(value);
+    t.workers = calloc(t.num_workers, sizeof(SolverWorker));
+    if (!t.workers){
+        fprintf(stderr, "Error: Not enough memory for the threads of the solver\n");
+        exit(EXIT_FAILURE);
+    }
+    t.compute = compute;
+    t.shared_chunks = 0;
+    t.idle = 0;
+    t.finished = false;
+    pthread_mutex_init(&t.lock, NULL);
+    pthread_cond_init(&t.wake, NULL);
+    for (i = 0; i < t.num_workers; i++){
+        t.workers[i].threads = &t;
+        t.workers[i].id = i;
+        pthread_mutex_init(&t.workers[i].lock, NULL);
     }
 
-    t = Queue_pop(s->reading);
+    /* The first variables are evaluated before the other threads start */
+    w = &t.workers[0];
+    if (serial){
+        w->serial_queue = queue;
+        w->serial_variables = serial;
+        compute(w);
+        w->serial_queue = NULL;
+    }
+
+    /* The rest of the variables are distributed between the threads */
+    for (i = 0; queue->size; i = (i + 1) % t.num_workers){
+        chunk = SolverWorker_new_chunk(&t.workers[i]);
+        while (chunk->size < SOLVER_CHUNK_SIZE && (variable = SolverQueue_pop(queue)))
+            chunk->variables[chunk->size++] = *variable;
+        SolverWorker_share(&t.workers[i], chunk);
+    }
+
+    for (started = 1; started < t.num_workers; started++){
+        if (pthread_create(&t.workers[started].thread, NULL, SolverWorker_run, &t.workers[started])){
+            fprintf(stderr, "Error: Can't start the threads of the solver\n");
+            failed = true;
+            break;
+        }
+    }
+    /* The threads that couldn't be started are counted as idle, their chunks
+       are taken by the other threads */
+    if (failed){
+        pthread_mutex_lock(&t.lock);
+        __atomic_add_fetch(&t.idle, t.num_workers - started, __ATOMIC_RELAXED);
+        pthread_mutex_unlock(&t.lock);
+    }
+    compute(w);
+    SolverWorker_flush(w);
+    for (i = 1; i < started; i++)
+        pthread_join(t.workers[i].thread, NULL);
+
+    for (i = 0; i < t.num_workers; i++){
+        w = &t.workers[i];
+        queue->appended += w->appended;
+        queue->stolen += w->stolen;
+        if (w->input){
+            w->input->next = w->free_chunks;
+            w->free_chunks = w->input;
+        }
+        for (chunk = w->free_chunks; chunk; chunk = next){
+            next = chunk->next;
+            free(chunk);
+        }
+        pthread_mutex_destroy(&w->lock);
+    }
+    pthread_mutex_destroy(&t.lock);
+    pthread_cond_destroy(&t.wake);
+    free(t.workers);
 
-    return t;
+    return !failed;
 }
+#endif
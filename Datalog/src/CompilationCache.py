@@ -0,0 +1,185 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import os
+import hashlib
+import logging
+import tempfile
+import cPickle as pickle
+
+from collections import namedtuple
+
+# Increase this value every time the layout of the CacheEntry changes, old
+# entries will be simply ignored.
+CACHE_VERSION = 1
+
+# The compiler sources and the templates are part of the key. In that way an
+# updated compiler never reuses the analysis or the code of an older one.
+COMPILER_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIRECTORIES = {'C': 'C_Template',
+                        'Python': 'Py_Template',
+                        'Java': 'Java_Template',
+                        'CPP': 'CPP_Template'}
+
+# The permissions of the files created with open (0666 without the umask)
+UMASK = os.umask(0)
+os.umask(UMASK)
+FILE_MODE = 0666 & ~UMASK
+
+# CacheEntry is a named tuple that represents what is stored on disk for every
+# compiled program. Contents:
+#        rulesTable -> The rules table as returned by buildRulesTable.
+#   dependencyGraph -> The dependency graph as a dictionary of tuples.
+#    predicateTypes -> The PredicateTypes once the extensional predicates given
+#                      by the user have been moved.
+#          stratums -> List of Stratum (equations, views and ordering).
+# idToStratumLevels -> Dictionary from identifiers to the stratum levels.
+#         manifests -> Dictionary containing as keys the directories the code
+#                      has been generated into and as values a dictionary from
+#                      the generated files to the sha1 of their contents.
+CacheEntry = namedtuple('CacheEntry', ['rulesTable', 'dependencyGraph',
+                                       'predicateTypes', 'stratums',
+                                       'idToStratumLevels', 'manifests'],
+                        verbose=False)
+
+def hashFile(filename, digest=None):
+    if digest is None:
+        digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), ''):
+            digest.update(chunk)
+    return digest
+
+# Options given as comma separated values are normalized so that the order
+# in which they are written on the command line doesn't change the key.
+def normalizeOption(option):
+    if not option:
+        return ''
+    return ','.join(sorted(x.strip() for x in option.split(',')))
+
+# The options of the frontends are pairs key=value. When a key is repeated the
+# frontends use its last value, so the pairs are merged in the same way before
+# they are sorted.
+def normalizeFrontendOptions(options):
+    if not options:
+        return ''
+    merged = dict((x.split('=', 1) + [None])[:2] for x in options.split(','))
+    return ','.join(sorted(key if value is None else key + '=' + value
+                               for key, value in merged.iteritems()))
+
+def computeCacheKey(source_file, frontend, options, extensional, print_variables):
+    digest = hashlib.sha1('dcompiler-cache-{}'.format(CACHE_VERSION))
+
+    # The Datalog program
+    hashFile(source_file, digest)
+
+    # The options that change the analysis or the generated code
+    digest.update('\0' + normalizeOption(frontend))
+    digest.update('\0' + normalizeFrontendOptions(options))
+    for option in (extensional, print_variables):
+        digest.update('\0' + normalizeOption(option))
+
+    # The compiler itself
+    for name in sorted(os.listdir(COMPILER_DIRECTORY)):
+        if name.endswith('.py'):
+            digest.update('\0' + name)
+            hashFile(os.path.join(COMPILER_DIRECTORY, name), digest)
+    template_directory = os.path.join(COMPILER_DIRECTORY,
+                                      TEMPLATE_DIRECTORIES[frontend])
+    for root, dirs, files in os.walk(template_directory):
+        dirs.sort()
+        for name in sorted(files):
+            filename = os.path.join(root, name)
+            digest.update('\0' + os.path.relpath(filename, template_directory))
+            hashFile(filename, digest)
+
+    return digest.hexdigest()
+
+def getCacheEntryPath(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + '.pickle')
+
+def loadCacheEntry(cache_dir, key):
+    path = getCacheEntryPath(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception as e:
+        logging.warning("Discarding damaged cache entry %s (%s)", path, e)
+        return None
+
+    if not isinstance(entry, CacheEntry):
+        return None
+
+    return entry
+
+def storeCacheEntry(cache_dir, key, entry):
+    path = getCacheEntryPath(cache_dir, key)
+    directory = os.path.dirname(path)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    # Write to a temporary file and rename it so that concurrent compilations
+    # never see a half written entry.
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+    os.rename(temp_path, path)
+
+# This function returns a manifest for the given files. A manifest is a
+# dictionary from the absolute path of the file to the sha1 of its contents.
+def buildManifest(filenames):
+    return dict((os.path.abspath(filename), hashFile(filename).hexdigest())
+                    for filename in filenames)
+
+# This function checks that all the files of the manifest still exist and
+# have not been modified since they were generated.
+def isManifestUpToDate(manifest):
+    if not manifest:
+        return False
+
+    for filename, file_hash in manifest.iteritems():
+        if not os.path.exists(filename) or\
+           hashFile(filename).hexdigest() != file_hash:
+            return False
+
+    return True
+
+# These functions are used by the frontends to emit the generated files. If
+# the destination file already has the same contents it is not touched, that
+# way its timestamp is kept and the builds of the generated code (make) are
+# still incremental.
+#
+# The file is written to a temporary file that is renamed afterwards, in that
+# way the files are replaced atomically even when they are filled by several
+# processes at the same time (see --jobs). The temporary files are created
+# with the permissions open would have used.
+def writeFileIfChanged(filename, contents):
+    if os.path.exists(filename):
+        with open(filename, 'rb') as f:
+            if f.read() == contents:
+                return False
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)),
+                                     suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(contents)
+    os.chmod(temp_path, FILE_MODE)
+    os.rename(temp_path, filename)
+    return True
+
+def copyFileIfChanged(orig_file, dest_file):
+    with open(orig_file, 'rb') as f:
+        return writeFileIfChanged(dest_file, f.read())
+
+# In incremental mode the destination directory of the previous compilation is
+# kept. The frontends whose generated files depend on the options use this
+# function to remove the ones that are no longer produced.
+def removeStaleFiles(filenames):
+    for filename in filenames:
+        if os.path.exists(filename):
+            os.remove(filename)
@@ -7,20 +7,41 @@ Created on Feb 3, 2014
 from Types import LogicRule, Identifier, Predicate
 from itertools import combinations
 
-import re
 import random
 
 UNIQUEVAR_TEXT = "#UniqueVar-"
-UNIQUEVAR_REGEXP = r"(.+)" + UNIQUEVAR_TEXT + r"(?:\d)+"
 
 decomposed_rules = 0
 
-def generate_new_head(first, second):
+def get_variables(atoms):
+    return set(argument.value for atom in atoms for argument in atom.arguments
+                    if argument.type == 'variable')
+
+# This function returns the arguments of the head generated for the given
+# atoms. Only the variables in needed_variables (those used by the head of
+# the rule or by the atoms that haven't been joined yet) are kept, in the
+# order they appear. If none of them is needed the first variable is kept
+# so the head still has an argument.
+def get_head_arguments(atoms, needed_variables):
+    arguments = []
+    for atom in atoms:
+        for argument in atom.arguments:
+            if argument.type == 'variable' and argument.value in needed_variables and\
+               argument not in arguments:
+                arguments.append(argument)
+    
+    if not arguments:
+        arguments = [argument for atom in atoms for argument in atom.arguments
+                        if argument.type == 'variable'][:1]
+    
+    return arguments
+
+def generate_new_head(first, second, needed_variables):
     global decomposed_rules
     decomposed_rules += 1
     name = "temp_{}".format(str(decomposed_rules))
     identifier = Identifier(name, name)
-    arguments = list(set(first.arguments).symmetric_difference(second.arguments))
+    arguments = get_head_arguments([first, second], needed_variables)
     
     return Predicate(identifier, False, arguments)
    
@@ -35,7 +56,7 @@ def leftMostDecomposingMethod(logic_rule):
         first, second = body.pop(0), body.pop(0)
         
         # Create the new atom header
-        new_head = generate_new_head(first, second)
+        new_head = generate_new_head(first, second, get_variables(body + [logic_rule.head]))
         
         # Reinsert the new atom
         body.insert(0, new_head)
@@ -58,7 +79,7 @@ def rightMostDecomposingMethod(logic_rule):
         first, second = body.pop(), body.pop()
         
         # Create the new atom header
-        new_head = generate_new_head(first, second)
+        new_head = generate_new_head(first, second, get_variables(body + [logic_rule.head]))
         
         # Reinsert the new atom
         body.append(new_head)
@@ -82,7 +103,7 @@ def randomDecomposingMethod(logic_rule):
         second = body.pop(random.randint(0, len(body)-1))
         
         # Create the new atom header
-        new_head = generate_new_head(first, second)
+        new_head = generate_new_head(first, second, get_variables(body + [logic_rule.head]))
         
         # Reinsert the new atom
         body.append(new_head)
@@ -95,58 +116,51 @@ def randomDecomposingMethod(logic_rule):
     return answers
 
 def get_punctuation(first, second):
-    return len(set(first[1]).intersection(second[1]))
-
-def get_rule_punctuation(rule, punctuation):
-    if isinstance(rule[0][1], list) and isinstance(rule[1][1], list):
-        first, second  = rule[0], rule[1]
-    elif len(rule[0]) == 2 and isinstance(rule[0][1], tuple):
-        first, temp_punct = get_rule_punctuation(rule[0], punctuation)
-        second, punctuation = get_rule_punctuation(rule[1], punctuation + temp_punct)
-    else:
-        first = rule[0]
-        second, punctuation = get_rule_punctuation(rule[1], punctuation)
+    return len(set(first.arguments).intersection(second.arguments))
+
+def get_leafs(rule):
+    if isinstance(rule, Predicate):
+        return [rule]
+    return get_leafs(rule[0]) + get_leafs(rule[1])
+
+# This function returns the variables that the head generated for the given
+# combination has to keep, the ones used by the atoms that are not part of it
+# or by the head of the rule.
+def get_needed_variables(rule, logic_rule):
+    joined = set(id(atom) for atom in get_leafs(rule))
+    return get_variables([atom for atom in logic_rule.body if id(atom) not in joined] +
+                         [logic_rule.head])
+
+# The combinations are nested pairs, every element of a pair is either a
+# Predicate of the body or another pair. The punctuation of a combination is
+# the sum of the lengths of all the heads that have to be generated.
+def get_rule_punctuation(rule, punctuation, logic_rule):
+    first, second = rule
+    if not isinstance(first, Predicate):
+        first, punctuation = get_rule_punctuation(first, punctuation, logic_rule)
+    if not isinstance(second, Predicate):
+        second, punctuation = get_rule_punctuation(second, punctuation, logic_rule)
     
-    head = generate_new_head(first, second)
+    head = generate_new_head(first, second, get_needed_variables(rule, logic_rule))
     #new_punctuation = get_punctuation(first, second)
-    new_punctuation = len(head[1])
+    new_punctuation = len(head.arguments)
     
     return head, punctuation + new_punctuation
 
-def generate_logic_rules(rule, rules):
-    if isinstance(rule[0][1], list) and isinstance(rule[1][1], list):
-        first, second  = rule[0], rule[1]
-    elif len(rule[0]) == 2 and isinstance(rule[0][1], tuple):
-        first = generate_logic_rules(rule[0], rules)
-        second = generate_logic_rules(rule[1], rules)
-    else:
-        first = rule[0]
-        second = generate_logic_rules(rule[1], rules)
+def generate_logic_rules(rule, rules, logic_rule):
+    first, second = rule
+    if not isinstance(first, Predicate):
+        first = generate_logic_rules(first, rules, logic_rule)
+    if not isinstance(second, Predicate):
+        second = generate_logic_rules(second, rules, logic_rule)
         
-    head = generate_new_head(first, second)
-    #rules.append( (head, [(first, second)] ) )
-    match = re.match(UNIQUEVAR_REGEXP, first[0])
-    if match:
-        first = ( match.group(1), first[1] )
-    match = re.match(UNIQUEVAR_REGEXP, second[0])
-    if match:
-        second = ( match.group(1), second[1] )
-    
-    rules.append( LogicRule(head, [first, second], None, None, "")) 
+    head = generate_new_head(first, second, get_needed_variables(rule, logic_rule))
+    rules.append( LogicRule(head, [first, second], None, None, None, "")) 
     return head
 
 def reconstruct_rule(answer, predToVars):
-    if isinstance(answer[0], str) and isinstance(answer[1], str):
-        first = (answer[0], predToVars[answer[0]])
-        second = (answer[1], predToVars[answer[1]])
-    elif len(answer[0]) == 2 and isinstance(answer[0], tuple):
-        first = reconstruct_rule((answer[0][0], answer[0][1]), predToVars)
-        second = reconstruct_rule(answer[1], predToVars)
-    else:
-        first = (answer[0], predToVars[answer[0]])
-        second = reconstruct_rule(answer[1], predToVars)
-        
-    return (first, second)
+    return tuple(predToVars[element] if isinstance(element, str) else reconstruct_rule(element, predToVars)
+                    for element in answer)
     
 def commonVariablesDecomposingMethod(logic_rule):
     global decomposed_rules
@@ -159,11 +173,12 @@ def commonVariablesDecomposingMethod(logic_rule):
     # integer (its position in the original rule) to make it unique.
     body_predicates = [] 
     predToVars = {}
-    for (position, (name, vars)) in enumerate(logic_rule.body):
+    for position, predicate in enumerate(logic_rule.body):
+        name = predicate.id.name
         if name in predToVars:
             name = name + UNIQUEVAR_TEXT + str(position)
         body_predicates.append(name)
-        predToVars[name] = vars
+        predToVars[name] = predicate
     
     # Get all the possible unique combinations that can be generated
     # using the given body of the rule. As stated in the formula this
@@ -190,7 +205,7 @@ def commonVariablesDecomposingMethod(logic_rule):
     best_punctuation, best_combination = float("inf"), None 
     for answer in body_combinations:
         rule = reconstruct_rule(answer, predToVars)
-        _, punctuation = get_rule_punctuation(rule, 0)
+        _, punctuation = get_rule_punctuation(rule, 0, logic_rule)
         if punctuation <= best_punctuation:
             best_combination = rule
             best_punctuation = punctuation
@@ -199,7 +214,7 @@ def commonVariablesDecomposingMethod(logic_rule):
     # Once we have the best answer we have to generate all the logical rules
     # that can be derived from the best computed combination
     new_rules = []
-    generate_logic_rules(best_combination, new_rules)
+    generate_logic_rules(best_combination, new_rules, logic_rule)
     # The previous function generated one more head than needed we have to fix
     # it here and replace the last generated head with the proper rule head
     decomposed_rules -= 1 
@@ -207,4 +222,193 @@ def commonVariablesDecomposingMethod(logic_rule):
     last_rule = new_rules.pop()
     new_rules.append(last_rule._replace(head = logic_rule.head))
     
-    return new_rules
\ No newline at end of file
+    return new_rules
+
+#===============================================================================
+# Dynamic programming decomposition. It uses the same punctuation as the
+# common variables method (the sum of the lengths of the generated heads) but
+# instead of enumerating every binary tree it computes the best tree for every
+# subset of the body only once. As a generated head keeps the variables of
+# its atoms needed by the rest of the rule, the head of a subset is the same
+# whatever tree is used to build it, so the best tree of a subset only depends
+# on the best trees of its two parts.
+# Rules with up to EXACT_DECOMPOSITION_ATOMS atoms consider every split of
+# every subset, so the punctuation is always the one obtained by the common
+# variables method. Longer rules only consider the subsets formed by
+# consecutive atoms of the body (rules are usually written following their
+# joins), which reduces the number of subsets to a quadratic number.
+#===============================================================================
+
+EXACT_DECOMPOSITION_ATOMS = 8
+
+def get_lowest_position(subset):
+    return (subset & -subset).bit_length() - 1
+
+# This function generates every subset of atoms contained in subset that
+# includes the given atoms
+def generate_all_subsets(atoms, subset):
+    rest = subset & ~atoms
+    chosen = rest
+    while True:
+        yield atoms | chosen
+        if not chosen:
+            break
+        chosen = (chosen - 1) & rest
+
+# This function generates every subset of consecutive atoms contained in
+# subset (which is also formed by consecutive atoms) that includes the given
+# atom
+def generate_consecutive_subsets(atom, subset):
+    answer = atom
+    while answer & subset == answer:
+        yield answer
+        answer |= answer << 1
+
+# This function computes the best decomposition of the rule, get_cost is a
+# function that receives a subset of the body and the arguments of its head
+# and returns the cost of generating that head. It returns the new rules and
+# for every new rule the subset of the body it computes.
+def plan_decomposition(logic_rule, get_cost):
+    global decomposed_rules
+    body = logic_rule.body
+    if len(body) <= EXACT_DECOMPOSITION_ATOMS:
+        generate_subsets = generate_all_subsets
+    else:
+        generate_subsets = generate_consecutive_subsets
+    
+    # The heads of the subsets are computed when they are needed and stored
+    heads = {}
+    get_atoms = lambda subset: [atom for position, atom in enumerate(body) if subset >> position & 1]
+    def get_needed(subset):
+        return get_variables(get_atoms(~subset) + [logic_rule.head])
+    def get_head(subset):
+        if subset not in heads:
+            heads[subset] = get_head_arguments(get_atoms(subset), get_needed(subset))
+        return heads[subset]
+    
+    # best contains for every subset the cost of its best tree and how it has
+    # to be split. Subsets of only one atom are leafs.
+    best = {}
+    for position in xrange(len(body)):
+        best[1 << position] = (0, None)
+    def get_best(subset):
+        if subset in best:
+            return best[subset]
+        best_cost, best_split = float("inf"), None
+        # The lowest atom is always on the first part so every split is
+        # only visited once
+        for first in generate_subsets(subset & -subset, subset):
+            second = subset & ~first
+            if not second:
+                continue
+            cost = get_best(first)[0] + get_best(second)[0]
+            if cost < best_cost:
+                best_cost, best_split = cost, (first, second)
+        best[subset] = (best_cost + get_cost(subset, get_head(subset)), best_split)
+        return best[subset]
+    get_best((1 << len(body)) - 1)
+    
+    # Generate the rules. Every split generates a new head but the last one,
+    # which is the head of the rule.
+    new_rules = []
+    subsets = []
+    def generate_rules(subset):
+        split = best[subset][1]
+        if split is None:
+            return body[get_lowest_position(subset)]
+        first, second = generate_rules(split[0]), generate_rules(split[1])
+        new_head = generate_new_head(first, second, get_needed(subset))
+        new_rules.append(LogicRule(new_head, [first, second], None, None, None, logic_rule.rule))
+        subsets.append(subset)
+        return new_head
+    generate_rules((1 << len(body)) - 1)
+    decomposed_rules -= 1
+    last_rule = new_rules.pop()
+    new_rules.append(logic_rule._replace(body=last_rule.body))
+    
+    return new_rules, subsets
+
+def dynamicProgrammingDecomposingMethod(logic_rule):
+    new_rules, _ = plan_decomposition(logic_rule, lambda subset, head: len(head))
+    return new_rules
+
+#===============================================================================
+# Cost based decomposition. It uses the statistics of the relations (see
+# RelationStatistics.py) to estimate the number of tuples of every generated
+# head and chooses the decomposition that minimizes the total number of
+# intermediate tuples. The estimations follow the classical ones of the
+# relational databases: the variables are supposed to be uniformly and
+# independently distributed and the size of a join is divided, for every
+# common variable, by the largest numbers of distinct values it has.
+# The estimated sizes of the generated heads are stored in the estimated_sizes
+# dictionary given by the caller so that saveDecomposedRules can show them.
+#===============================================================================
+
+# Statistics supposed for the predicates that don't have any
+DEFAULT_CARDINALITY = 1000
+
+# This function estimates the tuples of a single atom. It returns the
+# estimated number of tuples and a dictionary from its variables to their
+# estimated number of distinct values.
+def estimate_atom(atom, statistics):
+    if atom.id.name in statistics:
+        cardinality, distinct = statistics[atom.id.name]
+    else:
+        cardinality = DEFAULT_CARDINALITY
+        distinct = [DEFAULT_CARDINALITY] * len(atom.arguments)
+    
+    size = float(cardinality)
+    variables = {}
+    for argument, values in zip(atom.arguments, distinct):
+        values = max(values, 1)
+        if argument.type != 'variable':
+            # Selection of a constant
+            size /= values
+        elif argument.value in variables:
+            # The same variable appears twice in the atom
+            size /= max(variables[argument.value], values)
+            variables[argument.value] = min(variables[argument.value], values)
+        else:
+            variables[argument.value] = values
+    
+    size = max(size, 1.0)
+    return size, dict((variable, min(values, size)) for variable, values in variables.iteritems())
+
+# This function estimates the tuples obtained by joining all the given atoms
+# and projecting the result to the given head arguments
+def estimate_join(atoms, head, statistics):
+    size = 1.0
+    variables = {}
+    for atom in atoms:
+        atom_size, atom_variables = estimate_atom(atom, statistics)
+        size *= atom_size
+        for variable, values in atom_variables.iteritems():
+            if variable in variables:
+                size /= max(variables[variable], values)
+                variables[variable] = min(variables[variable], values)
+            else:
+                variables[variable] = values
+    size = max(size, 1.0)
+    
+    projection = 1.0
+    for argument in head:
+        if argument.type == 'variable':
+            projection *= min(variables[argument.value], size)
+    
+    return min(size, projection)
+
+def costBasedDecomposingMethod(logic_rule, statistics=None, estimated_sizes=None):
+    if statistics is None:
+        statistics = {}
+    body = logic_rule.body
+    get_atoms = lambda subset: [atom for position, atom in enumerate(body) if subset >> position & 1]
+
+    new_rules, subsets = plan_decomposition(logic_rule,
+                                            lambda subset, head: estimate_join(get_atoms(subset), head, statistics))
+    
+    # The last rule is the original rule, the rest are the generated heads
+    if estimated_sizes is not None:
+        for rule, subset in zip(new_rules, subsets)[:-1]:
+            estimated_sizes[rule.head.id] = estimate_join(get_atoms(subset), rule.head.arguments, statistics)
+        
+    return new_rules
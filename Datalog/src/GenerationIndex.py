@@ -0,0 +1,166 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+from collections import defaultdict
+from itertools import chain
+
+from Types import Argument, GenerationIndex
+from PhaseProfiler import profilePhase
+
+#===============================================================================
+# The code generators (the frontends) query the equations of the program many
+# times, most of the times inside loops that walk the equations again. All
+# that information is computed here once from the stratums and shared by the
+# four frontends. The sets are built exactly in the same order the frontends
+# used to build them, as the generated code depends on their iteration order.
+#===============================================================================
+
+# The arity of every predicate, the first equation in which it appears
+# decides it.
+def computePredicateLengths(equations):
+    lengths = {}
+    for eq in equations:
+        lengths.setdefault(eq.leftVariable.id, len(eq.leftArguments))
+        lengths.setdefault(eq.rightVariable.id, len(eq.rightArguments))
+        for negated_element in eq.negatedElements:
+            lengths.setdefault(negated_element.id, len(negated_element.arguments))
+    return lengths
+
+# The predicates that appear in some rule being all its variables equal cards
+def computePredicatesWithAllVariablesBeingTheSameEqualCard(equations, answersToStore):
+    answers = set()
+    for eq in equations:
+        if (eq.leftVariable.id not in answersToStore) and\
+                len(set(eq.leftArguments)) == 1 and\
+                eq.type == 2:
+            answers.add(eq.leftVariable.id)
+    return answers
+
+def computePredicatesWithAllVariablesBeingInTheSharedSet(equations, answersToStore):
+    answers = set()
+    for eq in equations:
+        if (eq.leftVariable not in answersToStore and \
+                eq.type == 2 and
+                len(set(eq.consultingArguments)) == len(eq.commonVariables)):
+            answers.add(eq.consultingPredicate.id)
+    return answers
+
+def computePredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants(equations, answersToStore):
+    answers = set()
+    for eq in equations:
+        if (eq.leftVariable.id not in answersToStore and \
+                eq.type == 2):
+            argument_constants = [x for x in eq.consultingArguments if isinstance(x, int) or
+                                    (isinstance(x, Argument) and x.type == "constant")]
+
+            if len(eq.consultingArguments) == len(argument_constants):
+                answers.add(eq.consultingPredicate.id)
+
+    return answers
+
+def computeNegatedPredicates(equations):
+    answers = set()
+    for eq in equations:
+        for negated_element in eq.negatedElements:
+            answers.add(negated_element.id)
+    return answers
+
+# The answers of length 1 are the predicates of length 1 on the right side of
+# an equation or negated. The predicates of length 1 on the left side of the
+# equations of type 2 are returned apart.
+def computeAnswersOfLength_1(equations):
+    answers_of_length_1 = set()
+    predicates_in_rules_of_length_1 = set()
+    for equation in equations:
+        if len(equation.rightArguments) == 1:
+            answers_of_length_1.add(equation.rightVariable.id)
+        if equation.type == 2 and len(equation.leftArguments) == 1:
+            predicates_in_rules_of_length_1.add(equation.leftVariable.id)
+        for negated_element in equation.negatedElements:
+            if len(negated_element.arguments) == 1:
+                answers_of_length_1.add(negated_element.id)
+    return answers_of_length_1, predicates_in_rules_of_length_1
+
+# The predicates longer than 1 by their length, they are stored in the level
+# nodes of the data structures.
+def computePredicatesByLength(equations):
+    predicates = defaultdict(set)
+    for eq in equations:
+        if len(eq.rightArguments) > 1:
+            predicates[len(eq.rightArguments)].add(eq.rightVariable.id)
+        if len(eq.leftArguments) > 1:
+            predicates[len(eq.leftArguments)].add(eq.leftVariable.id)
+        for negated_element in eq.negatedElements:
+            if len(negated_element.arguments) > 1:
+                predicates[len(negated_element.arguments)].add(negated_element.id)
+    return predicates
+
+def computeGenerationIndex(stratums, answersToStore):
+    equations = list(chain.from_iterable(stratum.equations for stratum in stratums))
+    views = [stratum.views for stratum in stratums]
+    type2_equations = [eq for eq in equations if eq.type == 2]
+
+    equations_by_left_variable = defaultdict(list)
+    for eq in equations:
+        equations_by_left_variable[eq.leftVariable.id].append(eq)
+
+    # The lengths of the predicates of every equation, it keeps the tuples
+    # in the order they were added to the set.
+    data = []
+    for eq in equations:
+        data.append((eq.leftVariable.id, len(eq.leftArguments)))
+        data.append((eq.rightVariable.id, len(eq.rightArguments)))
+
+    same_equal_card = computePredicatesWithAllVariablesBeingTheSameEqualCard(equations, answersToStore)
+    shared_set = computePredicatesWithAllVariablesBeingInTheSharedSet(equations, answersToStore)
+    shared_set_constants = computePredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants(equations,
+                                                                                                answersToStore)
+    negated_predicates = computeNegatedPredicates(equations)
+
+    solutions = set()
+    solutions |= answersToStore
+    solutions |= same_equal_card
+    solutions |= shared_set
+    solutions |= shared_set_constants
+    solutions |= negated_predicates
+
+    query_lengths = [len(eq.leftArguments) for eq in type2_equations]
+    node_lengths = query_lengths + [len(eq.rightArguments) for eq in equations]
+    answers_of_length_1, predicates_in_rules_of_length_1 = computeAnswersOfLength_1(equations)
+
+    return GenerationIndex(
+        equations=equations,
+        type2Equations=type2_equations,
+        equationsByLeftVariable=equations_by_left_variable,
+        views=views,
+        predsToViewNames=dict(chain(*[view.predsToViewNames.items() for view in views])),
+        viewNamesToCombinations=dict(chain(*[view.viewNamesToCombinations.items() for view in views])),
+        aliasToViewNames=dict(chain(*[view.aliasToViewNames.items() for view in views])),
+        extensionalPredicates=list(chain.from_iterable(stratum.ordering.block1 for stratum in stratums)),
+        predicateIDs=set(chain.from_iterable(chain(stratum.ordering.block1,
+                                                   stratum.ordering.block2,
+                                                   stratum.ordering.block3) for stratum in stratums)),
+        predicateLengths=computePredicateLengths(equations),
+        predicatesLengths=set(data),
+        predicatesByLength=computePredicatesByLength(equations),
+        queryMinimumLength=min(query_lengths) if query_lengths else None,
+        queryMaximumLength=max(query_lengths) if query_lengths else None,
+        dataStructureNodesMaximumLength=max(node_lengths) if node_lengths else None,
+        rewritingVariableMaximumLength=max(chain((len(eq.leftArguments) for eq in equations),
+                                                 (len(eq.rightArguments) for eq in equations))) if equations else None,
+        sameEqualCardPredicates=same_equal_card,
+        sharedSetPredicates=shared_set,
+        sharedSetIncludingConstantsPredicates=shared_set_constants,
+        negatedPredicates=negated_predicates,
+        appendedSolutions=shared_set | shared_set_constants | negated_predicates,
+        solutions=solutions,
+        consultingPredicates=set(eq.consultingPredicate.id for eq in type2_equations),
+        answersOfLength_1=answers_of_length_1,
+        predicatesInRulesOfLength_1=predicates_in_rules_of_length_1)
+
+# The index is built once by every frontend before filling the templates
+def buildGenerationIndex(stratums, answersToStore):
+    with profilePhase('generation index'):
+        return computeGenerationIndex(stratums, answersToStore)
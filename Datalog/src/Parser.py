@@ -8,288 +8,307 @@ from Types import Argument, Predicate, Identifier,\
                   AssignationExpression, BooleanExpression,\
                   ArithmeticExpression
 
-import random, string, re
+import random, string, re, hashlib
 
 # This variable is used to generate the uniqueIds of the predicates.
-# In case of being True a random generated text chunk will be added
-# to the uniqueId representing the predicate.
-GENERATE_RANDOM_CHUNK=True
+# In case of being True a text chunk derived from the name of the predicate
+# will be added to the uniqueId representing the predicate. The chunk is
+# not random so compiling the same program twice gives the same identifiers.
+GENERATE_UNIQUE_CHUNK=True
 
 def random_generator(size=6, chars=string.ascii_letters+string.digits):
     return ''.join(random.choice(chars) for _ in range(size))
 
-def removeRuleSpaces(rule):
-    return "".join([x for x in rule if x != " " and x != " \t" and x != "\n"])
+# Same as random_generator but the chunk only depends on the given text,
+# every call with the same text returns the same chunk.
+def hashed_generator(text, size=6, chars=string.ascii_letters+string.digits):
+    value = int(hashlib.md5(text).hexdigest(), 16)
+    chunk = []
+    for _ in xrange(size):
+        value, position = divmod(value, len(chars))
+        chunk.append(chars[position])
+    return ''.join(chunk)
 
-def makeArgument(arg):
-    try:
-        return Argument('constant', int(arg))
-    except ValueError:
-        return Argument('variable', arg)
+# This exception is raised when a rule can't be parsed. Line and column point
+# to the token where the error was found, both start at 1.
+class ParsingError(ValueError):
+    def __init__(self, message, line, column):
+        ValueError.__init__(self, 'Line:{}:Column:{}:{}'.format(line, column, message))
+        self.reason = message
+        self.line = line
+        self.column = column
 
-# This function is used to parse assignation expressions of the kind A = B + C
-# The grammar is:
-#   EQUAL_OPERATOR ::= '=' | 'IS'
+#===============================================================================
+# Lexer. A program is read line by line and every line is split into tokens
+# with a single regular expression. A token is just the string of its
+# characters: names, numbers or symbols (':-', '(', '==', ...). Anything else
+# becomes a one character token that the parser will reject. Comments start
+# with '#' and finish at the end of the line. The position of the tokens is
+# only computed when an error has to be reported.
+#===============================================================================
+TOKEN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|[0-9]+|:-|==|!=|<=|>=|\S')
+
+NAME_START = frozenset(string.ascii_letters + '_')
+ARITHMETIC_OPERATORS = frozenset(['+', '-', '*', '/', '%'])
+BOOLEAN_OPERATORS = frozenset(['==', '<', '>', '<=', '>=', '!='])
+ASSIGNATION_OPERATORS = frozenset(['=', 'IS'])
+
+def tokenizeLine(line):
+    tokens = TOKEN.findall(line)
+    if '#' in tokens:
+        del tokens[tokens.index('#'):]
+    return tokens
+
+# This function returns the column (starting at 1) of the given token of the
+# line.
+def getTokenColumn(line, token_number):
+    for number, match in enumerate(TOKEN.finditer(line)):
+        if number == token_number:
+            return match.start() + 1
+    return len(line.rstrip('\n')) + 1
+
+# Raised by the parser with the position of the token that can't be parsed.
+# It is translated to a ParsingError once the line and the column are known.
+class TokenError(Exception):
+    def __init__(self, message, position):
+        Exception.__init__(self, message)
+        self.message = message
+        self.position = position
+
+def error(position, message):
+    raise TokenError(message, position)
+
+#===============================================================================
+# Parser. Every get_* function parses an element of the rule from the given
+# token position and returns the element and the position of the next token.
+# The tokens of a rule always finish with '.' so the parser never has to check
+# if it has arrived to the end of the list.
+#===============================================================================
+
+# Clousure used to avoid adding the uniqueIds dictionary as a global variable.
+# Identifiers and arguments are immutable so the same ones are shared by all
+# the rules.
+def clousure_get_identifier():
+    identifiers = {}
+    def _(name):
+        if name not in identifiers:
+            if GENERATE_UNIQUE_CHUNK:
+                uniqueId = name + '_' + hashed_generator(name, 5)
+            else:
+                uniqueId = name
+            identifiers[name] = Identifier(name, uniqueId)
+        return identifiers[name]
+    return _
+get_identifier = clousure_get_identifier()
+
+# Returns None if the token is not a variable or a number.
+def clousure_get_argument():
+    arguments = {}
+    def _(token):
+        argument = arguments.get(token)
+        if argument is None:
+            if token.isdigit():
+                argument = Argument('constant', int(token))
+            elif token[0] in NAME_START:
+                argument = Argument('variable', token)
+            else:
+                return None
+            arguments[token] = argument
+        return argument
+    return _
+get_argument = clousure_get_argument()
+
+# This function is used to parse a predicate of the form ~?NAME(ARG1,...,ARGN)
+# where every argument is a variable or an integer.
+def get_predicate(tokens, position):
+    is_negated = tokens[position] == '~'
+    if is_negated:
+        position += 1
+
+    name = tokens[position]
+    if not name[0].isalpha():
+        error(position, 'Incorrect predicate name')
+    if tokens[position+1] != '(':
+        error(position+1, 'Missing opening parenthesis')
+    position += 2
+
+    arguments = []
+    while True:
+        argument = get_argument(tokens[position])
+        if argument is None:
+            if tokens[position] != '-' or not tokens[position+1].isdigit():
+                error(position, 'Incorrect argument')
+            position += 1
+            argument = Argument('constant', -int(tokens[position]))
+        arguments.append(argument)
+        position += 1
+
+        token = tokens[position]
+        if token == ')':
+            break
+        if token != ',':
+            error(position, 'Missing closing parenthesis')
+        position += 1
+
+    return Predicate(get_identifier(name), is_negated, arguments), position+1
+
+# This function is used to parse a variable or a number.
+def get_term(tokens, position):
+    argument = get_argument(tokens[position])
+    if argument is None:
+        error(position, 'Expected a variable or a number')
+    return argument, position+1
+
+# This function is used to parse the expressions used by the assignation and
+# boolean expressions. The grammar is:
 #   VARIABLE_OR_NUMBER ::= VARIABLE | NUMBER
 #   ARITHMETIC_EXPRESSION ::= VARIABLE_OR_NUMBER ARITHMETIC_OPERATOR
 #                             VARIABLE_OR_NUMBER
-#   EXPRESSION ::= VARIABLE_OR_NUMBER | ARITHMETIC_EXPRESSION
-#   ASSIGNATION_EXPRESSION ::= VARIABLE_OR_NUMBER EQUAL_OPERATOR
-#                              EXPRESSION
-# Clousure added to compute the compilation of the regexes only once.
-def clousure_get_assignation_expression():
-    VAR = '[A-Za-z]+'
-    NUMBER = '[0-9]+'
-    VAR_OR_NUMBER = "(" + VAR + "|" + NUMBER + ")"
-    EXPRESSION = VAR_OR_NUMBER + r"([\+\-\*/\%])" +\
-                 VAR_OR_NUMBER
-    EXPRESSION_SIDE = "([A-Za-z0-9\+\*\-/\(\)\%]+)"
-    ASSIGNATION = "("+ VAR + ")" + "(=|IS)" +  EXPRESSION_SIDE
-    arg = re.compile(VAR_OR_NUMBER + "$")
-    expression = re.compile(EXPRESSION + "$")
-    assignation = re.compile(ASSIGNATION)
-    def _(rule, start_position):
-        match = assignation.match(rule[start_position:])
-        if match == None:
-            return None, start_position
-
-        left_side, operator, right = match.groups()
-
-        right_side = None
-        # Is the right side a variable or a constant?
-        if arg.match(right):
-            right_side = makeArgument(right)
-        # Is the right side an arithmetic expression?
-        elif expression.match(right):
-            arg1, op, arg2 = expression.match(right).groups()
-            right_side = ArithmeticExpression((makeArgument(arg1), makeArgument(arg2)),
-                                              op)
-        # At this point we don't now what the right side is.q
-        else:
-            return None, start_position
-
-        assignation_expression = AssignationExpression('assignation',
-                                                       (makeArgument(left_side), right_side),
-                                                       operator)
-        new_position = start_position + match.end()
-
-        return assignation_expression, new_position
+#   EXPRESSION ::= VARIABLE_OR_NUMBER | ARITHMETIC_EXPRESSION |
+#                  '(' ARITHMETIC_EXPRESSION ')'
+# Please take in mind that arithmetic expressions can't be nested (Y+1+N)
+# will not be parsed.
+def get_expression(tokens, position):
+    parentheses = tokens[position] == '('
+    if parentheses:
+        position += 1
 
-    return _
-get_assignation_expression = clousure_get_assignation_expression()
+    left_side, position = get_term(tokens, position)
+    operator = tokens[position]
+    if operator not in ARITHMETIC_OPERATORS:
+        if parentheses:
+            error(position, 'Expected an arithmetic operator')
+        return left_side, position
+
+    right_side, position = get_term(tokens, position+1)
+    if parentheses:
+        if tokens[position] != ')':
+            error(position, 'Missing closing parenthesis')
+        position += 1
+
+    return ArithmeticExpression((left_side, right_side), operator), position
 
-# This function is used to parse boolean expressions of the kind
-# A < B where A and B can be arithmetic expressions or arguments.
+# This function is used to parse assignation expressions of the kind A = B + C
+# The grammar is:
+#   EQUAL_OPERATOR ::= '=' | 'IS'
+#   ASSIGNATION_EXPRESSION ::= VARIABLE EQUAL_OPERATOR EXPRESSION
+def get_assignation_expression(tokens, position):
+    left_side = get_argument(tokens[position])
+    operator = tokens[position+1]
+    right_side, position = get_expression(tokens, position+2)
+    return AssignationExpression('assignation', (left_side, right_side), operator), position
+
+# This function is used to parse boolean expressions of the kind A < B where A
+# and B can be arithmetic expressions or arguments.
 # The grammar is:
-#  VARIABLE_OR_NUMBER ::= VARIABLE | NUMBER
-#  ARITHMETIC_EXPRESSION ::= VARIABLE_OR_NUMBER ARITHMETIC_OPERATOR
-#                            VARIABLE_OR_NUMBER
-#  EXPRESSION ::= VARIABLE_OR_NUMBER | ARITHMETIC_EXPRESSION
 #  BOOLEAN_EXPRESSION ::= EXPRESSION BOOLEAN_OPERATOR EXPRESSION
-# Clousure added to compute the compilation of the regexes only once.
-# Please take in mind that arithmetic expressions can't be nested (Y+1+N)
-# will not be parsed. Also adding parentheses to the boolean expression
-# won't parse either.
-def clousure_get_boolean_expression():
-    VAR = '[A-Z][A-Za-z0-9_]*'
-    NUMBER = '[0-9]+'
-    VAR_OR_NUMBER = "(" + VAR + "|" + NUMBER + ")"
-    EXPRESSION = VAR_OR_NUMBER + r"([\+\-\*/\%])" +\
-                 VAR_OR_NUMBER
-    EXPRESSION_WITH_PARENTHESES = "\(" + VAR_OR_NUMBER +\
-            r"([\+\-\*/\%])" + VAR_OR_NUMBER + "\)"
-    EXPRESSION_SIDE = "([A-Za-z0-9\+\*\-/\(\)\%]+)"
-    BOOLEAN_EXPRESSION = EXPRESSION_SIDE +\
-                         "(==|<|>|<=|>=|!=)" +\
-                         EXPRESSION_SIDE
-    arg = re.compile(VAR_OR_NUMBER + "$")
-    expression = re.compile(EXPRESSION + "$")
-    expression_with_parentheses = re.compile(EXPRESSION_WITH_PARENTHESES)
-    boolean = re.compile(BOOLEAN_EXPRESSION)
-    def _(rule, start_position):
-        match = boolean.match(rule[start_position:])
-        if match == None:
-            return None, start_position
-
-        # Split the main expression
-        left, operator, right = match.groups()
-        
-        # Check the left side it can be an expression with or without parentheses
-        # or an argument (a variable or a constant). If nothing matches return
-        # the error.
-        left_side = None
-        if (arg.match(left)):
-            left_side = makeArgument(left)
-        elif expression.match(left):
-            arg1, op, arg2 = expression.match(left).groups()
-            left_side = ArithmeticExpression((makeArgument(arg1), makeArgument(arg2)),
-                                             op)
-        elif expression_with_parentheses.match(left):
-            arg1, op, arg2 = expression_with_parentheses.match(left).groups()
-            left_side = ArithmeticExpression((makeArgument(arg1), makeArgument(arg2)),
-                                             op)
-        else:
-            return None, start_position
-        
-        # Check the left side it can be an expression with or without parentheses
-        # or an argument (a variable or a constant). If nothing matches return
-        # the error.
-        right_side = None
-        if (arg.match(right)):
-            right_side = makeArgument(right)
-        elif expression.match(right):
-            arg1, op, arg2 = expression.match(right).groups()
-            right_side = ArithmeticExpression((makeArgument(arg1), makeArgument(arg2)),
-                                              op)
-        elif expression_with_parentheses.match(right):
-            arg1, op, arg2 = expression_with_parentheses.match(right).groups()
-            right_side = ArithmeticExpression((makeArgument(arg1), makeArgument(arg2)),
-                                              op)
-        else:
-            return None, start_position
-        
-        boolean_expression = BooleanExpression('boolean',
-                                               (left_side, right_side),
-                                               operator)
-        new_position = start_position + match.end()
-        return boolean_expression, new_position
+def get_boolean_expression(tokens, position):
+    left_side, position = get_expression(tokens, position)
+    operator = tokens[position]
+    if operator not in BOOLEAN_OPERATORS:
+        error(position, 'Expected a boolean operator')
+    right_side, position = get_expression(tokens, position+1)
+    return BooleanExpression('boolean', (left_side, right_side), operator), position
 
-    return _
-get_boolean_expression = clousure_get_boolean_expression()
+# The kind of every element of the body is decided looking at its first two
+# tokens: predicates are followed by an opening parenthesis and assignations
+# by an equal operator, everything else has to be a boolean expression.
+def get_body_element(tokens, position):
+    token = tokens[position]
+    if token == '~':
+        return get_predicate(tokens, position)
+    if token[0] in NAME_START:
+        next_token = tokens[position+1]
+        if next_token == '(':
+            return get_predicate(tokens, position)
+        if next_token in ASSIGNATION_OPERATORS:
+            return get_assignation_expression(tokens, position)
+    return get_boolean_expression(tokens, position)
+
+# This function parses the tokens of a rule, they must finish with the '.'
+# token.
+def parseTokens(tokens):
+    if tokens[0] == '~':
+        error(0, 'Incorrect head')
+    head, position = get_predicate(tokens, 0)
+
+    # The separator can contain spaces between its characters (: -)
+    if tokens[position] == ':' and tokens[position + 1] == '-':
+        position += 1
+    elif tokens[position] != ':-':
+        error(position, 'Head separator not found')
+    position += 1
 
-# Clousure used to avoid adding the uniqueIds dictionary as a global variable.
-def clousure_get_predicate():
-    uniqueIds = {}
-    NEGATION_CHAR = '~?'
-    NAME = NEGATION_CHAR + '[a-zA-Z][A-Za-z0-9_]*'
-    name_match = re.compile(NAME + "$")
-    def _(rule, start_position):
-        """ This function is used to parse a predicate of the 
-        form NAME(VAR1,...,VARN) from the start position"""
-        
-        # Get the identifier name of the predicate. If the identifier 
-        # name is not something valid stop parsing it as a Predicate.
-        end_name_position = rule.find('(', start_position)
-        if (end_name_position == -1) or (end_name_position == start_position):
-            return None, start_position
-
-        name = rule[start_position:end_name_position]
-        if name_match.match(name) == None:
-            return None, start_position
-        
-        is_negated = False
-        # Check if the predicated is negated
-        if name[0] == '~':
-            is_negated = True
-            name = name[1:]
-        
-        if name in uniqueIds:
-            uniqueId = uniqueIds[name]
-        else:
-            if GENERATE_RANDOM_CHUNK:
-                uniqueId = name + '_' + random_generator(5)
-            else:
-                uniqueId = name
-                
-            uniqueIds[name] = uniqueId
-
-        last_var_position = rule.find(')', end_name_position+1)
-        if end_name_position == -1:
-            return None, start_position
-        
-        if rule.find('(', end_name_position+1, last_var_position) != -1:
-            return None, start_position
-        
-        #variables = rule[end_name_position+1:last_var_position].split(",")
-        # Here we check if the 
-        string_arguments = rule[end_name_position+1:last_var_position].split(",")
-        arguments = []
-        for arg in string_arguments:
-            try:
-                arguments.append(Argument('constant', int(arg)))
-            except ValueError:
-                arguments.append(Argument('variable', arg))
-        #print arguments
-            
-        #return (name, variables), last_var_position+1
-        return Predicate(Identifier(name, uniqueId), is_negated, arguments), last_var_position+1
-    return _
-get_predicate = clousure_get_predicate()
-
-def get_head_separator(rule, start_position):
-    """ Checks that from the starting position what we have is the head rule
-    separator """
-    if start_position+2 >= len(rule) or\
-       rule[start_position:start_position+2] != ':-':
-        return False, start_position
-    else:
-        return True, start_position+2
-    
-def get_predicate_seaparator(rule, start_position):
-    """ Checks that from the starting position what we have is the body rule
-    predicate separator """
-    if start_position+1 >= len(rule) or rule[start_position] != ',':
-        return False, start_position
-    else:
-        return True, start_position+1
-    
-def parseRule(rule, check_restricted=False):
-    """This functions parses a rule. It removes all the spaces of the given
-    rule and parses it returning a tuple of two elements, containing the 
-    head as first element and a list of tuples representing the body as 
-    second element. Both the head and body elements are tuples containing a 
-    string representing the predicate name as a first element, and a list of 
-    strings representing the variables as a second element"""
-    rule = removeRuleSpaces(rule)
-
-    # Get the predicate head    
-    head, position = get_predicate(rule, 0)
-    if head == None:
-        raise ValueError('Incorrect head')
-    
-    # Check that the next we have in the rule is the separator
-    v, position = get_head_separator(rule, position)
-    if not v:
-        raise ValueError('Head separator not found')
-    
-    parser_body_elements = [get_predicate, get_assignation_expression, get_boolean_expression]
-
-    # Get the body.
-    body = []
     # We don't check if we are parsing a restricted body or not.
     # That is handled later on at BuildRulesTables.
+    body = []
     while True:
-        # We check if the next element is a predicate or one of
-        # the supported expressions (assignment or boolean)
-        # otherwise we rise an error.
-        element_parsed = False
-        for parser_element in parser_body_elements:
-            element, position = parser_element(rule, position)
-            if element != None:
-                element_parsed = True
-                body.append(element)
-                break
-
-
-        if element_parsed == False:
-            raise ValueError('Incorrect body')
-
-        # Check if arrived to the end of the rule in an incorrect position
-        if position >= len(rule):
-            raise ValueError('Unfishined rule')
-        
+        element, position = get_body_element(tokens, position)
+        body.append(element)
+
         # Is this the end of the rule?
-        if rule[position] == '.':
+        token = tokens[position]
+        if token == '.':
+            break
+        if token != ',':
+            error(position, 'Incorrect body')
+        position += 1
+
+    return (head, body)
+
+# Every element of lines is a tuple (line_no, line, offset) where offset is
+# the position in the tokens of the rule of the first token of the line.
+def raiseParsingError(message, position, lines):
+    line_no, line, offset = lines[0]
+    for line_no, line, offset in reversed(lines):
+        if offset <= position:
             break
-        
-        # Get the separator for the second predicate.
-        v, position = get_predicate_seaparator(rule, position)
-        if v == False:
-            raise ValueError('Incorrect body')
-
-    # Check, if we have to, that we don't have more than two hypothesis in 
-    # the rule
-    if check_restricted and rule[position] != '.':
-        raise ValueError('The body of a rule can at max have only two hypothesis')
-    
-    return (head, body)
\ No newline at end of file
+    raise ParsingError(message, line_no, getTokenColumn(line, position - offset))
+
+def parseRules(stream):
+    """This function parses all the rules of a stream of lines (an open file
+    for instance) without reading it completely. A rule can span several lines
+    and a line can contain several rules. It yields a tuple for every rule
+    containing the head, the list of elements of the body, the line in which
+    the rule starts and the text of the lines of the rule."""
+    tokens = []
+    lines = []
+    for line_no, line in enumerate(stream, start=1):
+        line_tokens = tokenizeLine(line)
+        if not line_tokens:
+            continue
+
+        lines.append((line_no, line, len(tokens)))
+        tokens.extend(line_tokens)
+        while '.' in tokens:
+            end = tokens.index('.') + 1
+            try:
+                head, body = parseTokens(tokens[:end])
+            except TokenError as e:
+                raiseParsingError(e.message, e.position, lines)
+            yield head, body, lines[0][0], ''.join(x[1] for x in lines)
+
+            # Continue with the rest of the line
+            tokens = tokens[end:]
+            lines = [(line_no, line, lines[-1][2] - end)] if tokens else []
+
+    if tokens:
+        raiseParsingError('Unfinished rule', len(tokens), lines)
+
+def parseRule(rule, check_restricted=False):
+    """This functions parses a rule. It returns a tuple of two elements,
+    containing the head as first element and a list with the elements of the
+    body (predicates, assignation and boolean expressions) as second element.
+    The restrictions on the body are checked at BuildRulesTable so
+    check_restricted is only kept for compatibility."""
+    rules = parseRules(rule.splitlines(True))
+    try:
+        head, body, _, _ = next(rules)
+    except StopIteration:
+        raise ParsingError('Empty rule', 1, 1)
+
+    # Only one rule can be parsed
+    for _, _, line_no, _ in rules:
+        raise ParsingError('More than one rule found', line_no, 1)
+
+    return (head, body)
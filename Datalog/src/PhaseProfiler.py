@@ -0,0 +1,111 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import gc
+import json
+import time
+import resource
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+#===============================================================================
+# Profiling of the phases of the compiler (--profile-phases). Every phase
+# records the number of times it has been executed, its wall time, the growth
+# of the peak memory of the process and the number of objects it has created
+# (objects tracked by the garbage collector). The phases executed more than
+# once (the equation generation of every stratum is a different phase but a
+# fill* directive can appear in several templates) accumulate their values.
+#
+# Python 2.7 has no tracemalloc, the peak memory is the maximum resident set
+# size given by getrusage (in kilobytes).
+#
+# The profiling is disabled by default and then the functions of this module
+# don't measure anything.
+#===============================================================================
+
+# Dictionary from the name of the phases to their measures, None when the
+# profiling is disabled.
+Phases = None
+
+def enablePhaseProfiling():
+    globals()['Phases'] = OrderedDict()
+
+def isPhaseProfilingEnabled():
+    return Phases is not None
+
+def getPeakMemory():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def getNumberOfObjects():
+    return len(gc.get_objects())
+
+# The memory and the objects are None for the phases in which they can't be
+# measured (see profileIterator).
+def addPhaseMeasure(name, elapsed_time, memory_growth=None, created_objects=None):
+    initial_value = None if memory_growth is None else 0
+    measure = Phases.setdefault(name, OrderedDict([('name', name),
+                                                   ('calls', 0),
+                                                   ('wall_time', 0.0),
+                                                   ('peak_memory_growth_kb', initial_value),
+                                                   ('created_objects', initial_value)]))
+    measure['calls'] += 1
+    measure['wall_time'] += elapsed_time
+    if memory_growth is not None:
+        measure['peak_memory_growth_kb'] += memory_growth
+        measure['created_objects'] += created_objects
+
+# Context manager to measure the code executed inside the with statement.
+# The objects are counted out of the measured time.
+@contextmanager
+def profilePhase(name):
+    if Phases is None:
+        yield
+        return
+
+    objects = getNumberOfObjects()
+    memory = getPeakMemory()
+    start = time.time()
+    try:
+        yield
+    finally:
+        elapsed_time = time.time() - start
+        addPhaseMeasure(name, elapsed_time, getPeakMemory() - memory,
+                        getNumberOfObjects() - objects)
+
+# This function measures the time spent obtaining the elements of the given
+# iterator, it is used for the phases that are consumed by other phases (the
+# parser is consumed while the rules table is built). Only the time can be
+# measured, the memory and the objects are shared with the consumer and they
+# are reported as null.
+def profileIterator(name, iterator):
+    if Phases is None:
+        return iterator
+
+    def _():
+        elapsed_time = 0.0
+        iterator_ = iter(iterator)
+        try:
+            while True:
+                start = time.time()
+                try:
+                    element = next(iterator_)
+                finally:
+                    elapsed_time += time.time() - start
+                yield element
+        finally:
+            addPhaseMeasure(name, elapsed_time)
+    return _()
+
+# This function writes the report with the measures of the phases as JSON.
+# The given information (the program, the frontend, ...) is added to the
+# report as it is.
+def writePhaseReport(filename, **information):
+    report = OrderedDict(sorted(information.items()))
+    report['peak_memory_kb'] = getPeakMemory()
+    report['phases'] = Phases.values()
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
@@ -5,57 +5,68 @@ Created on Jul 26, 2013
 '''
 
 from collections import Counter
-from copy import deepcopy
-from operator import itemgetter
-from itertools import groupby
 from functools import cmp_to_key
 
-def computeIncidendeGrades(dependencyGraph):
+from RuleStratifier import computeStronglyConnectedComponents
+
+def computeIncidendeGrades(dependencyGraph, excludedNodes=frozenset()):
     incidenceGrades = Counter({pred:0 for pred in dependencyGraph.keys()})
-    
+
     for key in dependencyGraph.keys():
+        if key in excludedNodes:
+            continue
         for pred in dependencyGraph[key]:
             incidenceGrades[pred] += 1
-        
+
     return incidenceGrades
 
-def computePredecessors(node, dependencyGraph):
-        answer = set([x for x in dependencyGraph[node].keys() if x != node])
-        working_set = deepcopy(answer)
-        
-        while working_set:
-            current_node = working_set.pop()
-            temp_set = set([x for x in dependencyGraph[current_node].keys() if x not in answer and x != node])
-            answer |= temp_set
-            working_set |= temp_set
-            
-        return answer
-
-def orderFirstBlock(block1, block2, predecessors, negatedPredicates):
-#     def computePredecessors(node, dependencyGraph):
-#         answer = set([x for x in dependencyGraph[node].keys() if x != node])
-#         working_set = deepcopy(answer)
-#         
-#         while working_set:
-#             current_node = working_set.pop()
-#             temp_set = set([x for x in dependencyGraph[current_node].keys() if x not in answer and x != node])
-#             answer |= temp_set
-#             working_set |= temp_set
-#             
-#         return answer
-#         
-#     predecessors = dict()
-#     for node in block2:
-#         predecessors[node] = computePredecessors(node, dependencyGraph)
-    #print predecessors, block1
-        
+# This function computes the transitive closure of the dependency graph. Every
+# node gets a position and the set of nodes reachable from it is represented
+# as a bitset (a python integer). As all the nodes of a strongly connected
+# component reach the same nodes the bitset is computed only once per
+# component, and as the components are visited in reverse topological order
+# the bitsets of the successors are always available. It returns the
+# dictionary with the positions and the dictionary with the bitsets of every
+# node. A node is only considered reachable from itself if it belongs to a
+# cycle.
+def computeTransitiveClosure(dependencyGraph):
+    successors_of = lambda node: dependencyGraph.get(node, ())
+    components = computeStronglyConnectedComponents(dependencyGraph.keys(), successors_of)
+
+    positions = {}
+    for component in components:
+        for node in component:
+            positions[node] = len(positions)
+
+    reachable = {}
+    for component in components:
+        members = set(component)
+        bitset = 0
+        for node in component:
+            for successor in successors_of(node):
+                bitset |= 1 << positions[successor]
+                if successor not in members:
+                    bitset |= reachable[successor]
+        for node in component:
+            reachable[node] = bitset
+
+    return positions, reachable
+
+# This function returns the predecessors of the given node (the nodes that
+# can be reached from it following the dependency graph, which is built in a
+# bottom-up fashion) leaving the node itself out. The predecessors are
+# returned as a bitset, positions and reachable are the ones returned by
+# computeTransitiveClosure.
+def computePredecessors(node, positions, reachable):
+    return reachable[node] & ~(1 << positions[node])
+
+def orderFirstBlock(block1, negatedPredicates):
+    # The nodes of the first block have no incoming edges so none of them
+    # can be a predecessor of a node of the second block, answer_tmp starts
+    # empty.
     answer = []
     answer_tmp = []
-    for node in block2:
-        for pred in predecessors[node]:
-            if pred in block1:
-                answer_tmp.append(pred)
-    
+
     # Make sure negated predicates go first in the ordering
     answer_tmp += list(set(block1).difference(set(answer_tmp)))
     for idPred in answer_tmp:
@@ -63,81 +74,67 @@ def orderFirstBlock(block1, block2, predecessors, negatedPredicates):
             answer.insert(0, idPred)
         else:
             answer.append(idPred)
-            
-    return answer 
 
-def orderSecondBlock(block2, predecessors):
-    return sorted(block2, key=cmp_to_key(lambda x, y: 1 if x in predecessors[y] else -1))
+    return answer
+
+def orderSecondBlock(block2, positions, predecessors):
+    return sorted(block2, key=cmp_to_key(lambda x, y: 1 if predecessors[y] >> positions[x] & 1 else -1))
 
 def orderThirdBlock(block_1, block_2, block_3, dependencyGraph):
-    # Copy the graph 
-    graph = deepcopy(dependencyGraph)
-    # Remove the nodes of block_1
-    for node in block_1:
-        del graph[node]
-    # Compute the incidence graph in case there is a tie
-    iG_1 = computeIncidendeGrades(graph)
-    # Remove the nodes of block_2
-    for node in block_2:
-        del graph[node]
-    # Compute the incidence graph to set the order of this block
-    iG_2 = computeIncidendeGrades(graph)
-    
-    sortingBlock = [ (elem, iG_2[elem]) for elem in block_3]
-    sortingBlock = sorted(sortingBlock, key=itemgetter(1), reverse=True)
-    sortingBlocks = [ list(x[1]) for x in groupby(sortingBlock, key=itemgetter(1)) ] 
-    answer = []
-    # Check if there is a tie on some nodes of the block and use the previous block to untie
-    for block in sortingBlocks:
-        if len(block) == 1:
-            answer.append(block[0][0])
-        else:
-            sortingBlock = [ (elem[0], iG_1[elem[0]]) for elem in block]
-            sortingBlock = sorted(sortingBlock, key=itemgetter(1), reverse=True)
-            answer.extend([x[0] for x in sortingBlock])
-    
-    return answer
-        
+    # Compute the incidence grades without the nodes of block_1 in case there
+    # is a tie
+    excludedNodes = set(block_1)
+    iG_1 = computeIncidendeGrades(dependencyGraph, excludedNodes)
+    # Compute the incidence grades without the nodes of block_1 and block_2
+    # to set the order of this block
+    excludedNodes.update(block_2)
+    iG_2 = computeIncidendeGrades(dependencyGraph, excludedNodes)
+
+    # The nodes are sorted by the incidence grade without the first two
+    # blocks, the ties are broken with the incidence grade without the first
+    # block. The sort is stable so the remaining ties keep their order.
+    return sorted(block_3, key=lambda elem: (iG_2[elem], iG_1[elem]), reverse=True)
+
 def predicateOrder(dependencyGraph, intensionalPredicates, negatedPredicates):
     block1 = list()
     block2 = list()
-    #print negatedPredicates
 
-    graph = deepcopy(dependencyGraph)
-    incidenceGrades = computeIncidendeGrades(graph)
+    # The nodes are peeled in layers, a layer contains the nodes that are not
+    # the successor of any node still in the graph. Instead of computing the
+    # incidence grades again for every layer a counter is kept for every node
+    # and it is decreased when one of its predecessors is peeled.
+    incidenceGrades = computeIncidendeGrades(dependencyGraph)
+    remainingGrades = Counter(incidenceGrades)
     markedNodes = set() | negatedPredicates
     addedNodes = [x for x in incidenceGrades.keys() if incidenceGrades[x] == 0]
-    
+
+    # The nodes of every layer are added in the order they have in the graph
+    graphOrder = dict((node, position) for position, node in enumerate(dependencyGraph.keys()))
+
     while (len(addedNodes)):
         markedNodes.update(addedNodes)
-        # For every addedNode remove it from the graph
+        nextNodes = []
         for node in addedNodes:
-            del graph[node]
-        
-        iG = computeIncidendeGrades(graph)
-        addedNodes = [x for x in graph.keys() if iG[x] == 0]
-        
-    #print markedNodes
-    #print incidenceGrades
+            for successor in dependencyGraph[node]:
+                remainingGrades[successor] -= 1
+                if remainingGrades[successor] == 0 and successor in graphOrder:
+                    nextNodes.append(successor)
+        addedNodes = sorted(nextNodes, key=graphOrder.__getitem__)
+
     for node in markedNodes:
         if incidenceGrades[node] == 0:
             block1.append(node)
         else: block2.append(node)
-        
+
     block3 = list(set(dependencyGraph.keys()).union(intensionalPredicates).difference(markedNodes))
     block3 = orderThirdBlock(block1, block2, block3, dependencyGraph)
-    
+
+    positions, reachable = computeTransitiveClosure(dependencyGraph)
     predecessors = dict()
     for node in block2:
-        predecessors[node] = computePredecessors(node, dependencyGraph)
-        
-    block2 = orderSecondBlock(block2, predecessors)
-    #block1 = orderFirstBlock(block1, block2, dependencyGraph)
-    block1 = orderFirstBlock(block1, block2, predecessors, negatedPredicates)
-    
-    #if [x for x in block3 if x in negatedPredicates]:
-    #    print "NegatedPredicates in thirdBlock"
-        
-    #print block1, block2, block3
-    
-    return (block1, block2, block3)
\ No newline at end of file
+        predecessors[node] = computePredecessors(node, positions, reachable)
+
+    block2 = orderSecondBlock(block2, positions, predecessors)
+    block1 = orderFirstBlock(block1, negatedPredicates)
+
+    return (block1, block2, block3)
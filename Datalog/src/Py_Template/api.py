@@ -0,0 +1,159 @@
+%% fill_Header
+
+import imp
+import os
+
+from collections import deque
+from itertools import count, islice
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+%% fillApiPredicates
+
+# API
+# The solver can be embedded in other programs with the class Solver. The facts
+# of the extensional predicates are given as iterables of tuples with add_facts,
+# run evaluates the stratums (at most max_steps rewriting variables at a time,
+# so the evaluation can be interleaved with other work) and answers returns a
+# generator that yields the answers of a predicate as they are derived.
+#
+# Every Solver executes its own copy of the module solver, so several solvers
+# can be used at the same time. The copy takes the facts from the iterables
+# given to add_facts instead of the .tuples files (in chunks of FACTS_CHUNK_SIZE
+# facts) and keeps the answers in memory instead of writing them to files.
+FACTS_CHUNK_SIZE = 1 << 14
+# The number of rewriting variables evaluated by answers before it looks for
+# new answers
+ANSWERS_STEPS = 1 << 10
+
+SOLVER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solver.py')
+with open(SOLVER_FILE) as solver_file:
+    SOLVER_CODE = compile(solver_file.read(), SOLVER_FILE, 'exec')
+solver_copies = count()
+
+def load_solver():
+    module = imp.new_module('solver_{}'.format(next(solver_copies)))
+    module.__file__ = SOLVER_FILE
+    exec SOLVER_CODE in module.__dict__
+    return module
+
+# The answers of a predicate are kept until they are consumed by answers, it
+# replaces the writer of the answers of the predicate (utils.py)
+class AnswersCollector(object):
+    def __init__(self):
+        self.answers = deque()
+
+    # The variable is a tuple whose first element is the hypothesis
+    def write(self, var):
+        self.answers.append(var[1:])
+
+    # The rows are tuples with only the values of the answers
+    def write_rows(self, rows):
+        self.answers.extend(rows)
+
+    def close(self):
+        pass
+
+# The answers of the predicates that are not consumed are not kept
+class AnswersDiscarder(AnswersCollector):
+    def write(self, var):
+        pass
+
+    def write_rows(self, rows):
+        pass
+
+class Solver(object):
+    # Only the answers of the given predicates are kept, by default the answers of
+    # all the predicates stored by the solver
+    def __init__(self, predicates=None):
+        if predicates is None:
+            predicates = ANSWER_PREDICATES
+        for name in predicates:
+            if name not in ANSWER_PREDICATES:
+                raise ValueError('The answers of {} are not stored by the solver'.format(name))
+        self.solver = load_solver()
+        self.solver.read_facts = self.read_facts
+        if hasattr(self.solver, 'read_fact_arrays'):
+            self.solver.read_fact_arrays = self.read_fact_arrays
+        self.collectors = {}
+        for name in ANSWER_PREDICATES:
+            if name in predicates:
+                self.collectors[name] = AnswersCollector()
+                setattr(self.solver, 'fp_' + name, self.collectors[name])
+            else:
+                setattr(self.solver, 'fp_' + name, AnswersDiscarder())
+        self.facts = dict((name, []) for name in EXTENSIONAL_PREDICATES)
+        self.reads = dict.fromkeys(EXTENSIONAL_PREDICATES, 0)
+        self.steps = None
+        self.finished = False
+
+    # The facts are consumed when the first stratum that reads them starts, until
+    # then more facts of the predicate can be added
+    def add_facts(self, predicate, facts):
+        if predicate not in EXTENSIONAL_PREDICATES:
+            raise ValueError('{} is not an extensional predicate'.format(predicate))
+        if self.reads[predicate]:
+            raise ValueError('The facts of {} were already read by the solver'.format(predicate))
+        self.facts[predicate].append(facts)
+
+    # This function evaluates at most max_steps rewriting variables (all of them if
+    # max_steps is None) and returns True when the evaluation has finished
+    def run(self, max_steps=None):
+        if self.steps is None:
+            self.steps = self.solver.solver_steps()
+        if max_steps is None:
+            deque(self.steps, maxlen=0)
+            self.finished = True
+        else:
+            self.finished = sum(1 for _ in islice(self.steps, max_steps)) < max_steps
+        return self.finished
+
+    # This function returns a generator of the answers of the predicate (tuples with
+    # its values), when there are no answers left it continues the evaluation. Every
+    # answer is returned only once.
+    def answers(self, predicate, steps=ANSWERS_STEPS):
+        if predicate not in self.collectors:
+            raise ValueError('The answers of {} are not kept by the solver'.format(predicate))
+        pending = self.collectors[predicate].answers
+        popleft = pending.popleft
+        while True:
+            while pending:
+                yield popleft()
+            if self.finished:
+                return
+            self.run(steps)
+
+    # This function returns an iterator over the facts of the predicate in lists of
+    # at most FACTS_CHUNK_SIZE tuples. The facts are kept only when another stratum
+    # reads them again.
+    def take_facts(self, name):
+        arity, readers = EXTENSIONAL_PREDICATES[name]
+        self.reads[name] += 1
+        keep = self.reads[name] < readers
+        kept = []
+        for source in self.facts[name]:
+            source = iter(source)
+            while True:
+                facts = map(tuple, islice(source, FACTS_CHUNK_SIZE))
+                if not facts:
+                    break
+                if any(len(fact) != arity for fact in facts):
+                    raise ValueError('{}: every fact must contain {} values'.format(name, arity))
+                if keep:
+                    kept.append(facts)
+                yield facts
+        self.facts[name] = kept
+
+    # It replaces read_facts (utils.py) in the copy of the module solver
+    def read_facts(self, filename, arity, hypothesis):
+        prefix = (hypothesis,)
+        for facts in self.take_facts(filename[:-len('.tuples')]):
+            yield [prefix + fact for fact in facts]
+
+    # It replaces read_fact_arrays (relations.py) in the copy of the module solver
+    def read_fact_arrays(self, filename, arity):
+        for facts in self.take_facts(filename[:-len('.tuples')]):
+            yield numpy.array(facts, dtype=numpy.int64).reshape(-1, arity)
@@ -0,0 +1,121 @@
+%% fill_Header
+
+import sys
+
+from multiprocessing import Array, Process, Queue, Value
+from Queue import Empty
+
+# Multiprocess queue
+# The rewriting variables are partitioned between several worker processes by
+# the values of the columns their equations join, every worker has its own
+# data structure and its own queues and the variables that belong to other
+# workers are sent to them in batches.
+
+# Number of variables of a batch sent to another worker
+BATCH_SIZE = 1024
+# Seconds a worker waits for a batch before checking if the stratum finished
+POLL_INTERVAL = 0.005
+
+# This function returns the worker of the given values of the join columns of a
+# variable. Only the different values are used: the two predicates joined by a
+# rule can store the join columns in a different order and, with equal cards,
+# a different number of times. A single value is its own partition.
+def partition(values, workers):
+    values = frozenset(values)
+    if len(values) == 1:
+        for value in values:
+            return value % workers
+    return hash(values) % workers
+
+# The channel of a worker. It sends the variables to the queues of the workers
+# and detects the end of every stratum.
+# The end of a stratum is detected with a counter (pending) for every stratum
+# level shared by all the workers. It counts the batches of the level that have
+# not been handled yet plus one for every worker that has not finished the
+# initialization of the stratum. A batch is counted before it is sent and it is
+# discounted once the worker that received it has handled it and has sent the
+# variables it generated, so when the counter reaches 0 no worker has work left
+# for the stratum and every worker can go on with the next one.
+class Channel(object):
+    def __init__(self, worker, inboxes, pending, failed, queues):
+        self.worker = worker
+        self.workers = len(inboxes)
+        self.all_workers = tuple(xrange(self.workers))
+        self.inboxes = inboxes
+        self.pending = pending
+        self.failed = failed
+        self.queues = queues
+        # The variables waiting to be sent, by worker and by stratum level
+        self.outboxes = [[[] for _ in queues] for _ in xrange(self.workers)]
+        # The batches received by level that have not been discounted yet. Every
+        # worker starts with the initialization of every level.
+        self.received = [1] * len(queues)
+
+    # This function adds the variable to the queue of the given level of every
+    # target worker
+    def send(self, level, var, targets):
+        for target in targets:
+            if target == self.worker:
+                self.queues[level - 1].append(var)
+            else:
+                batch = self.outboxes[target][level - 1]
+                batch.append(var)
+                if len(batch) == BATCH_SIZE:
+                    self.send_batch(target, level)
+
+    def send_batch(self, target, level):
+        with self.pending.get_lock():
+            self.pending[level - 1] += 1
+        self.inboxes[target].put((level, self.outboxes[target][level - 1]))
+        self.outboxes[target][level - 1] = []
+
+    # This function is called when the queue of the given level is empty. It sends
+    # the waiting variables and waits for a batch of the level. It returns True when
+    # a batch has been added to the queue and False when the stratum has finished.
+    def synchronize(self, level):
+        for target in xrange(self.workers):
+            for batch_level, batch in enumerate(self.outboxes[target], start=1):
+                if batch:
+                    self.send_batch(target, batch_level)
+
+        with self.pending.get_lock():
+            self.pending[level - 1] -= self.received[level - 1]
+        self.received[level - 1] = 0
+
+        inbox = self.inboxes[self.worker]
+        while True:
+            try:
+                batch_level, batch = inbox.get(True, POLL_INTERVAL)
+            except Empty:
+                if self.failed.value:
+                    sys.exit('Another worker of the solver failed')
+                if self.pending[level - 1] == 0:
+                    return False
+                continue
+
+            self.queues[batch_level - 1].extend(batch)
+            self.received[batch_level - 1] += 1
+            if batch_level == level:
+                return True
+
+def run_worker(target, channel):
+    try:
+        target(channel)
+    except:
+        channel.failed.value = 1
+        raise
+
+# This function starts the given number of workers, every one of them calls
+# target with its channel. queues are the queues of the stratum levels.
+def start_workers(target, workers, queues):
+    inboxes = [Queue() for _ in xrange(workers)]
+    pending = Array('l', [workers] * len(queues))
+    failed = Value('i', 0)
+
+    processes = []
+    for worker in xrange(workers):
+        channel = Channel(worker, inboxes, pending, failed, queues)
+        process = Process(target=run_worker, args=(target, channel))
+        process.start()
+        processes.append(process)
+    return processes
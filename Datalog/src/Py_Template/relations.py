@@ -0,0 +1,157 @@
+%% fill_Header
+
+from collections import deque
+
+import numpy
+
+from utils import parse_values, read_chunks
+
+# NumPy backend
+# The tuples of every predicate are stored as the rows of a two dimensional
+# array of integers and the rewriting variables are evaluated in batches, every
+# handler receives all the pending variables of a predicate as an array.
+
+def empty_tuples(arity):
+    return numpy.empty((0, arity), dtype=numpy.int64)
+
+# This function returns the keys of the rows given by its columns. A single
+# column is its own key, the rows of several columns are viewed as opaque
+# values (only their equality and their order are used).
+def keys(columns):
+    if len(columns) == 1:
+        return numpy.ascontiguousarray(columns[0], dtype=numpy.int64)
+    rows = numpy.ascontiguousarray(numpy.column_stack(columns), dtype=numpy.int64)
+    return rows.view(numpy.dtype((numpy.void, rows.itemsize * rows.shape[1]))).ravel()
+
+# This function builds an array of n tuples from the given columns. A column
+# can be a constant, in that case it is repeated in every tuple.
+def tuples(n, columns):
+    result = numpy.empty((n, len(columns)), dtype=numpy.int64)
+    for position, column in enumerate(columns):
+        result[:, position] = column
+    return result
+
+# This function returns the given tuples that satisfy all the conditions. A
+# condition is a boolean array (one value for every tuple) or a boolean.
+def select(tuples, conditions):
+    mask = numpy.ones(len(tuples), dtype=bool)
+    for condition in conditions:
+        mask &= condition
+    return tuples[mask]
+
+def write_tuples(f, name, tuples):
+    if len(tuples):
+        line = '{}({}).\n'.format(name, ', '.join('%i' for _ in xrange(tuples.shape[1])))
+        f.write(''.join(line % row for row in map(tuple, tuples.tolist())))
+
+# This function returns an iterator over the facts of the given file, the facts
+# are returned in arrays (one array for every chunk of the file).
+def read_fact_arrays(filename, arity):
+    first_line = 1
+    for chunk in read_chunks(filename):
+        yield parse_values(chunk, arity, filename, first_line).reshape(-1, arity)
+        first_line += chunk.count('\n')
+
+class Relation(object):
+    def __init__(self, arity):
+        self.arity = arity
+        self.tuples = empty_tuples(arity)
+        # The sorted indexes of the relation. Every index is a dictionary entry
+        # whose key is a tuple with the indexed columns and whose value is a pair
+        # with the sorted keys of the rows and the rows in that order.
+        self.indexes = {}
+
+    def __len__(self):
+        return len(self.tuples)
+
+    def index(self, columns):
+        if columns not in self.indexes:
+            row_keys = keys([self.tuples[:, column] for column in columns])
+            rows = numpy.argsort(row_keys, kind='mergesort')
+            self.indexes[columns] = (row_keys[rows], rows)
+        return self.indexes[columns]
+
+    # The new tuples are merged into the existing indexes
+    def insert(self, tuples):
+        if not len(tuples):
+            return
+        first_row = len(self.tuples)
+        self.tuples = numpy.concatenate((self.tuples, tuples))
+        for columns, (sorted_keys, rows) in self.indexes.items():
+            new_keys = keys([tuples[:, column] for column in columns])
+            order = numpy.argsort(new_keys, kind='mergesort')
+            new_keys = new_keys[order]
+            positions = sorted_keys.searchsorted(new_keys)
+            self.indexes[columns] = (numpy.insert(sorted_keys, positions, new_keys),
+                                     numpy.insert(rows, positions, order + first_row))
+
+    # This function joins n values with the tuples of the relation. The values
+    # are given by columns (a constant is the same value for the n values) and
+    # they are compared with the given columns of the tuples. It returns two
+    # arrays with the pairs that match: the positions of the values and the
+    # rows of the tuples.
+    def join(self, n, columns, values):
+        if not n or not len(self.tuples):
+            return numpy.empty(0, dtype=numpy.intp), numpy.empty(0, dtype=numpy.intp)
+        # Without columns every value matches every tuple
+        if not columns:
+            return (numpy.repeat(numpy.arange(n), len(self.tuples)),
+                    numpy.tile(numpy.arange(len(self.tuples)), n))
+
+        sorted_keys, rows = self.index(columns)
+        probe = tuples(n, values)
+        probe_keys = keys([probe[:, position] for position in xrange(len(columns))])
+        low = sorted_keys.searchsorted(probe_keys, 'left')
+        counts = sorted_keys.searchsorted(probe_keys, 'right') - low
+        positions = numpy.repeat(numpy.arange(n), counts)
+        # For every match its offset inside the range of rows of its value
+        offsets = numpy.arange(len(positions)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        return positions, rows[numpy.repeat(low, counts) + offsets]
+
+    # This function returns a boolean array, True for the given tuples that
+    # are stored in the relation
+    def contains(self, tuples):
+        if not len(tuples) or not len(self.tuples):
+            return numpy.zeros(len(tuples), dtype=bool)
+        columns = tuple(xrange(self.arity))
+        sorted_keys, _ = self.index(columns)
+        probe_keys = keys([tuples[:, column] for column in columns])
+        positions = numpy.minimum(sorted_keys.searchsorted(probe_keys), len(sorted_keys) - 1)
+        return sorted_keys[positions] == probe_keys
+
+    # This function stores the given tuples that are not stored yet and returns
+    # them (without repetitions)
+    def add(self, tuples):
+        if not len(tuples):
+            return tuples
+        tuples = numpy.unique(tuples, axis=0)
+        tuples = tuples[~self.contains(tuples)]
+        self.insert(tuples)
+        return tuples
+
+# The queue of a stratum. The batches of variables of the same predicate are
+# kept together and returned as one batch, the predicates are returned in the
+# order in which their first pending batch was added.
+class BatchQueue(object):
+    def __init__(self):
+        self.batches = {}
+        self.hypotheses = deque()
+
+    def __len__(self):
+        return len(self.hypotheses)
+
+    def append(self, hypothesis, tuples):
+        if not len(tuples):
+            return
+        if hypothesis in self.batches:
+            self.batches[hypothesis].append(tuples)
+        else:
+            self.batches[hypothesis] = [tuples]
+            self.hypotheses.append(hypothesis)
+
+    def popleft(self):
+        hypothesis = self.hypotheses.popleft()
+        batches = self.batches.pop(hypothesis)
+        if len(batches) == 1:
+            return hypothesis, batches[0]
+        return hypothesis, numpy.concatenate(batches)
@@ -5,12 +5,10 @@ import sys
 %% fillSolverQueueModules
 
 from datastructure import datastructure
-from utils import hypotheses, views
+from utils import hypotheses, views, read_facts, open_writer
 
 %% fillStratumSolverQueues
 
-%% fillPrintAnswer
-
 %% fillPrintRewritingVariable
 
 %% fillSolverInit
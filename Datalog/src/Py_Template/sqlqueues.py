@@ -0,0 +1,29 @@
+%% fill_Header
+
+from collections import deque
+
+# SQL backend
+# The rewriting variables are stored in the tables of the database (a table for
+# every stratum level and predicate) and every handler evaluates all the pending
+# variables of its predicate with a few INSERT ... SELECT statements. The queue
+# of every stratum level only keeps the hypotheses whose tables have rows.
+
+class HypothesesQueue(object):
+    def __init__(self):
+        self.pending = set()
+        self.hypotheses = deque()
+
+    def __len__(self):
+        return len(self.hypotheses)
+
+    # The hypothesis is added if some rows were inserted into its table and it
+    # isn't already waiting to be handled
+    def append(self, hypothesis, rows):
+        if rows and hypothesis not in self.pending:
+            self.pending.add(hypothesis)
+            self.hypotheses.append(hypothesis)
+
+    def popleft(self):
+        hypothesis = self.hypotheses.popleft()
+        self.pending.discard(hypothesis)
+        return hypothesis
@@ -1,7 +1,158 @@
 %% fill_Header
 
 from collections import namedtuple
+from itertools import chain, repeat
+
+import gzip
+import re
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Facts
+# The facts of the extensional predicates are read in chunks of FACTS_BUFFER_SIZE
+# bytes and the integers of every chunk are parsed at once (with NumPy if it is
+# available). Every line contains a fact, written as in the .tuples files
+# (a(1, 2).) or as integers separated by tabs or commas (TSV or CSV without header).
+FACTS_BUFFER_SIZE = 1 << 24
+# The name of the predicate and the delimiters of a fact written as in the
+# .tuples files, only its values are kept
+FACT = re.compile(r'^[ \t]*[A-Za-z_][A-Za-z0-9_]*\((.*)\)[ \t]*\.[ \t\r]*$', re.M)
+# The values are separated by commas or blanks, the line breaks are kept to
+# check the number of values of every fact and any other character is
+# replaced by WRONG_CHARACTER
+WRONG_CHARACTER = '#'
+SEPARATORS = ''.join(c if c.isdigit() or c in '-\n' else ' ' if c in ', \t\r' else WRONG_CHARACTER
+                     for c in map(chr, xrange(256)))
+# A minus sign that doesn't start an integer (-, --1 or 1-2)
+WRONG_VALUE = re.compile(r'-(?![0-9])|[0-9]-')
+
+# This function returns the text of the facts with only their values
+def fact_values(text):
+    return FACT.sub(r'\1', text).translate(SEPARATORS)
+
+# This function returns the error of the first line of the chunk that is not a
+# fact of the given arity, first_line is the number of the first line of the chunk.
+def fact_error(chunk, arity, filename, first_line):
+    for number, line in enumerate(chunk.split('\n'), first_line):
+        text = fact_values(line)
+        values = text.split()
+        if values and (len(values) != arity or WRONG_CHARACTER in text or WRONG_VALUE.search(text)):
+            return ValueError('{}:{}: {!r} is not a fact with {} integer values'.format(filename, number,
+                                                                                        line.strip(), arity))
+    return ValueError('{}: every fact must contain {} values'.format(filename, arity))
+
+# This function returns the values of the facts of the chunk (an array if NumPy
+# is available), it raises a ValueError if a line is not a fact of the given arity.
+def parse_values(chunk, arity, filename, first_line=1):
+    text = fact_values(chunk)
+    if WRONG_CHARACTER in text or WRONG_VALUE.search(text):
+        raise fact_error(chunk, arity, filename, first_line)
+    if numpy is not None:
+        # The number of values of every line is the number of values that start in it
+        chars = numpy.frombuffer(text, dtype=numpy.uint8)
+        spaces = (chars == ord(' ')) | (chars == ord('\n'))
+        starts = ~spaces
+        starts[1:] &= spaces[:-1]
+        counts = numpy.bincount(numpy.cumsum(chars == ord('\n'))[starts])
+        if numpy.any((counts != 0) & (counts != arity)):
+            raise fact_error(chunk, arity, filename, first_line)
+        return numpy.fromstring(text, dtype=numpy.int64, sep=' ')
+    lines = [line.split() for line in text.split('\n')]
+    if any(len(values) != arity for values in lines if values):
+        raise fact_error(chunk, arity, filename, first_line)
+    return map(int, chain.from_iterable(lines))
+
+def parse_facts(text, arity, hypothesis, filename, first_line=1):
+    values = parse_values(text, arity, filename, first_line)
+    if numpy is not None:
+        values = values.tolist()
+    # The facts are returned as tuples, the first element is the hypothesis
+    return zip(repeat(hypothesis, len(values) // arity), *([iter(values)] * arity))
+
+# This function returns an iterator over the chunks of the given file, every
+# chunk contains only complete lines (the last one can miss the line break).
+def read_chunks(filename):
+    with open(filename, 'rb') as fp:
+        pending = ''
+        while True:
+            chunk = fp.read(FACTS_BUFFER_SIZE)
+            if not chunk:
+                break
+            # Only the complete lines are returned, the rest is kept for the next chunk
+            end = chunk.rfind('\n') + 1
+            if not end:
+                pending += chunk
+                continue
+            yield pending + chunk[:end]
+            pending = chunk[end:]
+        if pending.strip():
+            yield pending
+
+# This function returns an iterator over the facts of the given file, the facts
+# are returned in lists (one list for every chunk of the file).
+def read_facts(filename, arity, hypothesis):
+    first_line = 1
+    for chunk in read_chunks(filename):
+        yield parse_facts(chunk, arity, hypothesis, filename, first_line)
+        first_line += chunk.count('\n')
+
+# Output
+# The answers of every predicate are written by a writer that keeps them in a
+# buffer and writes OUTPUT_BUFFER_SIZE answers at once. The text format is the
+# one of the .tuples files, the binary format writes every value as a signed
+# 64 bit little-endian integer (the values of an answer are consecutive) and
+# the gzip format is the text format compressed while it is written.
+OUTPUT_BUFFER_SIZE = 1 << 14
+
+class TextWriter(object):
+    def __init__(self, fp, name, arity):
+        self.fp = fp
+        self.line = '{}({}).\n'.format(name, ', '.join('%i' for _ in xrange(arity)))
+        self.rows = []
+
+    # The variable is a tuple whose first element is the hypothesis
+    def write(self, var):
+        rows = self.rows
+        rows.append(var[1:])
+        if len(rows) >= OUTPUT_BUFFER_SIZE:
+            self.flush()
+
+    # The rows are tuples with only the values of the answers
+    def write_rows(self, rows):
+        self.rows.extend(rows)
+        if len(self.rows) >= OUTPUT_BUFFER_SIZE:
+            self.flush()
+
+    def format_rows(self, rows):
+        return ''.join(map(self.line.__mod__, rows))
+
+    def flush(self):
+        if self.rows:
+            self.fp.write(self.format_rows(self.rows))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.fp.close()
+
+class BinaryWriter(TextWriter):
+    def format_rows(self, rows):
+        values = list(chain.from_iterable(rows))
+        return struct.pack('<{}q'.format(len(values)), *values)
+
+# This function returns the writer of the answers of a predicate for the given
+# format, the extension of the file depends on the format
+def open_writer(filename, name, arity, format='text'):
+    if format == 'binary':
+        return BinaryWriter(open(filename + '.bin', 'wb'), name, arity)
+    elif format == 'gzip':
+        return TextWriter(gzip.open(filename + '.gz', 'wb', 6), name, arity)
+    return TextWriter(open(filename, 'wb'), name, arity)
 
 %% fillAccessViews
 
-%% fillHypothesesNames
\ No newline at end of file
+%% fillHypothesesNames
@@ -0,0 +1,65 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import os
+import glob
+import logging
+
+from Types import RelationStatistics
+
+TUPLES_EXTENSION = '.tuples'
+
+# This function computes the statistics of a relation from a tuples file. The
+# file contains a tuple per line with the same format the solvers use, for
+# example "vP0(1, 0).". The file is read line by line so big samples can be
+# used. It returns None if the file doesn't contain any tuple.
+def loadRelationStatistics(filename):
+    cardinality = 0
+    values = None
+    with open(filename, 'r') as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+            
+            try:
+                row = line[line.index('(') + 1:line.rindex(')')].split(',')
+            except ValueError:
+                logging.warning('Statistics:%s:Line:%i:Discarding malformed tuple', filename, line_no)
+                continue
+            
+            if values is None:
+                values = [set() for _ in row]
+            elif len(row) != len(values):
+                logging.warning('Statistics:%s:Line:%i:Discarding tuple of a different length', filename, line_no)
+                continue
+            
+            cardinality += 1
+            for column, value in zip(values, row):
+                column.add(value.strip())
+            
+    if values is None:
+        return None
+    
+    return RelationStatistics(cardinality, [len(column) for column in values])
+
+# This function computes the statistics of all the tuples files found in the
+# given directory. It returns a dictionary from the predicate names (the name
+# of the file without the extension) to their statistics.
+def loadStatisticsFromDirectory(directory):
+    statistics = {}
+    for filename in sorted(glob.glob(os.path.join(directory, '*' + TUPLES_EXTENSION))):
+        predicate_name = os.path.basename(filename)[:-len(TUPLES_EXTENSION)]
+        relation_statistics = loadRelationStatistics(filename)
+        if relation_statistics is not None:
+            statistics[predicate_name] = relation_statistics
+            logging.info("Statistics of {}: {} tuples, {} distinct values".format(predicate_name,
+                                                                                 relation_statistics.cardinality,
+                                                                                 relation_statistics.distinct))
+    
+    if not statistics:
+        logging.warning("No statistics found at {}".format(directory))
+        
+    return statistics
@@ -8,7 +8,7 @@ from Types import RewritingRule1, RewritingRule2, ArithmeticExpression
 from Types import ViewsData, Argument, Variable, BooleanExpression, Predicate
 from Types import NegatedElement, AssignationExpression
 
-from Parser import random_generator
+from Parser import hashed_generator
 
 from itertools import chain
 from collections import defaultdict
@@ -555,7 +555,7 @@ def rewritingEquationGenerator(rulesTable, printEquations=False):
         if aliasName not in alias_to_ViewNames:
             alias_to_ViewNames[aliasName] = viewName
         elif alias_to_ViewNames[aliasName] != viewName:
-            new_alias = aliasName + '_' + random_generator(size=3)
+            new_alias = aliasName + '_' + hashed_generator(aliasName + viewName, size=3)
             alias_to_ViewNames[new_alias] = viewName
                 
                 
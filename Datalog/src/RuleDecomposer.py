@@ -7,10 +7,13 @@ Created on Jan 27, 2014
 import sys
 import logging
 
-from Parser import parseRule
+from functools import partial
+
+from Parser import parseRules, ParsingError
 from Types import LogicRule, BooleanExpression
 from DecomposingMethods import rightMostDecomposingMethod, leftMostDecomposingMethod,\
-    commonVariablesDecomposingMethod, randomDecomposingMethod
+    commonVariablesDecomposingMethod, randomDecomposingMethod,\
+    dynamicProgrammingDecomposingMethod, costBasedDecomposingMethod
 
 #===============================================================================
 # This module is used to decompose a Datalog program right now only the 
@@ -19,11 +22,16 @@ from DecomposingMethods import rightMostDecomposingMethod, leftMostDecomposingMe
 #===============================================================================
 
 
-def getDecomposerRuleMethod(method):
+# The cost method stores the estimated size of every generated head in
+# estimated_sizes when it is given.
+def getDecomposerRuleMethod(method, statistics=None, estimated_sizes=None):
     buildingRulesAlgorithims = {'left' : leftMostDecomposingMethod,
                                 'right': rightMostDecomposingMethod,
                                 'random': randomDecomposingMethod,
-                                'common': commonVariablesDecomposingMethod}
+                                'common': commonVariablesDecomposingMethod,
+                                'dynamic': dynamicProgrammingDecomposingMethod,
+                                'cost': partial(costBasedDecomposingMethod, statistics=statistics,
+                                                estimated_sizes=estimated_sizes)}
     
     if method not in buildingRulesAlgorithims:
         logging.error("{} is an unknown method to decompose the rules".format(method))
@@ -31,31 +39,32 @@ def getDecomposerRuleMethod(method):
     
     return buildingRulesAlgorithims[method]
     
-def decomposeRulesFromFile(filename, method='random'):
-    decomposeRule = getDecomposerRuleMethod(method)
+def decomposeRulesFromFile(filename, method='random', statistics=None, estimated_sizes=None):
+    decomposeRule = getDecomposerRuleMethod(method, statistics, estimated_sizes)
     logging.info("Using method {}".format(method))
     
     f = open(filename, 'r')
     newRules = []
+    rules = parseRules(f)
     
-    for line_no, line in enumerate(f, start=1):
-        if line[0] == '\n': continue
-        
+    while True:
         try:
-            rule = parseRule(line, check_restricted=False)
-        except ValueError as v:
-            logging.error('Parsing:%s:Line:%i', filename, line_no)
-            logging.error('Parsing:%s', v.message)
+            head, body, line_no, line = next(rules)
+        except StopIteration:
+            break
+        except ParsingError as e:
+            logging.error('Parsing:%s:Line:%i', filename, e.line)
+            logging.error('Parsing:Column:%i:%s', e.column, e.reason)
             sys.exit(0)
             
         # Check if we have negated predicates or boolean expressions on the rule. 
         # We haven't studied if that can be done automatically yet.
-        if [predicate for predicate in rule[1] if predicate.negated or isinstance(predicate, BooleanExpression)]:
+        if [predicate for predicate in body if predicate.negated or isinstance(predicate, BooleanExpression)]:
             logging.error('Analyzing:%s:Line:%i', filename, line_no)
             logging.error('Decomposing rules with negated rules or boolean expressions in not supported yet')
             sys.exit(0)
             
-        logic_rule = LogicRule(rule[0], rule[1], 0, False, 0, line)
+        logic_rule = LogicRule(head, body, 0, False, 0, line)
         if (len(logic_rule.body) > 2):
             newRules.extend( decomposeRule(logic_rule) )
         else:
@@ -64,12 +73,19 @@ def decomposeRulesFromFile(filename, method='random'):
     f.close()            
     return newRules
 
-def saveDecomposedRules(logicRules, filename):
+def saveDecomposedRules(logicRules, filename, estimated_sizes=None):
+    if estimated_sizes is None:
+        estimated_sizes = {}
     f = open(filename, 'w')
     
     for rule in logicRules:
         head = rule.head
         body = rule.body
+        
+        # The cost based method estimates the size of the generated heads
+        if head.id in estimated_sizes:
+            f.write("# Estimated size of {}: {} tuples\n".format(head.id.name,
+                                                                  int(round(estimated_sizes[head.id]))))
 
         head_str = "{}({})".format(head.id.name,
                                    ", ".join([argument.value for argument in head.arguments]))
@@ -4,58 +4,127 @@ Created on Dec 18, 2014
 @author: nando
 '''
 
+import logging
+
+from collections import defaultdict
+
 from Types import Predicate
 
-def updateStratums(predicate_id, rule, stratums):
-    # Find the current stratum for the current rule
-    stratum_of_rule = 0
-    for stratum_level, stratum in enumerate(stratums):
-        for stratum_rule in stratum:
-            if rule == stratum_rule:
-                stratum_of_rule = stratum_level
-                
-    # Find the stratum it should be in
-    new_stratum = 0
-    found = False
-    for stratum_level, stratum in enumerate(stratums):
-        for stratum_rule in stratum:
-            if stratum_rule.head.id == predicate_id:
-                if stratum_level >= new_stratum:
-                    new_stratum = stratum_level + 1
-                found = True
-                
-    #TODO: Comprobar que en el stratum actual se puede colocar la regla sin problemas
-    
-    if found:
-        stratums[stratum_of_rule].remove(rule)
-        if len(stratums) <= new_stratum:
-            stratums.append([rule])
-        else:
-            stratums[new_stratum].append(rule)
-    
-        
+# This function builds the predicate dependency graph used to stratify the
+# program. The graph is a dictionary with the identifiers of the heads as keys
+# and a list of tuples (identifier, negated) as values, one for every predicate
+# appearing on the body of the rules defining the head.
+def buildStratificationGraph(rulesTable):
+    graph = defaultdict(list)
+    for rule in rulesTable:
+        graph[rule.head.id]
+        for element in rule.body:
+            if isinstance(element, Predicate):
+                graph[rule.head.id].append((element.id, element.negated))
+    return graph
+
+# This function computes the strongly connected components of a graph using
+# the Tarjan's algorithm. The graph is given by its nodes and a function that
+# returns the successors of a node. It is implemented iteratively, so it
+# doesn't depend on the recursion limit, and it runs in O(V + E). The
+# components are returned in reverse topological order, that is, a component
+# is always returned after all the components it depends on.
+def computeStronglyConnectedComponents(nodes, successors_of):
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors_of(root)))]
+
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(successors_of(successor))))
+                    advanced = True
+                    break
+                elif successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+# This function computes the stratum level of every predicate. A predicate is
+# placed at least in the same level as the predicates it depends on and at
+# least one level above the predicates it depends on through a negation. As
+# the components are visited in topological order every level is computed in
+# only one pass. If a negated dependency is found inside a component the
+# program can not be stratified and a ValueError is raised.
+def computePredicateLevels(graph):
+    levels = {}
+    successors_of = lambda predicate: [x for x, _ in graph.get(predicate, ())]
+    for component in computeStronglyConnectedComponents(graph, successors_of):
+        members = set(component)
+        level = 0
+        for predicate in component:
+            for dependency, negated in graph.get(predicate, ()):
+                if dependency in members:
+                    if negated:
+                        message = 'The program can\'t be stratified: "' + predicate.name +\
+                                  '" depends on the negation of "' + dependency.name +\
+                                  '" through a recursive cycle (' +\
+                                  ', '.join(sorted(x.name for x in members)) + ')'
+                        logging.error('Stratifying:%s', message)
+                        raise ValueError(message)
+                else:
+                    level = max(level, levels.get(dependency, 0) + (1 if negated else 0))
+        for predicate in component:
+            levels[predicate] = level
+    return levels
+
 def stratifyRules(rulesTable):
-    stratums = [rulesTable[:]]
+    '''This function stratifies the given rules. It returns a list of stratums,
+    every stratum is a list with the rules that define the predicates belonging
+    to it. The stratums are ordered, a stratum must be evaluated before all the
+    stratums that follow it. The rules keep inside each stratum the order they
+    have in the rules table.'''
+    graph = buildStratificationGraph(rulesTable)
+    levels = computePredicateLevels(graph)
+
+    # Only the levels containing rules become stratums
+    stratum_of_level = dict((level, position) for position, level in
+                            enumerate(sorted(set(levels[rule.head.id] for rule in rulesTable))))
+
+    stratums = [[] for _ in stratum_of_level]
     for rule in rulesTable:
-        if rule.type == 1:
-            if type(rule.body[0]) == Predicate and rule.body[0].negated:
-                updateStratums(rule.body[0].id, rule, stratums)
-            if len(rule.body) > 1 and type(rule.body[1]) == Predicate and rule.body[1].negated:
-                    updateStratums(rule.body[1].id, rule, stratums)
-        
-        if rule.type == 2:
-            if type(rule.body[1]) == Predicate and rule.body[1].negated:
-                updateStratums(rule.body[1].id, rule, stratums)
-            if len(rule.body) > 2 and type(rule.body[2]) == Predicate and rule.body[2].negated:
-                updateStratums(rule.body[2].id, rule, stratums)
-
-            
-#     for level, stratum in enumerate(stratums):
-#         print "LEVEL", level, ":"
-#         for rule in stratum:
-#             print "\t", rule.rule,
-            
-    return stratums
-            
-        
-        
\ No newline at end of file
+        stratums[stratum_of_level[levels[rule.head.id]]].append(rule)
+
+    return stratums or [[]]
@@ -0,0 +1,51 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import os
+import sys
+import multiprocessing
+
+# Once the analysis is done the template files of a frontend are independent
+# of each other, every one of them is filled only from the GenerationData of
+# the frontend. When more than one job is requested the files are filled by a
+# pool of processes. The processes are forked after the frontend has set its
+# GenerationData so they inherit it and nothing has to be sent to them but the
+# name of the files.
+
+# This function is executed by the processes of the pool. fill_file exits
+# when a template contains an unknown directive, the exit code is returned to
+# the parent as a SystemExit would kill the process and block the pool.
+def fillFileJob(job):
+    fill_file, arguments = job
+    try:
+        fill_file(*arguments)
+    except SystemExit as e:
+        return e.code
+    return None
+
+# This function fills the given files. files is a list of tuples containing
+# the arguments of the fill_file function of the frontend (the name of the
+# file, the template and the destination file).
+def fillFiles(fill_file, files, jobs=1):
+    jobs = min(jobs, len(files))
+    if jobs <= 1:
+        for arguments in files:
+            fill_file(*arguments)
+        return
+
+    # The biggest templates are given first so they don't end up being
+    # filled alone at the end
+    pending = sorted(files, key=lambda x: os.path.getsize(x[1]), reverse=True)
+    pool = multiprocessing.Pool(jobs)
+    try:
+        exit_codes = pool.map(fillFileJob, [(fill_file, arguments) for arguments in pending],
+                              chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    for exit_code in exit_codes:
+        if exit_code is not None:
+            sys.exit(exit_code)
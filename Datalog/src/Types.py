@@ -196,4 +196,62 @@ AssignationExpression = namedtuple('AssignationExpression', ['type', 'arguments'
 #  operator -> A string containing the character representing the operator
 #              used at the expression.
 BooleanExpression = namedtuple('BooleanExpression', ['type', 'arguments', 'operator'],
-                               verbose=False)
\ No newline at end of file
+                               verbose=False)
+# RelationStatistics is a named tuple that contains the statistics of a
+# relation computed from a sample of its tuples. They are used to estimate
+# the size of the relations generated when a rule is decomposed.
+# cardinality -> An integer with the number of tuples of the relation
+#    distinct -> A list with the number of distinct values of every column
+RelationStatistics = namedtuple('RelationStatistics', ['cardinality', 'distinct'],
+                                verbose=False)
+
+# GenerationIndex is a named tuple that contains the information about the
+# equations that the code generators need. It is built once from the stratums
+# by GenerationIndex.buildGenerationIndex. Contents:
+#                 equations -> List with the equations of all the stratums.
+#            type2Equations -> List with the equations of type 2.
+#   equationsByLeftVariable -> Dictionary from the identifiers to the list of
+#                              equations with that identifier on the left side.
+#                     views -> List with the ViewsData of every stratum.
+#          predsToViewNames -> The predsToViewNames of all the stratums.
+#   viewNamesToCombinations -> The viewNamesToCombinations of all the stratums.
+#          aliasToViewNames -> The aliasToViewNames of all the stratums.
+#     extensionalPredicates -> List with the identifiers of the first blocks.
+#              predicateIDs -> Set with the identifiers of all the orderings.
+#          predicateLengths -> Dictionary from the identifiers to their length.
+#         predicatesLengths -> Set of tuples (identifier, length) of the left and
+#                              right sides of the equations.
+#        predicatesByLength -> Dictionary from every length (bigger than 1) to
+#                              the set of identifiers of that length.
+#        queryMinimumLength -> Minimum length of the left side of the equations
+#                              of type 2 (None if there are not).
+#        queryMaximumLength -> Maximum length of the left side of the equations
+#                              of type 2 (None if there are not).
+# dataStructureNodesMaximumLength -> Maximum length of the nodes of the data
+#                              structure.
+# rewritingVariableMaximumLength -> Maximum length of the sides of the
+#                              equations.
+#   sameEqualCardPredicates, sharedSetPredicates,
+#   sharedSetIncludingConstantsPredicates, negatedPredicates -> Sets with the
+#                              identifiers of every kind of solution.
+#         appendedSolutions -> Union of the shared set and negated predicates.
+#                 solutions -> Set with all the solutions of the program.
+#      consultingPredicates -> Set with the identifiers queried on the database.
+#         answersOfLength_1 -> Set with the identifiers of the answers of length 1.
+# predicatesInRulesOfLength_1 -> Set with the identifiers of length 1 on the
+#                              left side of the equations of type 2.
+GenerationIndex = namedtuple('GenerationIndex', ['equations', 'type2Equations',
+                                                 'equationsByLeftVariable', 'views',
+                                                 'predsToViewNames', 'viewNamesToCombinations',
+                                                 'aliasToViewNames', 'extensionalPredicates',
+                                                 'predicateIDs', 'predicateLengths',
+                                                 'predicatesLengths', 'predicatesByLength',
+                                                 'queryMinimumLength', 'queryMaximumLength',
+                                                 'dataStructureNodesMaximumLength',
+                                                 'rewritingVariableMaximumLength',
+                                                 'sameEqualCardPredicates', 'sharedSetPredicates',
+                                                 'sharedSetIncludingConstantsPredicates',
+                                                 'negatedPredicates', 'appendedSolutions',
+                                                 'solutions', 'consultingPredicates',
+                                                 'answersOfLength_1', 'predicatesInRulesOfLength_1'],
+                             verbose=False)
@@ -11,9 +11,13 @@ import sys
 from collections import namedtuple, defaultdict
 from operator import attrgetter
 from itertools import count, chain
-from datetime import datetime
+from cStringIO import StringIO
 from functools import wraps
 from Types import Argument, ArithmeticExpression
+from CompilationCache import writeFileIfChanged
+from GenerationIndex import buildGenerationIndex
+from TemplateFilling import fillFiles
+from PhaseProfiler import profilePhase
 
 # Settings for the parser
 DELIMITER = '%%'
@@ -21,12 +25,17 @@ SOURCE_DIRECTORY = "C_Template"
 #OUTPUT_DIRECTORY = "./"
 
 INCLUDE_FILES = ['utils.h', 'solver.h', 'data_structure.h', 
-                 'data_structure_common.h', 'fact.h', 'parser.h',
-                 'solver_queue.h']
+                 'data_structure_common.h', 'parser.h',
+                 'solver_queue.h', 'output.h']
 
 SOURCE_FILES = ['makefile', 'main.c', 'parser.c',
                 'data_structure_common.c', 'solver.c', 
-                'data_structure.c', 'solver_queue.c']
+                'data_structure.c', 'solver_queue.c', 'output.c']
+
+# The constant of every format of the answers and the extension of its files
+OUTPUT_FORMATS = {'text' : ('OUTPUT_TEXT', ''),
+                  'binary' : ('OUTPUT_BINARY', '.bin'),
+                  'gzip' : ('OUTPUT_GZIP', '.gz')}
 
 EMPTY_LINE = '\n'
 SPACES = ' ' * 4
@@ -39,44 +48,84 @@ GenerationData = None
 # This function returns an iterator to a list containing all the extensional predicates
 # The extensional predicates are stored in the block1 of every stratum. 
 def getExtensionalPredicates():
-    return chain(*map(attrgetter('block1'), map(attrgetter('ordering'), GenerationData.stratums)))
+    return GenerationData.index.extensionalPredicates
 
 # This function returns an itertaror to all the equations contained in the stratums
 def getEquationsFromAllStratums():
-    return chain(*map(attrgetter('equations'), GenerationData.stratums))
+    return GenerationData.index.equations
 
 # This function returns an itertaror to all the views contained in the stratums
 def getViewsFromAllStratums():
-    return map(attrgetter('views'), GenerationData.stratums)
+    return GenerationData.index.views
 
 # Utility functions
 def getPredicateLength(predicate):
-    for eq in getEquationsFromAllStratums():
-        if predicate == eq.leftVariable.id:
-            return len(eq.leftArguments)
-        elif predicate == eq.rightVariable.id:
-            return len(eq.rightArguments)
-        else:
-            for negated_elment in eq.negatedElements:
-                if predicate == negated_elment.id:
-                    return len(negated_elment.arguments)
-            
-    #print "None"
-    return None
+    return GenerationData.index.predicateLengths.get(predicate)
+
+# The format of the answers of a predicate is given by the option Output.<predicate>
+# or by the option Output for all the predicates (text by default)
+def getOutputFormat(predicate):
+    options = GenerationData.compositionStructures
+    return options.get('Output.' + predicate.name, options.get('Output', 'text'))
+
+# With the option Threads=N the variables of every stratum are evaluated by N
+# threads (SolverThreads in solver_queue.c), otherwise this function returns 0
+def getThreads():
+    return int(GenerationData.compositionStructures.get('Threads', 0))
+
+# The node of the root level used by the functions of the data structure. With
+# the option Threads the root level is divided in stripes by the first value
+# (x_1) and every stripe has its own lock.
+def getRootNode():
+    if getThreads():
+        return 'root[DS_STRIPE(x_1)]'
+    return 'root'
+
+# With the option Threads the functions of the data structure are emitted as
+# static functions with the suffix _unlocked. They are called by the function
+# with the original name, emitted by writeDsLockedFunction, which holds the
+# lock of the stripe of the first value or the lock of the set of a solution
+# of length 1.
+def writeDsFunctionHeader(outfile, return_type, name, parameters):
+    if getThreads():
+        outfile.write('static {} {}_unlocked({})'.format(return_type, name, parameters))
+    else:
+        outfile.write('{} {}({})'.format(return_type, name, parameters))
+
+def getDsLock(length, solution=None):
+    if length == 1 and solution is not None:
+        return '&R{}_lock'.format(solution.name)
+    return '&root_locks[DS_STRIPE(x_1)]'
+
+def writeDsLockedFunction(outfile, return_type, name, parameters, lock):
+    spaces = SPACES
+    if not getThreads():
+        return
+    arguments = ', '.join(x.split()[-1] for x in parameters.split(', '))
+    outfile.write('{} {}({}){{\n'.format(return_type, name, parameters))
+    outfile.write('{}pthread_mutex_t *lock = {};\n'.format(spaces, lock))
+    if return_type != 'void':
+        outfile.write('{}{} result;\n'.format(spaces, return_type))
+    outfile.write('\n{}pthread_mutex_lock(lock);\n'.format(spaces))
+    if return_type != 'void':
+        outfile.write('{}result = {}_unlocked({});\n'.format(spaces, name, arguments))
+    else:
+        outfile.write('{}{}_unlocked({});\n'.format(spaces, name, arguments))
+    outfile.write('{}pthread_mutex_unlock(lock);\n'.format(spaces))
+    if return_type != 'void':
+        outfile.write('\n{}return result;\n'.format(spaces))
+    outfile.write('}\n\n')
 
 def getQueryMinimumLength():
-    #return min(len(x.leftArguments) for x in GenerationData.equationsTable if x.type == 2)
-    return min(len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2)
+    return GenerationData.index.queryMinimumLength
 
 def getQueryMaximumLength():
-    #return max(len(x.leftArguments) for x in GenerationData.equationsTable if x.type == 2)
-    return max(len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2)
+    return GenerationData.index.queryMaximumLength
 
 # In order to get the minimum node and the maximum node we have to check the right side
 # of every rule to store the answers and the left side of the rule of type 2
 def getDataStructureNodesMaximumLength():
-    return  max(chain([len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2],
-                      [len(x.rightArguments) for x in getEquationsFromAllStratums()]))
+    return GenerationData.index.dataStructureNodesMaximumLength
 
 # This is a closure to check if we have predicates of type 2, some functions
 # like the ones handling the requests to the data structures should not be 
@@ -87,7 +136,7 @@ def check_for_predicates_of_type2(view_func):
     def _decorator(request, *args, **kwargs):
         response = None
         # Make sure we don't call the function if we don't have predicates of type 2
-        if len([x for x in getEquationsFromAllStratums() if x.type == 2]):
+        if GenerationData.index.type2Equations:
             response = view_func(request, *args, **kwargs)
         return response
     return wraps(view_func)(_decorator)
@@ -97,44 +146,17 @@ def check_for_predicates_of_type2(view_func):
 # The function returns a set of strings, every string represents the name of
 # a predicate having all variables as equal cards.
 def getPredicatesWithAllVariablesBeingTheSameEqualCard():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable.id not in GenerationData.answersToStore) and\
-                len(set(eq.leftArguments)) == 1 and\
-                eq.type == 2:
-            answers.add(eq.leftVariable.id)
-    return answers
+    return GenerationData.index.sameEqualCardPredicates
 
 
 def getPredicatesWithAllVariablesBeingInTheSharedSet():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable not in GenerationData.answersToStore and \
-                eq.type == 2 and
-                len(set(eq.consultingArguments)) == len(eq.commonVariables)):
-            answers.add(eq.consultingPredicate.id)
-    return answers
+    return GenerationData.index.sharedSetPredicates
 
 def getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable.id not in GenerationData.answersToStore and \
-                eq.type == 2):
-            argument_constants = [x for x in eq.consultingArguments if isinstance(x, int) or  
-                                    (isinstance(x, Argument) and x.type == "constant")]
-            
-            if len(eq.consultingArguments) == len(argument_constants):
-                answers.add(eq.consultingPredicate.id)
-                
-    return answers
+    return GenerationData.index.sharedSetIncludingConstantsPredicates
 
 def getNegatedPredicates():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        for negated_element in eq.negatedElements:
-            answers.add(negated_element.id )
-    
-    return answers
+    return GenerationData.index.negatedPredicates
 
 # This function returns the Answers of length 1.
 # An answer of length 1 is:
@@ -142,18 +164,7 @@ def getNegatedPredicates():
 #    A predicate on the head of a rule with length 1.
 #    A negated predicate of length 1
 def getAnswersOfLength_1():
-    answers_of_length_1 = set()
-    predicates_in_rules_of_length_1 = set()
-    for equation in getEquationsFromAllStratums():
-        if len(equation.rightArguments) == 1:
-            answers_of_length_1.add(equation.rightVariable.id)
-        if equation.type == 2 and len(equation.leftArguments) == 1:
-            predicates_in_rules_of_length_1.add(equation.leftVariable.id)
-        for negated_element in equation.negatedElements:
-            if len(negated_element.arguments) == 1:
-                answers_of_length_1.add(negated_element.id)
-                
-    return (answers_of_length_1, predicates_in_rules_of_length_1) 
+    return (GenerationData.index.answersOfLength_1, GenerationData.index.predicatesInRulesOfLength_1) 
 
 
 # This function get the solutions of the Datalog program. It returns a set
@@ -163,33 +174,18 @@ def getAnswersOfLength_1():
 # and all its variables are in the set of the Common variables are required to
 # be considered solutions.
 def getAllSolutions():
-    solutions = set()
-    solutions |= GenerationData.answersToStore
-    solutions |= getPredicatesWithAllVariablesBeingTheSameEqualCard()
-    solutions |= getPredicatesWithAllVariablesBeingInTheSharedSet()
-    solutions |= getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants()
-    solutions |= getNegatedPredicates()
-    return solutions
+    return GenerationData.index.solutions
 
 # This function returns all the identifiers for the identifiers we have to query
 # on the database.
 def getAllConsultingPredicates():
-    return set(eq.consultingPredicate.id for eq in
-                    getEquationsFromAllStratums() if eq.type == 2)
+    return GenerationData.index.consultingPredicates
     
     
 # This function returns a list containing tuples in which the first element
 # is a predicate name and the second element is its length.
 def getAllPredicatesLengths():
-    data = []
-    for eq in getEquationsFromAllStratums():
-        data.append((eq.leftVariable.id,
-                     len(eq.leftArguments)))
-        data.append((eq.rightVariable.id,
-                     len(eq.rightArguments)))
-
-    # Remove duplicates
-    return set(data)
+    return GenerationData.index.predicatesLengths
 
 # utils.h
 def fillProgramName(outfile):
@@ -261,6 +257,9 @@ def fillDataStructureSolutionHeaderFunctions(outfile):
                                                                           ', '.join(ints)))
         outfile.write('extern void Ds_append_solution_{}({});\n'.format(variable_id.name,
                                                                         ', '.join(ints)))
+        if getThreads():
+            outfile.write('extern int  Ds_add_solution_{}({});\n'.format(variable_id.name,
+                                                                          ', '.join(ints)))
     outfile.write('\n')
 
 # solver.c
@@ -284,19 +283,22 @@ def fillOutputTuplesFiles(outfile):
     outputTuples = GenerationData.answersToStore
     
     outfile.write('static char *tuples_output_files[] = {\n')
-    for pos, (pred_name, _) in enumerate(outputTuples):
+    for pos, predicate in enumerate(outputTuples):
+        _, extension = OUTPUT_FORMATS[getOutputFormat(predicate)]
         if pos != len(outputTuples)-1:
-            outfile.write('{}"{}.tuples",\n'.format(spaces_level_1,
-                                                    pred_name))
+            outfile.write('{}"{}.tuples{}",\n'.format(spaces_level_1,
+                                                      predicate.name,
+                                                      extension))
         else:
-            outfile.write('{}"{}.tuples"\n'.format(spaces_level_1,
-                                                   pred_name))
+            outfile.write('{}"{}.tuples{}"\n'.format(spaces_level_1,
+                                                     predicate.name,
+                                                     extension))
     outfile.write('};\n')
     outfile.write('#define OUTPUT_TUPLES_FILES {}\n'.format(len(outputTuples)))
     
-    outfile.write('FILE')
+    outfile.write('OutputFile')
     for pos, (pred_name, _) in enumerate(outputTuples):
-        outfile.write(' *fp_{}'.format(pred_name))
+        outfile.write(' fp_{}'.format(pred_name))
         if pos != len(outputTuples) - 1:
             outfile.write(',')
     outfile.write(';\n')
@@ -344,6 +346,25 @@ def fillPrintAnswer(outfile):
                                                                     variables))
 
 
+# Every answer stored in a file is written by its own function, its values are
+# passed to the OutputFile of the predicate without checking the predicate.
+def fillWriteAnswers(outfile):
+    spaces_level_1 = SPACES
+    
+    for predicate in GenerationData.answersToStore:
+        length = getPredicateLength(predicate)
+        values = ', '.join(['b->VAR_' + str(x) for x in xrange(1, length+1)])
+        
+        outfile.write('void write_answer_{}(OutputFilePtr o, TYPE_REWRITING_VARIABLE *b){{\n'.format(predicate.name))
+        outfile.write('{}unsigned int values[{}] = {{{}}};\n'.format(spaces_level_1,
+                                                                   length,
+                                                                   values))
+        outfile.write('{}OutputFile_write(o, "{}", {}, values, {});\n'.format(spaces_level_1,
+                                                                             predicate.name,
+                                                                             len(predicate.name),
+                                                                             length))
+        outfile.write('}\n\n')
+
 def fillSolverInit(outfile):
     spaces_level_1 = SPACES
 
@@ -358,64 +379,139 @@ def fillSolverInit(outfile):
     outfile.write('\n')
         
     for pos, predicate in enumerate(outputTuples):
-        outfile.write('{}fp_{} = fopen(tuples_output_files[{}], "w+");\n'.format(spaces_level_1,
-                                                                                 predicate[0],
-                                                                                 str(pos)))
-        
-def fillStratumQueueInitializers(outfile):
+        format_constant, _ = OUTPUT_FORMATS[getOutputFormat(predicate)]
+        outfile.write('{}if (!OutputFile_open(&fp_{}, tuples_output_files[{}], {}))\n'.format(spaces_level_1,
+                                                                                              predicate[0],
+                                                                                              str(pos),
+                                                                                              format_constant))
+        outfile.write('{}return false;\n'.format(spaces_level_1 + SPACES))
+        
+# This function returns the extensional predicates whose facts are read at the given
+# stratum level. In the first level the order of the block is honored as the negated
+# predicates must be put first.
+def getStratumFacts(stratum_level):
     extensional = list(getExtensionalPredicates())
     extensional_as_set = set(extensional)
     idToStratumLevels = GenerationData.idToStratumLevels
+    
+    # Create a new dictionary from idToStratumLevels only containing
+    # extensional predicates
+    extensionalToStratumLevels = {k: v for (k,v) in idToStratumLevels.iteritems() if k in extensional_as_set}
+    idsVars = [ idVar for (idVar, levels) in extensionalToStratumLevels.iteritems() if stratum_level in levels ]
+    if (stratum_level == 1):
+        idsVarsSet = set(idsVars)
+        return [ x for x in extensional if x in idsVarsSet ]
+    return idsVars
+
+# With the option Facts=Thread the files of the facts are read by a producer thread
+# (FactsProducer in parser.c) while the solver evaluates the facts already read. The
+# facts of the negated predicates are read before the evaluation starts, as they must
+# be handled before the variables that consult them. This function returns the
+# predicates read by the thread at the given stratum level.
+def getProducedFacts(stratum_level):
+    if GenerationData.compositionStructures.get('Facts') != 'Thread':
+        return []
+    negated = getNegatedPredicates()
+    return [ x for x in getStratumFacts(stratum_level) if x not in negated ]
+
+def fillStratumQueueInitializers(outfile):
+    extensional = list(getExtensionalPredicates())
     number_of_stratums = len(GenerationData.stratums)
     
     spaces_level_1 = SPACES
     spaces_level_2 = SPACES * 2
+    spaces_level_3 = SPACES * 3
     spaces_level_4 = SPACES * 4
-
-    # Create a new dictionary from idToStratumLevels only containing
-    # extensional predicates
-    extensionalToStratumLevels = {k: v for (k,v) in idToStratumLevels.iteritems() if k in extensional_as_set}
+    
+    # The facts read by the producer thread are appended to the queue of the stratum
+    # in chunks, every chunk has facts of only one predicate
+    produced_arities = sorted(set(getPredicateLength(x) for level in xrange(1, number_of_stratums + 1)
+                                                        for x in getProducedFacts(level)))
+    if produced_arities:
+        outfile.write('static FactsProducer facts_producer;\n\n')
+        outfile.write('TYPE_REWRITING_VARIABLE *solver_take_facts(SolverQueuePtr);\n\n')
+        outfile.write('/*\n')
+        outfile.write(' * Appends the next chunk of facts read by the producer thread to the queue, it\n')
+        outfile.write(' * returns the first variable of the queue (NULL when all the facts were read).\n')
+        outfile.write(' */\n')
+        outfile.write('TYPE_REWRITING_VARIABLE *solver_take_facts(SolverQueuePtr queue){\n')
+        outfile.write('{}FactsChunkPtr chunk;\n'.format(spaces_level_1))
+        outfile.write('{}TYPE_REWRITING_VARIABLE VAR;\n'.format(spaces_level_1))
+        outfile.write('{}unsigned int *values;\n'.format(spaces_level_1))
+        outfile.write('{}size_t i;\n\n'.format(spaces_level_1))
+        outfile.write('{}if (!(chunk = FactsProducer_take(&facts_producer)))\n'.format(spaces_level_1))
+        outfile.write('{}return NULL;\n\n'.format(spaces_level_2))
+        outfile.write('{}VAR.PREDICATE = chunk->predicate;\n'.format(spaces_level_1))
+        outfile.write('{}values = chunk->values;\n'.format(spaces_level_1))
+        outfile.write('{}switch (chunk->arity){{\n'.format(spaces_level_1))
+        for length in produced_arities:
+            outfile.write('{}case {}:\n'.format(spaces_level_1,
+                                                length))
+            outfile.write('{}for (i = 0; i < chunk->num_facts; i++, values += {}){{\n'.format(spaces_level_2,
+                                                                                            length))
+            for x in xrange(length):
+                outfile.write('{}VAR.VAR_{} = values[{}];\n'.format(spaces_level_3,
+                                                                     str(x+1), x))
+            outfile.write('{}SolverQueue_append(queue, &VAR);\n'.format(spaces_level_3))
+            outfile.write('{}}}\n'.format(spaces_level_2))
+            outfile.write('{}break;\n'.format(spaces_level_2))
+        outfile.write('{}}}\n'.format(spaces_level_1))
+        outfile.write('{}FactsChunk_free(chunk);\n\n'.format(spaces_level_1))
+        outfile.write('{}return SolverQueue_pop(queue);\n'.format(spaces_level_1))
+        outfile.write('}\n\n')
+    
+    # With the option Threads the facts of the negated predicates, read first, are
+    # evaluated by one thread before the rest of the variables of the stratum
+    if getThreads():
+        outfile.write('static size_t solver_serial_variables;\n\n')
     
     for stratum_level in xrange(1, number_of_stratums + 1):
+        produced = getProducedFacts(stratum_level)
+        if produced:
+            outfile.write('static const int facts_files_level{}[] = {{{}}};\n'.format(stratum_level,
+                                                                                     ', '.join(str(extensional.index(x))
+                                                                                               for x in produced)))
+            outfile.write('static const int facts_arities_level{}[] = {{{}}};\n'.format(stratum_level,
+                                                                                       ', '.join(str(getPredicateLength(x))
+                                                                                                 for x in produced)))
+            outfile.write('static const int facts_predicates_level{}[] = {{{}}};\n\n'.format(stratum_level,
+                                                                                             ', '.join(x.uniqueId
+                                                                                                       for x in produced)))
+        
+        read = [ x for x in getStratumFacts(stratum_level) if x not in produced ]
         outfile.write('int solver_init_stratum_level{}(){{\n'.format(str(stratum_level)))
-        outfile.write('{}FILE *fp;\n'.format(spaces_level_1))
-        outfile.write('{}Fact fact;\n'.format(spaces_level_1))
-        outfile.write('{}TYPE_REWRITING_VARIABLE VAR;\n\n'.format(spaces_level_1))
+        if read:
+            outfile.write('{}FactsFile facts;\n'.format(spaces_level_1))
+            outfile.write('{}unsigned int values[{}];\n'.format(spaces_level_1,
+                                                              max(getPredicateLength(x) for x in read)))
+            outfile.write('{}int result;\n'.format(spaces_level_1))
+            outfile.write('{}TYPE_REWRITING_VARIABLE VAR;\n\n'.format(spaces_level_1))
         
         outfile.write('#ifdef NDEBUG\n')
         outfile.write('{}fprintf(stderr, "STRATUM LEVEL: {}\\n");\n'.format(spaces_level_1,
                                                                             str(stratum_level)))
         outfile.write('#endif\n\n')
+        if getThreads():
+            outfile.write('{}solver_serial_variables = 0;\n\n'.format(spaces_level_1))
         
-        # Get the predicates that belong to the current stratum level
-        idsVars = (idVar for (idVar, levels) in extensionalToStratumLevels.iteritems()
-                                if stratum_level in levels)
-        
-        # If we are in the first of the level we must honor the order of the block
-        # as negated predicates must be put first
-        if (stratum_level == 1):
-            idsVarsSet = set(idsVars)
-            idsVars = ( x for x in extensional if x in idsVarsSet )
-            
-        for idVar in idsVars:
+        # The facts are parsed from the mapped files (FactsFile in parser.c) directly
+        # into the values of the rewriting variables
+        for idVar in read:
             pos = extensional.index(idVar)
             
             length = getPredicateLength(idVar)
         
-            outfile.write('{}fp = fopen(tuples_input_files[{}], "r");\n'.format(spaces_level_1,
-                                                                                pos))
-            outfile.write('{}if (!fp){{\n'.format(spaces_level_1))
-            outfile.write('{}fprintf(stderr, "Error: Can\'t open file %s\\n",'.format(spaces_level_2))
-            outfile.write(' tuples_input_files[{}]);\n'.format(pos))
+            outfile.write('{}if (!FactsFile_open(&facts, tuples_input_files[{}]))\n'.format(spaces_level_1,
+                                                                                           pos))
             outfile.write('{}return false;\n'.format(spaces_level_2))
-            outfile.write('{}}}\n'.format(spaces_level_1))
-            outfile.write('{}while (parser_get_fact(fp, NULL, &fact) == 1){{\n'.format(spaces_level_1))
+            outfile.write('{}while ((result = FactsFile_next(&facts, values, {})) == 1){{\n'.format(spaces_level_1,
+                                                                                                  length))
             outfile.write('{}VAR.PREDICATE = {};\n'.format(spaces_level_2,
                                                            idVar.uniqueId))
             
             for x in xrange(length):
-                outfile.write('{}VAR.VAR_{} = fact.values[{}];\n'.format(spaces_level_2,
-                                                                         str(x+1), x))
+                outfile.write('{}VAR.VAR_{} = values[{}];\n'.format(spaces_level_2,
+                                                                     str(x+1), x))
     
             outfile.write('\n')
             
@@ -437,12 +533,36 @@ def fillStratumQueueInitializers(outfile):
             outfile.write('{}SolverQueue_append(&solver_queue{}, &VAR);\n'.format(spaces_level_2,
                                                                                   str(stratum_level)))
             outfile.write('{}}}\n'.format(spaces_level_1))
-            outfile.write('{}fclose(fp);\n\n'.format(spaces_level_1))
+            outfile.write('{}FactsFile_close(&facts);\n'.format(spaces_level_1))
+            outfile.write('{}if (!result)\n'.format(spaces_level_1))
+            outfile.write('{}return false;\n\n'.format(spaces_level_2))
+            if getThreads() and idVar in getNegatedPredicates():
+                outfile.write('{}solver_serial_variables = solver_queue{}.size;\n\n'.format(spaces_level_1,
+                                                                                           stratum_level))
+        
+        # The rest of the facts are read by the producer thread
+        if produced:
+            outfile.write('{0}if (!FactsProducer_start(&facts_producer, tuples_input_files, facts_files_level{1},\n'.format(spaces_level_1,
+                                                                                                                          stratum_level))
+            outfile.write('{0}facts_arities_level{1}, facts_predicates_level{1}, {2}))\n'.format(spaces_level_1 + ' ' * len('if (!FactsProducer_start('),
+                                                                                              stratum_level,
+                                                                                              len(produced)))
+            outfile.write('{}return false;\n\n'.format(spaces_level_2))
         
         outfile.write('{}return true;\n'.format(spaces_level_1))
         outfile.write('}\n\n')
     
+# With the option Threads the evaluation of every stratum is emitted in its own
+# function (solver_compute_stratumN), called by every thread of the solver with
+# its SolverWorker. Otherwise the stratums are evaluated in solver_compute.
 def fillSolverCompute(outfile):
+    emitSolverCompute(outfile, False)
+
+def fillSolverStratumFunctions(outfile):
+    if getThreads():
+        emitSolverCompute(outfile, True)
+
+def emitSolverCompute(outfile, stratum_functions):
     # This function is used to obtain the index position of the querying argument.
     # The position of the argument has on the query to the database.
     def get_t_index(argument, consulting_arguments, common_variables):
@@ -487,7 +607,7 @@ def fillSolverCompute(outfile):
     #     common_variables -> A list with the common_variables of the equation.
     def compose_expression(expression, consulting_arguments, common_variables):
         if isinstance(expression, int):
-            return "current->b.VAR_{}".format(expression)
+            return "current->VAR_{}".format(expression)
         elif isinstance(expression, Argument) and expression.type == 'constant':
             return str(expression.value)
         elif isinstance(expression, Argument) and expression.type == 'variable':
@@ -500,7 +620,7 @@ def fillSolverCompute(outfile):
                     
             for x in xrange(2):
                 if isinstance(args[x], int):
-                    emitting_code += "current->b.VAR_{}".format(args[x])
+                    emitting_code += "current->VAR_{}".format(args[x])
                 elif isinstance(args[x], Argument):
                     if args[x].type == "constant":
                         emitting_code += str(args[x].value)
@@ -533,6 +653,7 @@ def fillSolverCompute(outfile):
     # idToStratumLevels -> A dictionary. The dictionary is a mapping between the identifiers and
     #                      the stratum level they belong.
     def common_block(spaces, equation, level, num_of_stratums, idToStratumLevels):
+        stratum_level = level
         # Do we have to store the answer??
         if equation.rightVariable.id in answersToStore:
             variable_id = equation.rightVariable.id
@@ -540,13 +661,22 @@ def fillSolverCompute(outfile):
             args = ', '.join('VAR.VAR_{}'.format(x) for 
                             x in xrange(1, len(equation.rightArguments)+1))
             
-            outfile.write('\n{}if (!Ds_contains_solution_{}({})'.format(spaces,
-                                                                        variable_id.name,
-                                                                        args))
+            # With the option Threads the solution is checked and appended at once
+            # (Ds_add_solution), after the rest of the conditions
+            if stratum_functions:
+                outfile.write('\n{}if ('.format(spaces))
+                separator = ''
+            else:
+                outfile.write('\n{}if (!Ds_contains_solution_{}({})'.format(spaces,
+                                                                            variable_id.name,
+                                                                            args))
+                separator = ' &&'
             
             if equation.booleanExpressions:
-                outfile.write( ' &&\n{0}{1}/* Boolean expression conditions */\n{0}{1}'.format(spaces,
-                                                                                               '    '))
+                outfile.write( '{0}\n{1}{2}/* Boolean expression conditions */\n{1}{2}'.format(separator,
+                                                                                             spaces,
+                                                                                             '    '))
+                separator = ' &&' 
                 boolean_expressions_str = ''
                 for p1, (_, b_args, b_op) in enumerate(equation.booleanExpressions):
                     boolean_expression_str = ''
@@ -572,8 +702,10 @@ def fillSolverCompute(outfile):
                 outfile.write(boolean_expressions_str)
             
             if equation.negatedElements:
-                outfile.write( ' && \n{0}{1}/* Negated predicates */'.format(spaces,
-                                                                             '    '))
+                outfile.write( '{0} \n{1}{2}/* Negated predicates */'.format(separator,
+                                                                           spaces,
+                                                                           '    '))
+                separator = ' &&'
             
             for (pos, negated_element) in enumerate(equation.negatedElements):
                 negated_arguments_str = []
@@ -585,7 +717,7 @@ def fillSolverCompute(outfile):
                         found = False
                         for argument, position in equation.leftArguments:
                             if negated_arg == argument:
-                                negated_arguments_str.append('current->b.VAR_{}'.format(position))
+                                negated_arguments_str.append('current->VAR_{}'.format(position))
                                 found = True
                                 break
                         if not found and equation.type == 2:
@@ -606,6 +738,15 @@ def fillSolverCompute(outfile):
                                                                           negated_arguments))
                 if (pos != len(equation.negatedElements) - 1):
                     outfile.write(' &&')
+            if stratum_functions and separator:
+                outfile.write('{}\n{}{}Ds_add_solution_{}({})'.format(separator,
+                                                                      spaces,
+                                                                      '    ',
+                                                                      variable_id.name,
+                                                                      args))
+            elif stratum_functions:
+                outfile.write('Ds_add_solution_{}({})'.format(variable_id.name,
+                                                             args))
             spaces += SPACES
             outfile.write('){\n')
             outfile.write('#ifdef NDEBUG\n')
@@ -624,23 +765,35 @@ def fillSolverCompute(outfile):
             # contains the required information to emit the code. It takes as a key a variable_id and returns
             # the queue levels in which is required.
             for queue_level in idToStratumLevels[variable_id]:
-                outfile.write('{}SolverQueue_append(&solver_queue{}, &VAR);\n'.format(spaces, str(queue_level)))
-            outfile.write('{}Ds_append_solution_{}({});\n'.format(spaces,
-                                                                  variable_id.name,
-                                                                  args))
+                write_append(spaces, stratum_level, queue_level)
+            if not stratum_functions:
+                outfile.write('{}Ds_append_solution_{}({});\n'.format(spaces,
+                                                                      variable_id.name,
+                                                                      args))
             spaces = spaces[:-len(SPACES)]
             outfile.write('{}'.format(spaces))
             outfile.write('}\n')
         else:
-            outfile.write('{}SolverQueue_append(&solver_queue1, &VAR);\n'.format(spaces))
+            write_append(spaces, stratum_level, 1)
+    
+    # The variables of the stratum being evaluated by a thread are appended to its
+    # SolverWorker, the ones of other stratums are appended to their queues
+    def write_append(spaces, stratum_level, queue_level):
+        if not stratum_functions:
+            outfile.write('{}SolverQueue_append(&solver_queue{}, &VAR);\n'.format(spaces, str(queue_level)))
+        elif queue_level == stratum_level:
+            outfile.write('{}SolverWorker_append(worker, &VAR);\n'.format(spaces))
+        else:
+            outfile.write('{}SolverWorker_append_to(worker, &solver_queue{}, &VAR);\n'.format(spaces,
+                                                                                             str(queue_level)))
             
     #equationsTable = GenerationData.equationsTable
     #predsToViewNames = GenerationData.viewsData.predsToViewNames
-    predsToViewNames = dict(chain(*[ view.predsToViewNames.items() for view in getViewsFromAllStratums() ]))
+    predsToViewNames = GenerationData.index.predsToViewNames
     #viewNamesToCombinations = GenerationData.viewsData.viewNamesToCombinations
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     #aliasToViewNames = GenerationData.viewsData.aliasToViewNames
-    aliasToViewNames = dict(chain(*[ view.aliasToViewNames.items() for view in getViewsFromAllStratums() ]))
+    aliasToViewNames = GenerationData.index.aliasToViewNames
     answersToStore = GenerationData.answersToStore
     printVariables = GenerationData.printVariables
     outputTuples = GenerationData.answersToStore
@@ -653,18 +806,42 @@ def fillSolverCompute(outfile):
 
     # Here we emit code to handle the different stratums in the solver_compute function
     for level, stratum in enumerate(GenerationData.stratums, start=1):
-        outfile.write('{}/*Stratum {}*/\n'.format(spaces_level_1,
-                                                  level))
-        outfile.write('{}solver_init_stratum_level{}();\n'.format(spaces_level_1,
-                                                                  str(level)))
+        # With the option Threads the stratum is evaluated by the threads of the solver
+        if stratum_functions:
+            outfile.write('static void solver_compute_stratum{}(SolverWorkerPtr worker){{\n'.format(level))
+            fillIntList(outfile, stratum.equations)
+            outfile.write('{}TYPE_REWRITING_VARIABLE *current;\n'.format(spaces_level_1))
+            outfile.write('{}TYPE_REWRITING_VARIABLE VAR;\n\n'.format(spaces_level_1))
+            outfile.write('{}while ((current = SolverWorker_pop(worker))){{\n'.format(spaces_level_1))
+        else:
+            outfile.write('{}/*Stratum {}*/\n'.format(spaces_level_1,
+                                                      level))
+            outfile.write('{}if (!solver_init_stratum_level{}())\n'.format(spaces_level_1,
+                                                                           str(level)))
+            outfile.write('{}return false;\n'.format(spaces_level_2))
+        if getThreads() and not stratum_functions:
+            outfile.write('{}if (!SolverThreads_run(&solver_queue{}, solver_serial_variables, solver_compute_stratum{}))\n'.format(spaces_level_1,
+                                                                                                                                   level,
+                                                                                                                                   level))
+            outfile.write('{}return false;\n'.format(spaces_level_2))
+            continue
         # THIS HAS TO BE PRINTED IF WE WORK WITH THE SOLVER QUEUE BASED IN ONE QUEUE
         #outfile.write('{}while (solver_queue{}.head){{\n'.format(spaces_level_1,
         #                                                         str(level)))
         #outfile.write('{}current = solver_queue{}.head;\n\n'.format(spaces_level_2,
         #                                                            str(level)))
         # THIS HAS TO BE PRINTED IF WE WORK WITH THE SOLVER QUEUE BASED IN TWO QUEUES
-        outfile.write('{}while ((current = SolverQueue_pop(&solver_queue{}))){{\n'.format(spaces_level_1,
-                                                                                          str(level)))
+        # The chunks of the producer thread are taken when the queue is empty
+        if stratum_functions:
+            pass
+        elif getProducedFacts(level):
+            outfile.write('{0}while ((current = SolverQueue_pop(&solver_queue{1})) ||\n'.format(spaces_level_1,
+                                                                                             str(level)))
+            outfile.write('{0}(current = solver_take_facts(&solver_queue{1}))){{\n'.format(spaces_level_1 + ' ' * len('while ('),
+                                                                                        str(level)))
+        else:
+            outfile.write('{}while ((current = SolverQueue_pop(&solver_queue{}))){{\n'.format(spaces_level_1,
+                                                                                              str(level)))
         
         block1 = stratum.ordering.block1
         block2 = stratum.ordering.block2
@@ -672,9 +849,9 @@ def fillSolverCompute(outfile):
     
         for variable_id in chain(block1, block2, block3):
             # Get the equation of the predicate raise an exception if not found
-            equations = (x for x in getEquationsFromAllStratums() if x.leftVariable.id == variable_id)
+            equations = GenerationData.index.equationsByLeftVariable.get(variable_id, [])
     
-            outfile.write('{}if (current->b.PREDICATE == {})'.format(spaces_level_2,
+            outfile.write('{}if (current->PREDICATE == {})'.format(spaces_level_2,
                                                                      variable_id.uniqueId))
             outfile.write('{\n')
 
@@ -688,19 +865,20 @@ def fillSolverCompute(outfile):
             level_to_store_answer = sorted(idToStratumLevels[variable_id])[0]
             # Do we have to print the variable to stdout?.
             if level == level_to_store_answer and variable_id in printVariables:
-                outfile.write("{}print_answer(stdout, &current->b);\n".format(spaces_level_3))
+                outfile.write("{}print_answer(stdout, current);\n".format(spaces_level_3))
                 
             # Is it a solution? Then print it to a file.
             if level == level_to_store_answer and variable_id in outputTuples:
-                outfile.write("{}print_answer(fp_{}, &current->b);\n".format(spaces_level_3,
-                                                                             variable_id.name))
+                outfile.write("{}write_answer_{}(&fp_{}, current);\n".format(spaces_level_3,
+                                                                                 variable_id.name,
+                                                                                 variable_id.name))
             
             # Debug information
             pred_length = getPredicateLength(variable_id)
             outfile.write('#ifdef NDEBUG\n')
             formatting = ', '.join(['%i' for _ in xrange(pred_length)])
             separator = ',\n{}'.format(spaces_level_5)
-            args = separator.join(('current->b.VAR_{}'.format(str(x+1)) for x in xrange(pred_length)))
+            args = separator.join(('current->VAR_{}'.format(str(x+1)) for x in xrange(pred_length)))
             output_string = '{}fprintf(stderr, "Handling rewriting '.format(spaces_level_3) +\
                             'variable: X_{}'.format(variable_id.name) +\
                             '({})\\n",\n{}{});\n'.format(formatting,
@@ -723,10 +901,10 @@ def fillSolverCompute(outfile):
                 # treated as such. Otherwise we insert a value into the list as normal
                 if (level == level_to_store_answer) and (pred_length == 1):
                     outfile.write('{}fprintf(stderr, "\\tData structure: '.format(spaces_level_3))
-                    outfile.write('Adding solution {}(%i)\\n", current->b.VAR_1);\n'.format(variable_id.name))
+                    outfile.write('Adding solution {}(%i)\\n", current->VAR_1);\n'.format(variable_id.name))
                 elif (level == level_to_store_answer):
                     for view in predsToViewNames[variable_id]:
-                        args = ', '.join('current->b.VAR_{}'.format(x) for
+                        args = ', '.join('current->VAR_{}'.format(x) for
                                          x in viewNamesToCombinations[view])
                         formatting = ', '.join(('%i' for _ in viewNamesToCombinations[view]))
       
@@ -748,23 +926,21 @@ def fillSolverCompute(outfile):
                 # 1 we have to add directly the solution, as by convention there is no level node of length 0
                 # and the predicates of length 1 are turned into solutions
                 if (level == level_to_store_answer) and (pred_length == 1):
-                    outfile.write('{}Ds_append_solution_{}(current->b.VAR_1);\n'.format(spaces_level_3,
+                    outfile.write('{}Ds_append_solution_{}(current->VAR_1);\n'.format(spaces_level_3,
                                                                                         variable_id.name))
                     # If the variable only appears as a negated predicate we don't have to insert it to the database
                     if variable_id in getAllConsultingPredicates():
-                        outfile.write('{}Ds_insert_1(current->b.VAR_1);\n\n'.format(spaces_level_3))
+                        outfile.write('{}Ds_insert_1(current->VAR_1);\n\n'.format(spaces_level_3))
                 elif (level == level_to_store_answer):
                     for view in predsToViewNames[variable_id]:
-                        args = ', '.join('current->b.VAR_{}'.format(x) for
+                        args = ', '.join('current->VAR_{}'.format(x) for
                                          x in viewNamesToCombinations[view])
                         
                         # If the identifier pertains to the solutions we have to append it as a solution
                         # to the database. Checking the getAllSolutions function to know what it is considered
                         # to be a solution will raise an error on the evaluation of some programs due to equal
                         # cards.
-                        if variable_id in getPredicatesWithAllVariablesBeingInTheSharedSet() |\
-                                          getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants()|\
-                                          getNegatedPredicates():
+                        if variable_id in GenerationData.index.appendedSolutions:
                             outfile.write('{}Ds_append_solution_{}({});\n'.format(spaces_level_3,
                                                                                   variable_id.name,
                                                                                   args))
@@ -797,7 +973,7 @@ def fillSolverCompute(outfile):
                         
                         outfile.write('{}if ('.format(spaces))
                         for pos, l in enumerate(lists_of_duplicated_vars):
-                            t = ['current->b.VAR_{}'.format(x) for x in l]
+                            t = ['current->VAR_{}'.format(x) for x in l]
                             outfile.write('{}'.format(' == '.join(t)))
                             if pos != len(lists_of_duplicated_vars)-1:
                                 outfile.write(' &&\n{}   '.format(spaces))
@@ -808,7 +984,7 @@ def fillSolverCompute(outfile):
                             outfile.write('{}if ('.format(spaces))
                             
                         for pos, elem in enumerate(argument_constants_left_side):
-                            outfile.write('current->b.VAR_{} == {}'.format(elem[1], 
+                            outfile.write('current->VAR_{} == {}'.format(elem[1], 
                                                                            str(elem[0].value)))
                             if pos != len(argument_constants_left_side)-1:
                                 outfile.write(' &&\n{}   '.format(spaces))
@@ -913,7 +1089,7 @@ def fillSolverCompute(outfile):
                         outfile.write('{}if('.format(spaces))
 
                         for pos, l in enumerate(lists_of_duplicated_vars):
-                            t = ['current->b.VAR_{}'.format(x) for x in l]
+                            t = ['current->VAR_{}'.format(x) for x in l]
                             outfile.write('{}'.format(' == '.join(t)))
                             if pos != len(lists_of_duplicated_vars)-1:
                                 outfile.write(' &&\n{}   '.format(spaces))
@@ -921,7 +1097,7 @@ def fillSolverCompute(outfile):
                             outfile.write(' &&\n{}   '.format(spaces))
                                                 
                             for pos, elem in enumerate(argument_constants_left_side):
-                                outfile.write('current->b.VAR_{} == {}'.format(elem[1], 
+                                outfile.write('current->VAR_{} == {}'.format(elem[1], 
                                                                                str(elem[0].value)))
                                 if pos != len(argument_constants_left_side)-1:
                                     outfile.write(' &&\n{}   '.format(spaces))
@@ -933,19 +1109,21 @@ def fillSolverCompute(outfile):
                         # the same equal card. We check that if turning the list of leftArguments into a set the
                         # length is 1.
                         if len(set(equation.leftArguments)) == 1:
-                            args = ['current->b.VAR_{}'.format(x) for x in l]
-                            outfile.write("{}if (!Ds_contains_solution_{}({})){{\n".format(spaces,
-                                                                                           equation.leftVariable.id.name,
-                                                                                           ", ".join(args)))
+                            args = ['current->VAR_{}'.format(x) for x in l]
+                            outfile.write("{}if ({}_solution_{}({})){{\n".format(spaces,
+                                                                                 'Ds_add' if stratum_functions else '!Ds_contains',
+                                                                                 equation.leftVariable.id.name,
+                                                                                 ", ".join(args)))
                             spaces += SPACES
                             outfile.write("#ifdef NDEBUG\n")
                             outfile.write("{}fprintf(stderr, \"\\tAdding solution -> \");\n".format(spaces))
-                            outfile.write("{}print_rewriting_variable(stderr, &current->b);\n".format(spaces))
+                            outfile.write("{}print_rewriting_variable(stderr, current);\n".format(spaces))
                             outfile.write("{}fprintf(stderr, \"\\n\");\n".format(spaces))
                             outfile.write("#endif\n")
-                            outfile.write("{}Ds_append_solution_{}({});\n".format(spaces,
-                                                                                  equation.leftVariable.id.name,
-                                                                                  ", ".join(args)))
+                            if not stratum_functions:
+                                outfile.write("{}Ds_append_solution_{}({});\n".format(spaces,
+                                                                                      equation.leftVariable.id.name,
+                                                                                      ", ".join(args)))
                             spaces = spaces[:-len(SPACES)]
                             outfile.write("{}}}\n".format(spaces))
                     
@@ -953,7 +1131,7 @@ def fillSolverCompute(outfile):
                         outfile.write('{}if('.format(spaces))
                         
                         for pos, elem in enumerate(argument_constants_left_side):
-                            outfile.write('current->b.VAR_{} == {}'.format(elem[1],
+                            outfile.write('current->VAR_{} == {}'.format(elem[1],
                                                                            str(elem[0].value)))
                             if pos != len(argument_constants_left_side)-1:
                                 outfile.write(' &&\n{}   '.format(spaces))
@@ -989,7 +1167,7 @@ def fillSolverCompute(outfile):
                         # We don't have equal cards in the set of common variables, we just iterate over the set
                         # emitting code appropriately. 
                         if not equal_cards_query_common_vars:
-                            args_common = ', '.join(['current->b.VAR_{}'.format(str(x[1])) for x in equation.commonVariables])
+                            args_common = ', '.join(['current->VAR_{}'.format(str(x[1])) for x in equation.commonVariables])
                             #int_length = commonVars_len + len(argument_constants_consulting_values)
                             int_length = commonVars_len + len(argument_constants_consulting_values)
                         # Here we have equal cards in the set of common variables there fore we need to check which is 
@@ -999,7 +1177,7 @@ def fillSolverCompute(outfile):
                             # list
                             number_of_common_vars = sum(1 for x in equation.consultingArguments if isinstance(x, int))
                                                      
-                            args_common = ', '.join(['current->b.VAR_{}'.format(str(x))
+                            args_common = ', '.join(['current->VAR_{}'.format(str(x))
                                                      for x in equation.consultingArguments[:number_of_common_vars]])
                                 
                             #int_length = number_of_common_vars + len(argument_constants_consulting_values)
@@ -1207,11 +1385,12 @@ def fillSolverCompute(outfile):
                     outfile.write('{}}}\n'.format(spaces))
 
             outfile.write('{}}}\n\n'.format(spaces_level_2))
-        # THIS HAS TO BE PRINTED IF WE WORK WITH THE SOLVER QUEUE BASED IN ONE QUEUE
-        #outfile.write('{0}solver_queue{1}.head = solver_queue{1}.head->next;\n'.format(spaces_level_2,
-        #                                                                               str(level)))
-        outfile.write('{}free(current);\n'.format(spaces_level_2))
         outfile.write('{}}}\n'.format(spaces_level_1))
+        if stratum_functions:
+            outfile.write('}\n\n')
+        if getProducedFacts(level):
+            outfile.write('{}if (!FactsProducer_finish(&facts_producer))\n'.format(spaces_level_1))
+            outfile.write('{}return false;\n'.format(spaces_level_2))
         
 # In this function we emit code to close the file descriptors opened before
 # to store the answers in files. The file descriptor is called fp_{} plus the
@@ -1223,9 +1402,17 @@ def fillSolverFree(outfile):
     spaces_level_1 = SPACES
 
     for predicate in outputTuples:
-        outfile.write('{}fclose(fp_{});\n'.format(spaces_level_1,
-                                                  predicate[0]))
+        outfile.write('{}OutputFile_close(&fp_{});\n'.format(spaces_level_1,
+                                                             predicate[0]))
         
+    # The statistics of the queues are printed when the environment variable
+    # SOLVER_QUEUE_STATISTICS is set
+    outfile.write('\n{}if (getenv("SOLVER_QUEUE_STATISTICS")){{\n'.format(spaces_level_1))
+    for queue_number in xrange(1, number_of_stratums+1):
+        outfile.write('{}SolverQueue_print_statistics(stderr, {}, &solver_queue{});\n'.format(spaces_level_1 * 2,
+                                                                                            queue_number,
+                                                                                            queue_number))
+    outfile.write('{}}}\n'.format(spaces_level_1))
     outfile.write('\n{}Ds_free();\n'.format(spaces_level_1))
     for queue_number in xrange(1, number_of_stratums+1):
         outfile.write('{}SolverQueue_free(&solver_queue{});\n'.format(spaces_level_1,
@@ -1233,19 +1420,26 @@ def fillSolverFree(outfile):
     #outfile.write('{}Mem_free();\n'.format(spaces_level_1))
 
 @check_for_predicates_of_type2
-def fillIntList(outfile):
+def fillIntList(outfile, equations=None):
     #equationsTable = GenerationData.equationsTable
     spaces_level_1 = SPACES
     
+    # With the option Threads the variables are declared in the function of every
+    # stratum, only for its equations
+    if equations is None:
+        equations = getEquationsFromAllStratums()
+    if not any(x.type == 2 for x in equations):
+        return
+    
     # Check if there is a rule without common variables if that is the case we
     # need to iterate over the first level of the data structure at some point
     # and we need an extra variable to deal with it as we don't store list
     # of integers for the first level.
-    requires_t0 = any(len(x.commonVariables) == 0 for x in getEquationsFromAllStratums() if x.type == 2)
+    requires_t0 = any(len(x.commonVariables) == 0 for x in equations if x.type == 2)
     # Obtain the number of variables we have to iterate over to generate new 
     # answers. That value is the number of variables in the consulting values list
     length = max(len(filter(lambda y: isinstance(y, Argument) and y.type == 'variable', x.consultingArguments)) 
-                    for x in getEquationsFromAllStratums() if x.type == 2)
+                    for x in equations if x.type == 2)
     
     # In case there is a rule with no common variables
     if requires_t0:
@@ -1255,14 +1449,14 @@ def fillIntList(outfile):
         # if that is the case then we have to subtract 1 to the value as we are already 
         # using t0. 
         no_cvars_max_length = max(len(filter(lambda y: isinstance(y, Argument) and y.type == 'variable', x.consultingArguments)) 
-                                  for x in getEquationsFromAllStratums() if x.type == 2 and len(x.commonVariables) == 0)
+                                  for x in equations if x.type == 2 and len(x.commonVariables) == 0)
         
         # At this point we now there are rules with no common variables but might be the case that there are no rules
         # with common variables so we have to make sure we can execute max on the sequence as it throws an exception if
         # it is run on an empty sequence
         cvars_max_length = 0
         cvars_max_length_list = [len(filter(lambda y: isinstance(y, Argument) and y.type == 'variable', x.consultingArguments)) 
-                                  for x in getEquationsFromAllStratums() if x.type == 2 and len(x.commonVariables)]
+                                  for x in equations if x.type == 2 and len(x.commonVariables)]
         if len(cvars_max_length_list):
             cvars_max_length = max(cvars_max_length_list)
         
@@ -1285,6 +1479,15 @@ def fillIntList(outfile):
             outfile.write('{}uIntListStackNodePtr {};\n'.format(spaces_level_1,
                                                                 args))
 
+# The variables of solver_compute, with the option Threads they are declared
+# in the function of every stratum
+def fillSolverComputeVariables(outfile):
+    if getThreads():
+        return
+    fillIntList(outfile)
+    outfile.write('{}TYPE_REWRITING_VARIABLE *current;\n'.format(SPACES))
+    outfile.write('{}TYPE_REWRITING_VARIABLE VAR;\n\n'.format(SPACES))
+
 def fillDataStructureLevelNodes(outfile):
     # Auxiliar clousure function name to get the name of the structure to be used to represent the set leaf
     def get_set_leaf_structure_name():
@@ -1292,6 +1495,7 @@ def fillDataStructureLevelNodes(outfile):
         elif GenerationData.compositionStructures['Sets'] == 'BitMap': return 'BitMap'
         elif GenerationData.compositionStructures['Sets'] == 'AVLTree': return 'AVLTree'
         elif GenerationData.compositionStructures['Sets'] == 'BTree': return 'BTreeSet'
+        elif GenerationData.compositionStructures['Sets'] == 'ART': return 'ARTSet'
         else: return 'UNKNOWN'
     # Auxiliar clousure function name to get the name of the structure to be used to represent the successors list
     def get_successors_structure_name():
@@ -1302,7 +1506,7 @@ def fillDataStructureLevelNodes(outfile):
     #equationsTable = GenerationData.equationsTable
     #viewNamesToCombinations = GenerationData.viewsData.viewNamesToCombinations
     answersToStore = GenerationData.answersToStore
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     
     spaces_level_1 = SPACES
 
@@ -1373,15 +1577,21 @@ def fillDataStructureLevelNodes(outfile):
             elif GenerationData.compositionStructures['Paths'] == 'BTree':
                 outfile.write('{}BTree level{};\n'.format(spaces_level_1,
                                                           length+1))
+            elif GenerationData.compositionStructures['Paths'] == 'ART':
+                outfile.write('{}ART level{};\n'.format(spaces_level_1,
+                                                        length+1))
             
             
             
         outfile.write('};\n')
         outfile.write('typedef struct DsData_Level_{0} DsData_{0};\n\n'.format(length))
+        # With the option Threads every thread allocates the nodes in its own arena
+        outfile.write('static {1}Arena DsData_Level_{0}_arena = ARENA_INITIALIZER(DsData_{0});\n\n'.format(length,
+                      'ARENA_THREAD_LOCAL ' if getThreads() else ''))
         
         outfile.write('DsData_{0} * DsData_Level_{0}_new_node();\n'.format(length))
         outfile.write('void DsData_Level_{0}_init(DsData_{0} *);\n'.format(length))
-        if GenerationData.compositionStructures['Paths'] == 'BTree':
+        if GenerationData.compositionStructures['Paths'] in ('BTree', 'ART'):
             outfile.write('void DsData_Level_{0}_free(size_t);\n'.format(length))
         else:
             outfile.write('void DsData_Level_{0}_free(DsData_{0} *);\n'.format(length))
@@ -1396,13 +1606,14 @@ def fillDataStructureInsertFunctions(outfile):
         spaces_level_2 = SPACES * 2
         spaces_level_3 = SPACES * 3
         
-        outfile.write('void Ds_insert_1(int x_1){\n')
+        writeDsFunctionHeader(outfile, 'void', 'Ds_insert_1', 'int x_1')
+        outfile.write('{\n')
         
         if GenerationData.compositionStructures['Paths'] == 'Judy':
             outfile.write('{}Word_t * PValue1;\n\n'.format(spaces_level_1))
-            outfile.write('{}if (!(JLG(PValue1, root, x_1))){{\n'.format(spaces_level_1))
+            outfile.write('{}if (!(JLG(PValue1, {}, x_1))){{\n'.format(spaces_level_1, getRootNode()))
     
-            outfile.write('{}JLI(PValue1, root, x_1);\n'.format(spaces_level_2))
+            outfile.write('{}JLI(PValue1, {}, x_1);\n'.format(spaces_level_2, getRootNode()))
             outfile.write('{}if (PValue1 == PJERR){{\n'.format(spaces_level_2))
     
             outfile.write('{}fprintf(stderr, "Solver: Error allocating '.format(spaces_level_3))
@@ -1418,19 +1629,22 @@ def fillDataStructureInsertFunctions(outfile):
     
             outfile.write('{}}}\n'.format(spaces_level_1))
         
-        elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-          GenerationData.compositionStructures['Paths'] == 'BTree':
+        elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
             function_name = 'HashTable'
             ampersand = '&'
             if GenerationData.compositionStructures['Paths'] == 'BTree':
                 function_name = 'BTree'
                 ampersand = ''
+            elif GenerationData.compositionStructures['Paths'] == 'ART':
+                function_name = 'ART'
 
             outfile.write('{}Cell * c_1;\n\n'.format(spaces_level_1))
-            outfile.write('{}if (!(c_1 = {}_Lookup({}root, x_1))){{\n'.format(spaces_level_1, 
-                                                                              function_name,
-                                                                              ampersand))
-            outfile.write('{}c_1 = {}_Insert(&root, x_1);\n'.format(spaces_level_2, function_name))
+            outfile.write('{}if (!(c_1 = {}_Lookup({}{}, x_1))){{\n'.format(spaces_level_1, 
+                                                                            function_name,
+                                                                            ampersand,
+                                                                            getRootNode()))
+            outfile.write('{}c_1 = {}_Insert(&{}, x_1);\n'.format(spaces_level_2, function_name,
+                                                                   getRootNode()))
             
             if getDataStructureNodesMaximumLength() > 1:
                 outfile.write('{}c_1->value = (size_t) DsData_Level_2_new_node();\n'.format(spaces_level_2))
@@ -1442,6 +1656,9 @@ def fillDataStructureInsertFunctions(outfile):
             raise KeyError('Unknown data structure to represent the paths')
         
         outfile.write('}\n')
+        if getThreads():
+            outfile.write('\n')
+        writeDsLockedFunction(outfile, 'void', 'Ds_insert_1', 'int x_1', getDsLock(1))
             
         
     # Auxiliar clousure function name to get the name of the structure to be used to represent the successors list
@@ -1473,29 +1690,26 @@ def fillDataStructureInsertFunctions(outfile):
             print_code_for_Ds_insert_1()
             continue
 
-        args_to_function = ('int x_{}'.format(str(v+1)) for v in xrange(length))
-        outfile.write('void Ds_insert_{}(int pos, {})'.format(length,
-                                                              ", ".join(args_to_function)))
+        parameters = 'int pos, ' + ', '.join('int x_{}'.format(str(v+1)) for v in xrange(length))
+        writeDsFunctionHeader(outfile, 'void', 'Ds_insert_{}'.format(length), parameters)
         outfile.write('{\n')
 
         if GenerationData.compositionStructures['Paths'] == 'Judy':
             values = ('* PValue{}'.format(str(v+1)) for v in xrange(length-1))
             outfile.write('{}Word_t {};\n\n'.format(spaces_level_1,
                                                     ', '.join(values)))
-        elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-          GenerationData.compositionStructures['Paths'] == 'BTree':
+        elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
             values = ('* c_{}'.format(str(v+1)) for v in xrange(length-1))
             outfile.write('{}Cell {};\n\n'.format(spaces_level_1,
                                                   ', '.join(values)))
         
         for x in xrange(1, length):
             if x == 1:
-                node = 'root'
+                node = getRootNode()
             else:
                 if GenerationData.compositionStructures['Paths'] == 'Judy':
                     node = '((DsData_{} *) *PValue{})->level{}'.format(x, x-1, x+1)
-                elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-                  GenerationData.compositionStructures['Paths'] == 'BTree':
+                elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                     node = '((DsData_{} *) c_{}->value)->level{}'.format(x, x-1, x+1)
             
             if GenerationData.compositionStructures['Paths'] == 'Judy':
@@ -1507,6 +1721,9 @@ def fillDataStructureInsertFunctions(outfile):
             elif GenerationData.compositionStructures['Paths'] == 'BTree':
                 outfile.write('{0}if (!(c_{1} = BTree_Lookup({2}, x_{1})))'.format(spaces_level_1, x,
                                                                                    node))
+            elif GenerationData.compositionStructures['Paths'] == 'ART':
+                outfile.write('{0}if (!(c_{1} = ART_Lookup(&{2}, x_{1})))'.format(spaces_level_1, x,
+                                                                                  node))
                 
             outfile.write('{\n')
 
@@ -1525,11 +1742,12 @@ def fillDataStructureInsertFunctions(outfile):
                 outfile.write('}\n')
                 outfile.write('{}(*PValue{}) = ((Word_t) DsData_Level_{}_new_node());\n'.format(spaces_level_2,
                                                                                                  x, x+1))
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 structure_name = 'HashTable'
                 if GenerationData.compositionStructures['Paths'] == 'BTree':
                     structure_name = 'BTree'
+                elif GenerationData.compositionStructures['Paths'] == 'ART':
+                    structure_name = 'ART'
 
                 outfile.write('{0}c_{1} = {2}_Insert(&{3}, x_{1});\n'.format(spaces_level_2, x,
                                                                              structure_name, node))
@@ -1544,8 +1762,7 @@ def fillDataStructureInsertFunctions(outfile):
             returning_node = ''
             if GenerationData.compositionStructures['Paths'] == 'Judy':
                 returning_node = '*PValue{}'.format(x-1)
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 returning_node = 'c_{}->value'.format(x-1)
                 
             outfile.write('{}{}(&((DsData_{} *)'.format(spaces_level_1, 
@@ -1554,6 +1771,7 @@ def fillDataStructureInsertFunctions(outfile):
             outfile.write(' {})->m[pos], x_{});\n'.format(returning_node, x))
             
         outfile.write('}\n\n')
+        writeDsLockedFunction(outfile, 'void', 'Ds_insert_{}'.format(length), parameters, getDsLock(length))
 
 @check_for_predicates_of_type2        
 def fillDataStructureGetIntListFunctions(outfile):
@@ -1586,10 +1804,9 @@ def fillDataStructureGetIntListFunctions(outfile):
     # xrange functions goes to length - 1. We start in 1 as the 0 value is
     # reserved in the template to retrieve the values of the root.
     for length in xrange(1, length+1):
-        args_to_function = ('int x_{}'.format(str(v+1)) for v in xrange(length))
-        outfile.write('{} Ds_get_intList_{}(int pos, {})'.format(get_successors_structure_name(),
-                                                                 length,
-                                                                 ", ".join(args_to_function)))
+        parameters = 'int pos, ' + ', '.join('int x_{}'.format(str(v+1)) for v in xrange(length))
+        writeDsFunctionHeader(outfile, get_successors_structure_name(), 'Ds_get_intList_{}'.format(length),
+                              parameters)
         outfile.write('{\n')
         spaces = SPACES
         
@@ -1597,32 +1814,31 @@ def fillDataStructureGetIntListFunctions(outfile):
             values = ('* PValue{}'.format(str(v+1)) for v in xrange(length))
             outfile.write('{}Word_t {};\n\n'.format(spaces,
                                                     ', '.join(values)))
-        elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-          GenerationData.compositionStructures['Paths'] == 'BTree':
+        elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
             values = ('* c_{}'.format(str(v+1)) for v in xrange(length))
             outfile.write('{}Cell {};\n\n'.format(spaces,
                                                   ', '.join(values)))
         
         for x in xrange(1, length+1):
             if x == 1:
-                node = 'root'
+                node = getRootNode()
             else:
                 if GenerationData.compositionStructures['Paths'] == 'Judy':
                     node = '((DsData_{} *) *PValue{})->level{}'.format(x, x-1, x+1)
-                elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-                  GenerationData.compositionStructures['Paths'] == 'BTree':
+                elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                     node = '((DsData_{} *) c_{}->value)->level{}'.format(x, x-1, x+1)
             
             if GenerationData.compositionStructures['Paths'] == 'Judy':
                 outfile.write('{}if ((JLG(PValue{}, {}, x_{})))'.format(spaces, str(x),
                                                                         node, str(x)))
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 structure_name = 'HashTable'
                 ampersand = '&'
                 if GenerationData.compositionStructures['Paths'] == 'BTree':
                     structure_name = 'BTree'
                     ampersand = ''
+                elif GenerationData.compositionStructures['Paths'] == 'ART':
+                    structure_name = 'ART'
                     
                 outfile.write('{0}if ((c_{1} = {2}_Lookup({3}{4}, x_{1})))'.format(spaces, str(x), 
                                                                                    structure_name, 
@@ -1635,8 +1851,7 @@ def fillDataStructureGetIntListFunctions(outfile):
         returning_node = ''
         if GenerationData.compositionStructures['Paths'] == 'Judy':
             returning_node = '*PValue{}'.format(length)
-        elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-          GenerationData.compositionStructures['Paths'] == 'BTree':
+        elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
             returning_node = 'c_{}->value'.format(length)
             
         if GenerationData.compositionStructures['Successors'] == 'Stack':
@@ -1664,14 +1879,15 @@ def fillDataStructureGetIntListFunctions(outfile):
             outfile.write('\n{}return NULL;\n'.format(spaces))
         
         outfile.write('}\n\n')
+        writeDsLockedFunction(outfile, get_successors_structure_name(), 'Ds_get_intList_{}'.format(length),
+                              parameters, getDsLock(length))
         
 def fillDataStructureContainSolutionFunctions(outfile):
     for variable_id in getAllSolutions():
         # Get the length of the predicate
         length = getPredicateLength(variable_id)
-        args = ('int x_{}'.format(str(x)) for x in xrange(1, length+1))
-        outfile.write('int Ds_contains_solution_{}({})'.format(variable_id.name,
-                                                               ', '.join(args)))
+        parameters = ', '.join('int x_{}'.format(str(x)) for x in xrange(1, length+1))
+        writeDsFunctionHeader(outfile, 'int', 'Ds_contains_solution_{}'.format(variable_id.name), parameters)
         outfile.write('{\n')
         spaces = SPACES
         if length > 1:
@@ -1679,20 +1895,18 @@ def fillDataStructureContainSolutionFunctions(outfile):
                 values = ('* PValue{}'.format(str(v+1)) for v in xrange(length-1))
                 outfile.write('{}Word_t {};\n\n'.format(spaces,
                                                         ', '.join(values)))
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 values = ('* c_{}'.format(str(v+1)) for v in xrange(length-1))
                 outfile.write('{}Cell {};\n\n'.format(spaces,
                                                       ', '.join(values)))
         
         for x in xrange(1, length):
             if x == 1:
-                node = 'root'
+                node = getRootNode()
             else:
                 if GenerationData.compositionStructures['Paths'] == 'Judy':
                     node = '((DsData_{} *) *PValue{})->level{}'.format(x, x-1, x+1)
-                elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-                  GenerationData.compositionStructures['Paths'] == 'BTree':
+                elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                     node = '((DsData_{} *) c_{}->value)->level{}'.format(x, x-1, x+1)
                     
             if GenerationData.compositionStructures['Paths'] == 'Judy':
@@ -1704,6 +1918,9 @@ def fillDataStructureContainSolutionFunctions(outfile):
             elif GenerationData.compositionStructures['Paths'] == 'BTree':
                 outfile.write('{0}if (!(c_{1} = BTree_Lookup({2}, x_{1})))\n'.format(spaces,
                                                                                       x, node))
+            elif GenerationData.compositionStructures['Paths'] == 'ART':
+                outfile.write('{0}if (!(c_{1} = ART_Lookup(&{2}, x_{1})))\n'.format(spaces,
+                                                                                     x, node))
                 
             spaces += SPACES
             outfile.write('{}return false;\n'.format(spaces))
@@ -1714,8 +1931,7 @@ def fillDataStructureContainSolutionFunctions(outfile):
             returning_node = ''
             if GenerationData.compositionStructures['Paths'] == 'Judy':
                 returning_node = '*PValue{}'.format(length-1)
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 returning_node = 'c_{}->value'.format(length-1)
                 
             node = '((DsData_{} *) {})->R{}'.format(str(length),
@@ -1740,6 +1956,10 @@ def fillDataStructureContainSolutionFunctions(outfile):
             outfile.write('{}return BTreeSet_Contains({}, x_{});\n'.format(spaces,
                                                                            node,
                                                                            length))
+        elif GenerationData.compositionStructures['Sets'] == 'ART':
+            outfile.write('{}return ARTSet_Contains({}, x_{});\n'.format(spaces,
+                                                                         node,
+                                                                         length))
         else:
             error = "Don't know how to generate code for the data structure"
             error += " {} ".format(GenerationData.compositionStructures['Successors'])
@@ -1747,14 +1967,15 @@ def fillDataStructureContainSolutionFunctions(outfile):
             raise KeyError(error)
             
         outfile.write('}\n\n')
+        writeDsLockedFunction(outfile, 'int', 'Ds_contains_solution_{}'.format(variable_id.name),
+                              parameters, getDsLock(length, variable_id))
         
 def fillDataStructureAppendSolutionFunctions(outfile):
     for variable_id in getAllSolutions():
         # Get the length of the predicate
         length = getPredicateLength(variable_id)
-        args = ('int x_{}'.format(str(x)) for x in xrange(1, length+1))
-        outfile.write('void Ds_append_solution_{}({})'.format(variable_id.name,
-                                                               ', '.join(args)))
+        parameters = ', '.join('int x_{}'.format(str(x)) for x in xrange(1, length+1))
+        writeDsFunctionHeader(outfile, 'void', 'Ds_append_solution_{}'.format(variable_id.name), parameters)
         outfile.write('{\n')
         spaces = SPACES
         if length > 1:
@@ -1762,19 +1983,17 @@ def fillDataStructureAppendSolutionFunctions(outfile):
                 values = ('* PValue{}'.format(str(v+1)) for v in xrange(length-1))
                 outfile.write('{}Word_t {};\n\n'.format(spaces,
                                                         ', '.join(values)))
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 values = ('* c_{}'.format(str(v+1)) for v in xrange(length-1))
                 outfile.write('{}Cell {};\n\n'.format(spaces,
                                                       ', '.join(values)))
         for x in xrange(1, length):
             if x == 1:
-                node = 'root'
+                node = getRootNode()
             else:
                 if GenerationData.compositionStructures['Paths'] == 'Judy':
                     node = '((DsData_{} *) *PValue{})->level{}'.format(x, x-1, x+1)
-                elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-                  GenerationData.compositionStructures['Paths'] == 'BTree':
+                elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                     node = '((DsData_{} *) c_{}->value)->level{}'.format(x, x-1, x+1)
             
             if GenerationData.compositionStructures['Paths'] == 'Judy':
@@ -1799,13 +2018,14 @@ def fillDataStructureAppendSolutionFunctions(outfile):
                 outfile.write('}\n')
                 outfile.write('{}(*PValue{}) = ((Word_t) DsData_Level_{}_new_node());\n'.format(spaces,
                                                                                                 x, x+1))
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 structure_name = 'HashTable'
                 ampersand = '&'
                 if GenerationData.compositionStructures['Paths'] == 'BTree':
                     structure_name = 'BTree'
                     ampersand = ''
+                elif GenerationData.compositionStructures['Paths'] == 'ART':
+                    structure_name = 'ART'
                      
                 outfile.write('{0}if (!(c_{1} = {2}_Lookup({3}{4}, x_{1})))'.format(spaces, x,
                                                                                     structure_name, 
@@ -1828,8 +2048,7 @@ def fillDataStructureAppendSolutionFunctions(outfile):
                 node = '((DsData_{} *) *PValue{})->R{}'.format(str(length),
                                                                str(length-1),
                                                                variable_id.name)
-            elif GenerationData.compositionStructures['Paths'] == 'Hash' or\
-              GenerationData.compositionStructures['Paths'] == 'BTree':
+            elif GenerationData.compositionStructures['Paths'] in ('Hash', 'BTree', 'ART'):
                 node = '((DsData_{} *) c_{}->value)->R{}'.format(str(length),
                                                                  str(length-1),
                                                                  variable_id.name)
@@ -1860,6 +2079,10 @@ def fillDataStructureAppendSolutionFunctions(outfile):
             outfile.write('{0}BTreeSet_Insert({1}, x_{2});\n'.format(spaces,
                                                                      node,
                                                                      str(length)))
+        elif GenerationData.compositionStructures['Sets'] == 'ART':
+            outfile.write('{0}ARTSet_Insert(&{1}, x_{2});\n'.format(spaces,
+                                                                    node,
+                                                                    str(length)))
         else:
             error = "Don't know how to generate code for the data structure"
             error += " {} ".format(GenerationData.compositionStructures['Successors'])
@@ -1867,6 +2090,27 @@ def fillDataStructureAppendSolutionFunctions(outfile):
             raise KeyError(error)
         
         outfile.write('}\n\n')
+        writeDsLockedFunction(outfile, 'void', 'Ds_append_solution_{}'.format(variable_id.name),
+                              parameters, getDsLock(length, variable_id))
+        
+        # With the option Threads the solutions are checked and appended at once
+        if getThreads():
+            arguments = ', '.join('x_{}'.format(str(x)) for x in xrange(1, length+1))
+            outfile.write('int Ds_add_solution_{}({}){{\n'.format(variable_id.name,
+                                                                 parameters))
+            outfile.write('{}pthread_mutex_t *lock = {};\n'.format(SPACES,
+                                                                  getDsLock(length, variable_id)))
+            outfile.write('{}int added;\n\n'.format(SPACES))
+            outfile.write('{}pthread_mutex_lock(lock);\n'.format(SPACES))
+            outfile.write('{}if ((added = !Ds_contains_solution_{}_unlocked({})))\n'.format(SPACES,
+                                                                                           variable_id.name,
+                                                                                           arguments))
+            outfile.write('{}Ds_append_solution_{}_unlocked({});\n'.format(SPACES * 2,
+                                                                          variable_id.name,
+                                                                          arguments))
+            outfile.write('{}pthread_mutex_unlock(lock);\n\n'.format(SPACES))
+            outfile.write('{}return added;\n'.format(SPACES))
+            outfile.write('}\n\n')
 
 def fillDataStructureInitLevelFunctions(outfile):
     def emit_code_set_leaf_init_function(spaces, name):
@@ -1882,6 +2126,9 @@ def fillDataStructureInitLevelFunctions(outfile):
         elif GenerationData.compositionStructures['Sets'] == 'BTree':
             outfile.write('{}d->R{} = BTreeSet_Init();\n'.format(spaces,
                                                                  name))
+        elif GenerationData.compositionStructures['Sets'] == 'ART':
+            outfile.write('{}ARTSet_Init(&d->R{});\n'.format(spaces,
+                                                             name))
         else:
             error = "Don't know how to generate code for the data structure"
             error += " {} ".format(GenerationData.compositionStructures['Sets'])
@@ -1891,7 +2138,7 @@ def fillDataStructureInitLevelFunctions(outfile):
     #equationsTable = GenerationData.equationsTable
     answersToStore = GenerationData.answersToStore
     #viewNamesToCombinations = GenerationData.viewsData.viewNamesToCombinations
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     
     lengthToPreds = defaultdict(set)
     for rule in getEquationsFromAllStratums():
@@ -1951,6 +2198,9 @@ def fillDataStructureInitLevelFunctions(outfile):
             elif GenerationData.compositionStructures['Paths'] == 'BTree':
                 outfile.write('{}d->level{} = BTree_Init();\n'.format(spaces_level_1,
                                                                       length + 1))
+            elif GenerationData.compositionStructures['Paths'] == 'ART':
+                outfile.write('{}ART_Init(&d->level{});\n'.format(spaces_level_1,
+                                                                  length + 1))
             
         for variable_id in lengthToPreds[length]:
             if variable_id in answersToStore:
@@ -1981,8 +2231,8 @@ def fillDataStructureLevelNewNodeFunctions(outfile):
         outfile.write('{\n')
         outfile.write('{}{} * temp;\n\n'.format(spaces_level_1,
                                                 node))
-        outfile.write('{}temp = malloc(sizeof({}));\n'.format(spaces_level_1,
-                                                              node))
+        outfile.write('{}temp = Arena_alloc(&DsData_Level_{}_arena);\n'.format(spaces_level_1,
+                                                                             length))
         #outfile.write('{}memset(temp, 0, sizeof({}));\n\n'.format(spaces_level_1,
         #                                                          node))
         outfile.write('{}DsData_Level_{}_init(temp);\n\n'.format(spaces_level_1,
@@ -1994,7 +2244,7 @@ def fillDataStructureLevelFreeFunctions(outfile):
     #equationsTable = GenerationData.equationsTable
     answersToStore = GenerationData.answersToStore
     
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
 
     lengthToPreds = defaultdict(set)
     for rule in getEquationsFromAllStratums():
@@ -2020,7 +2270,7 @@ def fillDataStructureLevelFreeFunctions(outfile):
     for pos, length in enumerate(lengths):
         spaces = SPACES
         
-        if GenerationData.compositionStructures['Paths'] == 'BTree':
+        if GenerationData.compositionStructures['Paths'] in ('BTree', 'ART'):
             outfile.write('void DsData_Level_{0}_free(size_t node){{\n'.format(length))
             outfile.write('{0}DsData_{1} *d = (DsData_{1} *) node;\n'.format(spaces, length))
         else:
@@ -2050,43 +2300,49 @@ def fillDataStructureLevelFreeFunctions(outfile):
                 spaces += SPACES
                 outfile.write('{}if ({})\n'.format(spaces, node))
                 spaces += SPACES
-                outfile.write('{0}DsData_Level_{1}_free((DsData_{1} *) {2});\n\n'.format(spaces, length+1, node))
+                outfile.write('{0}DsData_Level_{1}_free((DsData_{1} *) {2});\n'.format(spaces, length+1, node))
                 spaces = spaces[:-len(SPACES)]
                 spaces = spaces[:-len(SPACES)]
+                # The node of the key 0 is not stored in the cells
+                outfile.write('{}if (d->level{}.m_zeroUsed)\n'.format(spaces, length+1))
+                outfile.write('{0}DsData_Level_{1}_free((DsData_{1} *) d->level{1}.m_zeroCell.value);\n'.format(spaces + SPACES,
+                                                                                                          length+1))
+                outfile.write('{}HashTable_Free(&d->level{});\n\n'.format(spaces, length+1))
             elif GenerationData.compositionStructures['Paths'] == 'BTree':
                 outfile.write('{0}BTree_Free(d->level{1}, DsData_Level_{1}_free);\n'.format(spaces, length+1))
+            elif GenerationData.compositionStructures['Paths'] == 'ART':
+                outfile.write('{0}ART_Free(&d->level{1}, DsData_Level_{1}_free);\n'.format(spaces, length+1))
             else:
                 raise KeyError('Unknown paths data structure')
             
         number_of_views_for_this_level = sum((x[1]) for x in viewsData
                                              if x[0] >= length)
+        # The nodes of the stacks and of the AVL trees and BTrees used as sets are
+        # stored in arenas freed by Ds_free
         for i in xrange(number_of_views_for_this_level):
             if GenerationData.compositionStructures['Successors'] == 'Queue':
                 outfile.write('{}uIntArrayQueue_free(&d->m[{}]);\n'.format(spaces, i))
-            elif GenerationData.compositionStructures['Successors'] == 'Stack':
-                outfile.write('{}uIntListStack_free(&d->m[{}]);\n'.format(spaces, i))
         outfile.write('\n');
         
         
-        for variable_id in lengthToPreds[length]:
-            if variable_id in answersToStore:
-                if GenerationData.compositionStructures['Sets'] == 'BitMap':
-                    outfile.write('{}BitMap_free(&d->R{});\n'.format(spaces,
-                                                                     variable_id.name))
-                elif GenerationData.compositionStructures['Sets'] == 'AVLTree':
-                    outfile.write('{}AVLTree_free(d->R{});\n'.format(spaces,
-                                                                      variable_id.name))
-                elif GenerationData.compositionStructures['Sets'] == 'Judy':
-                    outfile.write('{}Judy1FreeArray(&d->R{}, PJE0);\n'.format(spaces,
-                                                                              variable_id.name))
-                elif GenerationData.compositionStructures['Sets'] == 'BTree':
-                    outfile.write('{}BTreeSet_Free(d->R{});\n'.format(spaces,
-                                                                   variable_id.name))
-                else:
-                    error = "Don't know how to generate code for the data structure"
-                    error += " {} ".format(GenerationData.compositionStructures['Sets'])
-                    error += "at function fillDataStructureLevelFreeFunctions"
-                    raise KeyError(error)
+        # The same sets initialized by fillDataStructureInitLevelFunctions
+        sets = [x for x in lengthToPreds[length] if x in answersToStore]
+        sets += [x for x in getAllSolutions()
+                 if x not in answersToStore and getPredicateLength(x) == length]
+        for variable_id in sets:
+            if GenerationData.compositionStructures['Sets'] == 'BitMap':
+                outfile.write('{}BitMap_free(&d->R{});\n'.format(spaces,
+                                                                 variable_id.name))
+            elif GenerationData.compositionStructures['Sets'] == 'Judy':
+                outfile.write('{}Judy1FreeArray(&d->R{}, PJE0);\n'.format(spaces,
+                                                                          variable_id.name))
+            elif GenerationData.compositionStructures['Sets'] in ('AVLTree', 'BTree', 'ART'):
+                pass
+            else:
+                error = "Don't know how to generate code for the data structure"
+                error += " {} ".format(GenerationData.compositionStructures['Sets'])
+                error += "at function fillDataStructureLevelFreeFunctions"
+                raise KeyError(error)
                 
         outfile.write('{}*&d = NULL;\n'.format(spaces))
         outfile.write('}\n\n')
@@ -2101,6 +2357,7 @@ def fillDataStructureRootSolutions(outfile):
         elif GenerationData.compositionStructures['Sets'] == 'BitMap': return 'BitMap'
         elif GenerationData.compositionStructures['Sets'] == 'AVLTree': return 'AVLTree'
         elif GenerationData.compositionStructures['Sets'] == 'BTree': return 'BTreeSet'
+        elif GenerationData.compositionStructures['Sets'] == 'ART': return 'ARTSet'
         else: return 'UNKNOWN'
         
     (answers_of_length_1, predicates_in_rules_of_length_1) = getAnswersOfLength_1()
@@ -2114,6 +2371,12 @@ def fillDataStructureRootSolutions(outfile):
         outfile.write("/* Predicates of length 1*/\n")
         line = ', '.join(['R{}'.format(variable_id.name) for variable_id in predicates_in_rules_of_length_1])
         outfile.write('static {} {};\n'.format(get_set_leaf_structure_name(), line))
+    
+    # With the option Threads every set has its own lock
+    if getThreads():
+        for variable_id in sorted(answers_of_length_1 | predicates_in_rules_of_length_1,
+                                  key=lambda variable_id: variable_id.name):
+            outfile.write('static pthread_mutex_t R{}_lock = PTHREAD_MUTEX_INITIALIZER;\n'.format(variable_id.name))
 
 # This function only should be executed if there are predicates of length 2
 # If we only have type 1 rules we don't have level 2 nodes (as there is no database) 
@@ -2135,22 +2398,41 @@ def fillDataStructureJudyHeader(outfile):
             GenerationData.compositionStructures['Sets'] == 'Judy':
         outfile.write('#include <Judy.h>\n')
         
+# With the option Threads the root level is divided in stripes, every one of
+# them with its own lock (see DS_STRIPE at data_structure_common.h)
 def fill_DataStructureRootLevel(outfile):
     if GenerationData.compositionStructures['Paths'] == 'Judy':
         outfile.write('static Pvoid_t root;\n')
     elif GenerationData.compositionStructures['Paths'] == 'Hash':
-        outfile.write('HashTable root;\n')
+        outfile.write('HashTable root{};\n'.format('[DS_STRIPES]' if getThreads() else ''))
     elif GenerationData.compositionStructures['Paths'] == 'BTree':
-        outfile.write('BTree root;\n')
+        outfile.write('BTree root{};\n'.format('[DS_STRIPES]' if getThreads() else ''))
+    elif GenerationData.compositionStructures['Paths'] == 'ART':
+        outfile.write('ART root{};\n'.format('[DS_STRIPES]' if getThreads() else ''))
     else:
         raise KeyError('Unknown data structure for paths')
+    
+    if getThreads():
+        outfile.write('static pthread_mutex_t root_locks[DS_STRIPES];\n')
         
+# With the option Threads every thread scans the level 0 by itself. The values
+# of the stripes are copied while their locks are held, so the scan doesn't
+# race with the insertions of the other threads. The keys of the ART are
+# always copied, the tree can grow while it is scanned.
 def fillDataStructureScanZeroLevelVariables(outfile):
     if GenerationData.compositionStructures['Paths'] == 'Judy':
         outfile.write('Word_t zero_index;\n')
         outfile.write('short first_value;\n')
+    elif GenerationData.compositionStructures['Paths'] in ('Hash', 'ART') and getThreads():
+        outfile.write('static __thread unsigned int *zero_values;\n')
+        outfile.write('static __thread unsigned int zero_index, zero_size, zero_max_size;\n')
+    elif GenerationData.compositionStructures['Paths'] == 'ART':
+        outfile.write('unsigned int *zero_values;\n')
+        outfile.write('unsigned int zero_index, zero_size, zero_max_size;\n')
     elif GenerationData.compositionStructures['Paths'] == 'Hash':
         outfile.write('unsigned int zero_index;\n')
+    elif GenerationData.compositionStructures['Paths'] == 'BTree' and getThreads():
+        outfile.write('static __thread BTreeKeyList *zero_index;\n')
     elif GenerationData.compositionStructures['Paths'] == 'BTree':
         outfile.write('BTreeKeyList *zero_index;\n')
     else:
@@ -2158,7 +2440,40 @@ def fillDataStructureScanZeroLevelVariables(outfile):
     
 def fill_DataStructurefillLevelZeroInit(outfile):
     spaces = SPACES
-    if GenerationData.compositionStructures['Paths'] == 'Judy':
+    if getThreads():
+        outfile.write('{}unsigned int stripe;\n'.format(spaces))
+        if GenerationData.compositionStructures['Paths'] == 'Hash':
+            outfile.write('{}size_t i;\n\n'.format(spaces))
+            outfile.write('{}zero_index = zero_size = 0;\n'.format(spaces))
+        elif GenerationData.compositionStructures['Paths'] == 'ART':
+            outfile.write('\n{}zero_index = zero_size = 0;\n'.format(spaces))
+        else:
+            outfile.write('{}while (zero_index){{\n'.format(spaces))
+            outfile.write('{}BTreeKeyList *temp = zero_index;\n'.format(spaces * 2))
+            outfile.write('{}zero_index = zero_index->next;\n'.format(spaces * 2))
+            outfile.write('{}free(temp);\n'.format(spaces * 2))
+            outfile.write('{}}}\n'.format(spaces))
+        outfile.write('{}for (stripe = 0; stripe < DS_STRIPES; stripe++){{\n'.format(spaces))
+        outfile.write('{}pthread_mutex_lock(&root_locks[stripe]);\n'.format(spaces * 2))
+        if GenerationData.compositionStructures['Paths'] == 'Hash':
+            outfile.write('{}if (zero_size + root[stripe].m_population > zero_max_size){{\n'.format(spaces * 2))
+            outfile.write('{}zero_max_size = (zero_size + root[stripe].m_population) * 2;\n'.format(spaces * 3))
+            outfile.write('{}zero_values = realloc(zero_values, zero_max_size * sizeof(unsigned int));\n'.format(spaces * 3))
+            outfile.write('{}if (!zero_values){{\n'.format(spaces * 3))
+            outfile.write('{}fprintf(stderr, "Error: Not enough memory to scan the level 0\\n");\n'.format(spaces * 4))
+            outfile.write('{}exit(EXIT_FAILURE);\n'.format(spaces * 4))
+            outfile.write('{}}}\n'.format(spaces * 3))
+            outfile.write('{}}}\n'.format(spaces * 2))
+            outfile.write('{}for (i = 0; i < root[stripe].m_arraySize; i++)\n'.format(spaces * 2))
+            outfile.write('{}if (root[stripe].m_cells[i].key)\n'.format(spaces * 3))
+            outfile.write('{}zero_values[zero_size++] = root[stripe].m_cells[i].key;\n'.format(spaces * 4))
+        elif GenerationData.compositionStructures['Paths'] == 'ART':
+            outfile.write('{}ART_Fill_Keys(&root[stripe], &zero_values, &zero_size, &zero_max_size);\n'.format(spaces * 2))
+        else:
+            outfile.write('{}BTree_Fill_KeysList(root[stripe], &zero_index);\n'.format(spaces * 2))
+        outfile.write('{}pthread_mutex_unlock(&root_locks[stripe]);\n'.format(spaces * 2))
+        outfile.write('{}}}\n'.format(spaces))
+    elif GenerationData.compositionStructures['Paths'] == 'Judy':
         outfile.write('{}zero_index = 0;\n'.format(spaces))
         outfile.write('{}first_value = 1;\n'.format(spaces))
     elif GenerationData.compositionStructures['Paths'] == 'Hash':
@@ -2166,6 +2481,9 @@ def fill_DataStructurefillLevelZeroInit(outfile):
     elif GenerationData.compositionStructures['Paths'] == 'BTree':
         outfile.write('{}zero_index = NULL;\n'.format(spaces))
         outfile.write('{}BTree_Fill_KeysList(root, &zero_index);\n'.format(spaces))
+    elif GenerationData.compositionStructures['Paths'] == 'ART':
+        outfile.write('{}zero_index = zero_size = 0;\n'.format(spaces))
+        outfile.write('{}ART_Fill_Keys(&root, &zero_values, &zero_size, &zero_max_size);\n'.format(spaces))
     else:
         raise KeyError('Unknown data structure for paths')
     
@@ -2182,6 +2500,12 @@ def fill_DataStructureGetZeroValues(outfile):
         outfile.write('{}if (PValue){{\n'.format(spaces))
         outfile.write('{}return true;\n{}}}\n'.format(spaces * 2, spaces))
         outfile.write('{}return false;\n'.format(spaces))
+    elif GenerationData.compositionStructures['Paths'] == 'ART' or\
+      (GenerationData.compositionStructures['Paths'] == 'Hash' and getThreads()):
+        outfile.write('{}if (zero_index < zero_size){{\n'.format(spaces))
+        outfile.write('{}(*value) = zero_values[zero_index++];\n'.format(spaces * 2))
+        outfile.write('{}return true;\n{}}}\n'.format(spaces * 2, spaces))
+        outfile.write('{}return false;\n'.format(spaces))
     elif GenerationData.compositionStructures['Paths'] == 'Hash':
         outfile.write('{}while (zero_index < root.m_arraySize){{\n'.format(spaces))
         outfile.write('{}if (root.m_cells[zero_index].key){{\n'.format(spaces * 2))
@@ -2205,12 +2529,25 @@ def fill_DataStructureGetZeroValues(outfile):
     
 def fill_DataStructureInit(outfile):
     spaces = SPACES
-    if GenerationData.compositionStructures['Paths'] == 'Judy':
+    if getThreads():
+        outfile.write('{}unsigned int stripe;\n\n'.format(spaces))
+        outfile.write('{}for (stripe = 0; stripe < DS_STRIPES; stripe++){{\n'.format(spaces))
+        if GenerationData.compositionStructures['Paths'] == 'Hash':
+            outfile.write('{}HashTable_Init(&root[stripe]);\n'.format(spaces * 2))
+        elif GenerationData.compositionStructures['Paths'] == 'ART':
+            outfile.write('{}ART_Init(&root[stripe]);\n'.format(spaces * 2))
+        else:
+            outfile.write('{}root[stripe] = BTree_Init();\n'.format(spaces * 2))
+        outfile.write('{}pthread_mutex_init(&root_locks[stripe], NULL);\n'.format(spaces * 2))
+        outfile.write('{}}}\n'.format(spaces))
+    elif GenerationData.compositionStructures['Paths'] == 'Judy':
         outfile.write('{}root = (Pvoid_t) NULL;\n'.format(spaces))
     elif GenerationData.compositionStructures['Paths'] == 'Hash':
         outfile.write('{}HashTable_Init(&root);\n'.format(spaces))
     elif GenerationData.compositionStructures['Paths'] == 'BTree':
         outfile.write('{}root = BTree_Init();\n'.format(spaces))
+    elif GenerationData.compositionStructures['Paths'] == 'ART':
+        outfile.write('{}ART_Init(&root);\n'.format(spaces))
     else:
         raise KeyError('Unknown data structure for paths')
     
@@ -2224,6 +2561,8 @@ def fill_DataStructureInit(outfile):
             outfile.write('{}R{} = NULL;\n'.format(spaces, variable_id.name))
         elif GenerationData.compositionStructures['Sets'] == 'BTree':
             outfile.write('{}R{} = BTreeSet_Init();\n'.format(spaces, variable_id.name))
+        elif GenerationData.compositionStructures['Sets'] == 'ART':
+            outfile.write('{}ARTSet_Init(&R{});\n'.format(spaces, variable_id.name))
         elif GenerationData.compositionStructures['Sets'] == 'AVLTree':
             outfile.write('{}AVLTree_init(&R{});\n'.format(spaces, variable_id.name))
         elif GenerationData.compositionStructures['Sets'] == 'BitMap':
@@ -2231,32 +2570,121 @@ def fill_DataStructureInit(outfile):
         else:
             raise KeyError("Unknown data structure for Sets at DsInitLevel")
     
+# The nodes of the levels, of the stacks and of the AVL trees, BTrees and ARTs
+# are stored in arenas. The levels are only traversed when their nodes own
+# memory outside of the arenas (hash tables, Judy arrays, bitmaps or array
+# queues), otherwise freeing the data structure only requires freeing the arenas.
+def levelNodesOwnMemory():
+    structures = GenerationData.compositionStructures
+    return structures['Paths'] not in ('BTree', 'ART') or \
+           structures['Successors'] == 'Queue' or \
+           structures['Sets'] in ('BitMap', 'Judy')
+
 def fill_DataStructureFree(outfile):
     spaces = SPACES
+    traverse_levels = getDataStructureNodesMaximumLength() > 1 and levelNodesOwnMemory()
+
     if GenerationData.compositionStructures['Paths'] == 'Judy':
-        outfile.write('{}Word_t * PValue, index = 0;\n\n'.format(spaces))
-        outfile.write('{}JLF(PValue, root, index);\n'.format(spaces))
-        outfile.write('{}while (PValue != NULL){{;\n'.format(spaces))
-        
-        if getDataStructureNodesMaximumLength() > 1:
+        if traverse_levels:
+            outfile.write('{}Word_t * PValue, index = 0;\n\n'.format(spaces))
+            outfile.write('{}JLF(PValue, root, index);\n'.format(spaces))
+            outfile.write('{}while (PValue != NULL){{;\n'.format(spaces))
             outfile.write('{}DsData_Level_2_free((DsData_2 *) *PValue);\n\n'.format(spaces * 2))
-        
-        outfile.write('{}JudyLDel(&root, index, PJE0);\n'.format(spaces * 2))
-        outfile.write('{}JLN(PValue, root, index);\n'.format(spaces * 2))
+            outfile.write('{}JudyLDel(&root, index, PJE0);\n'.format(spaces * 2))
+            outfile.write('{}JLN(PValue, root, index);\n'.format(spaces * 2))
+            outfile.write('{}}}\n'.format(spaces))
+        else:
+            outfile.write('{}JudyLFreeArray(&root, PJE0);\n'.format(spaces))
+    elif getThreads():
+        outfile.write('{}unsigned int stripe;\n'.format(spaces))
+        if GenerationData.compositionStructures['Paths'] == 'Hash' and traverse_levels:
+            outfile.write('{}unsigned int i;\n'.format(spaces))
+        outfile.write('\n{}for (stripe = 0; stripe < DS_STRIPES; stripe++){{\n'.format(spaces))
+        if GenerationData.compositionStructures['Paths'] == 'Hash':
+            if traverse_levels:
+                outfile.write('{}for (i = 0; i < root[stripe].m_arraySize; i++)\n'.format(spaces*2))
+                outfile.write('{}if (root[stripe].m_cells[i].key)\n'.format(spaces*3))
+                outfile.write('{}DsData_Level_2_free((DsData_2 *) root[stripe].m_cells[i].value);\n'.format(spaces*4))
+                outfile.write('{}if (root[stripe].m_zeroUsed)\n'.format(spaces*2))
+                outfile.write('{}DsData_Level_2_free((DsData_2 *) root[stripe].m_zeroCell.value);\n'.format(spaces*3))
+            outfile.write('{}HashTable_Free(&root[stripe]);\n'.format(spaces*2))
+        elif GenerationData.compositionStructures['Paths'] == 'ART' and traverse_levels:
+            outfile.write('{}ART_Free(&root[stripe], DsData_Level_2_free);\n'.format(spaces*2))
+        elif traverse_levels:
+            outfile.write('{}BTree_Free(root[stripe], DsData_Level_2_free);\n'.format(spaces*2))
+        outfile.write('{}pthread_mutex_destroy(&root_locks[stripe]);\n'.format(spaces*2))
         outfile.write('{}}}\n'.format(spaces))
+        if GenerationData.compositionStructures['Paths'] == 'Hash':
+            outfile.write('{}free(zero_values);\n'.format(spaces))
+        elif GenerationData.compositionStructures['Paths'] == 'ART':
+            outfile.write('{}free(zero_values);\n'.format(spaces))
+            outfile.write('{}ART_FreeAll();\n'.format(spaces))
+        else:
+            outfile.write('{}BTree_FreeAll();\n'.format(spaces))
     elif GenerationData.compositionStructures['Paths'] == 'Hash':
-        if getDataStructureNodesMaximumLength() > 1:
+        if traverse_levels:
             outfile.write('{}unsigned int i;\n\n'.format(spaces))
             outfile.write('{}for (i = 0; i < root.m_arraySize; i++)\n'.format(spaces))
             outfile.write('{}if (root.m_cells[i].key)\n'.format(spaces*2))
-            outfile.write('{}DsData_Level_2_free((DsData_2 *) root.m_cells[i].value);\n\n'.format(spaces*3))
+            outfile.write('{}DsData_Level_2_free((DsData_2 *) root.m_cells[i].value);\n'.format(spaces*3))
+            outfile.write('{}if (root.m_zeroUsed)\n'.format(spaces))
+            outfile.write('{}DsData_Level_2_free((DsData_2 *) root.m_zeroCell.value);\n\n'.format(spaces*2))
             
         outfile.write('{}HashTable_Free(&root);\n'.format(spaces))
     elif GenerationData.compositionStructures['Paths'] == 'BTree':
-        if getDataStructureNodesMaximumLength() > 1:
+        if traverse_levels:
             outfile.write('{}BTree_Free(root, DsData_Level_2_free);\n'.format(spaces))
-        
-    
+        outfile.write('{}BTree_FreeAll();\n'.format(spaces))
+    elif GenerationData.compositionStructures['Paths'] == 'ART':
+        if traverse_levels:
+            outfile.write('{}ART_Free(&root, DsData_Level_2_free);\n'.format(spaces))
+        outfile.write('{}free(zero_values);\n'.format(spaces))
+        outfile.write('{}ART_FreeAll();\n'.format(spaces))
+
+    # The sets of the solutions of length 1 are not stored in the levels
+    for variable_id in reduce(lambda x,y: x.union(y), getAnswersOfLength_1()):
+        if GenerationData.compositionStructures['Sets'] == 'BitMap':
+            outfile.write('{}BitMap_free(&R{});\n'.format(spaces, variable_id.name))
+        elif GenerationData.compositionStructures['Sets'] == 'Judy':
+            outfile.write('{}Judy1FreeArray(&R{}, PJE0);\n'.format(spaces, variable_id.name))
+
+    outfile.write('\n')
+    for length in xrange(2, getDataStructureNodesMaximumLength() + 1):
+        outfile.write('{}Arena_free(&DsData_Level_{}_arena);\n'.format(spaces, length))
+    if GenerationData.compositionStructures['Successors'] == 'Stack':
+        outfile.write('{}uIntListStack_free_all();\n'.format(spaces))
+    if GenerationData.compositionStructures['Sets'] == 'AVLTree':
+        outfile.write('{}AVLTree_free_all();\n'.format(spaces))
+    elif GenerationData.compositionStructures['Sets'] == 'BTree':
+        outfile.write('{}BTreeSet_FreeAll();\n'.format(spaces))
+    # The nodes of the ARTs of the paths and of the sets share their arenas
+    elif GenerationData.compositionStructures['Sets'] == 'ART' and\
+      GenerationData.compositionStructures['Paths'] != 'ART':
+        outfile.write('{}ART_FreeAll();\n'.format(spaces))
+    # The arenas of the threads that finished are freed with them
+    if getThreads():
+        outfile.write('{}Arena_free_retired();\n'.format(spaces))
+        
+# With the option Threads the arenas of every thread are retired when it
+# finishes, they are freed at once with the data structure
+def fill_DataStructureRetireThread(outfile):
+    if not getThreads():
+        return
+    spaces = SPACES
+    outfile.write('void Ds_retire_thread(){\n')
+    for length in xrange(2, getDataStructureNodesMaximumLength() + 1):
+        outfile.write('{}Arena_retire(&DsData_Level_{}_arena);\n'.format(spaces, length))
+    outfile.write('{}Arena_retire_thread();\n'.format(spaces))
+    if GenerationData.compositionStructures['Paths'] in ('Hash', 'ART'):
+        outfile.write('{}free(zero_values);\n'.format(spaces))
+        outfile.write('{}zero_values = NULL;\n'.format(spaces))
+    else:
+        outfile.write('{}while (zero_index){{\n'.format(spaces))
+        outfile.write('{}BTreeKeyList *temp = zero_index;\n'.format(spaces * 2))
+        outfile.write('{}zero_index = zero_index->next;\n'.format(spaces * 2))
+        outfile.write('{}free(temp);\n'.format(spaces * 2))
+        outfile.write('{}}}\n'.format(spaces))
+    outfile.write('}\n')
         
 def fill_DataStructureQueueNotFound(outfile):
     if GenerationData.compositionStructures['Successors'] == 'Queue':
@@ -2269,6 +2697,18 @@ def fillMakefileLibs(outfile):
         outfile.write('LIB   = -lm -lJudy\n')
     else:
         outfile.write('LIB   = -lm\n')
+    # The producer thread of the facts requires pthreads
+    if GenerationData.compositionStructures.get('Facts') == 'Thread':
+        outfile.write('LIB  += -lpthread\n')
+        outfile.write('FLAGS += -DFACTS_THREAD\n')
+    # The threads of the solver
+    if getThreads():
+        outfile.write('LIB  += -lpthread\n')
+        outfile.write('FLAGS += -DSOLVER_THREADS={}\n'.format(getThreads()))
+    # The gzip format of the answers requires zlib
+    if any(getOutputFormat(predicate) == 'gzip' for predicate in GenerationData.answersToStore):
+        outfile.write('LIB  += -lz\n')
+        outfile.write('FLAGS += -DOUTPUT_ZLIB\n')
         
 
 # Function mapping for directives
@@ -2281,9 +2721,12 @@ fill_template = {
      'fill_OutputTuplesFiles'      : fillOutputTuplesFiles,
      'fill_PrintRewritingVariable' : fillPrintRewritingVariable,
      'fill_PrintAnswer'         : fillPrintAnswer,
+     'fill_WriteAnswers'        : fillWriteAnswers,
      'fill_SolverInit'          : fillSolverInit,
      'fill_StratumQueueInitializers' : fillStratumQueueInitializers,
      'fill_SolverCompute'       : fillSolverCompute,
+     'fill_SolverStratumFunctions' : fillSolverStratumFunctions,
+     'fill_SolverComputeVariables' : fillSolverComputeVariables,
      'fill_SolverFree'          : fillSolverFree,
      'fill_IntList'             : fillIntList,
      'fill_DsQueryHeaderFunctions' : fillDataStructureQueryHeaderFunctions,
@@ -2305,6 +2748,7 @@ fill_template = {
      'fill_DsGetZeroValues'      : fill_DataStructureGetZeroValues,
      'fill_DsInit'               : fill_DataStructureInit,
      'fill_DsFree'               : fill_DataStructureFree,
+     'fill_DsRetireThread'       : fill_DataStructureRetireThread,
      'fill_DsQueueNotFound'      : fill_DataStructureQueueNotFound,
      'fill_StratumSolverQueues'  : fillStratumSolverQueues,
      'fill_MakefileLibs'         : fillMakefileLibs
@@ -2312,34 +2756,37 @@ fill_template = {
 
  
 def fill_file(filename, orig_file, dest_file):
+    outfile = StringIO()
     with open(orig_file, 'r') as infile:
-        with open(dest_file, 'w') as outfile:
-            # Check if the first line calls fill_Header
-            line = infile.readline()
-            if line.split()[1] == 'fill_Header':
-                header = '/*\n * {}\n *\n'.format(filename)
-                header += ' * Created by: {}\n'.format('C Code Generator')
-                header += ' * Created on: {}\n'.format(datetime.today().date())
-                header += ' */\n'
-            else:
-                header = line
-            
-            outfile.write(header)
+        # Check if the first line calls fill_Header
+        line = infile.readline()
+        if line.split()[1] == 'fill_Header':
+            header = '/*\n * {}\n *\n'.format(filename)
+            header += ' * Created by: {}\n'.format('C Code Generator')
+            header += ' */\n'
+        else:
+            header = line
+        
+        outfile.write(header)
 
-            for line, line_number in zip(infile, count(2)):
-                if line.startswith(DELIMITER):
-                    function = line.split()[1]
-                    try:
+        for line, line_number in zip(infile, count(2)):
+            if line.startswith(DELIMITER):
+                function = line.split()[1]
+                try:
+                    with profilePhase('directive ' + function):
                         fill_template[function](outfile)
-                    except KeyError as e:
-                        print e
-                        print "Error: {}: {}: Unknown directive: {}".format(filename, 
-                                                                   line_number,
-                                                                   function)
-                        sys.exit(-1)
-                else:
-                    outfile.write(line)
-                    
+                except KeyError as e:
+                    print e
+                    print "Error: {}: {}: Unknown directive: {}".format(filename, 
+                                                               line_number,
+                                                               function)
+                    sys.exit(-1)
+            else:
+                outfile.write(line)
+
+    # Only touch the destination file if its contents changed
+    writeFileIfChanged(dest_file, outfile.getvalue())
+    outfile.close()
     return True
               
 # The options represented by the compositionStructures must be a dictionary
@@ -2362,34 +2809,49 @@ def fill_file(filename, orig_file, dest_file):
 # compiler can choose between the next implementations:
 #    Queue -> It represents a queue implemented using an array.
 #    Stack -> It represents a stack implemented using a list.
+#
+# The optional key "Threads" gives the number of threads evaluating every stratum,
+# it requires the Stack successors and the parallelizable paths and sets.
 def generate_code_from_template(output_directory, stratums, 
                                 compositionStructures, predicateTypes, 
                                 answersToStore, printVariables, 
-                                idToStratumLevels):
+                                idToStratumLevels, incremental=False, jobs=1):
     # Make the necessary data to generate the source code available to the rest of the functions
     GD = namedtuple('GD', ['stratums', 'predicateTypes', 'compositionStructures', 
-                           'answersToStore', 'printVariables', 'idToStratumLevels'])
+                           'answersToStore', 'printVariables', 'idToStratumLevels',
+                           'index'])
     
     globals()['GenerationData'] = GD(stratums, predicateTypes, compositionStructures,
-                                     answersToStore, printVariables, idToStratumLevels)
+                                     answersToStore, printVariables, idToStratumLevels,
+                                     buildGenerationIndex(stratums, answersToStore))
     
     #Check that the output directory exists
     path = os.path.normpath(output_directory + '/Solver_C_code')
     include_path = os.path.normpath(path + '/include')
-    if os.path.exists(path):
+    # In incremental mode the previous directory is kept and only the files
+    # whose contents change are rewritten
+    if os.path.exists(path) and not incremental:
         shutil.rmtree(path)
     
-    os.makedirs(path)
-    os.makedirs(include_path)
+    if not os.path.exists(include_path):
+        os.makedirs(include_path)
     
+    generated_files = []
     # Manage the header files
+    files_to_fill = []
     for header_file in INCLUDE_FILES:
         orig_path = os.path.normpath(SOURCE_DIRECTORY + "/include/" + header_file)
         dest_path = os.path.normpath(include_path + "/" + header_file)
-        fill_file(header_file, orig_path, dest_path)
+        files_to_fill.append((header_file, orig_path, dest_path))
+        generated_files.append(dest_path)
         
     # Manage the source files
     for source_file in SOURCE_FILES:
         orig_path = os.path.normpath(SOURCE_DIRECTORY + "/" + source_file)
         dest_path = os.path.normpath(path + "/" + source_file)
-        fill_file(source_file, orig_path, dest_path)
+        files_to_fill.append((source_file, orig_path, dest_path))
+        generated_files.append(dest_path)
+    
+    fillFiles(fill_file, files_to_fill, jobs)
+        
+    return generated_files
@@ -21,6 +21,7 @@ import os
 import pprint
 import argparse
 import logging
+import time
 
 from itertools import chain
 from collections import defaultdict
@@ -30,10 +31,14 @@ from collections import defaultdict
 # Compiler code imports
 from BuildRulesTable import buildRulesTable
 from RuleDecomposer import decomposeRulesFromFile, saveDecomposedRules
+from RelationStatistics import loadStatisticsFromDirectory
 from RewritingEquationsGenerator import rewritingEquationGenerator, rewritingEquationPrinter
 from PredicateOrder import predicateOrder
 from RuleStratifier import stratifyRules
 from Types import Stratum, Ordering, Predicate
+from CompilationCache import CacheEntry, computeCacheKey, loadCacheEntry, storeCacheEntry,\
+    buildManifest, isManifestUpToDate
+from PhaseProfiler import enablePhaseProfiling, profilePhase, writePhaseReport
 
 # Import the frontends to generate the code
 import c_Frontend, py_Frontend, java_Frontend, cPP_Frontend
@@ -47,6 +52,9 @@ DEBUG = 0
 TESTRUN = 0
 PROFILE = 0
 
+# Formats of the files of the answers (option Output of the C and Python frontends)
+OUTPUT_FORMATS = frozenset(['text', 'binary', 'gzip'])
+
 class CLIError(Exception):
     '''Generic exception to raise and log different fatal errors.'''
     def __init__(self, msg):
@@ -57,6 +65,186 @@ class CLIError(Exception):
     def __unicode__(self):
         return self.msg
 
+def checkOutputFormats(options):
+    '''Checks the formats given by the options Output and Output.<predicate>,
+    the solver is not generated if a format is unknown.'''
+    for option, value in options.iteritems():
+        if (option == 'Output' or option.startswith('Output.')) and value not in OUTPUT_FORMATS:
+            logging.error("Unknown output format: {}".format(value))
+            sys.exit(0)
+
+def analyzeProgram(source_file, extensional_predicates_defined_by_rules):
+    '''Analyzes the given Datalog program. It returns the rules table, the
+    dependency graph, the predicate types, the stratums and the dictionary
+    from identifiers to stratum levels.'''
+    # This is in charge of parsing the input file. As a reminder
+    # After this point we only work with decomposed datalog programs
+    # If the parser detects that it is not decomposed it will refuse
+    # to continue. 
+    # It returns several data structures. A table representing the Datalog 
+    # program. It contains an entry in the table for every rule
+    # of the Datalog program.
+    # PredicateTypes gives information about the predicates which
+    # are intensional and which extensional. This is not strictly
+    # mandatory but helps to perform the computation later.
+    # The dependencyGraph is a graph containing the predicate dependency
+    # Of every rule in a bottom-up fashion
+    with profilePhase('rules table'):
+        rulesTable, predicateTypes, dependencyGraph, negatedPredicates = \
+                buildRulesTable(source_file)
+            
+    # This function establishes the ordering for the different predicates
+    # the algorithm is an optimization that imposes an scheduling to the
+    # different variables to avoid some unnecessary operations. This 
+    # function returns an ordering for the whole program, if we have more
+    # than one stratum (we do this next). We have to split the ordering
+    # for every stratum.
+    with profilePhase('predicate ordering'):
+        ordering_for_blocks = predicateOrder(dependencyGraph, 
+                                             predicateTypes.intensional,
+                                             negatedPredicates)
+    
+    # This function is in charge of stratifying a program. The stratification is 
+    # a technique used to handle logical programs that contains negated predicates
+    # The functions returns a list that contains list of rules each of those lists
+    # is a stratum, this stratums are also ordered, if one stratum is before another
+    # in the list it has to be evaluated first. For example rules_per_stratum[0] will 
+    # contain the rules that belong to the first stratum of a given program
+    with profilePhase('stratification'):
+        rules_per_stratum = stratifyRules(rulesTable)
+    
+    # stratums will contain the list of stratums. The definition of what is a Stratum
+    # can be consulted at Types.py 
+    stratums = []
+    
+    # This dictionary will contain as keys the identifiers of the rewriting
+    # variables and as values the different stratums is present. It is consulted
+    # to emit code. It is used for example when we fill the evalution queues of 
+    # every stratum
+    idToStratumLevels = defaultdict(set)
+    
+    # If the user specified the predicate names on the command line we have to convert
+    # them here into identifiers. We do that by traversing the intensional predicates
+    # set computed previously. Afterwards we have to update the previously computed 
+    # extensional and intensional sets accordingly. 
+    extensional_indentifiers = set()
+    for extensional in extensional_predicates_defined_by_rules:
+        for intensional in predicateTypes.intensional:
+            if intensional.name == extensional:
+                extensional_indentifiers.add(intensional)
+    extensional_predicates_defined_by_rules = extensional_indentifiers
+    
+    predicateTypes.extensional.update(extensional_predicates_defined_by_rules)
+    predicateTypes.intensional.difference_update(extensional_predicates_defined_by_rules)
+    
+    # This set takes account of the right variables that have already been
+    # defined in another equation. This is so in order to avoid to 
+    # handle them in different stratums. This is specially important for the 
+    # negated ones
+    previously_defined_right_variables = set()
+    
+    # This is a dictionary that keeps the record of the last stratum in 
+    # which a variable of the right side of an equation appears. Again
+    # this is done to avoid to handle the variables in different stratums.
+    last_stratum_right_variables = {}
+    for level, rules in enumerate(rules_per_stratum, start=1):
+        for rule in rules:
+            # The filter gets all the predicates that appear on the rule's body
+            # and are not negated.
+            for predicate in filter (lambda x: not x.negated,
+                                 filter(lambda x: type(x) == Predicate, 
+                                        rule.body)):
+                last_stratum_right_variables[predicate.id] = level
+    
+    # This section generates the stratums. The stratums will contain the rewriting 
+    # equations and the different data required to build the views for the database. This is
+    # generated by the rewritingEquationGenerator function. The rest of the code is used to
+    # build the idToStratumLevels dictionary and the Ordering for the current stratum.
+    # The code is a little bit bloated because the predicateOrder returns an Ordering for the
+    # whole program and here we have to split it for every stratum
+    for level, rules in enumerate(rules_per_stratum, start=1):
+        # This function call is in charge of generating the set of rewriting equations.
+        # It will return the equationsTable (a list) and the viewsData. In every row
+        # of the equationsTable we have one of the required equations to obtain the 
+        # solutions of the Datalog program. The ViewsData data structure (a named tuple
+        # longer description in Types.py) contains information about how to perform the 
+        # required operations (queries, navigations, etc...) using the data structure.
+        # We could use comprehension lists to fill the different blocks but as we are 
+        # filling more than one block it doesn't pay off.
+        with profilePhase('equation generation (stratum {})'.format(level)):
+            equationsTable, viewsData = rewritingEquationGenerator(rules)
+        
+        # Build the dictionary to establish the stratum level of the variables.
+        # If we are in the first level we have to add to the block1 the predicates
+        # specified by the user on the command line
+        block1 = []
+        if level == 1:
+            block1 = list(extensional_predicates_defined_by_rules) 
+        block2 = []; block3 = [] 
+        for equation in equationsTable:
+            previously_defined_right_variables.add(equation.rightVariable.id)
+            idToStratumLevels[equation.leftVariable.id].add(level)
+            
+            # If the right variable doesn't appear in a posterior 
+            # stratum in the left side of the equation we have to handle
+            # it in the current level.
+            right_side_appear_in_a_posterior_stratum = (equation.rightVariable.id in last_stratum_right_variables and
+                                                        last_stratum_right_variables[equation.rightVariable.id] > level)
+            if not right_side_appear_in_a_posterior_stratum:
+                idToStratumLevels[equation.rightVariable.id].add(level)
+            
+            # Check for negated predicates
+            for negatedElement in equation.negatedElements:
+                # If it is the first time we see the negated predicate it must be defined
+                # in the current stratum.
+                if negatedElement.id not in previously_defined_right_variables:
+                    idToStratumLevels[negatedElement.id].add(level)
+                    
+                    if negatedElement.id in ordering_for_blocks[0] and\
+                       negatedElement.id not in block1:
+                        block1.append(negatedElement.id)
+                
+            # Here we have to contemplate if we are dealing with a negated
+            # predicate in that case we have to reference it or otherwise
+            # its values wont be stored on the database if the predicate
+            # only appears as a negated predicate
+            if equation.type == 2 and equation.consultingPredicate.negated and\
+                  equation.consultingPredicate.id in ordering_for_blocks[0] and\
+                  equation.consultingPredicate.id not in block1:
+                block1.append(equation.consultingPredicate.id)
+                
+            # To add a variable we check that is the correct block
+            # and that has not already been added as a variable. The variable
+            # can appear in more than one equation and level. One optimization
+            # would be use a set to check if a variable belongs to the block.
+            if equation.leftVariable.id in ordering_for_blocks[0] and\
+                 equation.leftVariable.id not in block1:
+                block1.append(equation.leftVariable.id)
+            elif equation.leftVariable.id in ordering_for_blocks[1] and\
+                 equation.leftVariable.id not in block2:
+                block2.append(equation.leftVariable.id)
+            elif equation.leftVariable.id in ordering_for_blocks[2] and\
+                 equation.leftVariable.id not in block3:
+                block3.append(equation.leftVariable.id)
+                
+            if not right_side_appear_in_a_posterior_stratum and \
+                 equation.rightVariable.id in ordering_for_blocks[0] and\
+                 equation.rightVariable.id not in block1:
+                block1.append(equation.rightVariable.id)
+            elif not right_side_appear_in_a_posterior_stratum and \
+                 equation.rightVariable.id in ordering_for_blocks[1] and\
+                 equation.rightVariable.id not in block2:
+                block2.append(equation.rightVariable.id)
+            elif not right_side_appear_in_a_posterior_stratum and \
+                 equation.rightVariable.id in ordering_for_blocks[2] and\
+                 equation.rightVariable.id not in block3:
+                block3.append(equation.rightVariable.id)
+
+        stratums.append(Stratum(equationsTable, viewsData, Ordering(block1, block2, block3)))
+
+    return rulesTable, dependencyGraph, predicateTypes, stratums, idToStratumLevels
+
+
 def main(argv=None): # IGNORE:C0111
     '''Command line options.'''
 
@@ -100,10 +288,26 @@ USAGE
                                                             'intensional predicates will be printed).')
         parser.add_argument("-r", "--decompose-program", help='it takes the specified Datalog program and generates a decomposed version of it',
                             action="store_true")
+        parser.add_argument("-m", "--decomposing-method", choices=['left', 'right', 'random', 'common', 'dynamic', 'cost'], default='random',
+                            help='method used to decompose the program when -r is given (random is the default). ' +
+                                 'common and dynamic choose the decomposition that generates the smallest heads, common tries every ' +
+                                 'possible decomposition while dynamic plans it and can be used with long rules. cost chooses the ' +
+                                 'decomposition that generates less tuples using the statistics of the relations (see -s).')
+        parser.add_argument("-s", "--statistics-dir", help='directory containing sample .tuples files of the relations. They are used by the cost ' +
+                                                           'method of -m to estimate the size of the relations generated when the program is decomposed.')
         parser.add_argument("-n", "--no-code", help='when activated doesn\'t emit source code (option for debugging purposes)',
                             action="store_true")
-        parser.add_argument("-o", "--options", type=str, help='options to be passed to the front-end. For example, for the C front-end: "Sets=Judy,Paths=Judy,Successors=Queue" '+
-                                                              '(check the source code for more options).')
+        parser.add_argument("-o", "--options", type=str, help='options to be passed to the front-end. For example, for the C front-end: "Sets=ART,Paths=ART,Successors=Queue" '+
+                                                              '(check the source code for more options). The C and Python front-ends write the answers in the format ' +
+                                                              'given by Output=text|binary|gzip (Output.<predicate> for a single predicate).')
+        parser.add_argument("-c", "--cache-dir", help='directory used to cache the analysis of the compiled programs. When the program and ' +
+                                                      'the options didn\'t change the analysis is reused and only the modified generated files are rewritten.')
+        parser.add_argument("-j", "--jobs", type=int, default=1, help='number of processes used to fill the template files of the generated code ' +
+                                                                     '(1 is the default). The generated code is the same one for any number of processes.')
+        parser.add_argument("--profile-phases", metavar='FILE', help='write to FILE a JSON report with the wall time, the growth of the peak memory ' +
+                                                                     'and the objects created by every phase of the compiler (parsing, rules table, predicate ' +
+                                                                     'ordering, stratification, equation generation of every stratum and every fill directive ' +
+                                                                     'of the frontend).')
         parser.add_argument("-e", "--extensional", help='if the program has any predicate defined by the rules but it is also extensional use this option to specify it. ' + 
                                                         '(if there are more than one separate them by commas).')
 
@@ -128,6 +332,15 @@ USAGE
                             format="%(asctime)s %(levelname)s %(message)s",
                             datefmt="%Y-%m-%d %H:%M:%S")
         
+        # The fill directives of the frontends can only be measured when the
+        # templates are filled by this process
+        start_time = time.time()
+        if args.profile_phases:
+            enablePhaseProfiling()
+            if args.jobs > 1:
+                logging.warning("The phases are profiled, the templates will be filled by only one process")
+                args.jobs = 1
+        
         frontend = 'C'
         if args.frontend == 'Python':
             frontend = 'Python'
@@ -159,7 +372,6 @@ USAGE
             extensional_predicates_defined_by_rules.update(args.extensional.split(','))
         
         # Check if we have to decompose the specified program
-        # TODO: Add an option to choose the decomposition method
         if args.decompose_program:
             position = source_file.rfind(".")
             # TODO: Add an option to specify the decomposed filename
@@ -167,172 +379,38 @@ USAGE
             logging.info("Decomposing {}".format(source_file))
             logging.info("Storing result at {}".format(dest_file))
             
-            decomposedRules = decomposeRulesFromFile(source_file, args.decompose_program)
-            saveDecomposedRules(decomposedRules, dest_file)
+            statistics = None
+            if args.statistics_dir:
+                statistics = loadStatisticsFromDirectory(args.statistics_dir)
+            elif args.decomposing_method == 'cost':
+                logging.warning("No statistics directory given (-s), every relation is supposed to have the same size")
+            
+            estimated_sizes = {}
+            decomposedRules = decomposeRulesFromFile(source_file, args.decomposing_method, statistics,
+                                                     estimated_sizes)
+            saveDecomposedRules(decomposedRules, dest_file, estimated_sizes)
             
             # TODO: Should we continue with the execution here?
             sys.exit(0)
         
-        # This is in charge of parsing the input file. As a reminder
-        # After this point we only work with decomposed datalog programs
-        # If the parser detects that it is not decomposed it will refuse
-        # to continue. 
-        # It returns several data structures. A table representing the Datalog 
-        # program. It contains an entry in the table for every rule
-        # of the Datalog program.
-        # PredicateTypes gives information about the predicates which
-        # are intensional and which extensional. This is not strictly
-        # mandatory but helps to perform the computation later.
-        # The dependencyGraph is a graph containing the predicate dependency
-        # Of every rule in a bottom-up fashion
-        rulesTable, predicateTypes, dependencyGraph, negatedPredicates = \
-                buildRulesTable(source_file)
-                
-        # This function establishes the ordering for the different predicates
-        # the algorithm is an optimization that imposes an scheduling to the
-        # different variables to avoid some unnecessary operations. This 
-        # function returns an ordering for the whole program, if we have more
-        # than one stratum (we do this next). We have to split the ordering
-        # for every stratum.
-        ordering_for_blocks = predicateOrder(dependencyGraph, 
-                                             predicateTypes.intensional,
-                                             negatedPredicates)
-        
-        # This function is in charge of stratifying a program. The stratification is 
-        # a technique used to handle logical programs that contains negated predicates
-        # The functions returns a list that contains list of rules each of those lists
-        # is a stratum, this stratums are also ordered, if one stratum is before another
-        # in the list it has to be evaluated first. For example rules_per_stratum[0] will 
-        # contain the rules that belong to the first stratum of a given program
-        rules_per_stratum = stratifyRules(rulesTable)
-        
-        # stratums will contain the list of stratums. The definition of what is a Stratum
-        # can be consulted at Types.py 
-        stratums = []
-        
-        # This dictionary will contain as keys the identifiers of the rewriting
-        # variables and as values the different stratums is present. It is consulted
-        # to emit code. It is used for example when we fill the evalution queues of 
-        # every stratum
-        idToStratumLevels = defaultdict(set)
-        
-        # If the user specified the predicate names on the command line we have to convert
-        # them here into identifiers. We do that by traversing the intensional predicates
-        # set computed previously. Afterwards we have to update the previously computed 
-        # extensional and intensional sets accordingly. 
-        extensional_indentifiers = set()
-        for extensional in extensional_predicates_defined_by_rules:
-            for intensional in predicateTypes.intensional:
-                if intensional.name == extensional:
-                    extensional_indentifiers.add(intensional)
-        extensional_predicates_defined_by_rules = extensional_indentifiers
-        
-        predicateTypes.extensional.update(extensional_predicates_defined_by_rules)
-        predicateTypes.intensional.difference_update(extensional_predicates_defined_by_rules)
+        # The analysis of the program (rules table, ordering, stratification and
+        # rewriting equations) only depends on the source file and the options.
+        # If a cache directory has been given and the program has already been
+        # compiled with the same options the analysis is taken from there.
+        cache_key = None
+        cache_entry = None
+        if args.cache_dir:
+            cache_key = computeCacheKey(source_file, frontend, args.options,
+                                        args.extensional, args.print_variables)
+            cache_entry = loadCacheEntry(args.cache_dir, cache_key)
         
-        # This set takes account of the right variables that have already been
-        # defined in another equation. This is so in order to avoid to 
-        # handle them in different stratums. This is specially important for the 
-        # negated ones
-        previously_defined_right_variables = set()
-        
-        # This is a dictionary that keeps the record of the last stratum in 
-        # which a variable of the right side of an equation appears. Again
-        # this is done to avoid to handle the variables in different stratums.
-        last_stratum_right_variables = {}
-        for level, rules in enumerate(rules_per_stratum, start=1):
-            for rule in rules:
-                # The filter gets all the predicates that appear on the rule's body
-                # and are not negated.
-                for predicate in filter (lambda x: not x.negated,
-                                     filter(lambda x: type(x) == Predicate, 
-                                            rule.body)):
-                    last_stratum_right_variables[predicate.id] = level
-        
-        # This section generates the stratums. The stratums will contain the rewriting 
-        # equations and the different data required to build the views for the database. This is
-        # generated by the rewritingEquationGenerator function. The rest of the code is used to
-        # build the idToStratumLevels dictionary and the Ordering for the current stratum.
-        # The code is a little bit bloated because the predicateOrder returns an Ordering for the
-        # whole program and here we have to split it for every stratum
-        for level, rules in enumerate(rules_per_stratum, start=1):
-            # This function call is in charge of generating the set of rewriting equations.
-            # It will return the equationsTable (a list) and the viewsData. In every row
-            # of the equationsTable we have one of the required equations to obtain the 
-            # solutions of the Datalog program. The ViewsData data structure (a named tuple
-            # longer description in Types.py) contains information about how to perform the 
-            # required operations (queries, navigations, etc...) using the data structure.
-            # We could use comprehension lists to fill the different blocks but as we are 
-            # filling more than one block it doesn't pay off.
-            equationsTable, viewsData = rewritingEquationGenerator(rules)
-            
-            # Build the dictionary to establish the stratum level of the variables.
-            # If we are in the first level we have to add to the block1 the predicates
-            # specified by the user on the command line
-            block1 = []
-            if level == 1:
-                block1 = list(extensional_predicates_defined_by_rules) 
-            block2 = []; block3 = [] 
-            for equation in equationsTable:
-                previously_defined_right_variables.add(equation.rightVariable.id)
-                idToStratumLevels[equation.leftVariable.id].add(level)
-                
-                # If the right variable doesn't appear in a posterior 
-                # stratum in the left side of the equation we have to handle
-                # it in the current level.
-                right_side_appear_in_a_posterior_stratum = (equation.rightVariable.id in last_stratum_right_variables and
-                                                            last_stratum_right_variables[equation.rightVariable.id] > level)
-                if not right_side_appear_in_a_posterior_stratum:
-                    idToStratumLevels[equation.rightVariable.id].add(level)
-                
-                # Check for negated predicates
-                for negatedElement in equation.negatedElements:
-                    # If it is the first time we see the negated predicate it must be defined
-                    # in the current stratum.
-                    if negatedElement.id not in previously_defined_right_variables:
-                        idToStratumLevels[negatedElement.id].add(level)
-                        
-                        if negatedElement.id in ordering_for_blocks[0] and\
-                           negatedElement.id not in block1:
-                            block1.append(negatedElement.id)
-                    
-                # Here we have to contemplate if we are dealing with a negated
-                # predicate in that case we have to reference it or otherwise
-                # its values wont be stored on the database if the predicate
-                # only appears as a negated predicate
-                if equation.type == 2 and equation.consultingPredicate.negated and\
-                      equation.consultingPredicate.id in ordering_for_blocks[0] and\
-                      equation.consultingPredicate.id not in block1:
-                    block1.append(equation.consultingPredicate.id)
-                    
-                # To add a variable we check that is the correct block
-                # and that has not already been added as a variable. The variable
-                # can appear in more than one equation and level. One optimization
-                # would be use a set to check if a variable belongs to the block.
-                if equation.leftVariable.id in ordering_for_blocks[0] and\
-                     equation.leftVariable.id not in block1:
-                    block1.append(equation.leftVariable.id)
-                elif equation.leftVariable.id in ordering_for_blocks[1] and\
-                     equation.leftVariable.id not in block2:
-                    block2.append(equation.leftVariable.id)
-                elif equation.leftVariable.id in ordering_for_blocks[2] and\
-                     equation.leftVariable.id not in block3:
-                    block3.append(equation.leftVariable.id)
-                    
-                if not right_side_appear_in_a_posterior_stratum and \
-                     equation.rightVariable.id in ordering_for_blocks[0] and\
-                     equation.rightVariable.id not in block1:
-                    block1.append(equation.rightVariable.id)
-                elif not right_side_appear_in_a_posterior_stratum and \
-                     equation.rightVariable.id in ordering_for_blocks[1] and\
-                     equation.rightVariable.id not in block2:
-                    block2.append(equation.rightVariable.id)
-                elif not right_side_appear_in_a_posterior_stratum and \
-                     equation.rightVariable.id in ordering_for_blocks[2] and\
-                     equation.rightVariable.id not in block3:
-                    block3.append(equation.rightVariable.id)
-    
-            stratums.append(Stratum(equationsTable, viewsData, Ordering(block1, block2, block3)))
+        if cache_entry:
+            logging.info("Using the cached analysis:%s", cache_key)
+            rulesTable, dependencyGraph, predicateTypes, stratums, idToStratumLevels, manifests = cache_entry
+        else:
+            rulesTable, dependencyGraph, predicateTypes, stratums, idToStratumLevels = \
+                    analyzeProgram(source_file, extensional_predicates_defined_by_rules)
+            manifests = {}
                 
         # Here we have several pretty printers to show the different structures and other
         # interesting data computed so far from the given Datalog program in case the debug
@@ -340,7 +418,7 @@ USAGE
         
         logging.debug("Generated dependency graph:")
         for var, key in dependencyGraph.iteritems():
-            logging.debug('  %s -> %s', var, ", ".join([x.name for x in key.iterkeys()]))
+            logging.debug('  %s -> %s', var, ", ".join([x.name for x in key]))
             
         logging.debug("Rules table:")
         for rule in rulesTable:
@@ -353,8 +431,8 @@ USAGE
                 spaces += "  "
 
             logging.debug(spaces + "Equations table:")
-            for equation in equationsTable:
-                logging.debug(spaces + "  " + pp.pformat(equations))
+            for equation in equations:
+                logging.debug(spaces + "  " + pp.pformat(equation))
                 
             logging.debug(spaces + "Views Data:")
             logging.debug(spaces + "  Views to Combinations:")
@@ -398,7 +476,16 @@ USAGE
         # all the predicates in its respective files. The optimization to avoid storing 
         # the "temp" results is still to be implemented both in the respective file and in the
         # data structure
-        if args.no_code == False:
+        # If the cached entry has a record of the code generated for the destination
+        # directory and none of those files have been modified there is nothing
+        # else to do. Otherwise the frontend will only rewrite the files whose
+        # contents changed, keeping the builds of the generated code incremental.
+        code_directory = os.path.abspath(dest_dir)
+        generated_files = None
+        if cache_entry and args.no_code == False and\
+                isManifestUpToDate(manifests.get(code_directory)):
+            logging.info("Source code is up to date")
+        elif args.no_code == False:
             # Do not print anything to stdout by default
             printVariables = []
             #printVariables = predicateTypes.intensional
@@ -410,36 +497,73 @@ USAGE
             # for the future.
             if frontend == 'C':
                 # Here we define the default data structures for the c frontend to generate
-                # code for the compositional data structure. In total we have 12 options 
+                # code for the compositional data structure. In total we have 40 options 
                 # We have three different options:
                 # Paths (How to store the trie): 
+                #     - ART (to use an adaptive radix tree (local implementation), the default one)
                 #     - Judy (to use a radix trie implementation (external implementation)
                 #     - Hash (to use a hash to build the trie (local implementation)
+                #     - BTree (to use a BTree to build the trie (local implementation)
                 # Successors (How to store the successors given a prefix):
                 #     - Stack (To use a linked list that behaves as an stack)
                 #     - Queue (To use an array that behaves as an standard queue)
                 # Sets (How to store the last level successors):
+                #     - ART (to use an adaptive radix tree as a set, the default one)
                 #     - Judy (to use a radix trie implementation as a bitmap)
                 #     - AVLTree (to use an AVL Tree that behaves as a set)
                 #     - BitMap (to use a local implementation of a bit map)
-                composition_structures = {"Paths" : "Judy",
+                #     - BTree (to use a BTree that behaves as a set)
+                # Facts (How to read the facts of the .tuples files):
+                #     - Mmap (the files are mapped in memory and parsed before every stratum)
+                #     - Thread (the files are parsed by a thread while the facts already
+                #               read are evaluated)
+                # Threads (Number of threads evaluating the variables of every stratum):
+                #     - N (the data structure is divided in stripes with their own locks,
+                #          it requires Successors=Stack and can't be used with Judy nor
+                #          with Facts=Thread)
+                composition_structures = {"Paths" : "ART",
                                           "Successors" : "Stack",
-                                          "Sets": "Judy"}
+                                          "Sets": "ART",
+                                          "Facts": "Mmap"}
             
-                # Parse the options for the c frontend so far only the data structure
-                # Currently something like Sets=Judy,Paths=Judy,Successors=Queue
+                # Parse the options for the c frontend, the data structure and the format of
+                # the answers (Output and Output.<predicate>)
+                # Currently something like Sets=Judy,Paths=Judy,Successors=Queue,Output=binary
                 if args.options:
                     options = args.options.split(',')
                     options = [ x.split('=') for x in options ]
                     for key, value in options:
                         composition_structures[key] = value
+                    checkOutputFormats(composition_structures)
+                    if composition_structures['Facts'] not in ('Mmap', 'Thread'):
+                        logging.error("Unknown way to read the facts: {}".format(composition_structures['Facts']))
+                        sys.exit(0)
+                    if 'Threads' in composition_structures:
+                        threads = composition_structures['Threads']
+                        if not threads.isdigit() or int(threads) < 1:
+                            logging.error("The number of threads must be a positive integer: {}".format(threads))
+                            sys.exit(0)
+                        # The lists of successors returned by the data structure are
+                        # traversed without the locks, only the stacks allow it
+                        if composition_structures['Successors'] != 'Stack':
+                            logging.error("The option Threads requires Successors=Stack")
+                            sys.exit(0)
+                        if 'Judy' in (composition_structures['Paths'], composition_structures['Sets']):
+                            logging.error("The option Threads can't be used with Judy")
+                            sys.exit(0)
+                        if composition_structures['Facts'] == 'Thread':
+                            logging.error("The option Threads can't be used with Facts=Thread")
+                            sys.exit(0)
                         
-                c_Frontend.generate_code_from_template(dest_dir, stratums, composition_structures,
-                                                  predicateTypes, predicateTypes.intensional,
-                                                  printVariables, idToStratumLevels)
+                generated_files = c_Frontend.generate_code_from_template(dest_dir, stratums, composition_structures,
+                                                                         predicateTypes, predicateTypes.intensional,
+                                                                         printVariables, idToStratumLevels,
+                                                                         incremental=bool(args.cache_dir),
+                                                                         jobs=args.jobs)
             elif frontend == 'Python':
                 backend = "Native"
                 queue = "Deque"
+                output = {}
                 
                 # Parse the options for the python frontend
                 if args.options:
@@ -451,25 +575,65 @@ USAGE
                             backend = value
                         elif option == 'Queue':
                             queue = value
+                        elif option == 'Output' or option.startswith('Output.'):
+                            output[option] = value
                         else:
                             logging.error("Unknown option for the Python frontend")
                             sys.exit(0)                    
                     
-                py_Frontend.generate_code_from_template(dest_dir, stratums, 
-                                                        predicateTypes, predicateTypes.intensional, 
-                                                        printVariables, idToStratumLevels, 
-                                                        backend, queue)
+                    # The NumPy backend evaluates the variables in batches
+                    if backend == 'NumPy' and queue != 'Deque':
+                        logging.error("The NumPy backend can only be used with the Deque queue")
+                        sys.exit(0)
+                    # The SQL backend evaluates the variables set at a time
+                    if backend == 'SQL' and queue != 'Deque':
+                        logging.error("The SQL backend can only be used with the Deque queue")
+                        sys.exit(0)
+                    # Every worker of the Multiprocess queue has its own data structure
+                    if queue == 'Multiprocess' and backend not in ('Native', 'Hash'):
+                        logging.error("The Multiprocess queue can only be used with the Native and the Hash backends")
+                        sys.exit(0)
+                    checkOutputFormats(output)
+                    
+                generated_files = py_Frontend.generate_code_from_template(dest_dir, stratums, 
+                                                                          predicateTypes, predicateTypes.intensional, 
+                                                                          printVariables, idToStratumLevels, 
+                                                                          backend, queue, output,
+                                                                          incremental=bool(args.cache_dir),
+                                                                          jobs=args.jobs)
             elif frontend == 'Java':
-                java_Frontend.generate_code_from_template(dest_dir, stratums, 
-                                                          predicateTypes, predicateTypes.intensional,
-                                                          printVariables, idToStratumLevels)
+                generated_files = java_Frontend.generate_code_from_template(dest_dir, stratums, 
+                                                                            predicateTypes, predicateTypes.intensional,
+                                                                            printVariables, idToStratumLevels,
+                                                                            incremental=bool(args.cache_dir),
+                                                                            jobs=args.jobs)
             elif frontend == 'CPP':
-                cPP_Frontend.generate_code_from_template(dest_dir, stratums, 
-                                                          predicateTypes, predicateTypes.intensional,
-                                                          printVariables, idToStratumLevels)
+                generated_files = cPP_Frontend.generate_code_from_template(dest_dir, stratums, 
+                                                                           predicateTypes, predicateTypes.intensional,
+                                                                           printVariables, idToStratumLevels,
+                                                                           incremental=bool(args.cache_dir),
+                                                                           jobs=args.jobs)
                 
             logging.info("Source code generated")
         
+        # Store the analysis and the record of the generated files in the cache
+        if args.cache_dir and (not cache_entry or generated_files):
+            if generated_files:
+                manifests[code_directory] = buildManifest(generated_files)
+            storeCacheEntry(args.cache_dir, cache_key,
+                            CacheEntry(rulesTable,
+                                       dependencyGraph,
+                                       predicateTypes, stratums, idToStratumLevels,
+                                       manifests))
+        
+        if args.profile_phases:
+            writePhaseReport(args.profile_phases,
+                             program=source_file,
+                             frontend=frontend,
+                             options=args.options,
+                             cached_analysis=bool(cache_entry),
+                             wall_time=time.time() - start_time)
+            logging.info("Phases report stored at {}".format(args.profile_phases))
         
         return 0
     except KeyboardInterrupt:
@@ -12,9 +12,13 @@ from collections import namedtuple, defaultdict, Counter
 from operator import attrgetter
 from functools import wraps
 from itertools import count, chain, repeat
-from datetime import datetime
+from cStringIO import StringIO
 
 from Types import Argument, ArithmeticExpression
+from CompilationCache import writeFileIfChanged
+from GenerationIndex import buildGenerationIndex
+from TemplateFilling import fillFiles
+from PhaseProfiler import profilePhase
 
 
 # Settings for the parser
@@ -35,50 +39,33 @@ DEBUG = False
 GenerationData = None
 
 def getExtensionalPredicates():
-    return chain(*map(attrgetter('block1'), map(attrgetter('ordering'), GenerationData.stratums)))
+    return GenerationData.index.extensionalPredicates
 
 # This function returns an itertaror to all the views contained in the stratums
 def getViewsFromAllStratums():
-    return map(attrgetter('views'), GenerationData.stratums)
+    return GenerationData.index.views
 
 def getEquationsFromAllStratums():
-    return chain(*map(attrgetter('equations'), GenerationData.stratums))
+    return GenerationData.index.equations
 
 def getAllPredicatesIDs():
-    return set(chain.from_iterable(map(list,
-                                       map(lambda x: chain(x.ordering.block1,
-                                                           x.ordering.block2,
-                                                           x.ordering.block3),
-                                           GenerationData.stratums))))
+    return GenerationData.index.predicateIDs
 
 def getPredicateLength(predicate):
-    for eq in getEquationsFromAllStratums():
-        if predicate == eq.leftVariable.id:
-            return len(eq.leftArguments)
-        elif predicate == eq.rightVariable.id:
-            return len(eq.rightArguments)
-        else:
-            for negated_elment in eq.negatedElements:
-                if predicate == negated_elment.id:
-                    return len(negated_elment.arguments)
-            
-    #print "None"
-    return None
+    return GenerationData.index.predicateLengths.get(predicate)
 
 def getQueryMinimumLength():
-    #return min(len(x.leftArguments) for x in GenerationData.equationsTable if x.type == 2)
-    return min(len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2)
+    return GenerationData.index.queryMinimumLength
 
 def getQueryMaximumLength():
-    #return max(len(x.leftArguments) for x in GenerationData.equationsTable if x.type == 2)
-    return max(len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2)
+    return GenerationData.index.queryMaximumLength
 
 # Decorators
 def check_for_predicates_of_type2(view_func):
     def _decorator(request, *args, **kwargs):
         response = None
         # Make sure we don't call the function if we don't have predicates of type 2
-        if len([x for x in getEquationsFromAllStratums() if x.type == 2]):
+        if GenerationData.index.type2Equations:
             response = view_func(request, *args, **kwargs)
         return response
     return wraps(view_func)(_decorator)
@@ -86,51 +73,23 @@ def check_for_predicates_of_type2(view_func):
 # In order to get the minimum node and the maximum node we have to check the right side
 # of every rule to store the answers and the left side of the rule of type 2
 def getDataStructureNodesMaximumLength():
-    return  max(chain([len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2],
-                      [len(x.rightArguments) for x in getEquationsFromAllStratums()]))
+    return GenerationData.index.dataStructureNodesMaximumLength
 
 # This function checks to see if there are predicates that appearing in some
 # rule being all its variables equal cards. 
 # The function returns a set of strings, every string represents the name of
 # a predicate having all variables as equal cards.
 def getPredicatesWithAllVariablesBeingTheSameEqualCard():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable.id not in GenerationData.answersToStore) and\
-                len(set(eq.leftArguments)) == 1 and\
-                eq.type == 2:
-            answers.add(eq.leftVariable.id)
-    return answers
+    return GenerationData.index.sameEqualCardPredicates
 
 def getPredicatesWithAllVariablesBeingInTheSharedSet():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable not in GenerationData.answersToStore and \
-                eq.type == 2 and
-                len(set(eq.consultingArguments)) == len(eq.commonVariables)):
-            answers.add(eq.consultingPredicate.id)
-    return answers
+    return GenerationData.index.sharedSetPredicates
 
 def getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable.id not in GenerationData.answersToStore and \
-                eq.type == 2):
-            argument_constants = [x for x in eq.consultingArguments if isinstance(x, int) or  
-                                    (isinstance(x, Argument) and x.type == "constant")]
-            
-            if len(eq.consultingArguments) == len(argument_constants):
-                answers.add(eq.consultingPredicate.id)
-                
-    return answers
+    return GenerationData.index.sharedSetIncludingConstantsPredicates
 
 def getNegatedPredicates():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        for negated_element in eq.negatedElements:
-            answers.add(negated_element.id )
-    
-    return answers
+    return GenerationData.index.negatedPredicates
 
 
 # This function get the solutions of the Datalog program. It returns a set
@@ -140,30 +99,15 @@ def getNegatedPredicates():
 # and all its variables are in the set of the Common variables are required to
 # be considered solutions.
 def getAllSolutions():
-    solutions = set()
-    solutions |= GenerationData.answersToStore
-    solutions |= getPredicatesWithAllVariablesBeingTheSameEqualCard()
-    solutions |= getPredicatesWithAllVariablesBeingInTheSharedSet()
-    solutions |= getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants()
-    solutions |= getNegatedPredicates()
-    return solutions
+    return GenerationData.index.solutions
 
 def getAllConsultingPredicates():
-    return set(eq.consultingPredicate.id for eq in
-                    getEquationsFromAllStratums() if eq.type == 2)
+    return GenerationData.index.consultingPredicates
     
 # This function returns a list containing tuples in which the first element
 # is a predicate name and the second element is its length.
 def getAllPredicatesLengths():
-    data = []
-    for eq in getEquationsFromAllStratums():
-        data.append((eq.leftVariable.id,
-                     len(eq.leftArguments)))
-        data.append((eq.rightVariable.id,
-                     len(eq.rightArguments)))
-
-    # Remove duplicates
-    return set(data)
+    return GenerationData.index.predicatesLengths
 
 # Auxiliary function to emit code to get a node. If a node doesn't exist the functions
 # emit code to return return_value which must be a string with the wanted returned value
@@ -328,21 +272,13 @@ def fillVariableType(outfile):
     outfile.write('{}public int ID;\n}}'.format(SPACES))
 
 def fillDataStructureCreateNodeClasses(outfile):
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     number_of_data_structure_nodes = getDataStructureNodesMaximumLength()
     lengths = list(xrange(2, number_of_data_structure_nodes+1))
     
     # Store the answers by length. This will be used to know in which level node store the
     # answers
-    lengthToPreds = defaultdict(set)
-    for eq in getEquationsFromAllStratums():
-        if len(eq.rightArguments) > 1:
-            lengthToPreds[len(eq.rightArguments)].add(eq.rightVariable.id)
-        if len(eq.leftArguments) > 1:
-            lengthToPreds[len(eq.leftArguments)].add(eq.leftVariable.id)
-        for negated_element in eq.negatedElements:
-            if len(negated_element.arguments) > 1:
-                lengthToPreds[(len(negated_element.arguments))].add(negated_element.id)
+    lengthToPreds = GenerationData.index.predicatesByLength
 
     for length in lengths:
         view_names = map(lambda x: x[0], 
@@ -350,7 +286,7 @@ def fillDataStructureCreateNodeClasses(outfile):
                                 viewNamesToCombinations.items()))
         solution_names = map(lambda x: x[0],
                              filter(lambda x: x in getAllSolutions(), 
-                                    lengthToPreds[length]))
+                                    lengthToPreds.get(length, ())))
         outfile.write('{}private class Node{} {{\n'.format(SPACES, length))
         
         # Are we in the last level?
@@ -390,16 +326,8 @@ def fillDataStructureCreateNodeClasses(outfile):
         
 def fillDataStructureConstructor(outfile):
     root_hashtable = (getDataStructureNodesMaximumLength() > 1)
-    answers_of_length_1 = set()
-    predicates_in_rules_of_length_1 = set()
-    for equation in getEquationsFromAllStratums():
-        if len(equation.rightArguments) == 1:
-            answers_of_length_1.add(equation.rightVariable.id)
-        if equation.type == 2 and len(equation.leftArguments) == 1:
-            predicates_in_rules_of_length_1.add(equation.leftVariable.id)
-        for negated_element in equation.negatedElements:
-            if len(negated_element.arguments) == 1:
-                answers_of_length_1.add(negated_element.id)
+    answers_of_length_1 = GenerationData.index.answersOfLength_1
+    predicates_in_rules_of_length_1 = GenerationData.index.predicatesInRulesOfLength_1
 
     
     if root_hashtable:
@@ -436,7 +364,7 @@ def fillDataStructureConstructor(outfile):
     
 @check_for_predicates_of_type2
 def fillDataStructureInsertFunctions(outfile):
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     lengths = xrange(getQueryMinimumLength(), getQueryMaximumLength()+1)
     root_hashtable = (getDataStructureNodesMaximumLength() > 1)
     
@@ -518,7 +446,7 @@ def fillDataStructureGetLevel0Values(outfile):
 @check_for_predicates_of_type2
 def fillDataStructureGetFunctions(outfile):
     lengths = xrange(2, getQueryMaximumLength()+1)
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     
     for length in lengths:
         args_to_function = ('int x_{}'.format(str(v+1)) for v in xrange(length - 1))
@@ -1070,9 +998,9 @@ def fillSolverComputeStratumClasses(outfile):
         spaces = spaces[:-len(SPACES)]
         outfile.write('{}}}\n'.format(spaces))
         
-    predsToViewNames = dict(chain(*[ view.predsToViewNames.items() for view in getViewsFromAllStratums() ]))
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
-    aliasToViewNames = dict(chain(*[ view.aliasToViewNames.items() for view in getViewsFromAllStratums() ]))
+    predsToViewNames = GenerationData.index.predsToViewNames
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
+    aliasToViewNames = GenerationData.index.aliasToViewNames
     answersToStore = GenerationData.answersToStore
     printVariables = GenerationData.printVariables
     outputTuples = GenerationData.answersToStore
@@ -1135,7 +1063,7 @@ def fillSolverComputeStratumClasses(outfile):
     
         for variable_id in chain(block1, block2, block3):
             # Get the equation of the predicate raise an exception if not found
-            equations = (x for x in getEquationsFromAllStratums() if x.leftVariable.id == variable_id)
+            equations = GenerationData.index.equationsByLeftVariable.get(variable_id, [])
     
             outfile.write('\n')
             outfile.write('{}/* Rewriting variable {} block */\n'.format(spaces_level_4, variable_id.name))
@@ -1232,9 +1160,7 @@ def fillSolverComputeStratumClasses(outfile):
                         # to the database. Checking the getAllSolutions function to know what it is considered
                         # to be a solution will raise an error on the evaluation of some programs due to equal
                         # cards.
-                        if variable_id in getPredicatesWithAllVariablesBeingInTheSharedSet() |\
-                                          getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants()|\
-                                          getNegatedPredicates():
+                        if variable_id in GenerationData.index.appendedSolutions:
                             outfile.write('{}data.append_solution_{}({});\n'.format(spaces_level_5,
                                                                                     variable_id.name,
                                                                                     args))
@@ -1687,34 +1613,37 @@ fill_template = {
      }
 
 def fill_file(filename, orig_file, dest_file):
+    outfile = StringIO()
     with open(orig_file, 'r') as infile:
-        with open(dest_file, 'w') as outfile:
-            # Check if the first line calls fill_Header
-            line = infile.readline()
-            if line.split()[1] == 'fill_Header':
-                header =  '/**\n * {}\n'.format(filename)
-                header += ' * Created by: {}\n'.format('Java Code Generator')
-                header += ' * Created on: {}\n'.format(datetime.today().date())
-                header += ' */\n'
-            else:
-                header = line
-            
-            outfile.write(header)
+        # Check if the first line calls fill_Header
+        line = infile.readline()
+        if line.split()[1] == 'fill_Header':
+            header =  '/**\n * {}\n'.format(filename)
+            header += ' * Created by: {}\n'.format('Java Code Generator')
+            header += ' */\n'
+        else:
+            header = line
+        
+        outfile.write(header)
 
-            for line, line_number in zip(infile, count(2)):
-                if line.startswith(DELIMITER):
-                    function = line.split()[1]
-                    try:
+        for line, line_number in zip(infile, count(2)):
+            if line.startswith(DELIMITER):
+                function = line.split()[1]
+                try:
+                    with profilePhase('directive ' + function):
                         fill_template[function](outfile)
-                    except KeyError as e:
-                        print e
-                        print "Error: {}: {}: Unknown directive: {}".format(filename,
-                                                                            line_number,
-                                                                            function)
-                        sys.exit(-1)
-                else:
-                    outfile.write(line)
-                    
+                except KeyError as e:
+                    print e
+                    print "Error: {}: {}: Unknown directive: {}".format(filename,
+                                                                        line_number,
+                                                                        function)
+                    sys.exit(-1)
+            else:
+                outfile.write(line)
+
+    # Only touch the destination file if its contents changed
+    writeFileIfChanged(dest_file, outfile.getvalue())
+    outfile.close()
     return True
 
 # Options for the module:
@@ -1732,24 +1661,36 @@ def fill_file(filename, orig_file, dest_file):
 #                                               the local machine).
 def generate_code_from_template(output_directory, stratums, 
                                 predicateTypes, answersToStore,
-                                printVariables, idToStratumLevels):
+                                printVariables, idToStratumLevels,
+                                incremental=False, jobs=1):
     # Make the necessary data to generate the source code available to the rest of the functions
     GD = namedtuple('GD', ['stratums', 'predicateTypes', 'answersToStore', 
-                           'printVariables', 'idToStratumLevels'])
+                           'printVariables', 'idToStratumLevels', 'index'])
     
     globals()['GenerationData'] = GD(stratums, predicateTypes,
                                      answersToStore, printVariables,
-                                     idToStratumLevels)
+                                     idToStratumLevels,
+                                     buildGenerationIndex(stratums, answersToStore))
     
     #Check that the output directory exists
     path = os.path.normpath(output_directory + '/Solver_Java_code')
-    if os.path.exists(path):
+    # In incremental mode the previous directory is kept and only the files
+    # whose contents change are rewritten
+    if os.path.exists(path) and not incremental:
         shutil.rmtree(path)
     
-    os.makedirs(path)
+    if not os.path.exists(path):
+        os.makedirs(path)
     
     # Manage the source files
+    generated_files = []
+    files_to_fill = []
     for source_file in SOURCE_FILES:
         orig_path = os.path.normpath(SOURCE_DIRECTORY + "/" + source_file)
         dest_path = os.path.normpath(path + "/" + source_file)
-        fill_file(source_file, orig_path, dest_path)
\ No newline at end of file
+        files_to_fill.append((source_file, orig_path, dest_path))
+        generated_files.append(dest_path)
+    
+    fillFiles(fill_file, files_to_fill, jobs)
+        
+    return generated_files
\ No newline at end of file
@@ -12,9 +12,13 @@ from collections import namedtuple, defaultdict, Counter
 from operator import attrgetter
 from functools import wraps
 from itertools import count, chain, repeat
-from datetime import datetime
+from cStringIO import StringIO
 
 from Types import Argument, ArithmeticExpression
+from CompilationCache import writeFileIfChanged, removeStaleFiles
+from GenerationIndex import buildGenerationIndex
+from TemplateFilling import fillFiles
+from PhaseProfiler import profilePhase
 
 
 # Settings for the parser
@@ -23,6 +27,14 @@ SOURCE_DIRECTORY = "Py_Template"
 #OUTPUT_DIRECTORY = "./"
 
 SOURCE_FILES = ['datastructure.py', 'utils.py', 'main.py', 'solver.py', 'generate_one_file.sh']
+# Source files only required by the NumPy backend
+NUMPY_SOURCE_FILES = ['relations.py']
+# Source files only required by the SQL backend
+SQL_SOURCE_FILES = ['sqlqueues.py']
+# Source files only required by the Multiprocess queue
+MULTIPROCESS_SOURCE_FILES = ['partitions.py']
+# Source files only required by the API, it can only be used with the Deque queue
+API_SOURCE_FILES = ['api.py']
 
 EMPTY_LINE = '\n'
 SPACES = ' ' * 4
@@ -33,43 +45,30 @@ DEBUG = False
 GenerationData = None
 
 def getExtensionalPredicates():
-    return chain(*map(attrgetter('block1'), map(attrgetter('ordering'), GenerationData.stratums)))
+    return GenerationData.index.extensionalPredicates
 
 # This function returns an itertaror to all the views contained in the stratums
 def getViewsFromAllStratums():
-    return map(attrgetter('views'), GenerationData.stratums)
+    return GenerationData.index.views
 
 def getEquationsFromAllStratums():
-    return chain(*map(attrgetter('equations'), GenerationData.stratums))
+    return GenerationData.index.equations
 
 def getPredicateLength(predicate):
-    for eq in getEquationsFromAllStratums():
-        if predicate == eq.leftVariable.id:
-            return len(eq.leftArguments)
-        elif predicate == eq.rightVariable.id:
-            return len(eq.rightArguments)
-        else:
-            for negated_elment in eq.negatedElements:
-                if predicate == negated_elment.id:
-                    return len(negated_elment.arguments)
-            
-    #print "None"
-    return None
+    return GenerationData.index.predicateLengths.get(predicate)
 
 def getQueryMinimumLength():
-    #return min(len(x.leftArguments) for x in GenerationData.equationsTable if x.type == 2)
-    return min(len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2)
+    return GenerationData.index.queryMinimumLength
 
 def getQueryMaximumLength():
-    #return max(len(x.leftArguments) for x in GenerationData.equationsTable if x.type == 2)
-    return max(len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2)
+    return GenerationData.index.queryMaximumLength
 
 # Decorators
 def check_for_predicates_of_type2(view_func):
     def _decorator(request, *args, **kwargs):
         response = None
         # Make sure we don't call the function if we don't have predicates of type 2
-        if len([x for x in getEquationsFromAllStratums() if x.type == 2]):
+        if GenerationData.index.type2Equations:
             response = view_func(request, *args, **kwargs)
         return response
     return wraps(view_func)(_decorator)
@@ -83,54 +82,36 @@ def check_for_python_database_backend(view_func):
         return response
     return wraps(view_func)(_decorator)
 
+def check_for_tuple_at_a_time_backend(view_func):
+    def _decorator(request, *args, **kwargs):
+        response = None
+        # The NumPy and the SQL backends evaluate the variables in batches, they don't
+        # use the functions of the data structure that handle one tuple at a time
+        if GenerationData.Backend not in ("NumPy", "SQL"):
+            response = view_func(request, *args, **kwargs)
+        return response
+    return wraps(view_func)(_decorator)
+
 # In order to get the minimum node and the maximum node we have to check the right side
 # of every rule to store the answers and the left side of the rule of type 2
 def getDataStructureNodesMaximumLength():
-    return  max(chain([len(x.leftArguments) for x in getEquationsFromAllStratums() if x.type == 2],
-                      [len(x.rightArguments) for x in getEquationsFromAllStratums()]))
+    return GenerationData.index.dataStructureNodesMaximumLength
 
 # This function checks to see if there are predicates that appearing in some
 # rule being all its variables equal cards. 
 # The function returns a set of strings, every string represents the name of
 # a predicate having all variables as equal cards.
 def getPredicatesWithAllVariablesBeingTheSameEqualCard():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable.id not in GenerationData.answersToStore) and\
-                len(set(eq.leftArguments)) == 1 and\
-                eq.type == 2:
-            answers.add(eq.leftVariable.id)
-    return answers
+    return GenerationData.index.sameEqualCardPredicates
 
 def getPredicatesWithAllVariablesBeingInTheSharedSet():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable not in GenerationData.answersToStore and \
-                eq.type == 2 and
-                len(set(eq.consultingArguments)) == len(eq.commonVariables)):
-            answers.add(eq.consultingPredicate.id)
-    return answers
+    return GenerationData.index.sharedSetPredicates
 
 def getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        if (eq.leftVariable.id not in GenerationData.answersToStore and \
-                eq.type == 2):
-            argument_constants = [x for x in eq.consultingArguments if isinstance(x, int) or  
-                                    (isinstance(x, Argument) and x.type == "constant")]
-            
-            if len(eq.consultingArguments) == len(argument_constants):
-                answers.add(eq.consultingPredicate.id)
-                
-    return answers
+    return GenerationData.index.sharedSetIncludingConstantsPredicates
 
 def getNegatedPredicates():
-    answers = set()
-    for eq in getEquationsFromAllStratums():
-        for negated_element in eq.negatedElements:
-            answers.add(negated_element.id )
-    
-    return answers
+    return GenerationData.index.negatedPredicates
 
 
 # This function get the solutions of the Datalog program. It returns a set
@@ -140,30 +121,114 @@ def getNegatedPredicates():
 # and all its variables are in the set of the Common variables are required to
 # be considered solutions.
 def getAllSolutions():
-    solutions = set()
-    solutions |= GenerationData.answersToStore
-    solutions |= getPredicatesWithAllVariablesBeingTheSameEqualCard()
-    solutions |= getPredicatesWithAllVariablesBeingInTheSharedSet()
-    solutions |= getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants()
-    solutions |= getNegatedPredicates()
-    return solutions
+    return GenerationData.index.solutions
 
 def getAllConsultingPredicates():
-    return set(eq.consultingPredicate.id for eq in
-                    getEquationsFromAllStratums() if eq.type == 2)
+    return GenerationData.index.consultingPredicates
     
 # This function returns a list containing tuples in which the first element
 # is a predicate name and the second element is its length.
 def getAllPredicatesLengths():
-    data = []
-    for eq in getEquationsFromAllStratums():
-        data.append((eq.leftVariable.id,
-                     len(eq.leftArguments)))
-        data.append((eq.rightVariable.id,
-                     len(eq.rightArguments)))
-
-    # Remove duplicates
-    return set(data)
+    return GenerationData.index.predicatesLengths
+
+# The format of the answers of a predicate is given by the option Output.<predicate>
+# or by the option Output for all the predicates (text by default)
+def getOutputFormat(predicate):
+    output = GenerationData.Output
+    return output.get('Output.' + predicate.name, output.get('Output', 'text'))
+
+# With the Deque queue the solver also gets the generator solver_steps used by the API
+# (api.py). It evaluates the stratums as solver_compute but it yields after every pop
+# of the queues, so the evaluation can be interleaved with other work. This function
+# returns the names of the functions to emit and if they yield.
+def getComputeFunctions():
+    if GenerationData.Queue == 'Deque':
+        return [('solver_compute', False), ('solver_steps', True)]
+    return [('solver_compute', False)]
+
+# The Hash backend stores the views in a list indexed by their positions. This
+# function returns the number of positions used by the views.
+def getNumberOfViewPositions():
+    positions = [position for view in getViewsFromAllStratums()
+                          for _, position in view.viewsOrdering]
+    if not positions:
+        return 0
+    return max(positions) + 1
+
+# This function checks if the level 0 values of the data structure are consulted,
+# that happens when a rule of type 2 doesn't have common variables. Otherwise the
+# Hash backend doesn't need to keep them.
+def areLevel0ValuesConsulted():
+    return any(len(equation.commonVariables) == 0 for equation in GenerationData.index.type2Equations)
+
+# The Multiprocess queue partitions the rewriting variables between the workers by the
+# values of the columns joined by the equations of type 2, so the variables that have
+# to be joined are handled by the same worker. This function returns two dictionaries.
+# The first one contains for every predicate a list with the join columns of its
+# variables: the columns used by its equations and the columns used to consult it.
+# A variable is sent to the workers of every element of the list and the first one
+# is the worker that stores the variable as an answer. The predicates that are not
+# joined are partitioned by all their columns. The second one contains the join
+# columns of every view, only the workers of its join columns insert into a view.
+def getPartitioningColumns():
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
+    aliasToViewNames = GenerationData.index.aliasToViewNames
+    
+    # The columns are compared as sets as the workers are computed from the different values
+    def add_columns(columns_list, columns):
+        if set(columns) not in [set(x) for x in columns_list]:
+            columns_list.append(tuple(columns))
+    
+    predicateColumns = defaultdict(list)
+    viewColumns = defaultdict(list)
+    for equation in GenerationData.index.type2Equations:
+        common_columns = [x for x in equation.consultingArguments if isinstance(x, int)]
+        view = aliasToViewNames[equation.aliasName]
+        view_columns = viewNamesToCombinations[view][:len(common_columns)]
+        add_columns(predicateColumns[equation.leftVariable.id], common_columns)
+        add_columns(predicateColumns[equation.consultingPredicate.id], view_columns)
+        add_columns(viewColumns[view], view_columns)
+    
+    for predicate, length in GenerationData.index.predicateLengths.iteritems():
+        if not predicateColumns[predicate]:
+            predicateColumns[predicate].append(tuple(xrange(1, length + 1)))
+    
+    return predicateColumns, viewColumns
+
+# Returns the code of the worker of the given columns of the variable var. The
+# predicates consulted without common variables are stored by the worker 0.
+def getPartitionCode(columns, var):
+    columns = sorted(set(columns))
+    if not columns:
+        return '0'
+    elif len(columns) == 1:
+        return '{}[{}] % workers'.format(var, columns[0])
+    return 'partition(({}), workers)'.format(', '.join('{}[{}]'.format(var, x) for x in columns))
+
+# Returns the code of the condition that checks if the worker is one of the workers
+# of the given list of columns of the variable var
+def getOwnerConditionCode(columns_list, var):
+    codes = []
+    for columns in columns_list:
+        code = getPartitionCode(columns, var)
+        if code not in codes:
+            codes.append(code)
+    return ' or '.join('worker == {}'.format(code) for code in codes)
+
+# Returns the code of the workers a variable var of the predicate is sent to. The
+# negated predicates are sent to every worker as the negations are checked locally.
+def getTargetsCode(predicate, predicateColumns, var):
+    if predicate in getNegatedPredicates():
+        return 'all_workers'
+    
+    codes = []
+    for columns in predicateColumns[predicate]:
+        code = getPartitionCode(columns, var)
+        if code not in codes:
+            codes.append(code)
+    if len(codes) == 1:
+        return '({},)'.format(codes[0])
+    return 'set(({}))'.format(', '.join(codes))
 
 def print_append_query_to_the_trie(outfile, length, spaces):
     for x in xrange(1, length):
@@ -181,17 +246,144 @@ def print_append_query_to_the_trie(outfile, length, spaces):
                                                                              query,
                                                                              x + 1))
 
+# This function returns the key of the views of the Hash backend for the prefix
+# formed by the first length arguments
+def getPrefixKey(length):
+    if length == 1:
+        return 'x_1'
+    return '({})'.format(', '.join('x_{}'.format(x) for x in xrange(1, length + 1)))
+
+def print_append_to_the_view(outfile, length, spaces):
+    outfile.write('{}view = self.__views[pos]\n'.format(spaces))
+    for x in xrange(1, length):
+        key = getPrefixKey(x)
+        outfile.write('{}values = view.get({})\n'.format(spaces, key))
+        outfile.write('{}if values is None:\n'.format(spaces))
+        outfile.write("{}view[{}] = array('L', (x_{},))\n".format(spaces + SPACES, key, x + 1))
+        outfile.write('{}else:\n'.format(spaces))
+        outfile.write('{}values.append(x_{})\n'.format(spaces + SPACES, x + 1))
+
+# The SQL backend keeps the rewriting variables waiting to be handled in a table for
+# every stratum level and predicate (queue<level>_<predicate>). This function returns
+# a dictionary between the predicates and the sorted levels of their tables: the facts
+# and the answers are added to every level in which they are required and the rest of
+# the variables to the first level, as with the other backends.
+def getSQLQueueLevels():
+    idToStratumLevels = GenerationData.idToStratumLevels
+    levels = defaultdict(set)
+    for predicate in getExtensionalPredicates():
+        levels[predicate].update(idToStratumLevels.get(predicate, ()))
+    for equation in getEquationsFromAllStratums():
+        predicate = equation.rightVariable.id
+        if predicate in GenerationData.answersToStore:
+            levels[predicate].update(idToStratumLevels[predicate])
+        else:
+            levels[predicate].add(1)
+    return dict((predicate, sorted(predicate_levels)) for predicate, predicate_levels in levels.iteritems()
+                                                      if predicate_levels)
+
+# This function returns the tables of the SQL backend, a list of tuples with the name
+# of the table, its number of columns and whether its primary key contains all its
+# columns. For every predicate there are:
+#     queue<level>_<predicate> -> The variables waiting to be handled at the level.
+#     current_<predicate> -> The variables being handled.
+#     relation_<predicate> -> The handled variables, consulted by the joins (only for
+#                             the consulted predicates).
+#     solution_<predicate> -> The variables added to the queues, used to discard the
+#                             repeated ones and to evaluate the negations (only for the
+#                             answers and the negated predicates).
+#     new_<predicate> -> The new variables of an answer computed by an equation.
+def getSQLTables():
+    tables = []
+    for predicate, levels in sorted(getSQLQueueLevels().iteritems()):
+        length = getPredicateLength(predicate)
+        tables.extend(('queue{}_{}'.format(level, predicate.name), length, False) for level in levels)
+        tables.append(('current_{}'.format(predicate.name), length, False))
+    for predicate in sorted(getAllConsultingPredicates()):
+        tables.append(('relation_{}'.format(predicate.name), getPredicateLength(predicate), False))
+    for predicate in sorted(set(GenerationData.answersToStore) | set(getNegatedPredicates())):
+        tables.append(('solution_{}'.format(predicate.name), getPredicateLength(predicate), True))
+    for predicate in sorted(GenerationData.answersToStore):
+        tables.append(('new_{}'.format(predicate.name), getPredicateLength(predicate), False))
+    return tables
+
+# The database of the SQLite and SQL backends is kept in memory unless the path of a
+# file is given. A file only contains intermediate results, so it uses write ahead
+# logging and it isn't synchronized with the disk.
+def print_sqlite_connection(outfile, spaces):
+    outfile.write("{}self.con = sqlite3.connect(database)\n".format(spaces))
+    outfile.write("{}self.cur = self.con.cursor()\n".format(spaces))
+    outfile.write("{}if database != ':memory:':\n".format(spaces))
+    for pragma in ['journal_mode=WAL', 'synchronous=OFF', 'cache_size=-65536', 'temp_store=MEMORY']:
+        outfile.write('{}self.cur.execute("PRAGMA {}")\n'.format(spaces + SPACES,
+                                                                 pragma))
+
+# This function emits the code that creates a table with the given number of columns,
+# the table of a previous execution in the same file is dropped
+def print_create_table(outfile, table, length, primary_key, spaces):
+    values = ["V{}".format(x) for x in xrange(1, length + 1)]
+    inside_parens = ", ".join(["{} INTEGER NOT NULL".format(v) for v in values])
+    without_rowid = ''
+    if primary_key:
+        inside_parens += ', ' + "PRIMARY KEY " + "(" + ", ".join(values) + ")"
+        without_rowid = ' WITHOUT ROWID'
+    
+    outfile.write('{}self.cur.execute("DROP TABLE IF EXISTS {};")\n'.format(spaces,
+                                                                            table))
+    outfile.write('{}self.cur.execute("CREATE TABLE {}({}){};")\n'.format(spaces,
+                                                                          table,
+                                                                          inside_parens,
+                                                                          without_rowid))
+
+# This function returns the names of the tables of the SQLite backend and their
+# number of columns, the views first and then the solutions
+def getSQLiteTables():
+    tables = [(view_name, len(positions)) for view in getViewsFromAllStratums()
+                                          for view_name, positions in view.viewNamesToCombinations.iteritems()]
+    tables.extend(('solution_{}'.format(predicate.name), getPredicateLength(predicate))
+                  for predicate in getAllSolutions())
+    return tables
+
+# The SQLite backend keeps the rows inserted in a view in a list (pending_<view>)
+# and writes them with a single executemany before the view is consulted. This
+# function emits the code that writes the pending rows of a view.
+def print_write_pending_rows(outfile, table, length, spaces):
+    outfile.write('{}if self.pending_{}:\n'.format(spaces, table))
+    outfile.write('{}self.cur.executemany("INSERT OR IGNORE INTO {} VALUES({})", self.pending_{})\n'.format(spaces + SPACES,
+                                                                                                         table,
+                                                                                                         ', '.join('?' for _ in xrange(length)),
+                                                                                                         table))
+    if table.startswith('solution_'):
+        outfile.write('{}self.pending_{} = set()\n'.format(spaces + SPACES, table))
+    else:
+        outfile.write('{}self.pending_{} = []\n'.format(spaces + SPACES, table))
+
+# The rows inserted by the SQLite backend are committed every BATCH_SIZE rows (and at
+# the end of every stratum), this function emits the code to count an inserted row
+def print_count_pending_row(outfile, spaces):
+    outfile.write('{}self.pending += 1\n'.format(spaces))
+    outfile.write('{}if self.pending >= BATCH_SIZE:\n'.format(spaces))
+    outfile.write('{}self.commit()\n'.format(spaces + SPACES))
+
 def fillModules(outfile):
     backend = GenerationData.Backend
     
     if backend == 'SQLite':
         outfile.write('import sqlite3\n')
         outfile.write('\nfrom itertools import chain\n')
-        
-    outfile.write('from array import array\n')
+    
+    if backend == 'SQL':
+        outfile.write('import sqlite3\n')
+    elif backend == 'NumPy':
+        outfile.write('from relations import Relation\n')
+        outfile.write('from utils import hypotheses\n')
+    else:
+        outfile.write('from array import array\n')
         
     if backend == 'SQLite':
         outfile.write('\nfrom utils import views\n')
+        outfile.write('\n# Number of rows inserted after which the rows are written and committed\n')
+        outfile.write('BATCH_SIZE = 10000\n')
 
 @check_for_python_database_backend
 def fillSolutions(outfile):
@@ -199,7 +391,7 @@ def fillSolutions(outfile):
     viewsData = []
     
     last_level_of_the_data_structure = getDataStructureNodesMaximumLength()
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     viewLengths = list((len(x) for x in viewNamesToCombinations.itervalues()))
     number_of_data_structure_nodes = getDataStructureNodesMaximumLength()
     
@@ -258,18 +450,13 @@ def fillInitDataStructure(outfile):
     spaces_for_function_body = SPACES * 2
     backend = GenerationData.Backend
     
-    answers_of_length_1 = set()
-    predicates_in_rules_of_length_1 = set()
-    for equation in getEquationsFromAllStratums():
-        if len(equation.rightArguments) == 1:
-            answers_of_length_1.add(equation.rightVariable.id)
-        if equation.type == 2 and len(equation.leftArguments) == 1:
-            predicates_in_rules_of_length_1.add(equation.leftVariable.id)
-        for negated_element in equation.negatedElements:
-            if len(negated_element.arguments) == 1:
-                answers_of_length_1.add(negated_element.id)
+    answers_of_length_1 = GenerationData.index.answersOfLength_1
+    predicates_in_rules_of_length_1 = GenerationData.index.predicatesInRulesOfLength_1
     
-    outfile.write('{}def __init__(self):\n'.format(spaces_for_function_definition))
+    if backend == 'SQLite' or backend == 'SQL':
+        outfile.write("{}def __init__(self, database=':memory:'):\n".format(spaces_for_function_definition))
+    else:
+        outfile.write('{}def __init__(self):\n'.format(spaces_for_function_definition))
     
     if backend == 'Native':
         outfile.write('{}self.__root = dict()\n'.format(spaces_for_function_body))
@@ -278,58 +465,104 @@ def fillInitDataStructure(outfile):
             outfile.write('{}self.R_{} = set()\n'.format(spaces_for_function_body,
                                                          variable_id.name))
     elif backend == 'SQLite':
-        outfile.write("{}self.con = sqlite3.connect(':memory:')\n\n".format(spaces_for_function_body))
-        outfile.write("{}# Create the required tables\n".format(spaces_for_function_body))
-        outfile.write("{}self.cur = self.con.cursor()\n".format(spaces_for_function_body))
+        print_sqlite_connection(outfile, spaces_for_function_body)
         
-        sql_query = "CREATE TABLE {}({});"
+        # Every table is stored in the B-tree of its primary key (WITHOUT ROWID), so the
+        # primary key is the covering index used by all the queries: the views are
+        # consulted by the prefixes of their columns and the solutions by all of them.
+        # The tables of a previous execution in the same file are dropped.
+        outfile.write("\n{}# Create the required tables\n".format(spaces_for_function_body))
+        for table, length in getSQLiteTables():
+            print_create_table(outfile, table, length, True, spaces_for_function_body)
         
-        outfile.write("\n{}# Views tables\n".format(spaces_for_function_body))
-        for view in getViewsFromAllStratums():
-            for view_name, positions in view.viewNamesToCombinations.iteritems():
-                values = ["V{}".format(x) for x in xrange(1, len(positions) + 1)]
-                columns = ", ".join(["{} INTEGER NOT NULL".format(v) for v in values])
-                primary_key = "PRIMARY KEY " + "(" + ", ".join(values) + ")" 
-                inside_parens = columns + ', ' + primary_key
-                
-                outfile.write('{}self.cur.execute("{}")\n'.format(spaces_for_function_body,
-                                                                  sql_query.format(view_name, inside_parens)))
-        outfile.write("\n{}# Solution tables\n".format(spaces_for_function_body))
-        for predicate in getAllSolutions():
-            length = getPredicateLength(predicate)
-            
-            values = ["V{}".format(x) for x in xrange(1, length + 1)]
-            columns = ", ".join(["{} INTEGER NOT NULL".format(v) for v in values])
-            primary_key = "PRIMARY KEY " + "(" + ", ".join(values) + ")" 
-            inside_parens = columns + ', ' + primary_key
-            outfile.write('{}self.cur.execute("{}")\n'.format(spaces_for_function_body,
-                                                              sql_query.format("solution_{}".format(predicate.name),
-                                                                               inside_parens)))
+        # The rows waiting to be written. The solutions are kept in sets, as they are
+        # also consulted before being written.
+        outfile.write("\n{}# Rows waiting to be written\n".format(spaces_for_function_body))
+        outfile.write("{}self.pending = 0\n".format(spaces_for_function_body))
+        for table, length in getSQLiteTables():
+            if table.startswith('solution_'):
+                outfile.write("{}self.pending_{} = set()\n".format(spaces_for_function_body,
+                                                                   table))
+            else:
+                outfile.write("{}self.pending_{} = []\n".format(spaces_for_function_body,
+                                                                table))
+        
+        outfile.write("\n{}def write_pending_rows(self):\n".format(spaces_for_function_definition))
+        for table, length in getSQLiteTables():
+            print_write_pending_rows(outfile, table, length, spaces_for_function_body)
+        if not getSQLiteTables():
+            outfile.write("{}pass\n".format(spaces_for_function_body))
+        
+        outfile.write("\n{}def commit(self):\n".format(spaces_for_function_definition))
+        outfile.write("{}self.write_pending_rows()\n".format(spaces_for_function_body))
+        outfile.write("{}self.con.commit()\n".format(spaces_for_function_body))
+        outfile.write("{}self.pending = 0\n".format(spaces_for_function_body))
+    elif backend == 'Hash':
+        # Every view is a dictionary whose keys are the prefixes of the tuples inserted
+        # in the view and whose values are arrays with the values that follow every
+        # prefix (a single value is its own key). Every solution is a set of tuples
+        # (or of values if its length is 1). The arrays are only created for the
+        # prefixes that are inserted.
+        outfile.write('{}self.__views = [dict() for _ in xrange({})]\n'.format(spaces_for_function_body,
+                                                                            getNumberOfViewPositions()))
+        if areLevel0ValuesConsulted():
+            outfile.write('{}self.__level0 = set()\n'.format(spaces_for_function_body))
+        
+        for variable_id in getAllSolutions():
+            outfile.write('{}self.R_{} = set()\n'.format(spaces_for_function_body,
+                                                         variable_id.name))
+    elif backend == 'SQL':
+        print_sqlite_connection(outfile, spaces_for_function_body)
+        
+        outfile.write("\n{}# Create the required tables\n".format(spaces_for_function_body))
+        for table, length, primary_key in getSQLTables():
+            print_create_table(outfile, table, length, primary_key, spaces_for_function_body)
+        
+        # The joins consult the relations by the columns of their views, every view is
+        # an index of the relation with the columns of the view in order
+        predsToViewNames = GenerationData.index.predsToViewNames
+        viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
+        outfile.write("\n{}# Create the views\n".format(spaces_for_function_body))
+        for predicate in sorted(getAllConsultingPredicates()):
+            for view_name in sorted(predsToViewNames.get(predicate, ())):
+                columns = ', '.join('V{}'.format(x) for x in viewNamesToCombinations[view_name])
+                outfile.write('{}self.cur.execute("CREATE INDEX {} ON relation_{}({});")\n'.format(spaces_for_function_body,
+                                                                                                   view_name,
+                                                                                                   predicate.name,
+                                                                                                   columns))
+        
+        outfile.write("\n{}def commit(self):\n".format(spaces_for_function_definition))
+        outfile.write("{}self.con.commit()\n".format(spaces_for_function_body))
+    elif backend == 'NumPy':
+        # relations contains the variables of every predicate that have already been
+        # handled, they are consulted by the joins. solutions contains the variables of
+        # every predicate that have been added to the queues, it is used to discard the
+        # repeated variables and to evaluate the negations.
+        outfile.write('{}self.relations = [None] * len(hypotheses)\n'.format(spaces_for_function_body))
+        outfile.write('{}self.solutions = [None] * len(hypotheses)\n'.format(spaces_for_function_body))
+        # The negated predicates are not included in getAllPredicatesLengths
+        for predicate, length in sorted(GenerationData.index.predicateLengths.items()):
+            outfile.write('{}self.relations[hypotheses.{}] = Relation({})\n'.format(spaces_for_function_body,
+                                                                                    predicate.name,
+                                                                                    length))
+            outfile.write('{}self.solutions[hypotheses.{}] = Relation({})\n'.format(spaces_for_function_body,
+                                                                                    predicate.name,
+                                                                                    length))
 
 
 @check_for_python_database_backend
 def fillCreateNodes(outfile):
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
     
-    try:
-        max_query_length = getQueryMaximumLength()
-    except ValueError:
-        max_query_length = 0
+    # Without rules of type 2 there are no queries
+    max_query_length = getQueryMaximumLength() or 0
         
     max_data_structure_length = max(max(x[1] for x in getAllPredicatesLengths() if x[0] in getAllSolutions()),
                                     max_query_length)
         
     # Store the answers by length. This will be used to know in which level node store the
     # answers
-    lengthToPreds = defaultdict(set)
-    for eq in getEquationsFromAllStratums():
-        if len(eq.rightArguments) > 1:
-            lengthToPreds[len(eq.rightArguments)].add(eq.rightVariable.id)
-        if len(eq.leftArguments) > 1:
-            lengthToPreds[len(eq.leftArguments)].add(eq.leftVariable.id)
-        for negated_element in eq.negatedElements:
-            if len(negated_element.arguments) > 1:
-                lengthToPreds[(len(negated_element.arguments))].add(negated_element.id)
+    lengthToPreds = GenerationData.index.predicatesByLength
             
     
     viewsData = []
@@ -353,7 +586,7 @@ def fillCreateNodes(outfile):
         number_of_views_for_this_level = sum((x[1]) for x in viewsData 
                                              if x[0] >= length)
         # How many solutions do we have on the level. Solutions are represented as sets
-        number_of_solutions_for_this_level = sum(1 for variable_id in lengthToPreds[length]
+        number_of_solutions_for_this_level = sum(1 for variable_id in lengthToPreds.get(length, ())
                                                         if variable_id in getAllSolutions())
         
         line_body += ", ".join(repeat("array('L')", number_of_views_for_this_level))
@@ -388,6 +621,7 @@ def fillCreateNodes(outfile):
         outfile.write(line)
         outfile.write(EMPTY_LINE)
 
+@check_for_tuple_at_a_time_backend
 @check_for_predicates_of_type2
 def fillInsertNodes(outfile):
     def print_code_for_Ds_insert_1():
@@ -402,17 +636,24 @@ def fillInsertNodes(outfile):
                 outfile.write('{}self.__root[x_1] = self.__create_node2()\n'.format(spaces_level3))
             else:
                 outfile.write('{}self.__root[x_1] = tuple()\n'.format(spaces_level3))
+        elif backend == 'Hash':
+            # The views of length 1 are only consulted through the level 0 values
+            if areLevel0ValuesConsulted():
+                outfile.write('{}self.__level0.add(x_1)\n'.format(spaces_level2))
+            else:
+                outfile.write('{}pass\n'.format(spaces_level2))
         elif backend == 'SQLite':
-            outfile.write('{}try:\n'.format(spaces_level2))
+            total_views = 0
             for view in getViewsFromAllStratums():
                 for view_name, positions in view.viewNamesToCombinations.iteritems():
                     if len(positions) == 1:
-                        outfile.write('{}self.cur.execute("INSERT INTO {} VALUES(?)", (x_1, ))\n'.format(spaces_level3,
-                                                                                                         view_name))
-            if len(getViewsFromAllStratums()) == 0:
-                outfile.write('{}pass\n'.format(spaces_level3))
-            outfile.write('{}except sqlite3.IntegrityError:\n{}pass\n'.format(spaces_level2,
-                                                                              spaces_level3))
+                        outfile.write('{}self.pending_{}.append((x_1, ))\n'.format(spaces_level2,
+                                                                                 view_name))
+                        total_views += 1
+            if total_views > 0:
+                print_count_pending_row(outfile, spaces_level2)
+            else:
+                outfile.write('{}pass\n'.format(spaces_level2))
                 
             
         outfile.write(EMPTY_LINE)
@@ -456,41 +697,37 @@ def fillInsertNodes(outfile):
                                                                               query,
                                                                               pos,
                                                                               x + 1))
+        elif backend == 'Hash':
+            if areLevel0ValuesConsulted():
+                outfile.write('{}self.__level0.add(x_1)\n'.format(spaces_for_function_body))
+            print_append_to_the_view(outfile, length, spaces_for_function_body)
         elif backend == 'SQLite':
             spaces_for_function_body_if = SPACES * 3
             total_ifs = 0
 
-            outfile.write('{}try:\n'.format(spaces_for_function_body))            
             for view in getViewsFromAllStratums():
                 for view_name, positions in view.viewNamesToCombinations.iteritems():
                     if len(positions) == length:
-                        interrogants = ', '.join('?' for _ in xrange(length))
-                        values_tuple = ', '.join('x_{}'.format(x) for x in xrange(1, length + 1))
-                        if length == 1:
-                            values_tuple = '(' + values_tuple + ', )'
-                        else:
-                            values_tuple = '(' + values_tuple + ')'
+                        values_tuple = '(' + ', '.join('x_{}'.format(x) for x in xrange(1, length + 1)) + ')'
                         
                         if total_ifs == 0:
-                            outfile.write('{}if pos == views.{}:\n'.format(spaces_for_function_body_if, view_name))
+                            outfile.write('{}if pos == views.{}:\n'.format(spaces_for_function_body, view_name))
                         else:
-                            outfile.write('{}elif pos == views.{}:\n'.format(spaces_for_function_body_if, view_name))
+                            outfile.write('{}elif pos == views.{}:\n'.format(spaces_for_function_body, view_name))
                         
                         total_ifs += 1    
-                        outfile.write('{}self.cur.execute("INSERT INTO {} VALUES({})", {})\n'.format(spaces_for_function_body_if + SPACES,
-                                                                                                     view_name,
-                                                                                                     interrogants,
-                                                                                                     values_tuple))
+                        outfile.write('{}self.pending_{}.append({})\n'.format(spaces_for_function_body_if,
+                                                                             view_name,
+                                                                             values_tuple))
             if total_ifs > 0:
-                outfile.write("\n{}self.con.commit()\n".format(spaces_for_function_body_if))
+                outfile.write(EMPTY_LINE)
+                print_count_pending_row(outfile, spaces_for_function_body)
             else:
-                outfile.write("{}pass\n".format(spaces_for_function_body_if + SPACES))
-            
-            outfile.write('{}except sqlite3.IntegrityError:\n{}pass\n'.format(spaces_for_function_body,
-                                                                              spaces_for_function_body_if))
+                outfile.write("{}pass\n".format(spaces_for_function_body))
             
         outfile.write(EMPTY_LINE)
     
+@check_for_tuple_at_a_time_backend
 def fillGetLevel0Values(outfile):
     backend = GenerationData.Backend
     spaces_for_function_definition = SPACES
@@ -499,24 +736,16 @@ def fillGetLevel0Values(outfile):
     outfile.write('{}def get_level0_values(self):\n'.format(spaces_for_function_definition))
     if backend == 'Native':
         outfile.write('{}return self.__root.iterkeys()\n'.format(spaces_for_function_body))
+    elif backend == 'Hash':
+        if areLevel0ValuesConsulted():
+            outfile.write('{}return iter(self.__level0)\n'.format(spaces_for_function_body))
+        else:
+            outfile.write('{}return iter(())\n'.format(spaces_for_function_body))
     else:
-        views_query = ''
-        for views_per_stratum in getViewsFromAllStratums():
-            if len(views_query) == 0:
-                space = ''
-            else:
-                space = ' '
-            views_query += space + ' UNION '.join('SELECT V1 FROM {}'.format(v_name) 
-                                                  for v_name in 
-                                                  views_per_stratum.viewNamesToCombinations.iterkeys())
-          
-        solutions_query = ' UNION '.join('SELECT V1 FROM solution_{}'.format(solution.name)
-                                         for solution in getAllSolutions())  
-            
-        query = views_query
-        if solutions_query:
-            query += ' UNION ' + solutions_query + ';'
+        query = ' UNION '.join('SELECT V1 FROM {}'.format(table) for table, _ in getSQLiteTables()) + ';'
         
+        # The rows waiting to be written are also consulted
+        outfile.write('{}self.write_pending_rows()\n'.format(spaces_for_function_body))
         outfile.write('{}self.cur.execute("{}")\n'.format(spaces_for_function_body, query))
         outfile.write('\n{}data = self.cur.fetchall()\n'.format(spaces_for_function_body))
         outfile.write("{}for d in chain.from_iterable(data):\n".format(spaces_for_function_body))
@@ -524,6 +753,7 @@ def fillGetLevel0Values(outfile):
         
     outfile.write(EMPTY_LINE)
 
+@check_for_tuple_at_a_time_backend
 @check_for_predicates_of_type2
 def fillGetFunctions(outfile):
     lengths = xrange(2, getQueryMaximumLength()+1)
@@ -562,6 +792,9 @@ def fillGetFunctions(outfile):
                                                                    pos))
     
             outfile.write('\n{}return list()\n'.format(spaces_for_function_body))
+        elif backend == 'Hash':
+            outfile.write('{}return self.__views[pos].get({}, ())\n'.format(spaces_for_function_body,
+                                                                           getPrefixKey(length - 1)))
         elif backend == 'SQLite':
             spaces_for_function_body_if = SPACES * 3
             total_ifs = 0
@@ -574,7 +807,9 @@ def fillGetFunctions(outfile):
                     if len(positions) < length:
                         continue
                      
-                    v_select = ', '.join('V{}'.format(x) for x in xrange(length, len(positions) + 1))
+                    # As in the trie of the Native backend only the following column is
+                    # returned, the rest of them are consulted by the next get function
+                    v_select = 'DISTINCT V{}'.format(length)
                     v_where = ' AND '.join('V{}=?'.format(x) for x in xrange(1, length))
 
                     if total_ifs == 0:
@@ -583,6 +818,7 @@ def fillGetFunctions(outfile):
                         outfile.write('{}elif pos == views.{}:\n'.format(spaces_for_function_body, view_name))
                     
                     total_ifs += 1    
+                    print_write_pending_rows(outfile, view_name, len(positions), spaces_for_function_body_if)
                     outfile.write('{}self.cur.execute("SELECT {} FROM {} WHERE {}", values)\n'.format(spaces_for_function_body_if,
                                                                                                       v_select,
                                                                                                       view_name,
@@ -594,6 +830,7 @@ def fillGetFunctions(outfile):
 
         outfile.write(EMPTY_LINE)
         
+@check_for_tuple_at_a_time_backend
 def fillAppendFunctions(outfile):
     backend = GenerationData.Backend
     spaces_level_1 = SPACES
@@ -626,29 +863,24 @@ def fillAppendFunctions(outfile):
                                                                                 query,
                                                                                 variable_id.name,
                                                                                 length))
+        elif backend == 'Hash':
+            outfile.write('{}self.R_{}.add({})\n'.format(spaces_level_2,
+                                                         variable_id.name,
+                                                         getPrefixKey(length)))
         elif backend == 'SQLite':
-            length = getPredicateLength(variable_id)
-            interrogants = ', '.join('?'.format(x) for x in xrange(1, length + 1))
-            views_query = ', '.join('x_{}'.format(x) for x in xrange(1, length + 1))
+            views_query = '(' + ', '.join('x_{}'.format(x) for x in xrange(1, length + 1)) + ')'
             if length == 1:
-                views_query = '(' + views_query + ', )'
-            else:
-                views_query = '(' + views_query + ')'
-                
-            outfile.write("{}try:\n".format(spaces_level_2))
+                views_query = '(x_1, )'
             
-            outfile.write('{}self.cur.execute("INSERT INTO solution_{} VALUES({})", {})\n'.format(spaces_level_3,
-                                                                                                  variable_id.name,
-                                                                                                  interrogants,
-                                                                                                  views_query))
-            outfile.write('{}self.con.commit()\n'.format(spaces_level_3))
-            
-            outfile.write('{}except sqlite3.IntegrityError:\n{}pass\n'.format(spaces_level_2,
-                                                                              spaces_level_3))
+            outfile.write('{}self.pending_solution_{}.add({})\n'.format(spaces_level_2,
+                                                                        variable_id.name,
+                                                                        views_query))
+            print_count_pending_row(outfile, spaces_level_2)
             
 
         outfile.write(EMPTY_LINE)
         
+@check_for_tuple_at_a_time_backend
 def fillContainsFunctions(outfile):
     backend = GenerationData.Backend
     spaces_for_function_definition = SPACES
@@ -685,14 +917,22 @@ def fillContainsFunctions(outfile):
                                                                                    length,
                                                                                    query,
                                                                                    variable_id.name))
+        elif backend == 'Hash':
+            outfile.write('{}return ({} in self.R_{})\n'.format(spaces_for_function_body,
+                                                                getPrefixKey(length),
+                                                                variable_id.name))
         elif backend == 'SQLite':
-            length = getPredicateLength(variable_id)
             v_where = ' AND '.join('V{}=?'.format(x) for x in xrange(1, length + 1))
             views_query = ', '.join('x_{}'.format(x) for x in xrange(1, length + 1))
             if length == 1:
                 views_query = '(' + views_query + ', )'
             else:
                 views_query = '(' + views_query + ')'
+            # The solutions waiting to be written are consulted first
+            outfile.write('{}if {} in self.pending_solution_{}:\n'.format(spaces_for_function_body,
+                                                                          views_query,
+                                                                          variable_id.name))
+            outfile.write('{}return True\n'.format(spaces_for_function_body + SPACES))
             outfile.write('{}d = self.cur.execute("SELECT V1 FROM solution_{} WHERE {}", {})\n'.format(spaces_for_function_body,
                                                                                                        variable_id.name,
                                                                                                        v_where,
@@ -701,29 +941,6 @@ def fillContainsFunctions(outfile):
             
         outfile.write(EMPTY_LINE)
 
-def fillPrintAnswer(outfile):
-    spaces_level_1 = SPACES
-    spaces_level_2 = SPACES * 2
-    
-    outfile.write('def print_answer(f, var):\n')
-    for position, ((pred_name, _), length) in enumerate(getAllPredicatesLengths()):
-        if position == 0:
-            conditional = 'if'
-        else:
-            conditional = 'elif'
-        
-        formatting = ', '.join(['%i' for x in xrange(length)])
-        variables = ', '.join(['var[{}]'.format(x) for x in xrange(1, length+1)])
-        
-        outfile.write('{}{} (var[0] == hypotheses.{}):\n'.format(spaces_level_1,
-                                                                 conditional, 
-                                                                 pred_name))
-
-        outfile.write('{}f.write("{}({}).\\n" % ({}))\n'.format(spaces_level_2,
-                                                                pred_name,
-                                                                formatting,
-                                                                variables))
-        
 def fillPrintRewritingVariable(outfile):
     spaces_level_1 = SPACES
     spaces_level_2 = SPACES * 2
@@ -751,7 +968,16 @@ def fillStratumSolverQueues(outfile):
     queue = GenerationData.Queue
     number_of_stratums = len(GenerationData.stratums)
     
-    if queue == 'Deque':
+    if GenerationData.Backend == 'NumPy':
+        queues = "\n".join('solver_queue' + str(x) + ' = BatchQueue()' for x in xrange(1, number_of_stratums+1))
+        outfile.write('{}'.format(queues))
+        outfile.write(EMPTY_LINE)
+    elif GenerationData.Backend == 'SQL':
+        queues = "\n".join('solver_queue' + str(x) + ' = HypothesesQueue()' for x in xrange(1, number_of_stratums+1))
+        outfile.write('{}'.format(queues))
+        outfile.write(EMPTY_LINE)
+    # With the Multiprocess queue every worker has its own copy of the queues
+    elif queue == 'Deque' or queue == 'Multiprocess':
         queues = "\n".join('solver_queue' + str(x) + ' = deque()' for x in xrange(1, number_of_stratums+1))
         outfile.write('{}'.format(queues))
         outfile.write(EMPTY_LINE)
@@ -769,6 +995,7 @@ def fillStratumQueueInitializers(outfile):
     idToStratumLevels = GenerationData.idToStratumLevels
     number_of_stratums = len(GenerationData.stratums)
     queue = GenerationData.Queue
+    backend = GenerationData.Backend
     
     # Create a new dictionary from idToStratumLevels only containing
     # extensional predicates
@@ -776,8 +1003,20 @@ def fillStratumQueueInitializers(outfile):
     
     spaces_level_1 = SPACES
     spaces_level_2 = SPACES * 2
+    if queue == 'Multiprocess':
+        predicateColumns, _ = getPartitioningColumns()
+    
     for stratum_level in xrange(1, number_of_stratums + 1):
-        outfile.write('def solver_init_stratum_level{}():\n'.format(str(stratum_level)))
+        if backend == 'NumPy' or backend == 'SQL':
+            outfile.write('def solver_init_stratum_level{}(data):\n'.format(str(stratum_level)))
+        elif queue == 'Multiprocess':
+            outfile.write('def solver_init_stratum_level{}(channel):\n'.format(str(stratum_level)))
+            outfile.write('{}send = channel.send\n'.format(spaces_level_1))
+            outfile.write('{}worker = channel.worker\n'.format(spaces_level_1))
+            outfile.write('{}workers = channel.workers\n'.format(spaces_level_1))
+            outfile.write('{}all_workers = channel.all_workers\n\n'.format(spaces_level_1))
+        else:
+            outfile.write('def solver_init_stratum_level{}():\n'.format(str(stratum_level)))
         
         if DEBUG:
             outfile.write('{}print "STRATUM LEVEL: {}\\n"\n\n'.format(spaces_level_1,
@@ -793,20 +1032,72 @@ def fillStratumQueueInitializers(outfile):
             idsVarsSet = set(idsVars)
             idsVars = ( x for x in extensional if x in idsVarsSet )
             
+        # The facts are read in chunks by read_facts (utils.py), every chunk is
+        # a list of tuples whose first element is the hypothesis
         for idVar in idsVars:
-            outfile.write("{}fp = open('{}.tuples')\n".format(spaces_level_1,
-                                                              idVar.name))
-            outfile.write("{}for l in fp.readlines():\n".format(spaces_level_1))
-            outfile.write("{}values = map(int, l.strip()[:-2].split('(')[1].split(','))\n".format(spaces_level_2))
+            # With the NumPy backend every chunk is an array of facts (read_fact_arrays in
+            # relations.py). The facts of the negated predicates and of the answers are also
+            # added to the solutions of the predicate.
+            if backend == 'NumPy':
+                outfile.write("{}for facts in read_fact_arrays('{}.tuples', {}):\n".format(spaces_level_1,
+                                                                                         idVar.name,
+                                                                                         getPredicateLength(idVar)))
+                if idVar in getNegatedPredicates() or idVar in GenerationData.answersToStore:
+                    outfile.write('{}data.solutions[hypotheses.{}].add(facts)\n'.format(spaces_level_2,
+                                                                                        idVar.name))
+                outfile.write('{}solver_queue{}.append(hypotheses.{}, facts)\n'.format(spaces_level_2,
+                                                                                       stratum_level,
+                                                                                       idVar.name))
+                outfile.write(EMPTY_LINE)
+                continue
+            
+            # With the SQL backend the facts are inserted into the table of the stratum level
+            # (the parameters skip the hypothesis). The facts of the negated predicates and of
+            # the answers are also inserted into the solutions of the predicate.
+            if backend == 'SQL':
+                parameters = ', '.join('?{}'.format(x) for x in xrange(2, getPredicateLength(idVar) + 2))
+                outfile.write("{}for facts in read_facts('{}.tuples', {}, hypotheses.{}):\n".format(spaces_level_1,
+                                                                                                  idVar.name,
+                                                                                                  getPredicateLength(idVar),
+                                                                                                  idVar.name))
+                outfile.write('{}data.con.executemany("INSERT INTO queue{}_{} VALUES({})", facts)\n'.format(spaces_level_2,
+                                                                                                           stratum_level,
+                                                                                                           idVar.name,
+                                                                                                           parameters))
+                if idVar in getNegatedPredicates() or idVar in GenerationData.answersToStore:
+                    outfile.write('{}data.con.executemany("INSERT OR IGNORE INTO solution_{} VALUES({})", facts)\n'.format(spaces_level_2,
+                                                                                                                          idVar.name,
+                                                                                                                          parameters))
+                outfile.write('{}solver_queue{}.append(hypotheses.{}, len(facts))\n'.format(spaces_level_2,
+                                                                                           stratum_level,
+                                                                                           idVar.name))
+                outfile.write(EMPTY_LINE)
+                continue
+            
+            if queue != 'Multiprocess':
+                outfile.write("{}for facts in read_facts('{}.tuples', {}, hypotheses.{}):\n".format(spaces_level_1,
+                                                                                                  idVar.name,
+                                                                                                  getPredicateLength(idVar),
+                                                                                                  idVar.name))
             if queue == 'Deque':
-                outfile.write('{}solver_queue{}.append(([hypotheses.{}] + values))\n'.format(spaces_level_2,
-                                                                                             stratum_level,
-                                                                                             idVar.name))
+                outfile.write('{}solver_queue{}.extend(facts)\n'.format(spaces_level_2,
+                                                                        stratum_level))
+            elif queue == 'Multiprocess':
+                # Every worker reads its share of the chunks of the file and sends the facts
+                # to the workers that handle them
+                outfile.write("{}for position, facts in enumerate(read_facts('{}.tuples', {}, hypotheses.{})):\n".format(spaces_level_1,
+                                                                                                                        idVar.name,
+                                                                                                                        getPredicateLength(idVar),
+                                                                                                                        idVar.name))
+                outfile.write('{}if position % workers == worker:\n'.format(spaces_level_2))
+                outfile.write('{}for fact in facts:\n'.format(spaces_level_2 + SPACES))
+                outfile.write('{}send({}, fact, {})\n'.format(spaces_level_2 + SPACES * 2,
+                                                               stratum_level,
+                                                               getTargetsCode(idVar, predicateColumns, 'fact')))
             elif queue == 'Redis':
-                outfile.write('{}redis_connector.rpush(STRATUM_QUEUE{}, ([hypotheses.{}] + values))\n'.format(spaces_level_2,
-                                                                                                              stratum_level,
-                                                                                                              idVar.name))
-            outfile.write('{}fp.close()\n'.format(spaces_level_1))
+                outfile.write('{}for fact in facts:\n'.format(spaces_level_2))
+                outfile.write('{}redis_connector.rpush(STRATUM_QUEUE{}, fact)\n'.format(spaces_level_2 + SPACES,
+                                                                                        stratum_level))
             outfile.write(EMPTY_LINE)
     
 def fillSolverInit(outfile):
@@ -815,16 +1106,583 @@ def fillSolverInit(outfile):
     
     outfile.write(' = '.join('fp_{}'.format(ident.name) for ident in outputTuples))
     outfile.write(' = None\n')
+    # With the Multiprocess queue solver_init gets the number of workers, the first
+    # argument of the solver (by default the number of processors), and every worker
+    # writes the answers it stores to its own files (named as the predicate followed
+    # by the number of the worker).
+    if GenerationData.Queue == 'Multiprocess':
+        outfile.write('solver_workers = 1\n')
+        outfile.write('solver_processes = None\n')
+        outfile.write('def solver_init():\n')
+        outfile.write('{}global solver_workers\n'.format(spaces_level_1))
+        outfile.write('{}if len(sys.argv) > 1:\n'.format(spaces_level_1))
+        outfile.write('{}solver_workers = int(sys.argv[1])\n'.format(spaces_level_1 + SPACES))
+        outfile.write('{}else:\n'.format(spaces_level_1))
+        outfile.write('{}solver_workers = cpu_count()\n\n'.format(spaces_level_1 + SPACES))
+        outfile.write('def solver_init_worker(worker):\n')
+        outfile.write('{}global {}\n'.format(spaces_level_1,
+                                           ', '.join('fp_{}'.format(ident.name) for ident in outputTuples)))
+        for ident in outputTuples:
+            outfile.write('{0}fp_{1} = open_writer("{1}-{{}}.tuples".format(worker), "{1}", {2}, "{3}")\n'.format(spaces_level_1,
+                                                                                                                 ident.name,
+                                                                                                                 getPredicateLength(ident),
+                                                                                                                 getOutputFormat(ident)))
+        outfile.write(EMPTY_LINE)
+        return
+    
+    # With the SQLite and SQL backends solver_init gets the path of the database, the
+    # first argument of the solver (by default the database is kept in memory)
+    if GenerationData.Backend in ('SQLite', 'SQL'):
+        outfile.write("solver_database = ':memory:'\n")
     outfile.write('def solver_init():\n')
-    outfile.write('{}global {}\n'.format(spaces_level_1,
-                                       ', '.join('fp_{}'.format(ident.name) for ident in outputTuples)))
+    if GenerationData.Backend in ('SQLite', 'SQL'):
+        outfile.write('{}global solver_database, {}\n'.format(spaces_level_1,
+                                                             ', '.join('fp_{}'.format(ident.name) for ident in outputTuples)))
+        outfile.write('{}if len(sys.argv) > 1:\n'.format(spaces_level_1))
+        outfile.write('{}solver_database = sys.argv[1]\n'.format(spaces_level_1 + SPACES))
+    else:
+        outfile.write('{}global {}\n'.format(spaces_level_1,
+                                           ', '.join('fp_{}'.format(ident.name) for ident in outputTuples)))
     for ident in outputTuples:
-        outfile.write('{0}fp_{1} = open("{1}.tuples", "w+")\n'.format(spaces_level_1,
-                                                                      ident.name))
+        outfile.write('{0}fp_{1} = open_writer("{1}.tuples", "{1}", {2}, "{3}")\n'.format(spaces_level_1,
+                                                                                       ident.name,
+                                                                                       getPredicateLength(ident),
+                                                                                       getOutputFormat(ident)))
 
     outfile.write(EMPTY_LINE)
             
+# The NumPy backend evaluates the rewriting variables in batches. As with the other
+# backends, for every stratum a function creates the handlers of the variables of the
+# stratum, but here every handler receives an array with all the pending variables of
+# its predicate (a row for every variable) and evaluates its equations at once: the
+# joins are computed with the sorted indexes of the relations and the equal cards,
+# constants, boolean expressions and negations are evaluated as boolean arrays.
+def fillSolverComputeBatches(outfile):
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
+    aliasToViewNames = GenerationData.index.aliasToViewNames
+    answersToStore = GenerationData.answersToStore
+    printVariables = GenerationData.printVariables
+    outputTuples = GenerationData.answersToStore
+    idToStratumLevels = GenerationData.idToStratumLevels
+    
+    spaces_level_1 = SPACES
+    spaces_level_2 = SPACES * 2
+    
+    # The names used by the handlers are bound as locals of the function that creates
+    # them. local_names is a dictionary between the local names and the bound expressions.
+    local_names = {}
+    
+    def bind_local_name(name, expression):
+        local_names[name] = expression
+        return name
+    
+    def hypothesis_name(name):
+        return bind_local_name('hypothesis_' + name, 'hypotheses.' + name)
+    
+    def relation_name(name):
+        return bind_local_name('relation_' + name, 'data.relations[hypotheses.{}]'.format(name))
+    
+    def solutions_name(name):
+        return bind_local_name('solutions_' + name, 'data.solutions[hypotheses.{}]'.format(name))
+    
+    def queue_append_name(level):
+        return bind_local_name('solver_queue{}_append'.format(level),
+                               'solver_queue{}.append'.format(level))
+    
+    # Auxiliary function that returns the code of a tuple with the given elements
+    def compose_tuple(elements):
+        if len(elements) == 1:
+            return '({},)'.format(elements[0])
+        return '({})'.format(', '.join(elements))
+    
+    # Auxiliary function that returns the column of the predicate consulted by a type 2
+    # equation that holds the value of the given argument.
+    def consulting_column(argument, equation):
+        combination = viewNamesToCombinations[aliasToViewNames[equation.aliasName]]
+        return combination[equation.consultingArguments.index(argument)] - 1
+    
+    # Auxiliary function that returns the code of an expression evaluated for every variable.
+    # The positions of the rewriting variable are columns of the array named left and the
+    # variables of the consulted predicate are columns of the array named right.
+    def compose_expression(expression, equation, left):
+        if isinstance(expression, int):
+            return "{}[:, {}]".format(left, expression - 1)
+        elif isinstance(expression, Argument) and expression.type == 'constant':
+            return str(expression.value)
+        elif isinstance(expression, Argument) and expression.type == 'variable':
+            return "right[:, {}]".format(consulting_column(expression, equation))
+        elif isinstance(expression, ArithmeticExpression):
+            args, op = expression
+            return "({} {} {})".format(compose_expression(args[0], equation, left),
+                                       op,
+                                       compose_expression(args[1], equation, left))
+        else:
+            error_msg = "Emmiting code (Unknown type): "
+            raise ValueError(error_msg + str(expression))
+    
+    # This function returns the conditions that the rewriting variables have to satisfy
+    # to be used by the equation, the equal cards and the constants of the left side.
+    def left_conditions(equation):
+        conditions = []
+        positions_by_variable = defaultdict(list)
+        for rule_pos, (argument, _) in enumerate(equation.leftArguments, 1):
+            if argument.type == 'constant':
+                conditions.append('(current[:, {}] == {})'.format(rule_pos - 1,
+                                                                  argument.value))
+            else:
+                positions_by_variable[argument].append(rule_pos)
+        for positions in positions_by_variable.itervalues():
+            for position in positions[1:]:
+                conditions.append('(current[:, {}] == current[:, {}])'.format(positions[0] - 1,
+                                                                              position - 1))
+        return conditions
+    
+    # This function returns the conditions that the new variables have to satisfy: the
+    # equal cards of the consulted predicate, the boolean expressions and the negations.
+    def right_conditions(equation, left):
+        conditions = []
+        if equation.type == 2:
+            # Every repeated variable is compared with its first appearance
+            combination = viewNamesToCombinations[aliasToViewNames[equation.aliasName]]
+            for position, argument in enumerate(equation.consultingArguments):
+                if isinstance(argument, Argument) and argument.type == 'variable' and\
+                        consulting_column(argument, equation) != combination[position] - 1:
+                    conditions.append('(right[:, {}] == right[:, {}])'.format(consulting_column(argument, equation),
+                                                                              combination[position] - 1))
+        
+        for _, b_args, b_op in equation.booleanExpressions:
+            conditions.append('({} {} {})'.format(compose_expression(b_args[0], equation, left),
+                                                  b_op,
+                                                  compose_expression(b_args[1], equation, left)))
+        
+        for negated_element in equation.negatedElements:
+            negated_arguments = []
+            for negated_arg in negated_element.arguments:
+                if negated_arg.type == 'constant':
+                    negated_arguments.append(str(negated_arg.value))
+                    continue
+                positions = [position for argument, position in equation.leftArguments
+                                if argument == negated_arg]
+                if positions:
+                    negated_arguments.append(compose_expression(positions[0], equation, left))
+                elif equation.type == 2:
+                    negated_arguments.append(compose_expression(negated_arg, equation, left))
+            conditions.append('~{}.contains(tuples(len({}), {}))'.format(solutions_name(negated_element.id.name),
+                                                                      left,
+                                                                      compose_tuple(negated_arguments)))
+        return conditions
+    
+    # This function emits the code of an equation for the variables of the array current
+    def emit_equation(handlers_file, equation, level):
+        spaces = spaces_level_2
+        
+        # The variables that satisfy the equal cards and constants of the left side
+        conditions = left_conditions(equation)
+        source = 'current'
+        if conditions:
+            handlers_file.write('{}selected = select(current, {})\n'.format(spaces,
+                                                                            compose_tuple(conditions)))
+            source = 'selected'
+        
+        if equation.type == 1:
+            left = source
+        else:
+            # The variables are joined with the tuples of the consulted predicate. The columns
+            # of the consulted predicate given by the variables and by the constants are the
+            # columns of the join.
+            combination = viewNamesToCombinations[aliasToViewNames[equation.aliasName]]
+            columns = []
+            values = []
+            for position, argument in enumerate(equation.consultingArguments):
+                if isinstance(argument, int):
+                    columns.append(str(combination[position] - 1))
+                    values.append('{}[:, {}]'.format(source, argument - 1))
+                elif argument.type == 'constant':
+                    columns.append(str(combination[position] - 1))
+                    values.append(str(argument.value))
+            
+            consulted = relation_name(equation.consultingPredicate.id.name)
+            handlers_file.write('{}rows, matches = {}.join(len({}), {}, {})\n'.format(spaces,
+                                                                                     consulted,
+                                                                                     source,
+                                                                                     compose_tuple(columns),
+                                                                                     compose_tuple(values)))
+            handlers_file.write('{}left = {}[rows]\n'.format(spaces, source))
+            handlers_file.write('{}right = {}.tuples[matches]\n'.format(spaces, consulted))
+            left = 'left'
+        
+        new_columns = [compose_expression(argument, equation, left) for argument in equation.rightArguments]
+        handlers_file.write('{}var = tuples(len({}), {})\n'.format(spaces,
+                                                                   left,
+                                                                   compose_tuple(new_columns)))
+        conditions = right_conditions(equation, left)
+        if conditions:
+            handlers_file.write('{}var = select(var, {})\n'.format(spaces,
+                                                                   compose_tuple(conditions)))
+        
+        # The new variables that are answers are only added to the queues if they are new
+        variable_id = equation.rightVariable.id
+        if variable_id in answersToStore:
+            handlers_file.write('{}var = {}.add(var)\n'.format(spaces,
+                                                               solutions_name(variable_id.name)))
+            for queue_level in sorted(idToStratumLevels[variable_id]):
+                handlers_file.write('{}{}({}, var)\n'.format(spaces,
+                                                             queue_append_name(queue_level),
+                                                             hypothesis_name(variable_id.name)))
+        else:
+            handlers_file.write('{}{}({}, var)\n'.format(spaces,
+                                                         queue_append_name(1),
+                                                         hypothesis_name(variable_id.name)))
+        handlers_file.write(EMPTY_LINE)
+    
+    # Here we emit for every stratum the function that creates the handlers
+    for level, stratum in enumerate(GenerationData.stratums, start=1):
+        variables = list(chain(stratum.ordering.block1,
+                               stratum.ordering.block2,
+                               stratum.ordering.block3))
+        
+        local_names.clear()
+        handlers_file = StringIO()
+        for variable_id in variables:
+            handlers_file.write('{}def handle_{}(current):\n'.format(spaces_level_1,
+                                                                    variable_id.name))
+            handler_start = handlers_file.tell()
+            if DEBUG:
+                handlers_file.write('{}print "Handling %i rewriting variables X_{}" % len(current)\n'.format(spaces_level_2,
+                                                                                                            variable_id.name))
+            
+            # As with the other backends the variables are printed and stored only in the
+            # first stratum in which they appear.
+            level_to_store_answer = sorted(idToStratumLevels[variable_id])[0]
+            if level == level_to_store_answer:
+                if variable_id in printVariables:
+                    handlers_file.write("{}write_tuples(sys.stdout, '{}', current)\n".format(spaces_level_2,
+                                                                                            variable_id.name))
+                if variable_id in outputTuples:
+                    handlers_file.write("{}fp_{}.write_rows(map(tuple, current.tolist()))\n".format(spaces_level_2,
+                                                                                                   variable_id.name))
+                # The variables have to be handled before they are consulted by the joins
+                if variable_id in getAllConsultingPredicates():
+                    handlers_file.write('{}{}.insert(current)\n'.format(spaces_level_2,
+                                                                        relation_name(variable_id.name)))
+            if handlers_file.tell() != handler_start:
+                handlers_file.write(EMPTY_LINE)
+            
+            for equation in GenerationData.index.equationsByLeftVariable.get(variable_id, []):
+                emit_equation(handlers_file, equation, level)
+            if handlers_file.tell() == handler_start:
+                handlers_file.write('{}pass\n\n'.format(spaces_level_2))
+        
+        outfile.write('def solver_handlers_stratum_level{}(data):\n'.format(level))
+        for name in sorted(local_names):
+            outfile.write('{}{} = {}\n'.format(spaces_level_1,
+                                               name,
+                                               local_names[name]))
+        outfile.write(EMPTY_LINE)
+        outfile.write(handlers_file.getvalue())
+        outfile.write('{}handlers = [None] * len(hypotheses)\n'.format(spaces_level_1))
+        for variable_id in variables:
+            outfile.write('{0}handlers[hypotheses.{1}] = handle_{1}\n'.format(spaces_level_1,
+                                                                             variable_id.name))
+        outfile.write('{}return handlers\n\n'.format(spaces_level_1))
+    
+    for function, resumable in getComputeFunctions():
+        outfile.write('def {}():\n'.format(function))
+        outfile.write('{}data = datastructure()\n\n'.format(spaces_level_1))
+        for level in xrange(1, len(GenerationData.stratums) + 1):
+            outfile.write('{}#* Stratum {} *#\n'.format(spaces_level_1,
+                                                    level))
+            outfile.write('{}solver_init_stratum_level{}(data)\n'.format(spaces_level_1,
+                                                                          level))
+            outfile.write('{}handlers = solver_handlers_stratum_level{}(data)\n'.format(spaces_level_1,
+                                                                                       level))
+            outfile.write('{}while (solver_queue{}):\n'.format(spaces_level_1,
+                                                               level))
+            outfile.write('{}hypothesis, current = solver_queue{}.popleft()\n'.format(spaces_level_2,
+                                                                                     level))
+            outfile.write('{}handler = handlers[hypothesis]\n'.format(spaces_level_2))
+            outfile.write('{}if handler is not None:\n'.format(spaces_level_2))
+            outfile.write('{}handler(current)\n'.format(spaces_level_2 + SPACES))
+            if resumable:
+                outfile.write('{}yield\n'.format(spaces_level_2))
+            outfile.write(EMPTY_LINE)
+
+# The SQL backend evaluates the rewriting variables set at a time with SQL statements.
+# The pending variables of every predicate are stored in a table for every stratum level
+# and, as with the NumPy backend, every handler evaluates all the pending variables of its
+# predicate at once: they are moved to the table current_<predicate> and every equation
+# is compiled to an INSERT ... SELECT that joins them with the relation of the consulted
+# predicate (using the index of its view). The equal cards, constants and boolean
+# expressions are conditions of the query and the negations are NOT EXISTS subqueries on
+# the solutions. The new answers are the rows that are not already in the solutions, they
+# are added to the solutions and to the tables of the stratum levels that require them.
+def fillSolverComputeSQL(outfile):
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
+    aliasToViewNames = GenerationData.index.aliasToViewNames
+    answersToStore = GenerationData.answersToStore
+    printVariables = GenerationData.printVariables
+    outputTuples = GenerationData.answersToStore
+    idToStratumLevels = GenerationData.idToStratumLevels
+    queueLevels = getSQLQueueLevels()
+    
+    spaces_level_1 = SPACES
+    spaces_level_2 = SPACES * 2
+    
+    # The names used by the handlers are bound as locals of the function that creates
+    # them. local_names is a dictionary between the local names and the bound expressions.
+    local_names = {}
+    
+    def bind_local_name(name, expression):
+        local_names[name] = expression
+        return name
+    
+    def hypothesis_name(name):
+        return bind_local_name('hypothesis_' + name, 'hypotheses.' + name)
+    
+    def queue_append_name(level):
+        return bind_local_name('solver_queue{}_append'.format(level),
+                               'solver_queue{}.append'.format(level))
+    
+    # Auxiliary function that returns the column of the predicate consulted by a type 2
+    # equation that holds the value of the given argument (starting at 1).
+    def consulting_column(argument, equation):
+        combination = viewNamesToCombinations[aliasToViewNames[equation.aliasName]]
+        return combination[equation.consultingArguments.index(argument)]
+    
+    # Auxiliary function that returns the SQL code of an expression. The positions of the
+    # rewriting variable are columns of the table aliased as l and the variables of the
+    # consulted predicate are columns of the table aliased as r. The integer division and
+    # the modulo of SQLite truncate towards zero, they are rewritten to round towards
+    # minus infinity as in Python.
+    def compose_expression(expression, equation):
+        if isinstance(expression, int):
+            return "l.V{}".format(expression)
+        elif isinstance(expression, Argument) and expression.type == 'constant':
+            return str(expression.value)
+        elif isinstance(expression, Argument) and expression.type == 'variable':
+            return "r.V{}".format(consulting_column(expression, equation))
+        elif isinstance(expression, ArithmeticExpression):
+            args, op = expression
+            left = compose_expression(args[0], equation)
+            right = compose_expression(args[1], equation)
+            if op == '%' or op == '/':
+                modulo = "((({0} % {1}) + {1}) % {1})".format(left, right)
+                if op == '%':
+                    return modulo
+                return "(({} - {}) / {})".format(left, modulo, right)
+            return "({} {} {})".format(left, op, right)
+        else:
+            error_msg = "Emmiting code (Unknown type): "
+            raise ValueError(error_msg + str(expression))
+    
+    # This function returns the conditions of the query of an equation: the equal cards
+    # and the constants of the left side, the columns of the join with the consulted
+    # predicate and its equal cards, the boolean expressions and the negations.
+    def conditions(equation):
+        conditions = []
+        positions_by_variable = defaultdict(list)
+        for rule_pos, (argument, _) in enumerate(equation.leftArguments, 1):
+            if argument.type == 'constant':
+                conditions.append('l.V{} = {}'.format(rule_pos, argument.value))
+            else:
+                positions_by_variable[argument].append(rule_pos)
+        for positions in positions_by_variable.itervalues():
+            for position in positions[1:]:
+                conditions.append('l.V{} = l.V{}'.format(positions[0], position))
+        
+        if equation.type == 2:
+            # The columns of the consulted predicate given by the variable and by the
+            # constants are the columns of the join, every repeated variable is compared
+            # with its first appearance.
+            combination = viewNamesToCombinations[aliasToViewNames[equation.aliasName]]
+            for position, argument in enumerate(equation.consultingArguments):
+                if isinstance(argument, int):
+                    conditions.append('r.V{} = l.V{}'.format(combination[position],
+                                                             argument))
+                elif argument.type == 'constant':
+                    conditions.append('r.V{} = {}'.format(combination[position],
+                                                          argument.value))
+                elif consulting_column(argument, equation) != combination[position]:
+                    conditions.append('r.V{} = r.V{}'.format(combination[position],
+                                                             consulting_column(argument, equation)))
+        
+        for _, b_args, b_op in equation.booleanExpressions:
+            conditions.append('{} {} {}'.format(compose_expression(b_args[0], equation),
+                                                b_op,
+                                                compose_expression(b_args[1], equation)))
+        
+        for negated_element in equation.negatedElements:
+            negated_conditions = []
+            for column, negated_arg in enumerate(negated_element.arguments, 1):
+                if negated_arg.type == 'constant':
+                    value = str(negated_arg.value)
+                else:
+                    positions = [position for argument, position in equation.leftArguments
+                                    if argument == negated_arg]
+                    if positions:
+                        value = compose_expression(positions[0], equation)
+                    else:
+                        value = compose_expression(negated_arg, equation)
+                negated_conditions.append('n.V{} = {}'.format(column, value))
+            conditions.append('NOT EXISTS (SELECT 1 FROM solution_{} AS n WHERE {})'.format(negated_element.id.name,
+                                                                                           ' AND '.join(negated_conditions)))
+        return conditions
+    
+    # This function returns the query that computes the new variables of an equation
+    def compose_query(equation):
+        columns = ', '.join('{} AS V{}'.format(compose_expression(argument, equation), position)
+                            for position, argument in enumerate(equation.rightArguments, 1))
+        query = 'SELECT {} FROM current_{} AS l'.format(columns,
+                                                        equation.leftVariable.id.name)
+        # The join is evaluated for every pending variable
+        if equation.type == 2:
+            query += ' CROSS JOIN relation_{} AS r'.format(equation.consultingPredicate.id.name)
+        equation_conditions = conditions(equation)
+        if equation_conditions:
+            query += ' WHERE ' + ' AND '.join(equation_conditions)
+        return query
+    
+    # This function emits the code of an equation for the variables of the table current
+    def emit_equation(handlers_file, equation):
+        spaces = spaces_level_2
+        query = compose_query(equation)
+        
+        # The new variables that are answers are only added to the queues if they are new
+        variable_id = equation.rightVariable.id
+        if variable_id in answersToStore:
+            name = variable_id.name
+            same_columns = ' AND '.join('s.V{0} = c.V{0}'.format(x) for x in xrange(1, getPredicateLength(variable_id) + 1))
+            handlers_file.write('{}execute("DELETE FROM new_{}")\n'.format(spaces, name))
+            handlers_file.write('{0}execute("INSERT INTO new_{1} SELECT DISTINCT * FROM ({2}) AS c '
+                                'WHERE NOT EXISTS (SELECT 1 FROM solution_{1} AS s WHERE {3})")\n'.format(spaces,
+                                                                                                          name,
+                                                                                                          query,
+                                                                                                          same_columns))
+            handlers_file.write('{0}execute("INSERT INTO solution_{1} SELECT * FROM new_{1}")\n'.format(spaces,
+                                                                                                        name))
+            for queue_level in sorted(idToStratumLevels[variable_id]):
+                handlers_file.write('{}{}({}, execute("INSERT INTO queue{}_{} SELECT * FROM new_{}").rowcount)\n'.format(spaces,
+                                                                                                                      queue_append_name(queue_level),
+                                                                                                                      hypothesis_name(name),
+                                                                                                                      queue_level,
+                                                                                                                      name,
+                                                                                                                      name))
+        else:
+            handlers_file.write('{}{}({}, execute("INSERT INTO queue1_{} {}").rowcount)\n'.format(spaces,
+                                                                                              queue_append_name(1),
+                                                                                              hypothesis_name(variable_id.name),
+                                                                                              variable_id.name,
+                                                                                              query))
+        handlers_file.write(EMPTY_LINE)
+    
+    # Auxiliary function that emits the code to print the variables of the table current
+    def emit_print(handlers_file, f, variable_id):
+        formatting = ', '.join(['%i' for x in xrange(getPredicateLength(variable_id))])
+        handlers_file.write("{}{}.writelines('{}({}).\\n' % row for row in execute(\"SELECT * FROM current_{}\"))\n".format(spaces_level_2,
+                                                                                                                           f,
+                                                                                                                           variable_id.name,
+                                                                                                                           formatting,
+                                                                                                                           variable_id.name))
+    
+    # Here we emit for every stratum the function that creates the handlers
+    for level, stratum in enumerate(GenerationData.stratums, start=1):
+        variables = list(chain(stratum.ordering.block1,
+                               stratum.ordering.block2,
+                               stratum.ordering.block3))
+        # The variables added to the tables of the level that are not handled by the
+        # stratum are discarded
+        discarded = [predicate for predicate, levels in sorted(queueLevels.iteritems())
+                        if level in levels and predicate not in variables]
+        
+        local_names.clear()
+        bind_local_name('execute', 'data.con.execute')
+        handlers_file = StringIO()
+        for variable_id in variables:
+            handlers_file.write('{}def handle_{}():\n'.format(spaces_level_1,
+                                                             variable_id.name))
+            # The pending variables become the current ones
+            handlers_file.write('{}execute("DELETE FROM current_{}")\n'.format(spaces_level_2,
+                                                                              variable_id.name))
+            handlers_file.write('{}execute("INSERT INTO current_{} SELECT * FROM queue{}_{}")\n'.format(spaces_level_2,
+                                                                                                       variable_id.name,
+                                                                                                       level,
+                                                                                                       variable_id.name))
+            handlers_file.write('{}execute("DELETE FROM queue{}_{}")\n'.format(spaces_level_2,
+                                                                              level,
+                                                                              variable_id.name))
+            if DEBUG:
+                handlers_file.write('{}print "Handling rewriting variables X_{}"\n'.format(spaces_level_2,
+                                                                                          variable_id.name))
+            
+            # As with the other backends the variables are printed and stored only in the
+            # first stratum in which they appear.
+            level_to_store_answer = sorted(idToStratumLevels[variable_id])[0]
+            if level == level_to_store_answer:
+                if variable_id in printVariables:
+                    emit_print(handlers_file, 'sys.stdout', variable_id)
+                if variable_id in outputTuples:
+                    handlers_file.write('{}fp_{}.write_rows(execute("SELECT * FROM current_{}"))\n'.format(spaces_level_2,
+                                                                                                          variable_id.name,
+                                                                                                          variable_id.name))
+                # The variables have to be handled before they are consulted by the joins
+                if variable_id in getAllConsultingPredicates():
+                    handlers_file.write('{}execute("INSERT INTO relation_{} SELECT * FROM current_{}")\n'.format(spaces_level_2,
+                                                                                                                variable_id.name,
+                                                                                                                variable_id.name))
+            handlers_file.write(EMPTY_LINE)
+            
+            for equation in GenerationData.index.equationsByLeftVariable.get(variable_id, []):
+                emit_equation(handlers_file, equation)
+        
+        for variable_id in discarded:
+            handlers_file.write('{}def handle_{}():\n'.format(spaces_level_1,
+                                                             variable_id.name))
+            handlers_file.write('{}execute("DELETE FROM queue{}_{}")\n\n'.format(spaces_level_2,
+                                                                                level,
+                                                                                variable_id.name))
+        
+        outfile.write('def solver_handlers_stratum_level{}(data):\n'.format(level))
+        for name in sorted(local_names):
+            outfile.write('{}{} = {}\n'.format(spaces_level_1,
+                                               name,
+                                               local_names[name]))
+        outfile.write(EMPTY_LINE)
+        outfile.write(handlers_file.getvalue())
+        outfile.write('{}handlers = [None] * len(hypotheses)\n'.format(spaces_level_1))
+        for variable_id in chain(variables, discarded):
+            outfile.write('{0}handlers[hypotheses.{1}] = handle_{1}\n'.format(spaces_level_1,
+                                                                             variable_id.name))
+        outfile.write('{}return handlers\n\n'.format(spaces_level_1))
+    
+    for function, resumable in getComputeFunctions():
+        outfile.write('def {}():\n'.format(function))
+        outfile.write('{}data = datastructure(solver_database)\n\n'.format(spaces_level_1))
+        for level in xrange(1, len(GenerationData.stratums) + 1):
+            outfile.write('{}#* Stratum {} *#\n'.format(spaces_level_1,
+                                                    level))
+            outfile.write('{}solver_init_stratum_level{}(data)\n'.format(spaces_level_1,
+                                                                          level))
+            outfile.write('{}handlers = solver_handlers_stratum_level{}(data)\n'.format(spaces_level_1,
+                                                                                       level))
+            outfile.write('{}while (solver_queue{}):\n'.format(spaces_level_1,
+                                                               level))
+            outfile.write('{}handlers[solver_queue{}.popleft()]()\n'.format(spaces_level_2,
+                                                                           level))
+            if resumable:
+                outfile.write('{}yield\n'.format(spaces_level_2))
+            outfile.write(EMPTY_LINE)
+            outfile.write('{}data.commit()\n\n'.format(spaces_level_1))
+
 def fillSolverCompute(outfile):
+    # The NumPy backend evaluates the variables in batches
+    if GenerationData.Backend == 'NumPy':
+        fillSolverComputeBatches(outfile)
+        return
+    # The SQL backend evaluates the variables set at a time
+    if GenerationData.Backend == 'SQL':
+        fillSolverComputeSQL(outfile)
+        return
+    
     # Auxiliary function used to obtain the index position of a querying argument.
     # It is the position of the argument has on the elements we query to the database.
     def get_t_index(argument, consulting_arguments, common_variables):
@@ -899,8 +1757,42 @@ def fillSolverCompute(outfile):
             error_msg = "Emmiting code (Unknown type): "
             raise ValueError(error_msg + str(expression))
 
+    # The code of every rewriting variable is emitted in a handler function. The handlers
+    # of a stratum are created by a function that binds, as local names, the methods of
+    # the data structure, the views, the hypotheses and the queues the handlers use.
+    # This way they are looked up once and not every time a variable is handled.
+    # local_names is a dictionary between the local names and the bound expressions.
+    local_names = {}
+
+    def bind_local_name(name, expression):
+        local_names[name] = expression
+        return name
+
+    def data_method(name):
+        return bind_local_name(name, 'data.' + name)
+
+    def view_name(name):
+        return bind_local_name(name, 'views.' + name)
+
+    def hypothesis_name(name):
+        return bind_local_name('hypothesis_' + name, 'hypotheses.' + name)
+
+    # Returns the code to add the rewriting variable var of the predicate variable_id to the
+    # queue of the given stratum level
+    def add_to_queue(level, variable_id):
+        if GenerationData.Queue == 'Deque':
+            return '{}(var)'.format(bind_local_name('solver_queue{}_append'.format(level),
+                                                    'solver_queue{}.append'.format(level)))
+        elif GenerationData.Queue == 'Redis':
+            return '{}(STRATUM_QUEUE{}, var)'.format(bind_local_name('rpush', 'redis_connector.rpush'),
+                                                     level)
+        elif GenerationData.Queue == 'Multiprocess':
+            return 'send({}, var, {})'.format(level,
+                                              getTargetsCode(variable_id, predicateColumns, 'var'))
+
     # This function emits code regardless we are dealing with a type 1 or type 2 rewriting equation.
     # Parameters:
+    # outfile -> The file in which the code is emitted.
     #  spaces -> A string. Representing the number of spaces that we have to print when emitting code.
     #  equation -> A RewritingRule1 or RewritingRule2. Represents the rewriting equation.
     # level -> An integer. Represents the stratum we are in.
@@ -908,7 +1800,7 @@ def fillSolverCompute(outfile):
     #                    Datalog program.
     # idToStratumLevels -> A dictionary. The dictionary is a mapping between the identifiers and
     #                      the stratum level they belong.
-    def common_block(spaces, equation, level, num_of_stratums, idToStratumLevels):
+    def common_block(outfile, spaces, equation, level, num_of_stratums, idToStratumLevels):
         # Do we have to store the answer??
         if equation.rightVariable.id in answersToStore:
             variable_id = equation.rightVariable.id
@@ -916,9 +1808,9 @@ def fillSolverCompute(outfile):
             args = ', '.join('var[{}]'.format(x) for 
                             x in xrange(1, len(equation.rightArguments)+1))
             
-            outfile.write('\n{}if not data.contains_solution_{}({})'.format(spaces,
-                                                                            variable_id.name,
-                                                                            args))
+            outfile.write('\n{}if not {}({})'.format(spaces,
+                                                  data_method('contains_solution_' + variable_id.name),
+                                                  args))
             
             if equation.booleanExpressions:
                 outfile.write( ' and\\\n{0}{1}'.format(spaces,
@@ -975,10 +1867,10 @@ def fillSolverCompute(outfile):
                                                                           equation.commonVariables))
                 
                 negated_arguments = ', '.join(negated_arguments_str)
-                outfile.write('{}{}not data.contains_solution_{}({})'.format(spaces,
-                                                                             '    ',
-                                                                             negated_element.id.name,
-                                                                             negated_arguments))
+                outfile.write('{}{}not {}({})'.format(spaces,
+                                                      '    ',
+                                                      data_method('contains_solution_' + negated_element.id.name),
+                                                      negated_arguments))
                 if (pos != len(equation.negatedElements) - 1):
                     outfile.write(' and\\\n')
             spaces += SPACES
@@ -993,28 +1885,30 @@ def fillSolverCompute(outfile):
                     outfile.write('{}print "\\t  Queue {}"\n'.format(spaces, str(level)))
 
             
+            # With the Multiprocess queue the solutions of the worker only contain the variables it
+            # handles, so the variable is sent to the first level in which it is required and the
+            # workers that receive it store it as a solution and add it to the rest of the levels.
+            if GenerationData.Queue == 'Multiprocess':
+                outfile.write('{}{}\n'.format(spaces, add_to_queue(sorted(idToStratumLevels[variable_id])[0],
+                                                                    variable_id)))
+                return
+            
             # To compute a program a variable can be required to be evaluated in different queues, here we
             # make sure that the variable is added to every required queue. IdToStratums is a dictionary that
             # contains the required information to emit the code. It takes as a key a variable_id and returns
             # the queue levels in which is required.
             for queue_level in idToStratumLevels[variable_id]:
-                if GenerationData.Queue == 'Deque':
-                    outfile.write('{}solver_queue{}.append(var)\n'.format(spaces, str(queue_level)))
-                elif GenerationData.Queue == 'Redis':
-                    outfile.write('{}redis_connector.rpush(STRATUM_QUEUE{}, var)\n'.format(spaces, str(queue_level)))
+                outfile.write('{}{}\n'.format(spaces, add_to_queue(queue_level, variable_id)))
                                     
-            outfile.write('{}data.append_solution_{}({})\n'.format(spaces,
-                                                                    variable_id.name,
-                                                                    args))
+            outfile.write('{}{}({})\n'.format(spaces,
+                                               data_method('append_solution_' + variable_id.name),
+                                               args))
         else:
-            if GenerationData.Queue == 'Deque':
-                outfile.write('{}solver_queue1.append(var)\n'.format(spaces))
-            elif GenerationData.Queue == 'Redis':
-                outfile.write('{}redis_connector.rpush(STRATUM_QUEUE1, var)\n'.format(spaces))
+            outfile.write('{}{}\n'.format(spaces, add_to_queue(1, equation.rightVariable.id)))
             
-    predsToViewNames = dict(chain(*[ view.predsToViewNames.items() for view in getViewsFromAllStratums() ]))
-    viewNamesToCombinations = dict(chain(*[ view.viewNamesToCombinations.items() for view in getViewsFromAllStratums() ]))
-    aliasToViewNames = dict(chain(*[ view.aliasToViewNames.items() for view in getViewsFromAllStratums() ]))
+    predsToViewNames = GenerationData.index.predsToViewNames
+    viewNamesToCombinations = GenerationData.index.viewNamesToCombinations
+    aliasToViewNames = GenerationData.index.aliasToViewNames
     answersToStore = GenerationData.answersToStore
     printVariables = GenerationData.printVariables
     outputTuples = GenerationData.answersToStore
@@ -1023,40 +1917,46 @@ def fillSolverCompute(outfile):
     
     spaces_level_1 = SPACES
     spaces_level_2 = SPACES * 2
-    spaces_level_3 = SPACES * 3
     
-    outfile.write('def solver_compute():\n')
-    outfile.write('{}data = datastructure()\n'.format(spaces_level_1))
-    outfile.write('{}var = None\n\n'.format(spaces_level_1))
-    # Here we emit code to handle the different stratums in the solver_compute function
+    # With the Multiprocess queue every worker only evaluates the equations and stores the
+    # views and the answers of the join columns that belong to it
+    if queue == 'Multiprocess':
+        predicateColumns, viewColumns = getPartitioningColumns()
+    
+    # The conditions that check if the worker handles the given join columns of the current
+    # variable are computed once, at the beginning of the handler (after storing the answer).
+    # owner_conditions is a list with the conditions of the handler being emitted.
+    owner_conditions = []
+    
+    def owner_name(columns_list):
+        condition = getOwnerConditionCode(columns_list, 'current')
+        if condition not in owner_conditions:
+            owner_conditions.append(condition)
+        return 'owner{}'.format(owner_conditions.index(condition) + 1)
+    
+    # Here we emit for every stratum the function that creates the handlers of the rewriting
+    # variables. The handlers are returned in a list indexed by the hypotheses, solver_compute
+    # uses the list to dispatch the variables it takes from the queue of the stratum.
     for level, stratum in enumerate(GenerationData.stratums, start=1):
-        outfile.write('{}#* Stratum {} *#\n'.format(spaces_level_1, 
-                                                level))
-        outfile.write('{}solver_init_stratum_level{}()\n'.format(spaces_level_1,
-                                                                  level))
-        if queue == 'Deque':
-            outfile.write('{}while (solver_queue{}):\n'.format(spaces_level_1,
-                                                               level))
-            outfile.write('{}current = solver_queue{}.popleft()\n\n'.format(spaces_level_2,
-                                                                            level))
-        elif queue == 'Redis':
-            outfile.write('{}while (True):\n'.format(spaces_level_1))
-            outfile.write('{}try:\n'.format(spaces_level_2))
-            outfile.write('{}current = literal_eval(redis_connector.lpop(STRATUM_QUEUE{}))\n'.format(spaces_level_3,
-                                                                                                     level))
-            outfile.write('{}except ValueError:\n'.format(spaces_level_2))
-            outfile.write('{}break\n\n'.format(spaces_level_3))
-        
         block1 = stratum.ordering.block1
         block2 = stratum.ordering.block2
         block3 = stratum.ordering.block3
-    
+        
+        # The handlers are emitted first as the local names they use are not known in advance
+        local_names.clear()
+        if queue == 'Multiprocess':
+            bind_local_name('send', 'channel.send')
+            bind_local_name('worker', 'channel.worker')
+            bind_local_name('workers', 'channel.workers')
+            bind_local_name('all_workers', 'channel.all_workers')
+        handlers_file = StringIO()
         for variable_id in chain(block1, block2, block3):
             # Get the equation of the predicate raise an exception if not found
-            equations = (x for x in getEquationsFromAllStratums() if x.leftVariable.id == variable_id)
+            equations = GenerationData.index.equationsByLeftVariable.get(variable_id, [])
     
-            outfile.write('{}if current[0] == hypotheses.{}:\n'.format(spaces_level_2,
-                                                                       variable_id.name))
+            handlers_file.write('{}def handle_{}(current):\n'.format(spaces_level_1,
+                                                                variable_id.name))
+            handler_start = handlers_file.tell()
 
             # The answer can be represented in more than one level (stratum). We need to 
             # assure that we only emit the answer once, otherwise the solution would appear 
@@ -1066,19 +1966,47 @@ def fillSolverCompute(outfile):
             # we sort the levels the in which the variable appears take the first one and
             # check that is the level that the code is being emitted. 
             level_to_store_answer = sorted(idToStratumLevels[variable_id])[0]
+            pred_length = getPredicateLength(variable_id)
+            
+            # With the Multiprocess queue the answers are stored as solutions by the workers that
+            # handle them, as they can be sent more than once. Then they are added to the rest of
+            # the levels they are required and only one of the workers prints them.
+            spaces_print = spaces_level_2
+            if queue == 'Multiprocess' and level == level_to_store_answer:
+                if variable_id in answersToStore:
+                    args = ', '.join('current[{}]'.format(x) for x in xrange(1, pred_length + 1))
+                    handlers_file.write('{}if {}({}):\n'.format(spaces_level_2,
+                                                                data_method('contains_solution_' + variable_id.name),
+                                                                args))
+                    handlers_file.write('{}return\n'.format(spaces_level_2 + SPACES))
+                    handlers_file.write('{}{}({})\n'.format(spaces_level_2,
+                                                            data_method('append_solution_' + variable_id.name),
+                                                            args))
+                    for queue_level in sorted(idToStratumLevels[variable_id])[1:]:
+                        handlers_file.write('{}{}(current)\n'.format(spaces_level_2,
+                                                                     bind_local_name('solver_queue{}_append'.format(queue_level),
+                                                                                     'solver_queue{}.append'.format(queue_level))))
+            owner_conditions[:] = []
+            conditions_start = handlers_file.tell()
+            if queue == 'Multiprocess' and level == level_to_store_answer:
+                if variable_id in printVariables or variable_id in outputTuples:
+                    handlers_file.write('{}if {}:\n'.format(spaces_level_2,
+                                                            owner_name(predicateColumns[variable_id][:1])))
+                    spaces_print += SPACES
+            
             # Do we have to print the variable to stdout?.
             if level == level_to_store_answer and variable_id in printVariables:
-                outfile.write("{}print_rewriting_variable(current)\n".format(spaces_level_3))
+                handlers_file.write("{}print_rewriting_variable(current)\n".format(spaces_print))
                 
             # Is it a solution? Then print it to a file.
             if level == level_to_store_answer and variable_id in outputTuples:
-                outfile.write("{}print_answer(fp_{}, current)\n".format(spaces_level_3,
-                                                                        variable_id.name))
+                handlers_file.write("{}{}(current)\n".format(spaces_print,
+                                                              bind_local_name('write_answer_' + variable_id.name,
+                                                                              'fp_{}.write'.format(variable_id.name))))
             
-            pred_length = getPredicateLength(variable_id)
             # Debug information
             if DEBUG:
-                outfile.write('{}print "Handling rewriting variable X_{}({})" % ({})\n'.format(spaces_level_3,
+                handlers_file.write('{}print "Handling rewriting variable X_{}({})" % ({})\n'.format(spaces_level_2,
                                                                                                variable_id.name,
                                                                                                ', '.join('%i' for _ in xrange(pred_length)),
                                                                                                ', '.join('current[{}]'.format(x) for x in xrange(1, pred_length+1))))
@@ -1095,15 +2023,15 @@ def fillSolverCompute(outfile):
                 # treated as such. Otherwise we insert a value into the list as normal
                 if DEBUG:
                     if (level == level_to_store_answer) and (pred_length == 1):
-                        outfile.write('{}print "Data structure: Adding solution {}("'.format(spaces_level_3,
+                        handlers_file.write('{}print "Data structure: Adding solution {}("'.format(spaces_level_2,
                                                                                              variable_id.name))
-                        outfile.write(' + ", ".join(current[1:]) + ")"\n')
+                        handlers_file.write(' + ", ".join(current[1:]) + ")"\n')
                     elif (level == level_to_store_answer):
                         for view in predsToViewNames[variable_id]:
                             args = ', '.join('current[{}]'.format(x) for
                                              x in viewNamesToCombinations[view])
                             formatting = ', '.join(('%i' for _ in viewNamesToCombinations[view]))
-                            outfile.write('{}print "\\tData structure: Adding {}({})" % ({})\n'.format(spaces_level_3,
+                            handlers_file.write('{}print "\\tData structure: Adding {}({})" % ({})\n'.format(spaces_level_2,
                                                                                                        view,
                                                                                                        formatting,
                                                                                                        args))
@@ -1116,11 +2044,20 @@ def fillSolverCompute(outfile):
                 # 1 we have to add directly the solution, as by convention there is no level node of length 0
                 # and the predicates of length 1 are turned into solutions
                 if (level == level_to_store_answer) and (pred_length == 1):
-                    outfile.write('{}data.append_solution_{}(current[1])\n'.format(spaces_level_3,
-                                                                                   variable_id.name))
+                    handlers_file.write('{}{}(current[1])\n'.format(spaces_level_2,
+                                                                 data_method('append_solution_' + variable_id.name)))
                     # If the variable only appears as a negated predicate we don't have to insert it to the database
                     if variable_id in getAllConsultingPredicates():
-                        outfile.write('{}data.insert1(current[1])\n\n'.format(spaces_level_3))
+                        spaces_insert = spaces_level_2
+                        if queue == 'Multiprocess':
+                            columns_list = list(chain.from_iterable(viewColumns[view] for view in 
+                                                                    predsToViewNames[variable_id]))
+                            if columns_list:
+                                handlers_file.write('{}if {}:\n'.format(spaces_insert,
+                                                                        owner_name(columns_list)))
+                                spaces_insert += SPACES
+                        handlers_file.write('{}{}(current[1])\n\n'.format(spaces_insert,
+                                                                       data_method('insert1')))
                 elif (level == level_to_store_answer):
                     for view in predsToViewNames[variable_id]:
                         args = ', '.join('current[{}]'.format(x) for
@@ -1130,28 +2067,43 @@ def fillSolverCompute(outfile):
                         # to the database. Checking the getAllSolutions function to know what it is considered
                         # to be a solution will raise an error on the evaluation of some programs due to equal
                         # cards.
-                        if variable_id in getPredicatesWithAllVariablesBeingInTheSharedSet() |\
-                                          getPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants()|\
-                                          getNegatedPredicates():
-                            outfile.write('{}data.append_solution_{}({})\n'.format(spaces_level_3,
-                                                                                   variable_id.name,
-                                                                                   args))
+                        if variable_id in GenerationData.index.appendedSolutions:
+                            handlers_file.write('{}{}({})\n'.format(spaces_level_2,
+                                                                     data_method('append_solution_' + variable_id.name),
+                                                                     args))
                         
                         # We have to update the database if the identifier pertains to a variable
                         # that is going to be consulted in the database. That means it pertains to
                         # an equation  
                         if variable_id in getAllConsultingPredicates():
-                            outfile.write('{}data.insert{}(views.{}, {})\n'.format(spaces_level_3,
-                                                                                     pred_length,
-                                                                                     view,
-                                                                                     args))
-                        outfile.write(EMPTY_LINE)
+                            spaces_insert = spaces_level_2
+                            if queue == 'Multiprocess' and viewColumns[view]:
+                                handlers_file.write('{}if {}:\n'.format(spaces_insert,
+                                                                        owner_name(viewColumns[view])))
+                                spaces_insert += SPACES
+                            handlers_file.write('{}{}({}, {})\n'.format(spaces_insert,
+                                                                         data_method('insert' + str(pred_length)),
+                                                                         view_name(view),
+                                                                         args))
+                        handlers_file.write(EMPTY_LINE)
             
                     
-            spaces = spaces_level_3
+            spaces = spaces_level_2
             for equation in equations:
                 argument_constants_left_side = [ x for x in equation.leftArguments if x[0].type == 'constant']
                 
+                # The equations of type 2 are evaluated by the worker of their join columns and the
+                # equations of type 1 by the worker that prints the variable
+                if queue == 'Multiprocess':
+                    if equation.type == 2:
+                        columns = [x for x in equation.consultingArguments if isinstance(x, int)]
+                    else:
+                        columns = predicateColumns[variable_id][0]
+                    spaces = spaces_level_2
+                    handlers_file.write('{}if {}:\n'.format(spaces,
+                                                            owner_name([columns])))
+                    spaces += SPACES
+                
                 if equation.type == 1:
                     # Do we have equal cards? If so we need to be sure they match before process the variable 
                     have_equal_cards = (len(set(equation.leftArguments)) != len(equation.leftArguments))
@@ -1163,28 +2115,28 @@ def fillSolverCompute(outfile):
                             
                         lists_of_duplicated_vars = filter(lambda x: len(x) > 1, temp_dict.values())
                         
-                        outfile.write('\n{}if '.format(spaces))
+                        handlers_file.write('\n{}if '.format(spaces))
                         for pos, l in enumerate(lists_of_duplicated_vars):
-                            outfile.write('({})'.format(' == '.join( ['current[{}]'.format(x) for x in l] )))
+                            handlers_file.write('({})'.format(' == '.join( ['current[{}]'.format(x) for x in l] )))
                             if pos != len(lists_of_duplicated_vars)-1:
-                                outfile.write(' and\\\n{}   '.format(spaces))
+                                handlers_file.write(' and\\\n{}   '.format(spaces))
                     if argument_constants_left_side:
                         if have_equal_cards:
-                            outfile.write(' and\\\n{}   '.format(spaces))
+                            handlers_file.write(' and\\\n{}   '.format(spaces))
                         else:
-                            outfile.write('{}if '.format(spaces))
+                            handlers_file.write('{}if '.format(spaces))
                             
                         for pos, elem in enumerate(argument_constants_left_side):
-                            outfile.write('current[{}] == {}'.format(elem[1],
+                            handlers_file.write('current[{}] == {}'.format(elem[1],
                                                                      str(elem[0].value)))
                             if pos != len(argument_constants_left_side)-1:
-                                outfile.write(' and\\\n{}   '.format(spaces))
+                                handlers_file.write(' and\\\n{}   '.format(spaces))
                             
                     if have_equal_cards or argument_constants_left_side:
-                        outfile.write(':\n')
+                        handlers_file.write(':\n')
                         spaces += SPACES
                         
-                    new_var = 'var = (hypotheses.{}, '.format(equation.rightVariable.id.name)                            
+                    new_var = 'var = ({}, '.format(hypothesis_name(equation.rightVariable.id.name))                            
                     for pos, answer in enumerate(equation.rightArguments, 1):
                         # Check if we are dealing with a constant propagated trough the datalog source code.
                         # If we have an integer here it means it is a rewriting constant propagated value
@@ -1194,9 +2146,9 @@ def fillSolverCompute(outfile):
                         if (pos != len(equation.rightArguments)): new_var += ", "
                         
                     new_var += ')'
-                    outfile.write('{}{}'.format(spaces, new_var))
+                    handlers_file.write('{}{}'.format(spaces, new_var))
                         
-                    common_block(spaces, equation, level,
+                    common_block(handlers_file, spaces, equation, level,
                                  len(GenerationData.stratums),
                                  idToStratumLevels)
                     
@@ -1275,21 +2227,21 @@ def fillSolverCompute(outfile):
                         # Every list will contain the positions that should be equal. We emit an if in which
                         # every line are the positions of the list compared for equality and joined by logical 
                         # ands
-                        outfile.write('{}if '.format(spaces))
+                        handlers_file.write('{}if '.format(spaces))
                         for pos, l in enumerate(lists_of_duplicated_vars):
-                            outfile.write('({})'.format(' == '.join(['current[{}]'.format(x) for x in l])))
+                            handlers_file.write('({})'.format(' == '.join(['current[{}]'.format(x) for x in l])))
                             if pos != len(lists_of_duplicated_vars)-1:
-                                outfile.write(' and\\\n{}   '.format(spaces))
+                                handlers_file.write(' and\\\n{}   '.format(spaces))
                         if argument_constants_left_side:
-                            outfile.write(' and\\\n{}   '.format(spaces))
+                            handlers_file.write(' and\\\n{}   '.format(spaces))
                                                 
                             for pos, elem in enumerate(argument_constants_left_side):
-                                outfile.write('current[{}] == {}'.format(elem[1],
+                                handlers_file.write('current[{}] == {}'.format(elem[1],
                                                                          str(elem[0].value)))
                                 if pos != len(argument_constants_left_side)-1:
-                                    outfile.write(' and\\\n{}   '.format(spaces))
+                                    handlers_file.write(' and\\\n{}   '.format(spaces))
                                     
-                        outfile.write(':\n')
+                        handlers_file.write(':\n')
                         spaces += SPACES
                         
                         # Here we have to add the solution to the data structure if the predicate has all variables
@@ -1297,30 +2249,30 @@ def fillSolverCompute(outfile):
                         # length is 1.
                         if len(set(equation.leftArguments)) == 1:
                             args = ['current[{}]'.format(x) for x in l]
-                            outfile.write("{}if not data.contains_solution_{}({}):\n".format(spaces,
-                                                                                              equation.leftVariable.id.name,
-                                                                                              ", ".join(args)))
+                            handlers_file.write("{}if not {}({}):\n".format(spaces,
+                                                                             data_method('contains_solution_' + equation.leftVariable.id.name),
+                                                                             ", ".join(args)))
                             spaces += SPACES
                             if DEBUG:
-                                outfile.write('{}print "\\tAdding solution -> ",\n'.format(spaces))
-                                outfile.write('{}print_rewriting_variable(current)\n'.format(spaces))
+                                handlers_file.write('{}print "\\tAdding solution -> ",\n'.format(spaces))
+                                handlers_file.write('{}print_rewriting_variable(current)\n'.format(spaces))
 
-                            outfile.write("{}data.append_solution_{}({})\n".format(spaces,
-                                                                                    equation.leftVariable.id.name,
-                                                                                    ", ".join(args)))
+                            handlers_file.write("{}{}({})\n".format(spaces,
+                                                                     data_method('append_solution_' + equation.leftVariable.id.name),
+                                                                     ", ".join(args)))
                             spaces = spaces[:-len(SPACES)]
-                            outfile.write(EMPTY_LINE)
+                            handlers_file.write(EMPTY_LINE)
                     
                     elif argument_constants_left_side:
-                        outfile.write('{}if '.format(spaces))
+                        handlers_file.write('{}if '.format(spaces))
                         
                         for pos, elem in enumerate(argument_constants_left_side):
-                            outfile.write('current[{}] == {}'.format(elem[1],
+                            handlers_file.write('current[{}] == {}'.format(elem[1],
                                                                      str(elem[0].value)))
                             if pos != len(argument_constants_left_side)-1:
-                                outfile.write(' and\\\n{}   '.format(spaces))
+                                handlers_file.write(' and\\\n{}   '.format(spaces))
                                 
-                        outfile.write(':\n')
+                        handlers_file.write(':\n')
                         spaces += SPACES
                         
                     
@@ -1337,14 +2289,15 @@ def fillSolverCompute(outfile):
                     # If we don't have equal cards in the set of common variables we just iterate over the
                     # list of common variables taking the position.
                     if commonVars_len == 0:
-                        outfile.write('{}for t0 in data.get_level0_values():\n'.format(spaces))
+                        handlers_file.write('{}for t0 in {}():\n'.format(spaces,
+                                                                          data_method('get_level0_values')))
                         spaces += SPACES
                         # If the length of the predicate is one we also have to make sure that the value we obtain
                         # is valid as we won't iterate to obtain more values
                         if len(equation.consultingArguments) == 1:
-                            outfile.write('{}if (data.contains_solution_{}(t0))'.format(spaces,
-                                                                                        equation.consultingPredicate.id.name))
-                            outfile.write(':\n')
+                            handlers_file.write('{}if ({}(t0))'.format(spaces,
+                                                                       data_method('contains_solution_' + equation.consultingPredicate.id.name)))
+                            handlers_file.write(':\n')
                     
                     else:
                         # We don't have equal cards in the set of common variables, we just iterate over the set
@@ -1383,14 +2336,14 @@ def fillSolverCompute(outfile):
                             getPredicateLength(equation.consultingPredicate.id) != len(equation.commonVariables) and 
                             sum([1 for x in equation.consultingArguments if isinstance(x, int) or (isinstance(x, Argument) and x.type=='constant')]) != len(equation.consultingArguments)):
                             # Here we just emit code for t1 using the computed values
-                            outfile.write('{}for t1 in data.get{}(views.{}, {}):\n'.format(spaces,
-                                                                                    int_length + 1,
-                                                                                    aliasToViewNames[equation.aliasName],
+                            handlers_file.write('{}for t1 in {}({}, {}):\n'.format(spaces,
+                                                                                    data_method('get' + str(int_length + 1)),
+                                                                                    view_name(aliasToViewNames[equation.aliasName]),
                                                                                     args_common))
                         else:
-                            outfile.write("{}if data.contains_solution_{}({}):\n".format(spaces,
-                                                                                         equation.consultingPredicate.id.name,
-                                                                                         args_common))
+                            handlers_file.write("{}if {}({}):\n".format(spaces,
+                                                                         data_method('contains_solution_' + equation.consultingPredicate.id.name),
+                                                                         args_common))
                             spaces += SPACES
     
                     # Here we emit code for the rest of the required t levels that value is the number
@@ -1413,21 +2366,21 @@ def fillSolverCompute(outfile):
                            
                         if not equal_cards_query_common_vars:
                             args += ', '.join(['t{}'.format(i) for i in xrange(1, x)])
-                            outfile.write('{}for t{} in data.get{}(views.{}, {})'.format(spaces,
-                                                                                   x,
-                                                                                   query_value + 1,
-                                                                                   aliasToViewNames[equation.aliasName],
-                                                                                   args)) 
+                            handlers_file.write('{}for t{} in {}({}, {})'.format(spaces,
+                                                                                 x,
+                                                                                 data_method('get' + str(query_value + 1)),
+                                                                                 view_name(aliasToViewNames[equation.aliasName]),
+                                                                                 args)) 
                         else:
                             args += ', '.join(['t{}'.format(i) for i in xrange(1, (y-commonVars_len)+1)])
-                            outfile.write('{}for t{} in data.get{}(views.{}, {})'.format(spaces,
-                                                                                         (y-commonVars_len) + 1,
-                                                                                         query_value + 1,
-                                                                                         aliasToViewNames[equation.aliasName],
-                                                                                         args))
+                            handlers_file.write('{}for t{} in {}({}, {})'.format(spaces,
+                                                                                 (y-commonVars_len) + 1,
+                                                                                 data_method('get' + str(query_value + 1)),
+                                                                                 view_name(aliasToViewNames[equation.aliasName]),
+                                                                                 args))
 
                                           
-                        outfile.write(':\n')
+                        handlers_file.write(':\n')
                     
                     spaces += SPACES
                     
@@ -1460,17 +2413,17 @@ def fillSolverCompute(outfile):
                             lists_of_duplicated_vars = [list(xrange(len(equation.consultingArguments)))]
                             
                         # We only have to iterate over each list emitting code appropriately 
-                        outfile.write('{}if '.format(spaces))
+                        handlers_file.write('{}if '.format(spaces))
                         for pos, l in enumerate(lists_of_duplicated_vars):
                             t = ['t{}'.format(x) for x in l]
-                            outfile.write('{}'.format(' == '.join(t)))
+                            handlers_file.write('{}'.format(' == '.join(t)))
                             if pos != len(lists_of_duplicated_vars)-1:
-                                outfile.write(' and\\\n{}   '.format(spaces))
-                        outfile.write(':\n')
+                                handlers_file.write(' and\\\n{}   '.format(spaces))
+                        handlers_file.write(':\n')
                         spaces += SPACES
                         
-                    outfile.write('{}var = (hypotheses.{}'.format(spaces,
-                                                                  equation.rightVariable.id.name))
+                    handlers_file.write('{}var = ({}'.format(spaces,
+                                                             hypothesis_name(equation.rightVariable.id.name)))
                     
                     # Here we emit code to create the new variable. We start iterating
                     # from the rightArguments and check for every variable position of the
@@ -1485,24 +2438,135 @@ def fillSolverCompute(outfile):
                         code = compose_expression(var,
                                                   equation.consultingArguments,
                                                   equation.commonVariables)
-                        outfile.write(", {}".format(code))
+                        handlers_file.write(", {}".format(code))
 
-                    outfile.write(')\n')
+                    handlers_file.write(')\n')
                     
-                    common_block(spaces, equation, level,
+                    common_block(handlers_file, spaces, equation, level,
                                  len(GenerationData.stratums),
                                  idToStratumLevels)
 
                     # Reset the spacing                        
-                    outfile.write(EMPTY_LINE)
-                    spaces = spaces_level_3
+                    handlers_file.write(EMPTY_LINE)
+                    spaces = spaces_level_2
+            
+            # Emit the conditions of the worker before the code that uses them
+            if owner_conditions:
+                body = handlers_file.getvalue()[conditions_start:]
+                handlers_file.seek(conditions_start)
+                handlers_file.truncate()
+                for position, condition in enumerate(owner_conditions, start=1):
+                    handlers_file.write('{}owner{} = {}\n'.format(spaces_level_2,
+                                                                  position,
+                                                                  condition))
+                handlers_file.write(body)
+            if handlers_file.tell() == handler_start:
+                handlers_file.write('{}pass\n'.format(spaces_level_2))
+            handlers_file.write(EMPTY_LINE)
+
+        if queue == 'Multiprocess':
+            outfile.write('def solver_handlers_stratum_level{}(data, channel):\n'.format(level))
+        else:
+            outfile.write('def solver_handlers_stratum_level{}(data):\n'.format(level))
+        for name in sorted(local_names):
+            outfile.write('{}{} = {}\n'.format(spaces_level_1,
+                                                name,
+                                                local_names[name]))
+        outfile.write(EMPTY_LINE)
+        outfile.write(handlers_file.getvalue())
+        outfile.write('{}handlers = [None] * len(hypotheses)\n'.format(spaces_level_1))
+        for variable_id in chain(block1, block2, block3):
+            outfile.write('{0}handlers[hypotheses.{1}] = handle_{1}\n'.format(spaces_level_1,
+                                                                             variable_id.name))
+        outfile.write('{}return handlers\n\n'.format(spaces_level_1))
+    
+    # With the Multiprocess queue solver_compute starts the workers, every worker evaluates
+    # the stratums with its own data structure. When its queue is empty the worker waits for
+    # the variables sent by the rest of the workers until the stratum finishes.
+    if queue == 'Multiprocess':
+        compute_functions = [('solver_worker', False)]
+    else:
+        compute_functions = getComputeFunctions()
+    for function, resumable in compute_functions:
+        if queue == 'Multiprocess':
+            outfile.write('def solver_worker(channel):\n')
+            outfile.write('{}solver_init_worker(channel.worker)\n'.format(spaces_level_1))
+        else:
+            outfile.write('def {}():\n'.format(function))
+        if GenerationData.Backend == 'SQLite':
+            outfile.write('{}data = datastructure(solver_database)\n\n'.format(spaces_level_1))
+        else:
+            outfile.write('{}data = datastructure()\n\n'.format(spaces_level_1))
+        # Here we emit code to handle the different stratums in the solver_compute function
+        for level in xrange(1, len(GenerationData.stratums) + 1):
+            outfile.write('{}#* Stratum {} *#\n'.format(spaces_level_1, 
+                                                    level))
+            if queue == 'Multiprocess':
+                outfile.write('{}solver_init_stratum_level{}(channel)\n'.format(spaces_level_1,
+                                                                                 level))
+                outfile.write('{0}handlers = solver_handlers_stratum_level{1}(data, channel)\n'.format(spaces_level_1,
+                                                                                                  level))
+                outfile.write('{}popleft = solver_queue{}.popleft\n'.format(spaces_level_1,
+                                                                             level))
+                outfile.write('{}while (True):\n'.format(spaces_level_1))
+                outfile.write('{}while (solver_queue{}):\n'.format(spaces_level_2,
+                                                                    level))
+                outfile.write('{}current = popleft()\n'.format(spaces_level_2 + SPACES))
+                outfile.write('{}handler = handlers[current[0]]\n'.format(spaces_level_2 + SPACES))
+                outfile.write('{}if handler is not None:\n'.format(spaces_level_2 + SPACES))
+                outfile.write('{}handler(current)\n'.format(spaces_level_2 + SPACES * 2))
+                outfile.write('{}if not channel.synchronize({}):\n'.format(spaces_level_2,
+                                                                            level))
+                outfile.write('{}break\n\n'.format(spaces_level_2 + SPACES))
+                continue
+        
+            outfile.write('{}solver_init_stratum_level{}()\n'.format(spaces_level_1,
+                                                                      level))
+            outfile.write('{0}handlers = solver_handlers_stratum_level{1}(data)\n'.format(spaces_level_1,
+                                                                                         level))
+            if queue == 'Deque':
+                outfile.write('{}popleft = solver_queue{}.popleft\n'.format(spaces_level_1,
+                                                                             level))
+                outfile.write('{}while (solver_queue{}):\n'.format(spaces_level_1,
+                                                                   level))
+                outfile.write('{}current = popleft()\n'.format(spaces_level_2))
+            elif queue == 'Redis':
+                outfile.write('{}lpop = redis_connector.lpop\n'.format(spaces_level_1))
+                outfile.write('{}while (True):\n'.format(spaces_level_1))
+                outfile.write('{}try:\n'.format(spaces_level_2))
+                outfile.write('{}current = literal_eval(lpop(STRATUM_QUEUE{}))\n'.format(spaces_level_2 + SPACES,
+                                                                                         level))
+                outfile.write('{}except ValueError:\n'.format(spaces_level_2))
+                outfile.write('{}break\n'.format(spaces_level_2 + SPACES))
+            outfile.write('{}handler = handlers[current[0]]\n'.format(spaces_level_2))
+            outfile.write('{}if handler is not None:\n'.format(spaces_level_2))
+            outfile.write('{}handler(current)\n'.format(spaces_level_2 + SPACES))
+            if resumable:
+                outfile.write('{}yield\n'.format(spaces_level_2))
             outfile.write(EMPTY_LINE)
+            # The rows inserted by the SQLite backend are committed at the end of every stratum
+            if GenerationData.Backend == 'SQLite':
+                outfile.write('{}data.commit()\n\n'.format(spaces_level_1))
+    
+    if queue == 'Multiprocess':
+        outfile.write('{}solver_end_worker()\n\n'.format(spaces_level_1))
+        outfile.write('def solver_compute():\n')
+        outfile.write('{}global solver_processes\n'.format(spaces_level_1))
+        outfile.write('{}solver_processes = start_workers(solver_worker, solver_workers,\n'.format(spaces_level_1))
+        outfile.write('{}({},))\n\n'.format(spaces_level_1 + ' ' * len('solver_processes = start_workers('),
+                                              ', '.join('solver_queue{}'.format(x) for 
+                                                        x in xrange(1, len(GenerationData.stratums) + 1))))
 
 def fillSolverEnd(outfile):
     spaces_level_1 = SPACES
     outputTuples = GenerationData.answersToStore
     
-    outfile.write('def solver_end():\n')
+    # With the Multiprocess queue every worker closes its files and solver_end waits
+    # for the workers
+    if GenerationData.Queue == 'Multiprocess':
+        outfile.write('def solver_end_worker():\n')
+    else:
+        outfile.write('def solver_end():\n')
     outfile.write('{}global {}\n'.format(spaces_level_1,
                                          ', '.join('fp_{}'.format(ident.name) for ident in outputTuples)))
     for ident in outputTuples:
@@ -1510,11 +2574,40 @@ def fillSolverEnd(outfile):
                                                  ident.name))
     outfile.write(EMPTY_LINE)
     
+    if GenerationData.Queue == 'Multiprocess':
+        outfile.write('def solver_end():\n')
+        outfile.write('{}for process in solver_processes:\n'.format(spaces_level_1))
+        outfile.write('{}process.join()\n'.format(spaces_level_1 + SPACES))
+        outfile.write('{}if any(process.exitcode for process in solver_processes):\n'.format(spaces_level_1))
+        outfile.write("{}sys.exit('A worker of the solver failed')\n".format(spaces_level_1 + SPACES))
+        outfile.write(EMPTY_LINE)
+    
+# The API (api.py) gets the arity of every extensional predicate with the number of
+# stratums that read its facts, and the predicates whose answers are stored
+def fillApiPredicates(outfile):
+    idToStratumLevels = GenerationData.idToStratumLevels
+    
+    extensional = sorted(getExtensionalPredicates(), key=lambda ident: ident.name)
+    outfile.write('EXTENSIONAL_PREDICATES = {{{}}}\n'.format(', '.join("'{}': ({}, {})".format(ident.name,
+                                                                                             getPredicateLength(ident),
+                                                                                             len(idToStratumLevels.get(ident, ())))
+                                                                       for ident in extensional)))
+    outfile.write('ANSWER_PREDICATES = [{}]\n'.format(', '.join("'{}'".format(ident.name)
+                                                                 for ident in GenerationData.answersToStore)))
+
 def fillSolverQueueModules(outfile):
     queue = GenerationData.Queue
     
-    if queue == 'Deque':
+    if GenerationData.Backend == 'NumPy':
+        outfile.write('from relations import BatchQueue, read_fact_arrays, select, tuples, write_tuples\n')
+    elif GenerationData.Backend == 'SQL':
+        outfile.write('from sqlqueues import HypothesesQueue\n')
+    elif queue == 'Deque':
         outfile.write('from collections import deque\n')
+    elif queue == 'Multiprocess':
+        outfile.write('from collections import deque\n')
+        outfile.write('from multiprocessing import cpu_count\n\n')
+        outfile.write('from partitions import partition, start_workers\n')
     elif queue == 'Redis':
         outfile.write('import redis\n\n')
         outfile.write('from ast import literal_eval\n')
@@ -1533,44 +2626,47 @@ fill_template = {
         'fillContainsFunctions' : fillContainsFunctions,
         'fillAppendFunctions' : fillAppendFunctions,
         'fillPrintRewritingVariable' : fillPrintRewritingVariable,
-        'fillPrintAnswer' : fillPrintAnswer,
         'fillStratumSolverQueues' : fillStratumSolverQueues,
         'fillStratumQueueInitializers' : fillStratumQueueInitializers,
         'fillSolverInit' : fillSolverInit, 
         'fillSolverCompute' : fillSolverCompute,
         'fillSolverEnd' : fillSolverEnd,
-        'fillSolverQueueModules' : fillSolverQueueModules
+        'fillSolverQueueModules' : fillSolverQueueModules,
+        'fillApiPredicates' : fillApiPredicates
      }
 
 def fill_file(filename, orig_file, dest_file):
+    outfile = StringIO()
     with open(orig_file, 'r') as infile:
-        with open(dest_file, 'w') as outfile:
-            # Check if the first line calls fill_Header
-            line = infile.readline()
-            if line.split()[1] == 'fill_Header':
-                header =  '#\n# {}\n'.format(filename)
-                header += '# Created by: {}\n'.format('Python Code Generator')
-                header += '# Created on: {}\n'.format(datetime.today().date())
-                header += '#\n'
-            else:
-                header = line
-            
-            outfile.write(header)
+        # Check if the first line calls fill_Header
+        line = infile.readline()
+        if line.split()[1] == 'fill_Header':
+            header =  '#\n# {}\n'.format(filename)
+            header += '# Created by: {}\n'.format('Python Code Generator')
+            header += '#\n'
+        else:
+            header = line
+        
+        outfile.write(header)
 
-            for line, line_number in zip(infile, count(2)):
-                if line.startswith(DELIMITER):
-                    function = line.split()[1]
-                    try:
+        for line, line_number in zip(infile, count(2)):
+            if line.startswith(DELIMITER):
+                function = line.split()[1]
+                try:
+                    with profilePhase('directive ' + function):
                         fill_template[function](outfile)
-                    except KeyError as e:
-                        print e
-                        print "Error: {}: {}: Unknown directive: {}".format(filename,
-                                                                            line_number,
-                                                                            function)
-                        sys.exit(-1)
-                else:
-                    outfile.write(line)
-                    
+                except KeyError as e:
+                    print e
+                    print "Error: {}: {}: Unknown directive: {}".format(filename,
+                                                                        line_number,
+                                                                        function)
+                    sys.exit(-1)
+            else:
+                outfile.write(line)
+
+    # Only touch the destination file if its contents changed
+    writeFileIfChanged(dest_file, outfile.getvalue())
+    outfile.close()
     return True
 
 # Options for the module:
@@ -1579,36 +2675,85 @@ def fill_file(filename, orig_file, dest_file):
 # Backend -> It represents the static data is implemented
 # The possible options are:
 #     Native -> It will use a pure python representation of the data structure e
-#     SQLite -> It will use the SQLite module from the standard library
+#     Hash -> It will use a pure python representation with a dictionary for every view
+#             (indexed by the prefixes of its tuples) and a set for every solution
+#     SQLite -> It will use the SQLite module from the standard library. The database
+#               is kept in memory unless its path is given as argument of the solver.
+#     NumPy -> It will store the relations in NumPy arrays and evaluate the variables
+#              in batches (NumPy must be installed). Only the Deque queue can be used.
+#     SQL -> It will compile the equations of every stratum to SQL statements evaluated
+#            by SQLite set at a time. Only the Deque queue can be used.
 # Queue -> It represents how the dynamic queue is implemented
 # The possible options are:
 #     Deque -> A python deque (from the standard library).
 #     Redis -> To use redis key-store database (python-redis must be installed and 
 #                                               a redis server must be running on 
 #                                               the local machine).
+#     Multiprocess -> The variables are partitioned between several worker processes
+#                     (the number of workers is the argument of the solver). Every
+#                     worker writes its answers to its own files (named as the predicate
+#                     followed by the number of the worker). It can only be used with
+#                     the Native and the Hash backends.
+# With the Deque queue the solver also includes the API (api.py) to embed it in other
+# programs.
+# Output -> The format of the files of the answers, Output.<predicate> gives the format
+#           of a single predicate
+# The possible options are:
+#     text -> The format of the .tuples files.
+#     binary -> Every value is written as a signed 64 bit little-endian integer (the
+#               file is named as the predicate with the extension .tuples.bin).
+#     gzip -> The text format compressed with gzip (the extension is .tuples.gz).
 def generate_code_from_template(output_directory, stratums, 
                                 predicateTypes, answersToStore,
                                 printVariables, idToStratumLevels,
-                                backend, queue):
+                                backend, queue, output=None, incremental=False, jobs=1):
     # Make the necessary data to generate the source code available to the rest of the functions
     GD = namedtuple('GD', ['stratums', 'predicateTypes', 'answersToStore', 
                            'printVariables', 'idToStratumLevels', 'Backend',
-                           'Queue'])
+                           'Queue', 'Output', 'index'])
     
     globals()['GenerationData'] = GD(stratums, predicateTypes,
                                      answersToStore, printVariables,
                                      idToStratumLevels, backend,
-                                     queue)
+                                     queue, output or {},
+                                     buildGenerationIndex(stratums, answersToStore))
     
     #Check that the output directory exists
     path = os.path.normpath(output_directory + '/Solver_Py_code')
-    if os.path.exists(path):
+    # In incremental mode the previous directory is kept and only the files
+    # whose contents change are rewritten
+    if os.path.exists(path) and not incremental:
         shutil.rmtree(path)
     
-    os.makedirs(path)
+    if not os.path.exists(path):
+        os.makedirs(path)
     
     # Manage the source files
-    for source_file in SOURCE_FILES:
+    generated_files = []
+    files_to_fill = []
+    source_files = SOURCE_FILES
+    if backend == 'NumPy':
+        source_files = SOURCE_FILES + NUMPY_SOURCE_FILES
+    elif backend == 'SQL':
+        source_files = SOURCE_FILES + SQL_SOURCE_FILES
+    elif queue == 'Multiprocess':
+        source_files = SOURCE_FILES + MULTIPROCESS_SOURCE_FILES
+    if queue == 'Deque':
+        source_files = source_files + API_SOURCE_FILES
+    # In incremental mode the optional files generated with other options (and
+    # their compiled modules) are removed from the previous directory
+    if incremental:
+        stale_files = [os.path.normpath(path + "/" + source_file)
+                           for source_file in chain(NUMPY_SOURCE_FILES, SQL_SOURCE_FILES,
+                                                    MULTIPROCESS_SOURCE_FILES, API_SOURCE_FILES)
+                               if source_file not in source_files]
+        removeStaleFiles(stale_files + [filename + 'c' for filename in stale_files])
+    for source_file in source_files:
         orig_path = os.path.normpath(SOURCE_DIRECTORY + "/" + source_file)
         dest_path = os.path.normpath(path + "/" + source_file)
-        fill_file(source_file, orig_path, dest_path)
\ No newline at end of file
+        files_to_fill.append((source_file, orig_path, dest_path))
+        generated_files.append(dest_path)
+    
+    fillFiles(fill_file, files_to_fill, jobs)
+        
+    return generated_files
\ No newline at end of file
@@ -125,8 +125,8 @@ for frontend in Frontends:
         COMPILED_FILENAME = C_COMPILED_FILENAME
         FRONTEND = ' -f C'
         # Build the options
-        paths = ["Paths=" + x for x  in ["Judy", "Hash", "BTree"]]
-        sets =  ["Sets=" + x for x in  ["BitMap", "Judy", "AVLTree", "BTree"]]
+        paths = ["Paths=" + x for x  in ["ART", "Judy", "Hash", "BTree"]]
+        sets =  ["Sets=" + x for x in  ["ART", "BitMap", "Judy", "AVLTree", "BTree"]]
         successors = ["Successors=" + x for x in ["Queue", "Stack"]]
         OPTIONS = map(lambda x: ' -o ' + ','.join(x), product(paths, sets, successors))
     elif frontend =='Python':
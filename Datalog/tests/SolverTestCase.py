@@ -0,0 +1,132 @@
+'''
+Fixture shared by the tests that compile the examples into solvers, run them
+and compare their answers with the expected ones. The directory of every
+example contains its facts (.input files) and the expected answers of some of
+its predicates (.output files).
+'''
+import os
+import sys
+import glob
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from distutils.spawn import find_executable
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+sys.path.insert(0, SOURCE_DIRECTORY)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Examples with several stratums
+STRATIFIED_EXAMPLES = ['graphClausure', 'pointerAnalysis', 'negationTwoPredicates3']
+# Examples with negations, several stratums and predicates of different arities
+C_EXAMPLES = STRATIFIED_EXAMPLES + ['queens']
+# Examples with equal cards, constants, negations, several stratums and rules
+# without common variables
+PY_EXAMPLES = C_EXAMPLES + ['EqualCardsType2b', 'constants7', 'noCommonVars']
+# Examples with assignations, boolean expressions and negations of extensional
+# predicates
+EXPRESSION_EXAMPLES = ['assignation3', 'booleanCanReach', 'negated', 'odds2']
+
+# Data structures of the C solvers that don't require Judy
+C_OPTIONS = 'Paths=Hash,Sets=BitMap'
+
+SOLVER_DIRECTORIES = {'C': 'Solver_C_code', 'Python': 'Solver_Py_code'}
+
+requiresCCompiler = unittest.skipUnless(find_executable('make') and find_executable('cc'),
+                                        'A C compiler is required')
+requiresNumPy = unittest.skipIf(numpy is None, 'NumPy is not installed')
+
+class SolverTestCase(unittest.TestCase):
+
+    # The frontend used by the test case
+    frontend = 'C'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def solverDirectory(self):
+        return os.path.join(self.directory, SOLVER_DIRECTORIES[self.frontend])
+
+    # The compiler returns its exit status and its output. The program is an
+    # example or the path of a Datalog program.
+    def runCompiler(self, program, options, arguments=()):
+        if not program.endswith('.dl'):
+            program = os.path.join(EXAMPLES_DIRECTORY, program + '.dl')
+        process = subprocess.Popen([sys.executable, 'dcompiler.py', '-f', self.frontend, '-d', self.directory,
+                                    '-o', options] + list(arguments) + [program],
+                                   cwd=SOURCE_DIRECTORY, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        output, _ = process.communicate()
+        return process.returncode, output
+
+    # The options rejected by the compiler don't generate a solver
+    def assertRejected(self, program, options):
+        self.runCompiler(program, options)
+        self.assertFalse(os.path.exists(self.solverDirectory()), options)
+
+    def generateSolver(self, program, options, arguments=()):
+        status, output = self.runCompiler(program, options, arguments)
+        self.assertEqual(status, 0, output)
+        self.assertTrue(os.path.exists(self.solverDirectory()), output)
+        return self.solverDirectory()
+
+    def copyFacts(self, example, solver_directory):
+        for filename in glob.glob(os.path.join(EXAMPLES_DIRECTORY, example, '*.input')):
+            shutil.copy(filename, os.path.join(solver_directory,
+                                               os.path.basename(filename)[:-len('.input')] + '.tuples'))
+
+    # The solver is generated, compiled (C) and given the facts of the example
+    def buildSolver(self, example, options):
+        solver_directory = self.generateSolver(example, options)
+        if self.frontend == 'C':
+            with open(os.devnull, 'w') as devnull:
+                subprocess.check_call(['make'], cwd=solver_directory, stdout=devnull, stderr=devnull)
+        self.copyFacts(example, solver_directory)
+        return solver_directory
+
+    def writeFacts(self, solver_directory, predicate, facts):
+        with open(os.path.join(solver_directory, predicate + '.tuples'), 'w') as f:
+            f.write(''.join('{}({}).\n'.format(predicate, ', '.join(map(str, fact))) for fact in facts))
+
+    # The solver returns its exit status and the errors it printed
+    def runSolver(self, solver_directory, arguments=(), environment=None):
+        command = ['./solver'] if self.frontend == 'C' else [sys.executable, 'main.py']
+        with open(os.devnull, 'w') as devnull:
+            process = subprocess.Popen(command + list(arguments), cwd=solver_directory, stdout=devnull,
+                                       stderr=subprocess.PIPE, env=environment)
+            _, errors = process.communicate()
+        return process.returncode, errors
+
+    def readAnswers(self, solver_directory, predicate):
+        with open(os.path.join(solver_directory, predicate + '.tuples')) as f:
+            return sorted(line for line in f.read().split('\n') if line)
+
+    def expectedAnswers(self, example, predicate):
+        with open(os.path.join(EXAMPLES_DIRECTORY, example, predicate + '.output')) as f:
+            return sorted(line for line in f.read().split('\n') if line)
+
+    def checkAnswers(self, example, solver_directory, options=''):
+        for filename in glob.glob(os.path.join(EXAMPLES_DIRECTORY, example, '*.output')):
+            predicate = os.path.basename(filename)[:-len('.output')]
+            self.assertListEqual(self.readAnswers(solver_directory, predicate),
+                                 self.expectedAnswers(example, predicate),
+                                 'Wrong answers for {} in {} ({})'.format(predicate, example, options))
+
+    # Every example is solved with the given options
+    def checkExamples(self, examples, options, arguments=()):
+        for example in examples:
+            solver_directory = self.buildSolver(example, options)
+            status, errors = self.runSolver(solver_directory, arguments)
+            self.assertEqual(status, 0, 'The solver of {} failed ({}): {}'.format(example, options, errors))
+            self.checkAnswers(example, solver_directory, options)
+            shutil.rmtree(solver_directory)
@@ -0,0 +1,57 @@
+'''
+Tests of the adaptive radix tree used by the paths and the sets of the C solvers.
+'''
+import random
+import shutil
+import unittest
+
+from SolverTestCase import SolverTestCase, C_EXAMPLES, requiresCCompiler
+
+# Data structures of the C solvers that use the ART
+C_OPTIONS = ['Paths=ART,Sets=ART',
+             'Paths=ART,Sets=BitMap',
+             'Paths=ART,Sets=AVLTree,Successors=Queue',
+             'Paths=Hash,Sets=ART',
+             'Paths=ART,Sets=ART,Threads=4']
+# Values of the nodes of the graph: keys that share none, some or all of their
+# first bytes, so the nodes of the trees grow and their prefixes are split
+NODES = range(300) + range(70000, 70040) + range(1 << 24, (1 << 24) + 40, 4) + range(-20, 0)
+EDGES = 600
+
+@requiresCCompiler
+class TestCART(SolverTestCase):
+
+    def testExamplesAnswers(self):
+        for options in C_OPTIONS:
+            self.checkExamples(C_EXAMPLES, options)
+
+    def testSparseKeys(self):
+        rnd = random.Random(EDGES)
+        edges = set((rnd.choice(NODES), rnd.choice(NODES)) for _ in xrange(EDGES))
+        successors = {}
+        for x, y in edges:
+            successors.setdefault(x, set()).add(y)
+        # The transitive closure of the edges
+        expected = []
+        for x in successors:
+            reached, pending = set(), list(successors[x])
+            while pending:
+                y = pending.pop()
+                if y not in reached:
+                    reached.add(y)
+                    pending.extend(successors.get(y, ()))
+            expected.extend('path({}, {}).'.format(x, y) for y in reached)
+        for options in C_OPTIONS:
+            if 'BitMap' in options:
+                # The bitmaps can't store the negative values
+                continue
+            solver_directory = self.buildSolver('graphClausure', options)
+            self.writeFacts(solver_directory, 'edge', edges)
+            status, errors = self.runSolver(solver_directory)
+            self.assertEqual(status, 0, errors)
+            self.assertListEqual(self.readAnswers(solver_directory, 'path'), sorted(expected),
+                                 'Wrong answers ({})'.format(options))
+            shutil.rmtree(solver_directory)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+'''
+Tests of the data structures of the C solvers allocated in arenas.
+'''
+import os
+import shutil
+import unittest
+
+from SolverTestCase import SolverTestCase, C_EXAMPLES, requiresCCompiler
+
+# Data structures of the C solvers that don't require Judy
+C_OPTIONS = ['Paths=Hash,Sets=BitMap,Successors=Stack',
+             'Paths=Hash,Sets=AVLTree,Successors=Queue',
+             'Paths=BTree,Sets=BTree,Successors=Stack',
+             'Paths=BTree,Sets=BitMap,Successors=Queue']
+# Length of the chain of edges, its nodes fill several chunks of the arenas
+CHAIN_LENGTH = 400
+
+@requiresCCompiler
+class TestCDataStructures(SolverTestCase):
+
+    def testExamplesAnswers(self):
+        for options in C_OPTIONS:
+            self.checkExamples(C_EXAMPLES, options)
+
+    def testChain(self):
+        expected = sorted('path({}, {}).'.format(x, y) for x in xrange(CHAIN_LENGTH)
+                                                      for y in xrange(x + 1, CHAIN_LENGTH + 1))
+        for options in C_OPTIONS:
+            solver_directory = self.buildSolver('graphClausure', options)
+            self.writeFacts(solver_directory, 'edge', [(x, x + 1) for x in xrange(CHAIN_LENGTH)])
+            status, errors = self.runSolver(solver_directory)
+            self.assertEqual(status, 0, errors)
+            self.assertListEqual(self.readAnswers(solver_directory, 'path'), expected,
+                                 'Wrong answers ({})'.format(options))
+            shutil.rmtree(solver_directory)
+
+    # When all the nodes are stored in arenas the levels are not traversed to
+    # free the data structure
+    def testFreeWithoutTraversal(self):
+        solver_directory = self.generateSolver('pointerAnalysis', 'Paths=BTree,Sets=AVLTree,Successors=Stack')
+        with open(os.path.join(solver_directory, 'data_structure.c')) as f:
+            code = f.read()
+        ds_free = code[code.index('void Ds_free(){'):]
+        ds_free = ds_free[:ds_free.index('\n}\n')]
+        self.assertNotIn('DsData_Level_2_free', ds_free)
+        self.assertIn('Arena_free(&DsData_Level_2_arena);', ds_free)
+        self.assertIn('uIntListStack_free_all();', ds_free)
+        self.assertIn('AVLTree_free_all();', ds_free)
+        self.assertNotIn('malloc', code)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+'''
+Tests of the readers of the facts of the C solvers.
+'''
+import os
+import shutil
+import unittest
+
+from SolverTestCase import SolverTestCase, C_EXAMPLES, C_OPTIONS, requiresCCompiler
+
+FACTS_READERS = ['Mmap', 'Thread']
+
+@requiresCCompiler
+class TestCFactsReader(SolverTestCase):
+
+    def testExamplesAnswers(self):
+        for facts in FACTS_READERS:
+            self.checkExamples(C_EXAMPLES, C_OPTIONS + ',Facts=' + facts)
+
+    def testLongFacts(self):
+        for facts in FACTS_READERS:
+            solver_directory = self.buildSolver('pointerAnalysis', C_OPTIONS + ',Facts=' + facts)
+            with open(os.path.join(solver_directory, 'vP0.tuples'), 'w') as f:
+                f.write('vP0(2147483647,{}1).\n\n  vP0( 7 , 0 ) .\n'.format(' ' * 100))
+            self.writeFacts(solver_directory, 'a', [])
+            status, errors = self.runSolver(solver_directory)
+            self.assertEqual(status, 0, errors)
+            self.assertIn('vP(2147483647, 1).', self.readAnswers(solver_directory, 'vP'))
+            self.assertIn('vP(7, 0).', self.readAnswers(solver_directory, 'vP'))
+            shutil.rmtree(solver_directory)
+
+    def testWrongFacts(self):
+        wrong_facts = [('vP0(1, 2).\nvP0(1, 2, 3).\n', 'vP0.tuples:2: The fact has 3 values instead of 2'),
+                       ('vP0(1, 2147483648).\n', "vP0.tuples:1: The value doesn't fit in an int"),
+                       ('vP0(1, 99999999999999).\n', "vP0.tuples:1: The value doesn't fit in an int"),
+                       ('vP0(1, 2)\n', "vP0.tuples:1: Expected '.'"),
+                       ('vP0(1, a).\n', 'vP0.tuples:1: Expected a value'),
+                       ('vP0 1, 2.\n', "vP0.tuples:1: Expected '('")]
+        for facts in FACTS_READERS:
+            solver_directory = self.buildSolver('pointerAnalysis', C_OPTIONS + ',Facts=' + facts)
+            for contents, error in wrong_facts:
+                with open(os.path.join(solver_directory, 'vP0.tuples'), 'w') as f:
+                    f.write(contents)
+                status, errors = self.runSolver(solver_directory)
+                self.assertEqual(status, 1)
+                self.assertIn(error, errors)
+            os.remove(os.path.join(solver_directory, 'vP0.tuples'))
+            status, errors = self.runSolver(solver_directory)
+            self.assertEqual(status, 1)
+            self.assertIn("Can't open file vP0.tuples", errors)
+            shutil.rmtree(solver_directory)
+
+    def testUnknownFactsReader(self):
+        self.assertRejected('pointerAnalysis', C_OPTIONS + ',Facts=Stdio')
+
+if __name__ == "__main__":
+    unittest.main()
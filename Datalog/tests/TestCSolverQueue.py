@@ -0,0 +1,58 @@
+'''
+Tests of the queue of rewriting variables of the C solvers.
+'''
+import os
+import re
+import unittest
+
+from SolverTestCase import SolverTestCase, STRATIFIED_EXAMPLES, C_OPTIONS, requiresCCompiler
+
+# More facts than rewriting variables in a block of the queue
+NUMBER_OF_FACTS = 10000
+
+STATISTICS_RE = re.compile(r'Queue (\d+): (\d+) variables at most, (\d+) blocks \((\d+) bytes\), '
+                           r'(\d+) variables appended')
+
+@requiresCCompiler
+class TestCSolverQueue(SolverTestCase):
+
+    def runSolver(self, solver_directory, arguments=(), statistics=False):
+        environment = dict(os.environ)
+        environment.pop('SOLVER_QUEUE_STATISTICS', None)
+        if statistics:
+            environment['SOLVER_QUEUE_STATISTICS'] = '1'
+        return SolverTestCase.runSolver(self, solver_directory, arguments, environment)
+
+    def testExamplesAnswers(self):
+        for options in [C_OPTIONS, C_OPTIONS + ',Facts=Thread']:
+            self.checkExamples(STRATIFIED_EXAMPLES, options)
+
+    # The facts don't fit in a block, the blocks whose variables were popped
+    # are reused
+    def testSeveralBlocks(self):
+        solver_directory = self.buildSolver('pointerAnalysis', C_OPTIONS)
+        self.writeFacts(solver_directory, 'vP0', [(x, 0) for x in xrange(NUMBER_OF_FACTS)])
+        self.writeFacts(solver_directory, 'a', [(x + 1, x) for x in xrange(2 * NUMBER_OF_FACTS)])
+        for predicate in ['st', 'ld']:
+            self.writeFacts(solver_directory, predicate, [])
+        status, errors = self.runSolver(solver_directory, statistics=True)
+        self.assertEqual(status, 0, errors)
+        self.assertListEqual(self.readAnswers(solver_directory, 'vP'),
+                             sorted('vP({}, 0).'.format(x) for x in xrange(2 * NUMBER_OF_FACTS + 1)))
+        statistics = dict((int(m.group(1)), [int(x) for x in m.groups()[1:]])
+                          for m in STATISTICS_RE.finditer(errors))
+        self.assertIn(1, statistics)
+        high_water_mark, blocks, memory, appended = statistics[1]
+        self.assertGreaterEqual(high_water_mark, NUMBER_OF_FACTS)
+        self.assertGreater(blocks, 1)
+        self.assertGreater(memory, 0)
+        self.assertGreaterEqual(appended, high_water_mark)
+
+    def testNoStatistics(self):
+        solver_directory = self.buildSolver('pointerAnalysis', C_OPTIONS)
+        status, errors = self.runSolver(solver_directory)
+        self.assertEqual(status, 0)
+        self.assertIsNone(STATISTICS_RE.search(errors))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+'''
+Tests of the multi-threaded evaluation of the C solvers.
+'''
+import os
+import shutil
+import unittest
+
+from SolverTestCase import SolverTestCase, C_EXAMPLES, requiresCCompiler
+
+# Data structures of the C solvers that can be used with several threads
+C_OPTIONS = ['Paths=Hash,Sets=BitMap,Threads=4',
+             'Paths=Hash,Sets=AVLTree,Threads=4',
+             'Paths=BTree,Sets=BTree,Threads=4',
+             'Paths=BTree,Sets=BitMap,Threads=4']
+# Length of the chain of edges, its variables fill many chunks of the threads
+CHAIN_LENGTH = 400
+
+@requiresCCompiler
+class TestCThreads(SolverTestCase):
+
+    def testExamplesAnswers(self):
+        for options in C_OPTIONS:
+            self.checkExamples(C_EXAMPLES, options)
+
+    # Every answer is derived only once, even when several threads derive it
+    def testChain(self):
+        expected = sorted('path({}, {}).'.format(x, y) for x in xrange(CHAIN_LENGTH)
+                                                      for y in xrange(x + 1, CHAIN_LENGTH + 1))
+        for options in C_OPTIONS:
+            solver_directory = self.buildSolver('graphClausure', options)
+            self.writeFacts(solver_directory, 'edge', [(x, x + 1) for x in xrange(CHAIN_LENGTH)])
+            status, errors = self.runSolver(solver_directory)
+            self.assertEqual(status, 0, errors)
+            self.assertEqual(self.readAnswers(solver_directory, 'path'), expected,
+                             'Wrong answers ({})'.format(options))
+            shutil.rmtree(solver_directory)
+
+    # The environment variable SOLVER_THREADS changes the number of threads
+    def testThreadsEnvironment(self):
+        solver_directory = self.buildSolver('pointerAnalysis', C_OPTIONS[0])
+        for threads in ['1', '2', '8']:
+            status, errors = self.runSolver(solver_directory, environment=dict(os.environ, SOLVER_THREADS=threads))
+            self.assertEqual(status, 0, errors)
+            self.assertListEqual(self.readAnswers(solver_directory, 'vP'),
+                                 self.expectedAnswers('pointerAnalysis', 'vP'),
+                                 'Wrong answers with {} threads'.format(threads))
+
+    def testRejectedOptions(self):
+        for options in ['Paths=Hash,Sets=BitMap,Threads=0',
+                        'Paths=Hash,Sets=BitMap,Threads=many',
+                        'Paths=Hash,Sets=BitMap,Successors=Queue,Threads=4',
+                        'Paths=Judy,Sets=BitMap,Threads=4',
+                        'Paths=Hash,Sets=Judy,Threads=4',
+                        'Paths=Hash,Sets=BitMap,Facts=Thread,Threads=4']:
+            _, output = self.runCompiler('pointerAnalysis', options)
+            self.assertIn('ERROR', output, options)
+            self.assertFalse(os.path.exists(self.solverDirectory()), options)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+'''
+Tests of the compilation cache of dcompiler (option -c).
+'''
+import os
+import glob
+import shutil
+import tempfile
+import unittest
+
+from SolverTestCase import SolverTestCase, EXAMPLES_DIRECTORY
+
+CACHE_HIT = 'Using the cached analysis'
+UP_TO_DATE = 'Source code is up to date'
+
+class TestCompilationCache(SolverTestCase):
+
+    frontend = 'Python'
+
+    def setUp(self):
+        SolverTestCase.setUp(self)
+        self.cache_directory = tempfile.mkdtemp()
+        # A copy of the program that can be modified
+        self.program = os.path.join(self.directory, 'pointerAnalysis.dl')
+        shutil.copy(os.path.join(EXAMPLES_DIRECTORY, 'pointerAnalysis.dl'), self.program)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_directory)
+        SolverTestCase.tearDown(self)
+
+    # The compiler returns its output
+    def compileProgram(self, options):
+        status, output = self.runCompiler(self.program, options, ['-c', self.cache_directory])
+        self.assertEqual(status, 0, output)
+        return output
+
+    def testSecondCompilationHitsTheCache(self):
+        self.assertNotIn(CACHE_HIT, self.compileProgram('Backend=Native'))
+        output = self.compileProgram('Backend=Native')
+        self.assertIn(CACHE_HIT, output)
+        self.assertIn(UP_TO_DATE, output)
+        # The order of the options doesn't change the key
+        self.compileProgram('Backend=Native,Queue=Deque')
+        self.assertIn(CACHE_HIT, self.compileProgram('Queue=Deque,Backend=Native'))
+
+    def testUnchangedFilesKeepTheirTimes(self):
+        self.compileProgram('Backend=Native')
+        files = glob.glob(os.path.join(self.solverDirectory(), '*'))
+        for filename in files:
+            os.utime(filename, (1000, 1000))
+        # The modified file is generated again, the rest are not touched
+        modified = os.path.join(self.solverDirectory(), 'solver.py')
+        with open(modified, 'a') as f:
+            f.write('# Modified\n')
+        os.utime(modified, (1000, 1000))
+        output = self.compileProgram('Backend=Native')
+        self.assertIn(CACHE_HIT, output)
+        self.assertNotIn(UP_TO_DATE, output)
+        for filename in files:
+            if filename == modified:
+                self.assertNotEqual(os.path.getmtime(filename), 1000, filename)
+            else:
+                self.assertEqual(os.path.getmtime(filename), 1000, filename)
+        with open(modified) as f:
+            self.assertNotIn('# Modified', f.read())
+
+    def testChangedProgramMissesTheCache(self):
+        self.compileProgram('Backend=Native')
+        with open(self.program, 'a') as f:
+            f.write('vP2(X, Y) :- vP(Y, X).\n')
+        self.assertNotIn(CACHE_HIT, self.compileProgram('Backend=Native'))
+
+    def testChangedOptionsMissTheCache(self):
+        self.compileProgram('Backend=Native')
+        self.assertNotIn(CACHE_HIT, self.compileProgram('Backend=Hash'))
+        # The last value of a repeated option is the one used
+        self.assertIn(CACHE_HIT, self.compileProgram('Backend=SQL,Backend=Native'))
+        self.assertNotIn(CACHE_HIT, self.compileProgram('Backend=Native,Backend=SQL'))
+
+    def testHeadersDontChange(self):
+        self.compileProgram('Backend=Native')
+        # The date of the compilation would rewrite the files every day
+        with open(os.path.join(self.solverDirectory(), 'utils.py')) as f:
+            self.assertNotIn('Created on', f.read())
+
+    def testStaleFilesAreRemoved(self):
+        self.compileProgram('Backend=SQL')
+        solver_directory = self.solverDirectory()
+        # A compiled module of the previous solver
+        with open(os.path.join(solver_directory, 'sqlqueues.pyc'), 'w') as f:
+            f.write('')
+        self.writeFacts(solver_directory, 'vP0', [(1, 2)])
+        self.compileProgram('Queue=Multiprocess')
+        files = os.listdir(solver_directory)
+        self.assertNotIn('sqlqueues.py', files)
+        self.assertNotIn('sqlqueues.pyc', files)
+        self.assertNotIn('api.py', files)
+        self.assertIn('partitions.py', files)
+        # The files that are not generated are kept
+        self.assertIn('vP0.tuples', files)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,400 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from collections import defaultdict
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+sys.path.insert(0, SOURCE_DIRECTORY)
+
+from Parser import parseRule, parseRules
+from RuleDecomposer import decomposeRulesFromFile, saveDecomposedRules
+from RelationStatistics import loadStatisticsFromDirectory
+from DecomposingMethods import plan_decomposition, EXACT_DECOMPOSITION_ATOMS,\
+    dynamicProgrammingDecomposingMethod, commonVariablesDecomposingMethod
+from Types import LogicRule, Predicate
+
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+# The programs with rules that have to be decomposed. The data is the one of
+# another example, the names of its relations are translated.
+POINTER_ANALYSIS = os.path.join(EXAMPLES_DIRECTORY, 'pointerAnalysis4rules.dl')
+POINTER_ANALYSIS_DATA = os.path.join(EXAMPLES_DIRECTORY, 'pointerAnalysis')
+POINTER_ANALYSIS_RELATIONS = {'a': 'assign', 'st': 'store', 'ld': 'load', 'vP0': 'vP0'}
+
+# A rule in which a variable is shared by the three atoms of the body
+SHARED_VARIABLE_PROGRAM = 'alias(V1, V3, H) :- assign(V1, V2), assign(V2, V3), vP0(V2, H).\n'
+# A rule in which some variables are only used by one atom
+PROJECTION_PROGRAM = 'reachable(Z) :- vP0(X, H), assign(X, Y), assign(Y, Z).\n'
+
+# The same rule with the atoms in both orders. The statistics make big much
+# larger than small so the join of medium and small has to be done first.
+SKEWED_PROGRAMS = ['result(X, W) :- big(X, Y), medium(Y, Z), small(Z, W).\n',
+                   'result(X, W) :- small(Z, W), medium(Y, Z), big(X, Y).\n']
+SKEWED_RELATIONS = {'big': [(i, i % 100) for i in xrange(5000)],
+                    'medium': [(i, i % 10) for i in xrange(100)],
+                    'small': [(i, i) for i in xrange(3)]}
+
+METHODS = ['left', 'right', 'random', 'common', 'dynamic', 'cost']
+
+def isTemporary(name):
+    return name.startswith('temp_')
+
+def getValue(argument):
+    if argument.type == 'variable':
+        return None
+    return int(argument.value)
+
+# This function evaluates a program (a list of LogicRules without negated
+# predicates or expressions) over the given facts. It is a naive bottom-up
+# evaluation, enough for the small relations used in the tests.
+def evaluateProgram(rules, facts):
+    relations = defaultdict(set)
+    for name, tuples in facts.iteritems():
+        relations[name].update(tuples)
+
+    def match(body, bindings):
+        if not body:
+            yield bindings
+            return
+        atom = body[0]
+        for values in list(relations[atom.id.name]):
+            new_bindings = dict(bindings)
+            for argument, value in zip(atom.arguments, values):
+                if argument.type != 'variable':
+                    if getValue(argument) != value:
+                        break
+                elif new_bindings.setdefault(argument.value, value) != value:
+                    break
+            else:
+                for answer in match(body[1:], new_bindings):
+                    yield answer
+
+    changed = True
+    while changed:
+        changed = False
+        for rule in rules:
+            for bindings in list(match(list(rule.body), {})):
+                fact = tuple(bindings[argument.value] if argument.type == 'variable' else getValue(argument)
+                             for argument in rule.head.arguments)
+                if fact not in relations[rule.head.id.name]:
+                    relations[rule.head.id.name].add(fact)
+                    changed = True
+
+    return relations
+
+# This function returns the rules of the program without decomposing them
+def loadRules(program):
+    rules = []
+    with open(program) as f:
+        for line in f:
+            if line.strip() and line[0] != '#':
+                head, body = parseRule(line, check_restricted=False)
+                rules.append(LogicRule(head, body, 0, False, 0, line))
+    return rules
+
+def loadFacts(directory, relations, extension):
+    facts = {}
+    for filename in os.listdir(directory):
+        name, file_extension = os.path.splitext(filename)
+        if file_extension != extension:
+            continue
+        with open(os.path.join(directory, filename)) as f:
+            facts[relations.get(name, name)] = set(tuple(map(int, line.strip()[:-2].split('(')[1].split(',')))
+                                                   for line in f if line.strip())
+    return facts
+
+def generateFacts(seed):
+    rnd = random.Random(seed)
+    variable = lambda: rnd.randint(0, 12)
+    field = lambda: rnd.randint(0, 3)
+    heap = lambda: rnd.randint(0, 5)
+    return {'vP0': set((variable(), heap()) for _ in xrange(20)),
+            'assign': set((variable(), variable()) for _ in xrange(20)),
+            'store': set((variable(), field(), variable()) for _ in xrange(20)),
+            'load': set((variable(), field(), variable()) for _ in xrange(20))}
+
+# This function rebuilds the given decomposition using the heads that were
+# generated before: the symmetric difference of the arguments of the two
+# atoms of the body.
+def buildLegacyDecomposition(rules):
+    definitions = dict((rule.head.id.name, rule) for rule in rules if isTemporary(rule.head.id.name))
+    heads = {}
+
+    def getAtom(atom):
+        if not isTemporary(atom.id.name):
+            return atom
+        if atom.id.name not in heads:
+            first, second = [getAtom(x) for x in definitions[atom.id.name].body]
+            heads[atom.id.name] = Predicate(atom.id, False,
+                                            sorted(set(first.arguments).symmetric_difference(second.arguments)))
+        return heads[atom.id.name]
+
+    return [rule._replace(head=getAtom(rule.head), body=[getAtom(x) for x in rule.body]) for rule in rules]
+
+def getTemporaryArity(rules):
+    return sum(len(rule.head.arguments) for rule in rules if isTemporary(rule.head.id.name))
+
+def getTemporaryTuples(relations):
+    return sum(len(tuples) for name, tuples in relations.iteritems() if isTemporary(name))
+
+def getResults(relations):
+    return dict((name, tuples) for name, tuples in relations.iteritems() if not isTemporary(name))
+
+def getTemporaryBodies(rules):
+    return [sorted(atom.id.name for atom in rule.body) for rule in rules if isTemporary(rule.head.id.name)]
+
+# A rule whose body is a chain of the given number of atoms
+def createChainRule(atoms):
+    body = ', '.join('a{0}(X{0}, X{1})'.format(position, position + 1) for position in xrange(atoms))
+    line = 'r(X0, X{}) :- {}.'.format(atoms, body)
+    head, body = parseRule(line)
+    return LogicRule(head, body, 0, False, 0, line)
+
+def isConsecutive(subset):
+    subset >>= (subset & -subset).bit_length() - 1
+    return subset & (subset + 1) == 0
+
+def getAllSplits(subset):
+    lowest = subset & -subset
+    rest = subset & ~lowest
+    chosen = rest
+    while chosen:
+        yield subset & ~chosen
+        chosen = (chosen - 1) & rest
+
+def getConsecutiveSplits(subset):
+    first = subset & -subset
+    while first != subset:
+        yield first
+        first |= first << 1
+
+# This function returns the cost of every binary tree whose leafs are the
+# atoms of subset, the cost of a tree is the sum of the costs of the subsets
+# of its inner nodes. The trees are enumerated one by one.
+def getTreeCosts(subset, costs, get_splits):
+    if subset & (subset - 1) == 0:
+        yield 0
+        return
+    for first in get_splits(subset):
+        for first_cost in getTreeCosts(first, costs, get_splits):
+            for second_cost in getTreeCosts(subset & ~first, costs, get_splits):
+                yield first_cost + second_cost + costs[subset]
+
+def getText(predicate):
+    return (predicate.id.name, [argument.value for argument in predicate.arguments])
+
+class TestDecomposition(unittest.TestCase):
+
+    def setUp(self):
+        self.shared_variable_program = self.createProgram(SHARED_VARIABLE_PROGRAM)
+        self.projection_program = self.createProgram(PROJECTION_PROGRAM)
+        random.seed(0)
+
+    def tearDown(self):
+        os.remove(self.shared_variable_program)
+        os.remove(self.projection_program)
+
+    def createProgram(self, rules):
+        f, filename = tempfile.mkstemp(suffix='.dl')
+        with os.fdopen(f, 'w') as f:
+            f.write(rules)
+        return filename
+
+    def getPrograms(self):
+        return [POINTER_ANALYSIS, self.shared_variable_program, self.projection_program]
+
+    def testDecomposedProgramsObtainTheExpectedResults(self):
+        facts = loadFacts(POINTER_ANALYSIS_DATA, POINTER_ANALYSIS_RELATIONS, '.input')
+        expected_result = loadFacts(POINTER_ANALYSIS_DATA, {}, '.output')
+        for method in METHODS:
+            relations = evaluateProgram(decomposeRulesFromFile(POINTER_ANALYSIS, method), facts)
+            for name, tuples in expected_result.iteritems():
+                self.assertEqual(relations[name], tuples,
+                                 'Method ' + method + ': different ' + name + ' relation')
+
+    def testDecomposedProgramsObtainTheSameResults(self):
+        for program in self.getPrograms():
+            for seed in xrange(2):
+                facts = generateFacts(seed)
+                good_result = getResults(evaluateProgram(loadRules(program), facts))
+                for method in METHODS:
+                    obtained_result = getResults(evaluateProgram(decomposeRulesFromFile(program, method), facts))
+                    self.assertEqual(obtained_result, good_result,
+                                     'Method ' + method + ': different results for ' + os.path.basename(program))
+
+    def testTemporariesAreNarrowerThanBefore(self):
+        # The previous heads are only compared when they obtained the right
+        # results, otherwise they are just wrong
+        reduced_arity = reduced_tuples = False
+        for program in self.getPrograms():
+            facts = generateFacts(0)
+            good_result = getResults(evaluateProgram(loadRules(program), facts))
+            for method in ['left', 'right', 'common', 'dynamic']:
+                rules = decomposeRulesFromFile(program, method)
+                legacy_rules = buildLegacyDecomposition(rules)
+                relations = evaluateProgram(rules, facts)
+                legacy_relations = evaluateProgram(legacy_rules, facts)
+                if getResults(legacy_relations) != good_result:
+                    continue
+
+                self.assertLessEqual(getTemporaryArity(rules), getTemporaryArity(legacy_rules))
+                self.assertLessEqual(getTemporaryTuples(relations), getTemporaryTuples(legacy_relations))
+                reduced_arity |= getTemporaryArity(rules) < getTemporaryArity(legacy_rules)
+                reduced_tuples |= getTemporaryTuples(relations) < getTemporaryTuples(legacy_relations)
+
+        self.assertTrue(reduced_arity, 'The arity of the temporaries was never reduced')
+        self.assertTrue(reduced_tuples, 'The tuples of the temporaries were never reduced')
+
+    def testJoinVariablesAreKept(self):
+        # The variable shared by the three atoms has to be kept in the first
+        # generated head, otherwise the last join becomes a cross product
+        rules = decomposeRulesFromFile(self.shared_variable_program, 'left')
+        temporaries = [rule for rule in rules if isTemporary(rule.head.id.name)]
+        self.assertEqual(len(temporaries), 1)
+        self.assertIn('V2', [argument.value for argument in temporaries[0].head.arguments])
+
+        facts = generateFacts(0)
+        good_result = getResults(evaluateProgram(loadRules(self.shared_variable_program), facts))
+        legacy_result = getResults(evaluateProgram(buildLegacyDecomposition(rules), facts))
+        self.assertNotEqual(legacy_result, good_result)
+
+    # The tuples of the skewed relations are written in a new directory, the
+    # caller has to remove it
+    def createStatisticsDirectory(self):
+        directory = tempfile.mkdtemp()
+        for name, tuples in SKEWED_RELATIONS.iteritems():
+            with open(os.path.join(directory, name + '.tuples'), 'w') as f:
+                f.write(''.join('{}({}, {}).\n'.format(name, *values) for values in tuples))
+        return directory
+
+    def testCostMethodJoinsTheSmallRelationsFirst(self):
+        directory = self.createStatisticsDirectory()
+        try:
+            statistics = loadStatisticsFromDirectory(directory)
+        finally:
+            shutil.rmtree(directory)
+
+        # The left method is wrong with the first order and the right one with
+        # the second order
+        for program, method in zip(SKEWED_PROGRAMS, ['left', 'right']):
+            filename = self.createProgram(program)
+            try:
+                self.assertIn('big', getTemporaryBodies(decomposeRulesFromFile(filename, method))[0])
+                estimated_sizes = {}
+                rules = decomposeRulesFromFile(filename, 'cost', statistics, estimated_sizes)
+            finally:
+                os.remove(filename)
+            self.assertEqual(getTemporaryBodies(rules), [['medium', 'small']], program)
+            self.assertEqual(estimated_sizes, {rules[0].head.id: 30.0})
+
+    def testCompilerUsesTheStatistics(self):
+        directory = self.createStatisticsDirectory()
+        try:
+            filename = os.path.join(directory, 'skewed.dl')
+            with open(filename, 'w') as f:
+                f.write(SKEWED_PROGRAMS[0])
+            with open(os.devnull, 'w') as devnull:
+                subprocess.check_call([sys.executable, 'dcompiler.py', '-r', '-m', 'cost', '-s', directory, filename],
+                                      cwd=SOURCE_DIRECTORY, stdout=devnull, stderr=devnull)
+            with open(os.path.join(directory, 'skewed-decomposed.dl')) as f:
+                lines = f.readlines()
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(len(lines), 3)
+        self.assertRegexpMatches(lines[0], r'^# Estimated size of temp_\d+: 30 tuples$')
+        self.assertEqual(sorted(atom.id.name for atom in parseRule(lines[1])[1]), ['medium', 'small'])
+
+    def testEstimatedSizesAreSaved(self):
+        estimated_sizes = {}
+        rules = decomposeRulesFromFile(POINTER_ANALYSIS, 'cost', {}, estimated_sizes)
+        temporaries = [rule.head.id for rule in rules if isTemporary(rule.head.id.name)]
+        self.assertTrue(temporaries)
+        self.assertItemsEqual(estimated_sizes.keys(), temporaries)
+
+        filename = self.createProgram('')
+        try:
+            saveDecomposedRules(rules, filename, estimated_sizes)
+            with open(filename) as f:
+                lines = f.readlines()
+        finally:
+            os.remove(filename)
+
+        # Every generated head is preceded by its size and the comments don't
+        # change the rules read from the file
+        comments = [line for line in lines if line.startswith('#')]
+        self.assertEqual(comments, ['# Estimated size of {}: {} tuples\n'.format(head.name,
+                                                                                int(round(estimated_sizes[head])))
+                                    for head in temporaries])
+        self.assertEqual([(getText(head), [getText(atom) for atom in body])
+                          for head, body, _, _ in parseRules(lines)],
+                         [(getText(rule.head), [getText(atom) for atom in rule.body]) for rule in rules])
+
+    def testEstimatedSizesAreNotShared(self):
+        # Every call only stores the sizes of the heads it generates
+        first_sizes, second_sizes = {}, {}
+        decomposeRulesFromFile(POINTER_ANALYSIS, 'cost', {}, first_sizes)
+        rules = decomposeRulesFromFile(self.projection_program, 'cost', {}, second_sizes)
+        self.assertItemsEqual(second_sizes.keys(),
+                              [rule.head.id for rule in rules if isTemporary(rule.head.id.name)])
+        self.assertFalse(set(first_sizes) & set(second_sizes))
+
+class TestDynamicProgramming(unittest.TestCase):
+
+    def getPlanCost(self, atoms, costs):
+        rule = createChainRule(atoms)
+        new_rules, subsets = plan_decomposition(rule, lambda subset, head: costs[subset])
+        self.assertEqual(len(new_rules), atoms - 1)
+        self.assertEqual(new_rules[-1].head, rule.head)
+        self.assertEqual(subsets[-1], (1 << atoms) - 1)
+        return sum(costs[subset] for subset in subsets), subsets
+
+    def testExactPlanIsTheBestTree(self):
+        rnd = random.Random(0)
+        atoms = 6
+        for _ in xrange(3):
+            costs = [rnd.randint(1, 100) for _ in xrange(1 << atoms)]
+            cost, _ = self.getPlanCost(atoms, costs)
+            self.assertEqual(cost, min(getTreeCosts((1 << atoms) - 1, costs, getAllSplits)))
+
+    def testDynamicMethodObtainsThePunctuationOfTheCommonMethod(self):
+        # Both methods minimize the sum of the lengths of the generated heads
+        rules = [rule for rule in loadRules(POINTER_ANALYSIS) if len(rule.body) > 2]
+        for rule in rules + [createChainRule(atoms) for atoms in xrange(3, 6)]:
+            dynamic_rules = dynamicProgrammingDecomposingMethod(rule._replace(body=list(rule.body)))
+            common_rules = commonVariablesDecomposingMethod(rule._replace(body=list(rule.body)))
+            self.assertEqual(getTemporaryArity(dynamic_rules), getTemporaryArity(common_rules), rule.rule)
+
+    def testLongRulesPlanTheBestConsecutiveTree(self):
+        rnd = random.Random(0)
+        atoms = EXACT_DECOMPOSITION_ATOMS + 1
+        for _ in xrange(3):
+            costs = [rnd.randint(1, 100) for _ in xrange(1 << atoms)]
+            cost, subsets = self.getPlanCost(atoms, costs)
+            self.assertTrue(all(isConsecutive(subset) for subset in subsets))
+            self.assertEqual(cost, min(getTreeCosts((1 << atoms) - 1, costs, getConsecutiveSplits)))
+
+    def testOnlyShortRulesJoinAtomsThatAreNotConsecutive(self):
+        # Joining the first and the last atoms is the only cheap subset
+        for atoms in [EXACT_DECOMPOSITION_ATOMS, EXACT_DECOMPOSITION_ATOMS + 1]:
+            cheap_subset = 1 | 1 << (atoms - 1)
+            costs = [0 if subset == cheap_subset else 1 for subset in xrange(1 << atoms)]
+            _, subsets = self.getPlanCost(atoms, costs)
+            if atoms <= EXACT_DECOMPOSITION_ATOMS:
+                self.assertIn(cheap_subset, subsets)
+            else:
+                self.assertNotIn(cheap_subset, subsets)
+                self.assertTrue(all(isConsecutive(subset) for subset in subsets))
+
+if __name__ == "__main__":
+    unittest.main()
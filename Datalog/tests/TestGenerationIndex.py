@@ -0,0 +1,102 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import sys
+import glob
+import logging
+import unittest
+
+from itertools import chain
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from dcompiler import analyzeProgram
+from GenerationIndex import buildGenerationIndex
+from Types import Argument
+
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+# Reference implementation. These are the functions the frontends used to
+# scan the equations every time they were called, the index must contain the
+# same values and its sets must be iterated in the same order.
+def legacyGetPredicateLength(equations, predicate):
+    for eq in equations:
+        if predicate == eq.leftVariable.id:
+            return len(eq.leftArguments)
+        elif predicate == eq.rightVariable.id:
+            return len(eq.rightArguments)
+        else:
+            for negated_elment in eq.negatedElements:
+                if predicate == negated_elment.id:
+                    return len(negated_elment.arguments)
+    return None
+
+def legacyGetPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants(equations, answersToStore):
+    answers = set()
+    for eq in equations:
+        if eq.leftVariable.id not in answersToStore and eq.type == 2:
+            argument_constants = [x for x in eq.consultingArguments if isinstance(x, int) or
+                                    (isinstance(x, Argument) and x.type == "constant")]
+            if len(eq.consultingArguments) == len(argument_constants):
+                answers.add(eq.consultingPredicate.id)
+    return answers
+
+def legacyGetAllSolutions(equations, answersToStore):
+    solutions = set()
+    solutions |= answersToStore
+    solutions |= set(eq.leftVariable.id for eq in equations
+                        if eq.leftVariable.id not in answersToStore and
+                           len(set(eq.leftArguments)) == 1 and eq.type == 2)
+    solutions |= set(eq.consultingPredicate.id for eq in equations
+                        if eq.leftVariable not in answersToStore and eq.type == 2 and
+                           len(set(eq.consultingArguments)) == len(eq.commonVariables))
+    solutions |= legacyGetPredicatesWithAllVariablesBeingInTheSharedSetIncludingConstants(equations,
+                                                                                          answersToStore)
+    solutions |= set(chain(*[[x.id for x in eq.negatedElements] for eq in equations]))
+    return solutions
+
+def analyzeExample(filename):
+    # Some of the examples are rejected by the compiler on purpose
+    try:
+        _, _, predicateTypes, stratums, _ = analyzeProgram(filename, [])
+    except SystemExit:
+        return None
+    return stratums, predicateTypes.intensional
+
+class TestGenerationIndex(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def testIndexIsTheSameForAllTheExamples(self):
+        examples = sorted(glob.glob(os.path.join(EXAMPLES_DIRECTORY, '*.dl')))
+        self.assertTrue(examples, 'No examples found in ' + EXAMPLES_DIRECTORY)
+
+        for example in examples:
+            analysis = analyzeExample(example)
+            if analysis is None:
+                continue
+            stratums, answersToStore = analysis
+            index = buildGenerationIndex(stratums, answersToStore)
+            equations = list(chain(*[stratum.equations for stratum in stratums]))
+            name = os.path.basename(example)
+
+            predicates = set(chain(*[(eq.leftVariable.id, eq.rightVariable.id) for eq in equations]))
+            for predicate in predicates:
+                self.assertEqual(index.predicateLengths.get(predicate),
+                                 legacyGetPredicateLength(equations, predicate),
+                                 'Different length for ' + str(predicate) + ' in ' + name)
+
+            self.assertEqual(list(index.solutions), list(legacyGetAllSolutions(equations, answersToStore)),
+                             'Different solutions for ' + name)
+            for predicate in predicates:
+                self.assertEqual(index.equationsByLeftVariable.get(predicate, []),
+                                 [eq for eq in equations if eq.leftVariable.id == predicate])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+'''
+Tests of the Hash backend of the Python solvers.
+'''
+import os
+import unittest
+
+from SolverTestCase import SolverTestCase, PY_EXAMPLES
+
+# The rules of noCommonVars, EqualCardsType2e and reverseSameGeneration don't
+# have common variables, so they consult the level 0 values of the data structure
+EXAMPLES = PY_EXAMPLES + ['EqualCardsType2e', 'reverseSameGeneration']
+
+class TestHashBackend(SolverTestCase):
+
+    frontend = 'Python'
+
+    def testExamplesAnswers(self):
+        self.checkExamples(EXAMPLES, 'Backend=Hash')
+
+    def testNoTrieNodes(self):
+        solver_directory = self.generateSolver('graphClausure', 'Backend=Hash')
+        with open(os.path.join(solver_directory, 'datastructure.py')) as f:
+            code = f.read()
+        self.assertNotIn('__create_node', code)
+        self.assertNotIn('__level0', code)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+'''
+Tests of the Multiprocess queue of the Python solvers.
+'''
+import os
+import unittest
+
+from SolverTestCase import SolverTestCase, PY_EXAMPLES, EXPRESSION_EXAMPLES
+
+# Number of workers of the solvers
+WORKERS = 3
+
+class TestMultiprocessQueue(SolverTestCase):
+
+    frontend = 'Python'
+
+    # Every worker writes its own file
+    def readAnswers(self, solver_directory, predicate):
+        answers = []
+        for worker in xrange(WORKERS):
+            with open(os.path.join(solver_directory, '{}-{}.tuples'.format(predicate, worker))) as f:
+                answers.extend(line for line in f.read().split('\n') if line)
+        return sorted(answers)
+
+    def testExamplesAnswers(self):
+        self.checkExamples(PY_EXAMPLES + EXPRESSION_EXAMPLES + ['EqualCardsType2g'], 'Queue=Multiprocess',
+                           [str(WORKERS)])
+
+    def testOnlyNativeBackend(self):
+        self.assertRejected('graphClausure', 'Backend=SQLite,Queue=Multiprocess')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+'''
+Tests of the NumPy backend of the Python solvers.
+'''
+import unittest
+
+from SolverTestCase import SolverTestCase, PY_EXAMPLES, EXPRESSION_EXAMPLES, requiresNumPy
+
+@requiresNumPy
+class TestNumPyBackend(SolverTestCase):
+
+    frontend = 'Python'
+
+    def testExamplesAnswers(self):
+        self.checkExamples(PY_EXAMPLES + EXPRESSION_EXAMPLES, 'Backend=NumPy')
+
+    def testOnlyDequeQueue(self):
+        self.assertRejected('graphClausure', 'Backend=NumPy,Queue=Redis')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+'''
+Tests of the formats of the answers of the Python and the C solvers.
+'''
+import os
+import gzip
+import shutil
+import struct
+import unittest
+import subprocess
+
+from SolverTestCase import SolverTestCase, C_OPTIONS, requiresCCompiler, numpy
+
+# The answers of pointerAnalysis are written in gzip except the ones of vP,
+# written in binary (the text format is the default of the rest of the tests)
+OPTIONS = 'Output=gzip,Output.vP=binary'
+
+# Writes answers of INT_MIN values (the longest ones) starting at every free
+# space of the buffer near its end. The OutputFile is followed by a canary that
+# is overwritten if an answer is written past the end of the buffer.
+OUTPUT_PROGRAM = r'''
+#include <limits.h>
+#include <string.h>
+
+#include "output.h"
+
+struct{
+    OutputFile output;
+    char canary[64];
+} file;
+
+int main(void){
+    unsigned int values[4] = {INT_MIN, INT_MIN, INT_MIN, INT_MIN};
+    int free_space, num_values, i;
+
+    memset(file.canary, 0x5a, sizeof(file.canary));
+    for (num_values = 1; num_values <= 4; num_values++){
+        for (free_space = 0; free_space < 64; free_space++){
+            if (!OutputFile_open(&file.output, "answers.tuples", OUTPUT_TEXT))
+                return 2;
+            memset(file.output.buffer, '\n', OUTPUT_BUFFER_SIZE - free_space);
+            file.output.used = OUTPUT_BUFFER_SIZE - free_space;
+            OutputFile_write(&file.output, "p", 1, values, num_values);
+            OutputFile_write(&file.output, "p", 1, values, num_values);
+            OutputFile_close(&file.output);
+            for (i = 0; i < sizeof(file.canary); i++)
+                if (file.canary[i] != 0x5a)
+                    return 1;
+        }
+    }
+    return 0;
+}
+'''
+
+class TestOutputFormats(SolverTestCase):
+
+    def checkFormats(self, solver_directory):
+        # Gzip
+        f = gzip.open(os.path.join(solver_directory, 'hP.tuples.gz'))
+        try:
+            self.assertListEqual(sorted(line for line in f.read().split('\n') if line),
+                                 self.expectedAnswers('pointerAnalysis', 'hP'))
+        finally:
+            f.close()
+        # Binary, every answer of vP is two signed 64 bit little-endian integers
+        with open(os.path.join(solver_directory, 'vP.tuples.bin'), 'rb') as f:
+            data = f.read()
+        values = struct.unpack('<{}q'.format(len(data) // 8), data)
+        self.assertListEqual(sorted('vP({}, {}).'.format(*answer) for answer in zip(values[::2], values[1::2])),
+                             self.expectedAnswers('pointerAnalysis', 'vP'))
+        self.assertFalse(os.path.exists(os.path.join(solver_directory, 'vP.tuples')))
+        self.assertTrue(os.path.exists(os.path.join(solver_directory, 'temp1.tuples.gz')))
+
+    def solve(self, options):
+        solver_directory = self.buildSolver('pointerAnalysis', options)
+        status, errors = self.runSolver(solver_directory)
+        self.assertEqual(status, 0, errors)
+        self.checkFormats(solver_directory)
+        shutil.rmtree(solver_directory)
+
+    def testPythonFormats(self):
+        self.frontend = 'Python'
+        for backend in ['Native', 'SQL'] + (['NumPy'] if numpy is not None else []):
+            self.solve(OPTIONS + ',Backend=' + backend)
+
+    @requiresCCompiler
+    def testCFormats(self):
+        self.solve(OPTIONS + ',' + C_OPTIONS)
+
+    @requiresCCompiler
+    def testCLongValuesAtTheEndOfTheBuffer(self):
+        solver_directory = self.generateSolver('pointerAnalysis', C_OPTIONS)
+        with open(os.path.join(solver_directory, 'check_output.c'), 'w') as f:
+            f.write(OUTPUT_PROGRAM)
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call(['cc', '-std=c99', '-Iinclude', '-o', 'check_output', 'check_output.c', 'output.c'],
+                                  cwd=solver_directory, stdout=devnull, stderr=devnull)
+        self.assertEqual(subprocess.call(['./check_output'], cwd=solver_directory), 0)
+        # The last file has two answers with four values
+        with open(os.path.join(solver_directory, 'answers.tuples')) as f:
+            self.assertListEqual([line for line in f.read().split('\n') if line],
+                                 ['p({}).'.format(', '.join(['-2147483648'] * 4))] * 2)
+
+    def testUnknownFormat(self):
+        self.frontend = 'Python'
+        self.assertRejected('pointerAnalysis', 'Output.vP=csv')
+
+if __name__ == "__main__":
+    unittest.main()
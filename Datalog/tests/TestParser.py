@@ -0,0 +1,117 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import sys
+import glob
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from Parser import parseRule, parseRules, ParsingError
+from Types import Argument, Predicate, AssignationExpression, BooleanExpression,\
+                  ArithmeticExpression
+
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+def variables(*names):
+    return [Argument('variable', name) for name in names]
+
+def getPredicate(predicate):
+    return (predicate.id.name, predicate.negated, predicate.arguments)
+
+class TestParser(unittest.TestCase):
+
+    def testRuleWithPredicates(self):
+        head, body = parseRule('path(X, Y) :- edge(X, 1, Z), ~path(Z, -2).\n')
+        self.assertEqual(getPredicate(head), ('path', False, variables('X', 'Y')))
+        self.assertEqual([getPredicate(x) for x in body],
+                         [('edge', False, [Argument('variable', 'X'), Argument('constant', 1),
+                                           Argument('variable', 'Z')]),
+                          ('path', True, [Argument('variable', 'Z'), Argument('constant', -2)])])
+        self.assertEqual(head.id, body[1].id)
+
+    def testRuleWithExpressions(self):
+        _, body = parseRule('A(X, R) :- B(X), (X % 2) == 0, X + 1 != 3, R = X * X.')
+        X, R = variables('X', 'R')
+        self.assertEqual(body[1:],
+                         [BooleanExpression('boolean',
+                                            (ArithmeticExpression((X, Argument('constant', 2)), '%'),
+                                             Argument('constant', 0)), '=='),
+                          BooleanExpression('boolean',
+                                            (ArithmeticExpression((X, Argument('constant', 1)), '+'),
+                                             Argument('constant', 3)), '!='),
+                          AssignationExpression('assignation', (R, ArithmeticExpression((X, X), '*')), '=')])
+
+    def testRulesWithAnySpacing(self):
+        # Every rule is given with the variables of its head and its body
+        rules = [('A(X, Z) :- B(X, Z).', 'XZ', ['BXZ']),
+                 ('A(X,Z):-B(X,Z).', 'XZ', ['BXZ']),
+                 ('A(X,          Z)    :-             B(X,                Z).', 'XZ', ['BXZ']),
+                 ('A(X, Z) :    - B(X, Z).', 'XZ', ['BXZ']),
+                 ('A(X,Y):-B(X,Z),C(Z,Y).', 'XY', ['BXZ', 'CZY']),
+                 ('A(X,          Y) :-              B(          X, Z), C(     Z, Y)     .', 'XY', ['BXZ', 'CZY']),
+                 ('A          (X, Y) :- B(      X, Z), C(Z           , W), D(  Z, Y).', 'XY',
+                  ['BXZ', 'CZW', 'DZY'])]
+        for rule, head_variables, body in rules:
+            head, obtained = parseRule(rule)
+            self.assertEqual(getPredicate(head), ('A', False, variables(*head_variables)), rule)
+            self.assertEqual([getPredicate(x) for x in obtained],
+                             [(x[0], False, variables(*x[1:])) for x in body], rule)
+
+    def testLongNames(self):
+        head, body = parseRule('ThisIsALongName(      LongLongName1  , LongLongLongName2) :- '
+                               'AnotherLongName(LongLongName3, LongLongLongName4).')
+        self.assertEqual(getPredicate(head),
+                         ('ThisIsALongName', False, variables('LongLongName1', 'LongLongLongName2')))
+        self.assertEqual([getPredicate(x) for x in body],
+                         [('AnotherLongName', False, variables('LongLongName3', 'LongLongLongName4'))])
+
+    def testMalformedRules(self):
+        for rule in ['A(X,Z):-B(X,Z)',
+                     'A(X, Y) :- B(X, Z), C(Z, Y)',
+                     'A(X, Z) B(X, Z).',
+                     'A(X, Y) :- B(X, Z) C(Z, Y).',
+                     'A(X, Y) :- B(X, Z, C(Z, Y).',
+                     'A(X, Y) :- B(X, Z), CZ, Y).']:
+            self.assertRaises(ParsingError, parseRule, rule)
+
+    def testMultilineRulesAndComments(self):
+        program = ['# A comment\n',
+                   '\n',
+                   'path(X, Y) :-   # The rule starts here\n',
+                   '    edge(X, Z),\n',
+                   '    path(Z, Y). path(X, Y) :- edge(X, Y).\n',
+                   'reach(X) :- path(1, X).']
+        rules = list(parseRules(program))
+        self.assertEqual([(x[0].id.name, len(x[1]), x[2]) for x in rules],
+                         [('path', 2, 3), ('path', 1, 5), ('reach', 1, 6)])
+        self.assertEqual(rules[0][3], ''.join(program[2:5]))
+
+    def testErrorsReportTheLineAndTheColumn(self):
+        errors = [('p(X) :- q(X) r(X).', 1, 14),
+                  ('p(X) :- q(X,\n  $Y).', 2, 3),
+                  ('p(X) :- q(X)', 1, 13),
+                  ('p(X) q(X).', 1, 6),
+                  ('p(X) :- X >> 2.', 1, 12),
+                  ('~p(X) :- q(X).', 1, 1)]
+        for rule, line, column in errors:
+            try:
+                parseRule(rule)
+            except ParsingError as e:
+                self.assertEqual((e.line, e.column), (line, column), 'Wrong position for: ' + rule)
+            else:
+                self.fail("Invalid Rule: " + rule + " should have raised an exception")
+
+    def testExamplesCanBeParsedLineByLine(self):
+        # Every rule of the examples is written in its own line
+        for example in sorted(glob.glob(os.path.join(EXAMPLES_DIRECTORY, '*.dl'))):
+            with open(example) as f:
+                lines = f.readlines()
+            for head, body, line_no, line in parseRules(lines):
+                self.assertEqual(line, lines[line_no - 1])
+                self.assertEqual(parseRule(line), (head, body))
+
+if __name__ == "__main__":
+    unittest.main()
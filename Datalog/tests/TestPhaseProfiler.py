@@ -0,0 +1,53 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+sys.path.insert(0, SOURCE_DIRECTORY)
+
+# A program with two stratums
+NEGATED_PROGRAM = os.path.join(EXAMPLES_DIRECTORY, 'negated.dl')
+
+class TestPhaseProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.report = os.path.join(self.directory, 'phases.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def compileProgram(self, frontend, *options):
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call([sys.executable, 'dcompiler.py', '-f', frontend, '-d', self.directory,
+                                   '--profile-phases', self.report] + list(options) + [NEGATED_PROGRAM],
+                                  cwd=SOURCE_DIRECTORY, stdout=devnull, stderr=devnull)
+        with open(self.report) as f:
+            return json.load(f)
+
+    def testReportContainsEveryPhase(self):
+        for frontend in ['C', 'Python', 'Java', 'CPP']:
+            report = self.compileProgram(frontend, '-j', '2')
+            names = [phase['name'] for phase in report['phases']]
+            self.assertEqual(names[:6], ['parsing', 'rules table', 'predicate ordering', 'stratification',
+                                         'equation generation (stratum 1)', 'equation generation (stratum 2)'])
+            self.assertIn('generation index', names)
+            self.assertTrue([name for name in names if name.startswith('directive fill')],
+                            'No directives measured for the ' + frontend + ' frontend')
+            self.assertEqual(report['frontend'], frontend)
+            for phase in report['phases']:
+                self.assertGreaterEqual(phase['calls'], 1)
+                self.assertGreaterEqual(phase['wall_time'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
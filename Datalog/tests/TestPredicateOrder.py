@@ -0,0 +1,149 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import sys
+import glob
+import unittest
+
+from copy import deepcopy
+from collections import Counter, defaultdict
+from operator import itemgetter
+from itertools import groupby
+from functools import cmp_to_key
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from BuildRulesTable import buildRulesTable
+from PredicateOrder import predicateOrder
+
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples')
+
+# Reference implementation. This is the ordering as it was computed before
+# the incremental peeling and the shared transitive closure, the orderings
+# obtained by predicateOrder must be exactly the same ones.
+def legacyComputeIncidendeGrades(dependencyGraph):
+    incidenceGrades = Counter({pred:0 for pred in dependencyGraph.keys()})
+    for key in dependencyGraph.keys():
+        for pred in dependencyGraph[key]:
+            incidenceGrades[pred] += 1
+    return incidenceGrades
+
+def legacyComputePredecessors(node, dependencyGraph):
+    answer = set([x for x in dependencyGraph[node].keys() if x != node])
+    working_set = deepcopy(answer)
+    while working_set:
+        current_node = working_set.pop()
+        temp_set = set([x for x in dependencyGraph[current_node].keys() if x not in answer and x != node])
+        answer |= temp_set
+        working_set |= temp_set
+    return answer
+
+def legacyOrderFirstBlock(block1, block2, predecessors, negatedPredicates):
+    answer = []
+    answer_tmp = []
+    for node in block2:
+        for pred in predecessors[node]:
+            if pred in block1:
+                answer_tmp.append(pred)
+    answer_tmp += list(set(block1).difference(set(answer_tmp)))
+    for idPred in answer_tmp:
+        if idPred in negatedPredicates:
+            answer.insert(0, idPred)
+        else:
+            answer.append(idPred)
+    return answer
+
+def legacyOrderThirdBlock(block_1, block_2, block_3, dependencyGraph):
+    graph = deepcopy(dependencyGraph)
+    for node in block_1:
+        del graph[node]
+    iG_1 = legacyComputeIncidendeGrades(graph)
+    for node in block_2:
+        del graph[node]
+    iG_2 = legacyComputeIncidendeGrades(graph)
+
+    sortingBlock = [ (elem, iG_2[elem]) for elem in block_3]
+    sortingBlock = sorted(sortingBlock, key=itemgetter(1), reverse=True)
+    sortingBlocks = [ list(x[1]) for x in groupby(sortingBlock, key=itemgetter(1)) ]
+    answer = []
+    for block in sortingBlocks:
+        if len(block) == 1:
+            answer.append(block[0][0])
+        else:
+            sortingBlock = [ (elem[0], iG_1[elem[0]]) for elem in block]
+            sortingBlock = sorted(sortingBlock, key=itemgetter(1), reverse=True)
+            answer.extend([x[0] for x in sortingBlock])
+    return answer
+
+def legacyPredicateOrder(dependencyGraph, intensionalPredicates, negatedPredicates):
+    block1 = list()
+    block2 = list()
+
+    graph = deepcopy(dependencyGraph)
+    incidenceGrades = legacyComputeIncidendeGrades(graph)
+    markedNodes = set() | negatedPredicates
+    addedNodes = [x for x in incidenceGrades.keys() if incidenceGrades[x] == 0]
+    while (len(addedNodes)):
+        markedNodes.update(addedNodes)
+        for node in addedNodes:
+            del graph[node]
+        iG = legacyComputeIncidendeGrades(graph)
+        addedNodes = [x for x in graph.keys() if iG[x] == 0]
+
+    for node in markedNodes:
+        if incidenceGrades[node] == 0:
+            block1.append(node)
+        else: block2.append(node)
+
+    block3 = list(set(dependencyGraph.keys()).union(intensionalPredicates).difference(markedNodes))
+    block3 = legacyOrderThirdBlock(block1, block2, block3, dependencyGraph)
+
+    predecessors = dict()
+    for node in block2:
+        predecessors[node] = legacyComputePredecessors(node, dependencyGraph)
+
+    block2 = sorted(block2, key=cmp_to_key(lambda x, y: 1 if x in predecessors[y] else -1))
+    block1 = legacyOrderFirstBlock(block1, block2, predecessors, negatedPredicates)
+
+    return (block1, block2, block3)
+
+# The legacy implementation works with the dependency graph as it was built
+# before, a dictionary of dictionaries that adds the missing nodes.
+def buildLegacyGraph(dependencyGraph):
+    graph = defaultdict(lambda: defaultdict(int))
+    for node, successors in dependencyGraph.iteritems():
+        for successor in successors:
+            graph[node][successor] = 0
+    return graph
+
+def analyzeExample(filename):
+    # Some of the examples are rejected by the compiler on purpose
+    try:
+        _, predicateTypes, dependencyGraph, negatedPredicates = buildRulesTable(filename)
+    except SystemExit:
+        return None
+    return dependencyGraph, predicateTypes.intensional, negatedPredicates
+
+class TestPredicateOrder(unittest.TestCase):
+
+    def testOrderingIsTheSameForAllTheExamples(self):
+        examples = sorted(glob.glob(os.path.join(EXAMPLES_DIRECTORY, '*.dl')))
+        self.assertTrue(examples, 'No examples found in ' + EXAMPLES_DIRECTORY)
+
+        for example in examples:
+            analysis = analyzeExample(example)
+            if analysis is None:
+                continue
+            dependencyGraph, intensionalPredicates, negatedPredicates = analysis
+            obtained_result = predicateOrder(*analysis)
+            good_result = legacyPredicateOrder(buildLegacyGraph(dependencyGraph),
+                                               intensionalPredicates, negatedPredicates)
+            self.assertEqual(obtained_result, good_result,
+                             'Different ordering for ' + os.path.basename(example) +
+                             '\n\tObtained Result: ' + str(obtained_result) +
+                             '\n\tExpected Result: ' + str(good_result))
+
+if __name__ == "__main__":
+    unittest.main()
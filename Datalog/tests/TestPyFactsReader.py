@@ -0,0 +1,45 @@
+'''
+Tests of the errors of the facts read by the Python solvers.
+'''
+import os
+import unittest
+
+from SolverTestCase import SolverTestCase, requiresNumPy
+
+# The facts of the predicate a of the example pointerAnalysis (arity 2) are
+# replaced by the given lines and the solver must stop with the given error.
+class TestPyFactsReader(SolverTestCase):
+
+    frontend = 'Python'
+
+    def solveWithFacts(self, options, lines):
+        solver_directory = self.buildSolver('pointerAnalysis', options)
+        with open(os.path.join(solver_directory, 'a.tuples'), 'w') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        status, errors = self.runSolver(solver_directory)
+        return status, errors.strip().split('\n')[-1]
+
+    def checkErrors(self, options):
+        # A fact with too many values balanced by a fact with too few
+        self.assertEqual(self.solveWithFacts(options, ['a(1, 2).', 'a(1, 2, 3).', 'a(4).']),
+                         (1, "ValueError: a.tuples:2: 'a(1, 2, 3).' is not a fact with 2 integer values"))
+        self.assertEqual(self.solveWithFacts(options, ['1\t2', '-', '3\t4']),
+                         (1, "ValueError: a.tuples:2: '-' is not a fact with 2 integer values"))
+        self.assertEqual(self.solveWithFacts(options, ['1,2', '', '3-4,5']),
+                         (1, "ValueError: a.tuples:3: '3-4,5' is not a fact with 2 integer values"))
+        # Characters that are not part of a value nor a separator
+        for line in ['1\tfoo\t3', '1.5,2', 'a(1, 2)b(3).', '1e5,2', 'a(1, 2)', '1, 2).']:
+            self.assertEqual(self.solveWithFacts(options, ['a(1, 2).', line]),
+                             (1, "ValueError: a.tuples:2: {!r} is not a fact with 2 integer values".format(line)))
+        # The facts can be written as in the .tuples files, as TSV or as CSV
+        self.assertEqual(self.solveWithFacts(options, ['a(1, 2).', '  a( 3 ,4 ) . ', '5\t6', '7,8', '9 10']), (0, ''))
+
+    def testNativeBackend(self):
+        self.checkErrors('Backend=Native')
+
+    @requiresNumPy
+    def testNumPyBackend(self):
+        self.checkErrors('Backend=NumPy')
+
+if __name__ == "__main__":
+    unittest.main()
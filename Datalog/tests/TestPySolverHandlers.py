@@ -0,0 +1,54 @@
+'''
+Tests of the dispatch of the rewriting variables of the Python solvers: the
+code of every predicate is emitted in a handler and solver_compute calls the
+handler of the hypothesis of every variable taken from the queue. The
+solvers have to obtain the answers they obtained before the handlers were
+used, which are the .output files of the examples.
+'''
+import os
+import glob
+import unittest
+
+from SolverTestCase import SolverTestCase, EXAMPLES_DIRECTORY
+
+# Every example with a Datalog program and its expected answers
+EXAMPLES = sorted(os.path.basename(directory.rstrip(os.sep))
+                  for directory in glob.glob(os.path.join(EXAMPLES_DIRECTORY, '*', ''))
+                  if os.path.exists(directory.rstrip(os.sep) + '.dl'))
+
+# The predicates of the chain are in the same stratum, so its handlers list
+# contains one handler for every predicate
+CHAIN_LENGTH = 100
+
+class TestPySolverHandlers(SolverTestCase):
+
+    frontend = 'Python'
+
+    def testExamplesAnswers(self):
+        self.checkExamples(EXAMPLES, '')
+
+    def testVariablesAreDispatchedByTheHandlers(self):
+        solver_directory = self.generateSolver('negationTwoPredicates3', '')
+        with open(os.path.join(solver_directory, 'solver.py')) as f:
+            code = f.read()
+        self.assertIn('handler = handlers[current[0]]', code)
+        self.assertNotIn('if current[0] == hypotheses.', code)
+
+    def testLongChain(self):
+        program = os.path.join(self.directory, 'chain.dl')
+        with open(program, 'w') as f:
+            f.write('p1(X, Y) :- edge(X, Y).\n')
+            for position in xrange(2, CHAIN_LENGTH + 1):
+                f.write('p{}(X, Y) :- p{}(X, Y).\n'.format(position, position - 1))
+
+        facts = [(x, (x * 7) % 50) for x in xrange(50)]
+        solver_directory = self.generateSolver(program, '')
+        self.writeFacts(solver_directory, 'edge', facts)
+        status, errors = self.runSolver(solver_directory)
+        self.assertEqual(status, 0, errors)
+        predicate = 'p{}'.format(CHAIN_LENGTH)
+        self.assertListEqual(self.readAnswers(solver_directory, predicate),
+                             sorted('{}({}, {}).'.format(predicate, x, y) for x, y in facts))
+
+if __name__ == "__main__":
+    unittest.main()
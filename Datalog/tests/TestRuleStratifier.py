@@ -0,0 +1,62 @@
+'''
+Tests of the stratification of the rules with the strongly connected
+components of the predicate dependency graph.
+'''
+import os
+import sys
+import logging
+import unittest
+
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from BuildRulesTable import buildRulesTable
+from RuleStratifier import buildStratificationGraph, computePredicateLevels, stratifyRules
+
+def rulesTable(program):
+    return buildRulesTable(StringIO(program), True)[0]
+
+# The stratums are given by the names of the heads of their rules
+def stratumNames(stratums):
+    return [[rule.head.id.name for rule in stratum] for stratum in stratums]
+
+class TestRuleStratifier(unittest.TestCase):
+
+    def testLevels(self):
+        rules = rulesTable('path(X, Y) :- edge(X, Y).\n'
+                           'path(X, Y) :- edge(X, Z), path(Z, Y).\n'
+                           'node(X) :- edge(X, Y).\n'
+                           'unreachable(X, Y) :- node(X), node(Y), ~path(X, Y).\n'
+                           'connected(X) :- node(X), ~unreachable(X, X).\n'
+                           'reach(X, Y) :- connected(X), path(X, Y).\n')
+        levels = computePredicateLevels(buildStratificationGraph(rules))
+        self.assertEqual(dict((predicate.name, level) for predicate, level in levels.items()),
+                         {'edge': 0, 'path': 0, 'node': 0, 'unreachable': 1, 'connected': 2, 'reach': 2})
+        # The rules keep their order inside every stratum
+        self.assertEqual(stratumNames(stratifyRules(rules)),
+                         [['path', 'path', 'node'], ['unreachable'], ['connected', 'reach']])
+
+    # The rule negating an extensional predicate is evaluated after the rules
+    # that don't, before it was placed in the first stratum
+    def testNegatedExtensionalPredicate(self):
+        rules = rulesTable('a(X) :- e(X).\n'
+                           'b(X) :- e(X), ~f(X).\n'
+                           'c(X) :- a(X), b(X).\n')
+        self.assertEqual(stratumNames(stratifyRules(rules)), [['a'], ['b', 'c']])
+
+    def testNegationInsideACycle(self):
+        rules = rulesTable('p(X) :- q(X), ~r(X).\n'
+                           'r(X) :- s(X), p(X).\n'
+                           's(X) :- r(X).\n')
+        logging.disable(logging.ERROR)
+        try:
+            with self.assertRaises(ValueError) as context:
+                stratifyRules(rules)
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertIn('"p" depends on the negation of "r" through a recursive cycle (p, r, s)',
+                      str(context.exception))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+'''
+Tests of the SQL backend of the Python solvers.
+'''
+import os
+import unittest
+
+from SolverTestCase import SolverTestCase, PY_EXAMPLES
+
+# Examples with arithmetic and boolean expressions and rules without common variables
+EXAMPLES = PY_EXAMPLES + ['booleanOneRuleExpression6', 'reverseSameGeneration']
+
+class TestSQLBackend(SolverTestCase):
+
+    frontend = 'Python'
+
+    def testExamplesAnswers(self):
+        self.checkExamples(EXAMPLES, 'Backend=SQL')
+
+    def testDatabaseFile(self):
+        solver_directory = self.buildSolver('negationTwoPredicates3', 'Backend=SQL')
+        # The tables of the previous execution are replaced
+        for _ in xrange(2):
+            status, errors = self.runSolver(solver_directory, ['solver.db'])
+            self.assertEqual(status, 0, errors)
+            self.checkAnswers('negationTwoPredicates3', solver_directory)
+        self.assertTrue(os.path.exists(os.path.join(solver_directory, 'solver.db')))
+
+    def testPythonArithmetic(self):
+        # The integer division and the modulo round towards minus infinity as in Python
+        program = os.path.join(self.directory, 'arithmetic.dl')
+        with open(program, 'w') as f:
+            f.write('result(X, Y, Z) :- number(X), Y = X / 3, Z = X % 3.\n')
+        solver_directory = self.generateSolver(program, 'Backend=SQL')
+        self.writeFacts(solver_directory, 'number', [(x,) for x in xrange(-7, 8)])
+        status, errors = self.runSolver(solver_directory)
+        self.assertEqual(status, 0, errors)
+        self.assertListEqual(self.readAnswers(solver_directory, 'result'),
+                             sorted('result({}, {}, {}).'.format(x, x / 3, x % 3) for x in xrange(-7, 8)))
+
+    def testOnlyDequeQueue(self):
+        self.assertRejected('graphClausure', 'Backend=SQL,Queue=Multiprocess')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+'''
+Tests of the SQLite backend of the Python solvers.
+'''
+import os
+import shutil
+import unittest
+
+from SolverTestCase import SolverTestCase, PY_EXAMPLES
+
+class TestSQLiteBackend(SolverTestCase):
+
+    frontend = 'Python'
+
+    def testExamplesAnswers(self):
+        self.checkExamples(PY_EXAMPLES, 'Backend=SQLite')
+
+    def testDatabaseFile(self):
+        for example in PY_EXAMPLES:
+            solver_directory = self.buildSolver(example, 'Backend=SQLite')
+            # The tables of the previous execution are replaced
+            for _ in xrange(2):
+                status, errors = self.runSolver(solver_directory, ['solver.db'])
+                self.assertEqual(status, 0, errors)
+                self.checkAnswers(example, solver_directory)
+            self.assertTrue(os.path.exists(os.path.join(solver_directory, 'solver.db')))
+            shutil.rmtree(solver_directory)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+'''
+Tests of the embeddable API of the Python solvers.
+'''
+import os
+import sys
+import glob
+import shutil
+import unittest
+import subprocess
+
+from SolverTestCase import SolverTestCase, EXAMPLES_DIRECTORY, PY_EXAMPLES, numpy
+
+BACKENDS = ['Native', 'Hash', 'SQLite', 'SQL'] + (['NumPy'] if numpy is not None else [])
+
+# The script is executed in the directory of the solver. The facts are read from
+# the .input files of the example directory (the first argument) and given to
+# the solver by generators. The second argument chooses what is checked:
+#    answers -> The answers of every predicate with an .output file are printed.
+#    stream -> Prints if the evaluation finished before the first answer of the
+#              predicate of the first .output file.
+#    errors -> Prints the errors of the wrong uses of the API.
+SCRIPT = r'''
+import glob
+import os
+import re
+import sys
+
+from api import Solver, EXTENSIONAL_PREDICATES
+
+def read_facts(filename):
+    with open(filename) as f:
+        for line in f:
+            if line.strip():
+                yield tuple(int(value) for value in re.findall(r'-?\d+', line[line.index('('):]))
+
+def create_solver(example_directory):
+    solver = Solver()
+    for name in EXTENSIONAL_PREDICATES:
+        filename = os.path.join(example_directory, name + '.input')
+        if os.path.exists(filename):
+            solver.add_facts(name, read_facts(filename))
+    return solver
+
+example_directory, mode = sys.argv[1:]
+predicates = [os.path.basename(filename)[:-len('.output')]
+              for filename in sorted(glob.glob(os.path.join(example_directory, '*.output')))]
+solver = create_solver(example_directory)
+if mode == 'answers':
+    # A second solver is evaluated at the same time
+    other_solver = create_solver(example_directory)
+    other_solver.run(1)
+    for name in predicates:
+        for answer in solver.answers(name):
+            print '{}({}).'.format(name, ', '.join(str(value) for value in answer))
+    other_solver.run()
+    for name in predicates:
+        for answer in other_solver.answers(name):
+            print '{}({}).'.format(name, ', '.join(str(value) for value in answer))
+elif mode == 'stream':
+    answers = solver.answers(predicates[0], 1)
+    next(answers)
+    print solver.finished
+elif mode == 'errors':
+    for predicate, facts in (('unknown', []), (sorted(EXTENSIONAL_PREDICATES)[0], [(0, 0, 0, 0, 0)])):
+        try:
+            solver.add_facts(predicate, facts)
+            solver.run()
+        except ValueError as e:
+            print e
+    try:
+        Solver(['unknown'])
+    except ValueError as e:
+        print e
+'''
+
+class TestSolverAPI(SolverTestCase):
+
+    frontend = 'Python'
+
+    def generateSolver(self, example, options):
+        solver_directory = SolverTestCase.generateSolver(self, example, options)
+        with open(os.path.join(solver_directory, 'check_api.py'), 'w') as f:
+            f.write(SCRIPT)
+        return solver_directory
+
+    def runScript(self, solver_directory, example, mode):
+        return subprocess.check_output([sys.executable, 'check_api.py',
+                                        os.path.join(EXAMPLES_DIRECTORY, example), mode],
+                                       cwd=solver_directory)
+
+    def testExamplesAnswers(self):
+        for backend in BACKENDS:
+            for example in PY_EXAMPLES:
+                solver_directory = self.generateSolver(example, 'Backend=' + backend)
+                expected = []
+                for filename in glob.glob(os.path.join(EXAMPLES_DIRECTORY, example, '*.output')):
+                    expected.extend(self.expectedAnswers(example, os.path.basename(filename)[:-len('.output')]))
+                # Both solvers obtain the answers
+                obtained = self.runScript(solver_directory, example, 'answers').split('\n')
+                self.assertListEqual(sorted(line for line in obtained if line), sorted(expected * 2),
+                                     'Wrong answers for {} with the {} backend'.format(example, backend))
+                shutil.rmtree(solver_directory)
+
+    def testAnswersBeforeTheEnd(self):
+        solver_directory = self.generateSolver('graphClausure', 'Backend=Native')
+        self.assertEqual(self.runScript(solver_directory, 'graphClausure', 'stream'), 'False\n')
+
+    def testErrors(self):
+        solver_directory = self.generateSolver('pointerAnalysis', 'Backend=Native')
+        self.assertEqual(self.runScript(solver_directory, 'pointerAnalysis', 'errors'),
+                         'unknown is not an extensional predicate\n'
+                         'a: every fact must contain 2 values\n'
+                         'The answers of unknown are not stored by the solver\n')
+
+    def testOnlyWithTheDequeQueue(self):
+        solver_directory = self.generateSolver('pointerAnalysis', 'Queue=Multiprocess')
+        self.assertFalse(os.path.exists(os.path.join(solver_directory, 'api.py')))
+        with open(os.path.join(solver_directory, 'solver.py')) as f:
+            self.assertNotIn('def solver_steps', f.read())
+
+if __name__ == "__main__":
+    unittest.main()